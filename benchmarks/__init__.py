@@ -0,0 +1 @@
+"""Local benchmarks for the demo tool path. Run from the repository root, e.g. ``python -m benchmarks.encoding_benchmark``."""
@@ -0,0 +1,309 @@
+"""Offline end-to-end benchmark of the three demo approaches.
+
+The loop and ptc sessions run against ``StubAnthropic``, which replays a scripted
+discover_features / run_features conversation (with a container ID for PTC); the bash
+session runs against ``fake_claude.py`` put on PATH as ``claude``. No API key or network
+access is needed, so the numbers isolate our side of each approach.
+
+Usage:
+    python -m benchmarks.e2e_benchmark                          # all approaches, 1k and 100k rows
+    python -m benchmarks.e2e_benchmark --approaches loop ptc --rows 1000000 --latency 0.2
+    python -m benchmarks.e2e_benchmark --approaches ptc ptc_warm --cold-start 2
+    python -m benchmarks.e2e_benchmark --approaches loop --latency 1 --stream-tools
+
+Prints one JSON object per (approach, rows) pair, best of ``--repeat`` by wall time:
+wall_seconds, turns, tool_calls, tool_errors, dispatch_seconds, dispatch_overhead_seconds (dispatch
+wall time not spent in the slowest handler of each turn), serialize_seconds (encoding or
+digesting results), run_all_seconds (summed over concurrent calls), run_all_calls and
+payload_bytes (tool results sent back to the model). ptc records also say whether the session started in a
+warm container (``ptc_warm`` starts from a pool holding the stub container).
+first_tool_result_seconds is the time from session start until the first tool call
+finished; with --stream-tools, dispatch_seconds runs from the first call started mid-stream.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, cast
+
+from mloda.user import PluginLoader
+
+import demo
+from benchmarks.stub_api import StubAnthropic, StubResponse, final_turn, tool_turn
+from ptc_mloda_demo.agents.containers.container_pool import ContainerPool
+from ptc_mloda_demo.agents.dispatch.tool_dispatcher import ToolBatch, ToolDispatcher, ToolObserver
+from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import ROWS_OPTION, SEED_OPTION
+from ptc_mloda_demo.tools.encoding.result_encoding import DEFAULT_FORMAT
+from ptc_mloda_demo.tools.shaping.result_shaper import ResultShaper
+
+# ptc_warm is a ptc session that starts in a container left in the pool by an earlier session.
+APPROACHES = ("loop", "bash", "ptc", "ptc_warm")
+
+STUB_CONTAINER_ID = "container_stub"
+
+# The three demo questions, answered with server-side pushdown.
+QUESTION_CALLS: list[tuple[str, dict[str, Any]]] = [
+    (
+        "run_features",
+        {
+            "feature_names": ["employee_id", "department", "salary"],
+            "order_by": [{"column": "salary", "descending": True}],
+            "limit": 3,
+        },
+    ),
+    (
+        "run_features",
+        {
+            "feature_names": ["department", "salary"],
+            "group_by": ["department"],
+            "aggregations": [{"column": "salary", "func": "mean"}],
+        },
+    ),
+    (
+        "run_features",
+        {
+            "feature_names": ["employee_id", "department", "performance_score"],
+            "filter": [{"column": "performance_score", "op": ">", "value": 90}],
+        },
+    ),
+]
+
+
+def loop_script(question_turns: int = 1) -> list[StubResponse]:
+    """discover_features, then ``question_turns`` turns asking all three questions, then the answer."""
+    return [
+        tool_turn([("discover_features", {})]),
+        *(tool_turn(QUESTION_CALLS) for _ in range(question_turns)),
+        final_turn("stub answer"),
+    ]
+
+
+def ptc_script() -> list[StubResponse]:
+    # Sandbox code typically pulls the full table once, in a binary format, and analyzes it locally.
+    full_fetch = ("run_features", {"feature_names": list(demo.EMPLOYEE_FEATURES), "format": "parquet"})
+    return [
+        tool_turn([("discover_features", {})], container=STUB_CONTAINER_ID),
+        tool_turn([full_fetch], container=STUB_CONTAINER_ID),
+        final_turn("stub answer", container=STUB_CONTAINER_ID),
+    ]
+
+
+class _Metrics:
+    def __init__(self) -> None:
+        self.values: dict[str, float] = {
+            "tool_calls": 0,
+            "tool_errors": 0,
+            "dispatch_seconds": 0.0,
+            "dispatch_overhead_seconds": 0.0,
+            "serialize_seconds": 0.0,
+            "run_all_seconds": 0.0,
+            "run_all_calls": 0,
+            "payload_bytes": 0,
+        }
+        self._turn_handler_seconds: list[float] = []
+        self.started = time.perf_counter()
+
+    def timed(self, key: str, func: Callable[..., Any], count_key: Optional[str] = None) -> Callable[..., Any]:
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self.values[key] += elapsed
+                if count_key is not None:
+                    self.values[count_key] += 1
+                if key == "handler_seconds":
+                    self._turn_handler_seconds.append(elapsed)
+                    if "first_tool_result_seconds" not in self.values:
+                        self.values["first_tool_result_seconds"] = time.perf_counter() - self.started
+
+        return wrapper
+
+    def dispatcher(self, handler: Callable[[str, dict[str, Any]], str]) -> ToolDispatcher:
+        metrics = self
+        self.values.setdefault("handler_seconds", 0.0)
+
+        class TimedBatch(ToolBatch):
+            first_submit = 0.0
+
+            def submit(self, block: Any) -> None:
+                if not len(self):
+                    metrics._turn_handler_seconds = []
+                    self.first_submit = time.perf_counter()
+                super().submit(block)
+
+            def results(self) -> list[dict[str, Any]]:
+                results = super().results()
+                if not results:
+                    return results
+                elapsed = time.perf_counter() - self.first_submit
+                metrics.values["dispatch_seconds"] += elapsed
+                metrics.values["dispatch_overhead_seconds"] += max(
+                    0.0, elapsed - max(metrics._turn_handler_seconds, default=0.0)
+                )
+                metrics.values["tool_calls"] += len(results)
+                metrics.values["tool_errors"] += sum(1 for r in results if r.get("is_error"))
+                metrics.values["payload_bytes"] += sum(len(str(r["content"]).encode("utf-8")) for r in results)
+                return results
+
+        class TimedDispatcher(ToolDispatcher):
+            def batch(self, observer: Optional[ToolObserver] = None) -> ToolBatch:
+                return TimedBatch(self, observer)
+
+        return TimedDispatcher(self.timed("handler_seconds", handler))
+
+    def shaper(self, budget: ResultShaper) -> ResultShaper:
+        """A ResultShaper with ``budget``'s limits whose shape calls count as serialize_seconds."""
+        metrics = self
+
+        class TimedShaper(ResultShaper):
+            def shape(self, frame: Any, fmt: str = DEFAULT_FORMAT) -> str:
+                return str(metrics.timed("serialize_seconds", super().shape)(frame, fmt))
+
+        return TimedShaper(budget.max_bytes, budget.max_tokens, budget.chars_per_token)
+
+
+@contextlib.contextmanager
+def _patched(module: Any, **attrs: Any) -> Iterator[None]:
+    saved = {name: getattr(module, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(module, name, value)
+
+
+@contextlib.contextmanager
+def fake_claude_on_path(rows: int) -> Iterator[None]:
+    """Put a ``claude`` shim that runs fake_claude.py first on PATH."""
+    root = Path(__file__).resolve().parent.parent
+    with tempfile.TemporaryDirectory() as bindir:
+        shim = Path(bindir) / "claude"
+        shim.write_text(
+            f'#!/bin/sh\nPYTHONPATH="{root}" exec "{sys.executable}" "{root / "benchmarks" / "fake_claude.py"}" "$@"\n'
+        )
+        shim.chmod(0o755)
+        env = {"PATH": f"{bindir}{os.pathsep}{os.environ.get('PATH', '')}", "FAKE_CLAUDE_ROWS": str(rows)}
+        saved = {k: os.environ.get(k) for k in env}
+        os.environ.update(env)
+        try:
+            yield
+        finally:
+            for key, value in saved.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+
+def run_once(
+    approach: str,
+    rows: int,
+    latency_seconds: float = 0.0,
+    cold_start_seconds: float = 0.0,
+    stream_tools: bool = False,
+) -> dict[str, Any]:
+    """Run one session of ``approach`` against ``rows`` generated employees and collect its metrics.
+
+    With ``stream_tools`` the loop and ptc sessions stream responses and start tool calls mid-stream.
+    """
+    PluginLoader.all()
+    metrics = _Metrics()
+    demo.RESULT_CACHE.clear()
+    options = {ROWS_OPTION: rows, SEED_OPTION: 0}
+    record: dict[str, Any] = {"benchmark": "e2e", "approach": approach, "rows": rows}
+    if approach != "bash":
+        record["stream_tools"] = stream_tools
+    pool = ContainerPool()
+    if approach == "ptc_warm":
+        pool.release(STUB_CONTAINER_ID)
+    with _patched(
+        demo,
+        FEATURE_OPTIONS=options,
+        CONTAINER_POOL=pool,
+        STREAM_TOOL_CALLS=stream_tools,
+        TOOL_DISPATCHER=metrics.dispatcher(demo._handle_tool_call),
+        RESULT_SHAPER=metrics.shaper(demo.RESULT_SHAPER),
+        _run_features=metrics.timed("run_all_seconds", demo._run_features, count_key="run_all_calls"),
+    ):
+        if approach == "bash":
+            with fake_claude_on_path(rows):
+                start = metrics.started = time.perf_counter()
+                output = asyncio.run(demo.bash_session())
+                record["wall_seconds"] = time.perf_counter() - start
+            summary = json.loads(output)
+            metrics.values.update(
+                run_all_seconds=summary["run_all_seconds"], run_all_calls=1, payload_bytes=summary["payload_bytes"]
+            )
+            record["turns"] = 1
+        else:
+            script = loop_script() if approach == "loop" else ptc_script()
+            client = StubAnthropic(script, latency_seconds, cold_start_seconds)
+            session = demo.loop_session if approach == "loop" else demo.ptc_session
+            start = metrics.started = time.perf_counter()
+            asyncio.run(session(cast(Any, client)))
+            record["wall_seconds"] = time.perf_counter() - start
+            record["turns"] = len(client.requests)
+            record["request_chars"] = sum(r.input_chars for r in client.requests)
+            record["cache_breakpoints"] = max(r.cache_breakpoints for r in client.requests)
+            if approach.startswith("ptc"):
+                record["container_reused"] = all(r.container == STUB_CONTAINER_ID for r in client.requests[1:])
+                record["warm_start"] = client.requests[0].container is not None
+    metrics.values.pop("handler_seconds", None)
+    record.update(metrics.values)
+    return record
+
+
+def benchmark(
+    rows: int,
+    approaches: tuple[str, ...] = APPROACHES,
+    repeat: int = 3,
+    latency_seconds: float = 0.0,
+    cold_start_seconds: float = 0.0,
+    stream_tools: bool = False,
+) -> list[dict[str, Any]]:
+    """Best-of-``repeat`` (by wall time) record for each approach at ``rows`` employees."""
+    return [
+        min(
+            (run_once(approach, rows, latency_seconds, cold_start_seconds, stream_tools) for _ in range(repeat)),
+            key=lambda r: r["wall_seconds"],
+        )
+        for approach in approaches
+    ]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--approaches", nargs="+", choices=APPROACHES, default=list(APPROACHES))
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per Messages API call")
+    parser.add_argument(
+        "--cold-start", type=float, default=0.0, help="simulated seconds to start a code-execution container"
+    )
+    parser.add_argument(
+        "--stream-tools", action="store_true", help="stream responses and start tool calls before they finish"
+    )
+    args = parser.parse_args(argv)
+
+    PluginLoader.all()
+    demo.FEATURE_CATALOG.refresh()
+    for rows in args.rows:
+        for record in benchmark(
+            rows, tuple(args.approaches), args.repeat, args.latency, args.cold_start, args.stream_tools
+        ):
+            sys.stdout.write(json.dumps(record) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""Microbenchmark: encode time and payload size of each run_features result format.
+
+Usage:
+    python -m benchmarks.encoding_benchmark                       # 10k and 100k rows
+    python -m benchmarks.encoding_benchmark --rows 1000000 --repeat 1
+
+Prints one JSON object per (format, rows) pair.
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Any, Optional
+
+from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import generate_employees
+from ptc_mloda_demo.tools.encoding.result_encoding import RESULT_FORMATS, encode_result
+
+
+def benchmark(rows: int, formats: tuple[str, ...] = RESULT_FORMATS, repeat: int = 3) -> list[dict[str, Any]]:
+    """Best-of-``repeat`` encode time and payload bytes for each format."""
+    frame = generate_employees(rows)
+    results = []
+    for fmt in formats:
+        timings = []
+        payload = ""
+        for _ in range(repeat):
+            start = time.perf_counter()
+            payload = encode_result(frame, fmt)
+            timings.append(time.perf_counter() - start)
+        results.append(
+            {
+                "benchmark": "encoding",
+                "format": fmt,
+                "rows": rows,
+                "encode_seconds": min(timings),
+                "payload_bytes": len(payload.encode("utf-8")),
+            }
+        )
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--formats", nargs="+", choices=RESULT_FORMATS, default=list(RESULT_FORMATS))
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    for rows in args.rows:
+        for record in benchmark(rows, tuple(args.formats), args.repeat):
+            sys.stdout.write(json.dumps(record) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
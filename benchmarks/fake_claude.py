@@ -0,0 +1,60 @@
+"""Fake ``claude`` CLI for offline benchmarks of the bash approach.
+
+Accepts the ``claude -p --output-format json|stream-json [--verbose] [--allowedTools ...]``
+arguments, reads the prompt from stdin and does the work Claude would do through Bash: fetch
+the employee features with mloda and summarize them. Prints a result event whose result is
+itself JSON with the row count and the time spent in ``mloda.run_all``; with stream-json it
+is preceded by an init and an assistant event.
+
+Set FAKE_CLAUDE_ROWS to serve that many generated employees instead of the sample.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Optional
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--print", action="store_true")
+    parser.add_argument("--output-format", default="text")
+    parser.add_argument("--allowedTools", default="")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args(argv)
+    sys.stdin.read()
+
+    from mloda.user import Feature, PluginLoader
+    from mloda.user import mloda as mlodaAPI
+
+    from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import (
+        EMPLOYEE_COLUMNS,
+        ROWS_OPTION,
+        SEED_OPTION,
+    )
+
+    options: dict[str, Any] = {}
+    if os.environ.get("FAKE_CLAUDE_ROWS"):
+        options = {ROWS_OPTION: int(os.environ["FAKE_CLAUDE_ROWS"]), SEED_OPTION: 0}
+    PluginLoader.all()
+    start = time.perf_counter()
+    frame = mlodaAPI.run_all(
+        [Feature.not_typed(f, options=dict(options)) for f in EMPLOYEE_COLUMNS], compute_frameworks=["PandasDataFrame"]
+    )[0]
+    run_all_seconds = time.perf_counter() - start
+    # Claude reads the printed table back through Bash; that output is the payload of this approach.
+    payload_bytes = len(frame.to_string().encode("utf-8"))
+    result = {"rows": len(frame), "run_all_seconds": run_all_seconds, "payload_bytes": payload_bytes}
+    final = {"type": "result", "subtype": "success", "is_error": False, "result": json.dumps(result)}
+    if args.output_format == "stream-json":
+        sys.stdout.write(json.dumps({"type": "system", "subtype": "init"}) + "\n")
+        message = {"content": [{"type": "text", "text": f"Fetched {len(frame)} employees."}]}
+        sys.stdout.write(json.dumps({"type": "assistant", "message": message}) + "\n")
+    sys.stdout.write(json.dumps(final) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
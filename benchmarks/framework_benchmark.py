@@ -0,0 +1,120 @@
+"""Benchmark run_features per mloda compute framework: run time and peak memory by dataset size.
+
+Each (framework, rows) pair runs in a fresh interpreter, so peak memory is not inflated by
+an earlier measurement. Inside it, ``fetch_seconds`` is one mloda run producing every
+employee feature in the framework and handing it to the query layer, and ``query_seconds``
+answers the three demo questions (top-3 by salary, mean salary per department, filter on
+performance_score) through run_features with an empty result cache, so each question runs
+mloda and its filter / aggregation in the framework's own result type (pandas or Arrow).
+Frameworks whose package is not installed are skipped.
+
+Usage:
+    python -m benchmarks.framework_benchmark                                  # 100k and 1M rows
+    python -m benchmarks.framework_benchmark --frameworks PandasDataFrame PyArrowTable --rows 5000000
+
+Prints one JSON object per (framework, rows) pair: fetch_seconds and query_seconds (best of
+``--repeat``) and peak_rss_bytes, the growth of the process's peak resident set size over
+the measurement.
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from ptc_mloda_demo.tools.frameworks.compute_frameworks import COMPUTE_FRAMEWORKS, available_frameworks
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _peak_rss_bytes() -> int:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return int(peak if sys.platform == "darwin" else peak * 1024)
+
+
+def measure_in_process(framework: str, rows: int, repeat: int = 3) -> dict[str, Any]:
+    """Time run_features in ``framework`` over ``rows`` generated employees in this process."""
+    from mloda.user import PluginLoader
+
+    import demo
+    from benchmarks.e2e_benchmark import QUESTION_CALLS
+    from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import ROWS_OPTION, SEED_OPTION
+
+    PluginLoader.all()
+    demo.FEATURE_OPTIONS.update({ROWS_OPTION: rows, SEED_OPTION: 0})
+    baseline = _peak_rss_bytes()
+
+    fetch_seconds = query_seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        demo._run_features(list(demo.EMPLOYEE_FEATURES), framework)
+        fetch_seconds = min(fetch_seconds, time.perf_counter() - start)
+
+        elapsed = 0.0
+        for name, inputs in QUESTION_CALLS:
+            demo.RESULT_CACHE.clear()
+            start = time.perf_counter()
+            output = demo._call_tool(name, {**inputs, "compute_framework": framework})
+            elapsed += time.perf_counter() - start
+            if output.startswith('{"error"'):
+                raise RuntimeError(f"{framework}: {output}")
+        query_seconds = min(query_seconds, elapsed)
+
+    return {
+        "benchmark": "framework",
+        "framework": framework,
+        "rows": rows,
+        "fetch_seconds": fetch_seconds,
+        "query_seconds": query_seconds,
+        "peak_rss_bytes": _peak_rss_bytes() - baseline,
+    }
+
+
+def measure(framework: str, rows: int, repeat: int = 3) -> dict[str, Any]:
+    """``measure_in_process`` in a fresh interpreter."""
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.framework_benchmark", "--worker", framework, str(rows), str(repeat)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    record: dict[str, Any] = json.loads(completed.stdout.splitlines()[-1])
+    return record
+
+
+def benchmark(rows: int, frameworks: Optional[tuple[str, ...]] = None, repeat: int = 3) -> list[dict[str, Any]]:
+    """One record per installed framework at ``rows`` employees."""
+    installed = available_frameworks()
+    return [measure(f, rows, repeat) for f in frameworks or COMPUTE_FRAMEWORKS if f in installed]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frameworks", nargs="+", choices=COMPUTE_FRAMEWORKS, default=list(COMPUTE_FRAMEWORKS))
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--worker", nargs=3, metavar=("FRAMEWORK", "ROWS", "REPEAT"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        framework, rows, repeat = args.worker
+        sys.stdout.write(json.dumps(measure_in_process(framework, int(rows), int(repeat))) + "\n")
+        return 0
+
+    for f in args.frameworks:
+        if f not in available_frameworks():
+            sys.stderr.write(f"skipping {f}: not installed\n")
+    for rows in args.rows:
+        for record in benchmark(rows, tuple(args.frameworks), args.repeat):
+            sys.stdout.write(json.dumps(record) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
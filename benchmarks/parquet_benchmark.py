@@ -0,0 +1,102 @@
+"""Benchmark reads of the partitioned Parquet employee source.
+
+Writes generated employees as department partitions of ``--files`` files each into a
+temporary directory (or ``--dir``), then times each read strategy against a single-threaded
+read of the whole dataset:
+
+    baseline         pyarrow.parquet.read_table over the directory, use_threads=False
+    threads          read_employees, all columns, one file per pool thread
+    processes        read_employees on a process pool
+    projection       read_employees, salary and department only
+    pruned           read_employees, one department
+    row_groups       iter_employee_row_groups, consumed one row group at a time
+
+Usage:
+    python -m benchmarks.parquet_benchmark                          # 2M rows, 20 files per department
+    python -m benchmarks.parquet_benchmark --rows 10000000 --files 50 --workers 16
+
+Prints one JSON object per strategy: best-of-``--repeat`` seconds, rows read and the
+speedup over the baseline.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import pyarrow.parquet as pq
+
+from ptc_mloda_demo.feature_groups.parquet_source.employee_parquet_features import (
+    DEFAULT_WORKERS,
+    iter_employee_row_groups,
+    read_employees,
+    write_employee_partitions,
+)
+from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import DEPARTMENTS, generate_employee_table
+
+
+def strategies(root: Path, workers: int) -> dict[str, Callable[[], int]]:
+    """Each read strategy, returning the number of rows it read."""
+    return {
+        "baseline": lambda: pq.read_table(root, use_threads=False).num_rows,
+        "threads": lambda: read_employees(root, max_workers=workers).num_rows,
+        "processes": lambda: read_employees(root, max_workers=workers, pool="process").num_rows,
+        "projection": lambda: read_employees(root, columns={"salary", "department"}, max_workers=workers).num_rows,
+        "pruned": lambda: read_employees(root, departments=[DEPARTMENTS[0]], max_workers=workers).num_rows,
+        "row_groups": lambda: sum(t.num_rows for t in iter_employee_row_groups(root, max_workers=workers)),
+    }
+
+
+def benchmark(
+    root: Path, rows: int, files: int = 20, workers: int = DEFAULT_WORKERS, repeat: int = 3
+) -> list[dict[str, Any]]:
+    """Write ``rows`` employees under ``root`` and time every strategy on them."""
+    per_department = -(-rows // len(DEPARTMENTS))
+    write_employee_partitions(
+        generate_employee_table(rows), root, max_rows_per_file=max(1, -(-per_department // files))
+    )
+
+    timings: dict[str, tuple[int, float]] = {}
+    for name, read in strategies(root, workers).items():
+        seconds = float("inf")
+        read_rows = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            read_rows = read()
+            seconds = min(seconds, time.perf_counter() - start)
+        timings[name] = (read_rows, seconds)
+    baseline = timings["baseline"][1]
+    records = [
+        {
+            "benchmark": "parquet",
+            "strategy": name,
+            "rows": read_rows,
+            "seconds": seconds,
+            "speedup": baseline / seconds if seconds else None,
+        }
+        for name, (read_rows, seconds) in timings.items()
+    ]
+    return records
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--files", type=int, default=20, help="files per department partition")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--dir", help="write the dataset here instead of a temporary directory")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(args.dir or tmp)
+        for record in benchmark(root, args.rows, args.files, args.workers, args.repeat):
+            sys.stdout.write(json.dumps(record) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Benchmark request pacing against a rate-limited stub Messages API.
+
+Runs ``--sessions`` concurrent sessions of ``--turns`` sequential requests each against
+one StubAnthropic with requests and input-token limits, time-compressed so that a
+"minute" lasts ``--window`` seconds, under each strategy:
+
+    sdk_retries      every request sent at once; on 429, up to 2 retries after retry-after
+                     (what the SDK does on its own)
+    scheduler        RequestScheduler: token buckets following the rate-limit headers,
+                     AIMD concurrency, jittered backoff
+
+Usage:
+    python -m benchmarks.scheduler_benchmark
+    python -m benchmarks.scheduler_benchmark --sessions 200 --requests-per-window 50 --window 1
+
+Prints one JSON object per strategy: sessions completed and failed, requests sent,
+429s received, wall seconds and completed requests per second.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from benchmarks.stub_api import StubAnthropic, StubRateLimits, final_turn
+from ptc_mloda_demo.agents.scheduler.request_scheduler import RequestScheduler, retry_after
+
+STRATEGIES = ("sdk_retries", "scheduler")
+
+# The SDK's default: two retries, honouring retry-after.
+SDK_MAX_RETRIES = 2
+
+Send = Callable[[dict[str, Any]], Awaitable[Any]]
+
+
+def _sdk_retries(client: StubAnthropic) -> Send:
+    async def send(request: dict[str, Any]) -> Any:
+        attempt = 0
+        while True:
+            try:
+                return await client.messages.create(**request)
+            except Exception as e:
+                if getattr(e, "status_code", None) != 429 or attempt == SDK_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(retry_after(e.response.headers) or 0.5 * 2**attempt)  # type: ignore[attr-defined]
+            attempt += 1
+
+    return send
+
+
+def _scheduled(client: StubAnthropic, window_seconds: float) -> tuple[Send, RequestScheduler]:
+    scheduler = RequestScheduler(window_seconds=window_seconds, backoff_seconds=0.1 * window_seconds)
+
+    async def send(request: dict[str, Any]) -> Any:
+        return await scheduler.submit(lambda: scheduler.create(client, **request), scheduler.estimate(request))
+
+    return send, scheduler
+
+
+async def _sessions(send: Send, sessions: int, turns: int, prompt_chars: int) -> int:
+    """Run every session; returns the number that failed."""
+
+    async def session(index: int) -> None:
+        messages: list[dict[str, Any]] = [{"role": "user", "content": f"{index} " + "x" * prompt_chars}]
+        for _ in range(turns):
+            response = await send({"model": "stub", "max_tokens": 1024, "messages": list(messages)})
+            messages.append({"role": "assistant", "content": response.content})
+            messages.append({"role": "user", "content": "next"})
+
+    results = await asyncio.gather(*(session(i) for i in range(sessions)), return_exceptions=True)
+    return sum(isinstance(r, BaseException) for r in results)
+
+
+def run_once(
+    strategy: str,
+    sessions: int = 100,
+    turns: int = 3,
+    requests_per_window: int = 50,
+    input_tokens_per_window: Optional[int] = None,
+    window_seconds: float = 1.0,
+    latency_seconds: float = 0.05,
+    prompt_chars: int = 2000,
+) -> dict[str, Any]:
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}; expected one of {list(STRATEGIES)}")
+    limits = StubRateLimits(requests_per_window, input_tokens_per_window, window_seconds=window_seconds)
+    client = StubAnthropic([final_turn("ok")] * sessions * turns, latency_seconds=latency_seconds, rate_limits=limits)
+    scheduler: Optional[RequestScheduler] = None
+    if strategy == "scheduler":
+        send, scheduler = _scheduled(client, window_seconds)
+    else:
+        send = _sdk_retries(client)
+
+    start = time.perf_counter()
+    failed = asyncio.run(_sessions(send, sessions, turns, prompt_chars))
+    seconds = time.perf_counter() - start
+    completed = sum(not r.throttled for r in client.requests)
+    return {
+        "benchmark": "scheduler",
+        "strategy": strategy,
+        "sessions": sessions,
+        "sessions_failed": failed,
+        "requests": len(client.requests),
+        "throttled": sum(r.throttled for r in client.requests),
+        "seconds": seconds,
+        "completed_per_second": completed / seconds if seconds else None,
+        "concurrency_limit": None if scheduler is None else scheduler.stats.concurrency_limit,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--strategies", nargs="+", choices=STRATEGIES, default=list(STRATEGIES))
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--requests-per-window", type=int, default=50)
+    parser.add_argument("--input-tokens-per-window", type=int)
+    parser.add_argument("--window", type=float, default=1.0, help="seconds the stub's per-minute limits refill over")
+    parser.add_argument("--latency", type=float, default=0.05, help="stub response latency in seconds")
+    parser.add_argument("--prompt-chars", type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    for strategy in args.strategies:
+        record = run_once(
+            strategy,
+            sessions=args.sessions,
+            turns=args.turns,
+            requests_per_window=args.requests_per_window,
+            input_tokens_per_window=args.input_tokens_per_window,
+            window_seconds=args.window,
+            latency_seconds=args.latency,
+            prompt_chars=args.prompt_chars,
+        )
+        sys.stdout.write(json.dumps(record) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
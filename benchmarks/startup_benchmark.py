@@ -0,0 +1,144 @@
+"""Startup benchmark: import time of demo.py and plugin loading per approach, with a budget.
+
+Each measurement runs in a fresh interpreter. ``-X importtime`` gives the import time of
+``demo`` (and the slowest modules beneath it); the wall time of the same process covers
+interpreter start, imports and the plugin loading the selected approaches need.
+
+Usage:
+    python -m benchmarks.startup_benchmark                        # all approaches, best of 5
+    python -m benchmarks.startup_benchmark --approaches bash --budget-ms 800
+
+Prints one JSON object per approach: import_seconds, startup_seconds (wall, best of
+``--repeat``), the ``--top`` slowest imports by cumulative time, whether the API SDK was
+imported and which of the ``DEFERRED_MODULES`` were. Exits with status 1 if any
+startup_seconds exceeds ``--budget-ms`` (default ``DEFAULT_BUDGET_MS``; 0 disables the check).
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+APPROACHES = ("loop", "bash", "ptc")
+
+# Startup budget checked by default (and in the tests). Interpreter start, pandas and mloda take most of it.
+DEFAULT_BUDGET_MS = 2000.0
+
+# Modules demo imports only on the paths that use them (the API, tool server, feature store, Parquet
+# source, streamed tool calls, --async runner); none of them may be loaded once bash has started.
+DEFERRED_MODULES = (
+    "anthropic",
+    "ptc_mloda_demo.tools.server.tool_server",
+    "ptc_mloda_demo.extenders.feature_store.feature_store_extender",
+    "ptc_mloda_demo.feature_groups.parquet_source.employee_parquet_features",
+    "ptc_mloda_demo.agents.streaming.tool_stream",
+    "ptc_mloda_demo.agents.runner.async_runner",
+)
+
+# What a short-lived worker does before its first session: import demo and load the plugins it needs.
+STARTUP_SCRIPT = (
+    "import json, sys, demo\ndemo._load_plugins({approaches!r})\n"
+    "sys.stdout.write(json.dumps([m for m in {deferred!r} if m in sys.modules]))\n"
+)
+
+
+def parse_importtime(stderr: str) -> list[tuple[str, int, float]]:
+    """``(module, depth, cumulative seconds)`` for each line of ``-X importtime`` output."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # the header line
+        stripped = name.lstrip()
+        depth = (len(name) - len(stripped) - 1) // 2
+        entries.append((stripped, depth, int(cumulative) / 1e6))
+    return entries
+
+
+def direct_imports(entries: list[tuple[str, int, float]], module: str) -> list[tuple[str, float]]:
+    """Modules first imported directly by top-level ``module``, with their cumulative seconds.
+
+    importtime lists a module after everything it imports, so its direct imports are the
+    depth-1 entries between the previous top-level entry and the module itself.
+    """
+    end = next((i for i, (name, depth, _) in enumerate(entries) if name == module and depth == 0), None)
+    if end is None:
+        return []
+    start = end
+    while start > 0 and entries[start - 1][1] > 0:
+        start -= 1
+    return [(name, seconds) for name, depth, seconds in entries[start:end] if depth == 1]
+
+
+def measure(approaches: tuple[str, ...], top: int = 5) -> dict[str, Any]:
+    """Run the startup script once in a fresh interpreter and collect its timings."""
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            STARTUP_SCRIPT.format(approaches=list(approaches), deferred=list(DEFERRED_MODULES)),
+        ],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    startup_seconds = time.perf_counter() - start
+    entries = parse_importtime(completed.stderr)
+    children = direct_imports(entries, "demo")
+    demo_seconds = next((seconds for name, depth, seconds in entries if name == "demo" and depth == 0), 0.0)
+    slowest = sorted(children, key=lambda e: e[1], reverse=True)[:top]
+    deferred_loaded = json.loads(completed.stdout)
+    return {
+        "import_seconds": demo_seconds,
+        "startup_seconds": startup_seconds,
+        "slowest_imports": dict(slowest),
+        "imports_anthropic": "anthropic" in deferred_loaded,
+        "deferred_loaded": deferred_loaded,
+    }
+
+
+def benchmark(approaches: tuple[str, ...] = APPROACHES, repeat: int = 5, top: int = 5) -> list[dict[str, Any]]:
+    """Best-of-``repeat`` (by startup time) record for each approach on its own."""
+    records = []
+    for approach in approaches:
+        best = min((measure((approach,), top) for _ in range(repeat)), key=lambda r: r["startup_seconds"])
+        records.append({"benchmark": "startup", "approach": approach, **best})
+    return records
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--approaches", nargs="+", choices=APPROACHES, default=list(APPROACHES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="slowest direct imports of demo to report")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help="fail if any approach starts slower than this (0: no check)",
+    )
+    args = parser.parse_args(argv)
+
+    over_budget = False
+    for record in benchmark(tuple(args.approaches), args.repeat, args.top):
+        if args.budget_ms:
+            record["budget_seconds"] = args.budget_ms / 1000
+            record["within_budget"] = record["startup_seconds"] <= record["budget_seconds"]
+            over_budget = over_budget or not record["within_budget"]
+        sys.stdout.write(json.dumps(record) + "\n")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
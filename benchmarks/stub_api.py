@@ -0,0 +1,359 @@
+"""Offline stand-in for the Anthropic Messages API that replays scripted turns.
+
+``StubAnthropic`` is a drop-in for ``anthropic.AsyncAnthropic`` in the demo sessions:
+each ``messages.create`` call returns the next scripted response, after an optional
+simulated latency, and ``messages.stream`` replays it as raw streaming events. Requests
+are recorded so callers can check what was sent back. ``StubRateLimits`` makes it answer
+like a rate-limited API: 429s with ``retry-after`` and ``anthropic-ratelimit-*`` headers.
+"""
+
+import asyncio
+import dataclasses
+import itertools
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Callable, Optional, Sequence, Union, cast, final
+
+
+@dataclass(frozen=True)
+class TextBlock:
+    text: str
+    type: str = "text"
+
+
+@dataclass(frozen=True)
+class ToolUseBlock:
+    id: str
+    name: str
+    input: dict[str, Any]
+    type: str = "tool_use"
+
+
+@dataclass(frozen=True)
+class ServerToolUseBlock:
+    """The code_execution call that wraps PTC tool calls; ignored by the tool dispatcher."""
+
+    id: str
+    input: dict[str, Any]
+    name: str = "code_execution"
+    type: str = "server_tool_use"
+
+
+@dataclass(frozen=True)
+class Container:
+    id: str
+    expires_at: Optional[datetime] = None
+
+
+@dataclass(frozen=True)
+class StubResponse:
+    content: list[Any]
+    stop_reason: str
+    container: Optional[Container] = None
+
+
+@dataclass
+class RecordedRequest:
+    container: Optional[str]
+    num_messages: int
+    tool_results: list[dict[str, Any]] = field(default_factory=list)
+    # Serialized size of tools + messages: what the model would read as input on this request.
+    input_chars: int = 0
+    cache_breakpoints: int = 0
+    # Rejected with a 429 by the stub's rate limits.
+    throttled: bool = False
+
+
+_ids = itertools.count(1)
+
+
+def _block_dict(block: Any) -> Any:
+    return dataclasses.asdict(block) if dataclasses.is_dataclass(block) and not isinstance(block, type) else str(block)
+
+
+def tool_turn(calls: Sequence[tuple[str, dict[str, Any]]], container: Optional[str] = None) -> StubResponse:
+    """A response asking for the given (tool name, input) calls, all in one turn."""
+    content: list[Any] = []
+    if container is not None:
+        content.append(ServerToolUseBlock(id=f"srvtoolu_{next(_ids)}", input={"code": "..."}))
+    content.extend(ToolUseBlock(id=f"toolu_{next(_ids)}", name=name, input=inputs) for name, inputs in calls)
+    return StubResponse(
+        content=content, stop_reason="tool_use", container=None if container is None else Container(container)
+    )
+
+
+def final_turn(text: str, container: Optional[str] = None) -> StubResponse:
+    return StubResponse(
+        content=[TextBlock(text)], stop_reason="end_turn", container=None if container is None else Container(container)
+    )
+
+
+@dataclass(frozen=True)
+class Delta:
+    type: str
+    partial_json: str = ""
+    text: str = ""
+
+
+@dataclass(frozen=True)
+class StreamEvent:
+    """A raw Messages streaming event (message_start, content_block_start/delta/stop, ...)."""
+
+    type: str
+    index: int = 0
+    content_block: Any = None
+    delta: Optional[Delta] = None
+
+
+# Tool input JSON is streamed in pieces of this many characters, like input_json_delta events.
+JSON_CHUNK_CHARS = 16
+
+
+def stream_events(response: StubResponse) -> list[list[StreamEvent]]:
+    """The streaming events of ``response``, grouped per content block (first group: message_start)."""
+    groups = [[StreamEvent("message_start")]]
+    for index, block in enumerate(response.content):
+        if isinstance(block, ToolUseBlock):
+            raw = json.dumps(block.input)
+            events = [StreamEvent("content_block_start", index, dataclasses.replace(block, input={}))]
+            events.extend(
+                StreamEvent(
+                    "content_block_delta",
+                    index,
+                    delta=Delta("input_json_delta", partial_json=raw[i : i + JSON_CHUNK_CHARS]),
+                )
+                for i in range(0, len(raw), JSON_CHUNK_CHARS)
+            )
+        elif isinstance(block, TextBlock):
+            events = [
+                StreamEvent("content_block_start", index, TextBlock("")),
+                StreamEvent("content_block_delta", index, delta=Delta("text_delta", text=block.text)),
+            ]
+        else:
+            events = [StreamEvent("content_block_start", index, block)]
+        events.append(StreamEvent("content_block_stop", index))
+        groups.append(events)
+    groups[-1].extend([StreamEvent("message_delta"), StreamEvent("message_stop")])
+    return groups
+
+
+class StubRateLimits:
+    """Server-side requests- and input-tokens-per-minute limits for StubAnthropic.
+
+    Each limit is a bucket refilled continuously over ``window_seconds`` (None = unlimited),
+    a minute like the API unless a benchmark compresses time. Input tokens are the request's
+    serialized tools and messages over ``chars_per_token``.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        input_tokens_per_minute: Optional[int] = None,
+        chars_per_token: float = 4.0,
+        window_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.limits = {"requests": requests_per_minute, "input-tokens": input_tokens_per_minute}
+        self.chars_per_token = chars_per_token
+        self.window_seconds = window_seconds
+        self._clock = clock
+        self._levels = {name: float(limit or 0) for name, limit in self.limits.items()}
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        for name, limit in self.limits.items():
+            if limit:
+                self._levels[name] = min(
+                    float(limit), self._levels[name] + (now - self._updated) * limit / self.window_seconds
+                )
+        self._updated = now
+
+    def admit(self, input_chars: int) -> Optional[float]:
+        """Charge one request of ``input_chars``; returns the seconds to wait instead when a limit is exceeded."""
+        self._refill()
+        cost = {"requests": 1.0, "input-tokens": input_chars / self.chars_per_token}
+        waits = [
+            (min(cost[name], limit) - self._levels[name]) * self.window_seconds / limit
+            for name, limit in self.limits.items()
+            if limit and self._levels[name] < min(cost[name], limit)
+        ]
+        if waits:
+            return max(waits)
+        for name, limit in self.limits.items():
+            if limit:
+                self._levels[name] -= min(cost[name], limit)
+        return None
+
+    def headers(self, retry_after: Optional[float] = None) -> dict[str, str]:
+        """``anthropic-ratelimit-*`` headers of the current state, plus ``retry-after`` for a 429."""
+        self._refill()
+        headers: dict[str, str] = {}
+        for name, limit in self.limits.items():
+            if limit:
+                level = max(0.0, self._levels[name])
+                reset = datetime.now(timezone.utc) + timedelta(seconds=(limit - level) * self.window_seconds / limit)
+                headers[f"anthropic-ratelimit-{name}-limit"] = str(limit)
+                headers[f"anthropic-ratelimit-{name}-remaining"] = str(int(level))
+                headers[f"anthropic-ratelimit-{name}-reset"] = reset.isoformat()
+        if retry_after is not None:
+            headers["retry-after"] = f"{retry_after:.3f}"
+        return headers
+
+
+def rate_limit_error(headers: dict[str, str]) -> Exception:
+    """The ``anthropic.RateLimitError`` (HTTP 429) the SDK raises, carrying ``headers``."""
+    import anthropic
+
+    # Only the attributes APIStatusError reads; avoids depending on the SDK's HTTP client types.
+    response = SimpleNamespace(request=None, status_code=429, headers=headers)
+    return anthropic.RateLimitError("rate_limit_error", response=cast(Any, response), body=None)
+
+
+@dataclass(frozen=True)
+class StubHttpResponse:
+    headers: dict[str, str]
+
+
+@final
+class _StubStream:
+    """Async context manager and event iterator returned by ``messages.stream``.
+
+    The response latency is spread evenly over the time to the first event and the
+    generation of each content block; a cold start delays the first event.
+    """
+
+    def __init__(self, owner: "StubAnthropic", kwargs: dict[str, Any]) -> None:
+        self._owner = owner
+        self._kwargs = kwargs
+        self._response: Optional[StubResponse] = None
+        self._latency = 0.0
+        self._cold_start = 0.0
+        self.response = StubHttpResponse({})
+
+    async def __aenter__(self) -> "_StubStream":
+        item, self._latency, self._cold_start, headers = self._owner._take(self._kwargs)
+        if isinstance(item, Exception):
+            raise item
+        self._response = item
+        self.response = StubHttpResponse(headers)
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        return None
+
+    async def __aiter__(self) -> AsyncIterator[StreamEvent]:
+        if self._response is None:
+            raise RuntimeError("Iterate the stream inside its async with block")
+        groups = stream_events(self._response)
+        step = self._latency / len(groups)
+        for position, events in enumerate(groups):
+            delay = step + (self._cold_start if position == 0 else 0.0)
+            if delay:
+                await asyncio.sleep(delay)
+            for event in events:
+                yield event
+
+    async def get_final_message(self) -> StubResponse:
+        if self._response is None:
+            raise RuntimeError("Stream was not entered")
+        return self._response
+
+
+@dataclass(frozen=True)
+class StubRawResponse:
+    """What ``messages.with_raw_response.create`` returns: the headers, and the message from ``parse()``."""
+
+    headers: dict[str, str]
+    message: StubResponse
+
+    async def parse(self) -> StubResponse:
+        return self.message
+
+
+class _StubRawMessages:
+    def __init__(self, owner: "StubAnthropic") -> None:
+        self._owner = owner
+
+    async def create(self, **kwargs: Any) -> StubRawResponse:
+        item, latency, cold_start, headers = self._owner._take(kwargs)
+        if latency + cold_start:
+            await asyncio.sleep(latency + cold_start)
+        if isinstance(item, Exception):
+            raise item
+        return StubRawResponse(headers, item)
+
+
+class _StubMessages:
+    def __init__(self, owner: "StubAnthropic") -> None:
+        self._owner = owner
+        self.with_raw_response = _StubRawMessages(owner)
+
+    async def create(self, **kwargs: Any) -> StubResponse:
+        raw = await self.with_raw_response.create(**kwargs)
+        return raw.message
+
+    def stream(self, **kwargs: Any) -> _StubStream:
+        return _StubStream(self._owner, kwargs)
+
+
+class StubAnthropic:
+    """Replays ``script`` one response per ``messages.create`` or ``messages.stream`` call.
+
+    A script entry that is an exception is raised instead of returned. ``cold_start_seconds``
+    is added to requests that carry no container but get one back, like a sandbox starting up.
+    With ``rate_limits``, a request over a limit gets an immediate 429 with ``retry-after``
+    and does not use up a script entry; every response carries the rate-limit headers.
+    """
+
+    def __init__(
+        self,
+        script: Sequence[Union[StubResponse, Exception]],
+        latency_seconds: float = 0.0,
+        cold_start_seconds: float = 0.0,
+        rate_limits: Optional[StubRateLimits] = None,
+    ) -> None:
+        self.script = list(script)
+        self.latency_seconds = latency_seconds
+        self.cold_start_seconds = cold_start_seconds
+        self.rate_limits = rate_limits
+        self.requests: list[RecordedRequest] = []
+        self.messages = _StubMessages(self)
+        self.closed = False
+        self._served = 0
+
+    def _take(self, kwargs: dict[str, Any]) -> tuple[Union[StubResponse, Exception], float, float, dict[str, str]]:
+        """Record the request; return the next script entry (or a 429), its latency, cold-start delay and headers."""
+        messages = kwargs.get("messages", [])
+        last = messages[-1]["content"] if messages else None
+        tool_results = [r for r in last if isinstance(r, dict)] if isinstance(last, list) else []
+        payload = json.dumps({"tools": kwargs.get("tools", []), "messages": messages}, default=_block_dict)
+        request = RecordedRequest(
+            container=kwargs.get("container"),
+            num_messages=len(messages),
+            tool_results=tool_results,
+            input_chars=len(payload),
+            cache_breakpoints=payload.count('"cache_control"'),
+        )
+        self.requests.append(request)
+        headers: dict[str, str] = {}
+        if self.rate_limits is not None:
+            wait = self.rate_limits.admit(request.input_chars)
+            if wait is not None:
+                request.throttled = True
+                return rate_limit_error(self.rate_limits.headers(retry_after=wait)), 0.0, 0.0, {}
+            headers = self.rate_limits.headers()
+        self._served += 1
+        if self._served > len(self.script):
+            raise RuntimeError(f"Stub script exhausted after {len(self.script)} responses")
+        item = self.script[self._served - 1]
+        cold_start = 0.0
+        if isinstance(item, StubResponse) and item.container is not None and kwargs.get("container") is None:
+            cold_start = self.cold_start_seconds
+        return item, self.latency_seconds, cold_start, headers
+
+    async def close(self) -> None:
+        self.closed = True
@@ -0,0 +1,258 @@
+"""Smoke tests for the offline end-to-end benchmark and its stub Messages API."""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from typing import Any, cast
+
+import anthropic
+import pytest
+from mloda.user import PluginLoader
+
+import demo
+from benchmarks.e2e_benchmark import APPROACHES, _patched, loop_script, main, run_once
+from benchmarks.stub_api import StubAnthropic, StubRateLimits, final_turn, rate_limit_error, tool_turn
+from ptc_mloda_demo.agents.containers.container_pool import ContainerPool
+from ptc_mloda_demo.agents.dispatch.tool_dispatcher import ToolDispatcher
+from ptc_mloda_demo.agents.scheduler.request_scheduler import RequestScheduler
+from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import ROWS_OPTION, SEED_OPTION
+from ptc_mloda_demo.tools.frameworks.compute_frameworks import UnsupportedFrameworkError
+
+
+def test_stub_replays_script_and_records_requests() -> None:
+    client = StubAnthropic([tool_turn([("discover_features", {})], container="c1"), final_turn("done")])
+
+    async def converse() -> list[Any]:
+        first = await client.messages.create(messages=[{"role": "user", "content": "hi"}])
+        second = await client.messages.create(
+            container="c1", messages=[{"role": "user", "content": [{"type": "tool_result", "content": "[]"}]}]
+        )
+        with pytest.raises(RuntimeError):
+            await client.messages.create(messages=[])
+        return [first, second]
+
+    first, second = asyncio.run(converse())
+    assert [b.type for b in first.content] == ["server_tool_use", "tool_use"]
+    assert first.container.id == "c1"
+    assert second.stop_reason == "end_turn"
+    assert client.requests[1].container == "c1"
+    assert client.requests[1].tool_results == [{"type": "tool_result", "content": "[]"}]
+    assert client.requests[1].input_chars > client.requests[0].input_chars > 0
+
+
+def test_loop_session_sends_cache_breakpoints() -> None:
+    record = run_once("loop", rows=50)
+    assert record["cache_breakpoints"] == 3
+
+
+def test_loop_script_repeats_question_turns() -> None:
+    assert len(loop_script(question_turns=3)) == 5
+
+
+@pytest.mark.parametrize("approach", APPROACHES)
+def test_run_once_reports_metrics(approach: str) -> None:
+    record = run_once(approach, rows=200)
+    assert record["approach"] == approach
+    assert record["wall_seconds"] > 0
+    assert record["run_all_calls"] >= 1
+    assert record["payload_bytes"] > 0
+    if approach != "bash":
+        assert record["turns"] == 3
+        assert record["tool_calls"] >= 2
+        assert record["tool_errors"] == 0
+        assert record["serialize_seconds"] > 0
+        assert record["request_chars"] > 0
+    if approach.startswith("ptc"):
+        assert record["container_reused"] is True
+        assert record["warm_start"] is (approach == "ptc_warm")
+
+
+def test_main_prints_json_lines(capsys: Any) -> None:
+    assert main(["--approaches", "loop", "--rows", "50", "--repeat", "1"]) == 0
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert [json.loads(line)["approach"] for line in lines] == ["loop"]
+
+
+def _rejected(status: int) -> anthropic.APIStatusError:
+    # Only the attributes APIStatusError reads; avoids depending on the SDK's HTTP client types.
+    response = SimpleNamespace(request=None, status_code=status, headers={})
+    error = anthropic.NotFoundError if status == 404 else anthropic.BadRequestError
+    return error("container expired", response=cast(Any, response), body=None)
+
+
+class TestPtcContainerPool:
+    """PTC sessions start in the container a previous session left in the pool."""
+
+    def _run(self, pool: ContainerPool, script: list[Any]) -> StubAnthropic:
+        client = StubAnthropic(script)
+        with _patched(demo, CONTAINER_POOL=pool):
+            asyncio.run(demo.ptc_session(cast(Any, client)))
+        return client
+
+    def test_second_session_starts_warm(self) -> None:
+        pool = ContainerPool()
+        first = self._run(pool, [final_turn("a", container="c1")])
+        second = self._run(pool, [final_turn("b", container="c1")])
+        assert first.requests[0].container is None
+        assert second.requests[0].container == "c1"
+        assert (pool.stats.hits, pool.stats.misses, len(pool)) == (1, 1, 1)
+
+    def test_rejected_container_falls_back_to_cold_start(self) -> None:
+        pool = ContainerPool()
+        pool.release("stale")
+        client = self._run(pool, [_rejected(404), final_turn("a", container="fresh")])
+        assert [r.container for r in client.requests] == ["stale", None]
+        assert pool.stats.discarded == 1
+        assert pool.acquire() == "fresh"
+
+    def test_failed_session_discards_its_container(self) -> None:
+        pool = ContainerPool()
+        with pytest.raises(anthropic.BadRequestError):
+            self._run(pool, [tool_turn([("discover_features", {})], container="c1"), _rejected(400)])
+        assert len(pool) == 0
+        assert pool.stats.discarded == 1
+
+    def test_cold_start_latency_is_skipped_when_warm(self) -> None:
+        pool = ContainerPool()
+        pool.release("c1")
+        client = StubAnthropic([final_turn("a", container="c1")], cold_start_seconds=5)
+        with _patched(demo, CONTAINER_POOL=pool):
+            start = time.perf_counter()
+            asyncio.run(demo.ptc_session(cast(Any, client)))
+        assert time.perf_counter() - start < 5
+
+
+class TestStreamedToolCalls:
+    """With STREAM_TOOL_CALLS, tool calls start while the stub response is still streaming."""
+
+    @pytest.mark.parametrize("approach", ["loop", "ptc"])
+    def test_run_once_with_stream_tools(self, approach: str) -> None:
+        record = run_once(approach, rows=100, stream_tools=True)
+        assert record["stream_tools"] is True
+        assert record["turns"] == 3
+        assert record["tool_calls"] >= 2
+        assert record["tool_errors"] == 0
+
+    def test_first_tool_starts_before_the_response_is_complete(self) -> None:
+        started: list[float] = []
+
+        def handler(name: str, inputs: dict[str, Any]) -> str:
+            started.append(time.perf_counter())
+            return "[]"
+
+        script = [tool_turn([("discover_features", {})] * 3), final_turn("done")]
+        client = StubAnthropic(script, latency_seconds=0.4)
+        with _patched(demo, STREAM_TOOL_CALLS=True, TOOL_DISPATCHER=ToolDispatcher(handler)):
+            start = time.perf_counter()
+            answer = asyncio.run(demo.loop_session(cast(Any, client)))
+        assert answer == "done"
+        assert len(started) == 3
+        # 0.4s over 4 event groups: the first tool_use completes about 0.2s in, the response at 0.4s.
+        assert started[0] - start < 0.35
+        assert [r["tool_use_id"] for r in client.requests[1].tool_results] == [
+            b.id for b in script[0].content if b.type == "tool_use"
+        ]
+
+    def test_stub_stream_replays_the_scripted_response(self) -> None:
+        response = tool_turn([("run_features", {"feature_names": ["salary", "department"]})], container="c1")
+        client = StubAnthropic([response])
+
+        async def consume() -> tuple[list[str], Any]:
+            async with client.messages.stream(messages=[]) as stream:
+                kinds = [event.type async for event in stream]
+                return kinds, await stream.get_final_message()
+
+        kinds, final = asyncio.run(consume())
+        assert final is response
+        assert kinds[0] == "message_start" and kinds[-1] == "message_stop"
+        assert kinds.count("content_block_stop") == 2
+
+
+class TestScheduledRequests:
+    """Loop and ptc requests go through SCHEDULER, which retries 429s and follows the rate-limit headers."""
+
+    @pytest.mark.parametrize("stream_tools", [False, True])
+    def test_throttled_request_is_retried(self, stream_tools: bool) -> None:
+        calls: list[str] = []
+
+        def handler(name: str, inputs: dict[str, Any]) -> str:
+            calls.append(name)
+            return "[]"
+
+        script: list[Any] = [
+            rate_limit_error({"retry-after": "0.05"}),
+            tool_turn([("discover_features", {})]),
+            final_turn("done"),
+        ]
+        client = StubAnthropic(script)
+        scheduler = RequestScheduler(backoff_seconds=0.01)
+        with _patched(
+            demo, SCHEDULER=scheduler, STREAM_TOOL_CALLS=stream_tools, TOOL_DISPATCHER=ToolDispatcher(handler)
+        ):
+            answer = asyncio.run(demo.loop_session(cast(Any, client)))
+        assert answer == "done"
+        assert calls == ["discover_features"]  # the retried request did not run its tool call twice
+        assert (scheduler.stats.requests, scheduler.stats.throttled, scheduler.stats.retries) == (3, 1, 1)
+        assert scheduler.stats.concurrency_limit < 5  # halved from 8 by the 429
+
+    def test_reported_limits_pace_the_next_request(self) -> None:
+        limits = StubRateLimits(requests_per_minute=1, window_seconds=0.3)
+        client = StubAnthropic([tool_turn([("discover_features", {})]), final_turn("done")], rate_limits=limits)
+        scheduler = RequestScheduler(window_seconds=0.3)
+        with _patched(demo, SCHEDULER=scheduler, TOOL_DISPATCHER=ToolDispatcher(lambda name, inputs: "[]")):
+            start = time.perf_counter()
+            asyncio.run(demo.loop_session(cast(Any, client)))
+        assert time.perf_counter() - start >= 0.25
+        assert [r.throttled for r in client.requests] == [False, False]
+        assert scheduler.requests.capacity == 1
+
+
+def test_run_features_in_another_compute_framework() -> None:
+    PluginLoader.all()
+    inputs = {"feature_names": ["department", "salary"], "order_by": [{"column": "salary"}], "limit": 3}
+    demo.RESULT_CACHE.clear()
+    pandas_csv = demo._call_tool("run_features", inputs)
+    arrow_csv = demo._call_tool("run_features", {**inputs, "compute_framework": "PyArrowTable"})
+    assert arrow_csv == pandas_csv
+    assert len(demo.RESULT_CACHE) == 2
+    error = json.loads(demo._call_tool("run_features", {**inputs, "compute_framework": "SparkFramework"}))
+    assert "Unsupported compute framework" in error["error"]
+
+
+def test_run_features_answers_from_derived_features() -> None:
+    PluginLoader.all()
+    demo.RESULT_CACHE.clear()
+    per_department = demo._call_tool("run_features", {"feature_names": ["dept_name", "dept_mean_salary"]})
+    assert per_department.splitlines()[0] == "dept_name,dept_mean_salary"
+    assert len(per_department.strip().splitlines()) == 4
+    top = demo._call_tool(
+        "run_features",
+        {
+            "feature_names": ["employee_id", "salary", "salary_top_k"],
+            "filter": [{"column": "salary_top_k", "op": "==", "value": True}],
+        },
+    )
+    assert len(top.strip().splitlines()) == 4
+    error = json.loads(demo._call_tool("run_features", {"feature_names": ["employee_id", "dept_mean_salary"]}))
+    assert "separate run_features calls" in error["error"]
+
+
+@pytest.mark.parametrize("framework", ["PolarsDataFrame", "PolarsLazyDataFrame", "DuckDBFramework"])
+def test_derived_features_name_their_frameworks(framework: str) -> None:
+    # Checked before mloda runs, so the framework's package need not be installed.
+    with pytest.raises(UnsupportedFrameworkError, match="PandasDataFrame"):
+        demo._run_features(["employee_id", "salary_rank"], framework)
+
+
+def test_run_features_rejects_mixed_features_with_equal_row_counts(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Two generated employees in two departments: both results have two rows.
+    PluginLoader.all()
+    monkeypatch.setitem(demo.FEATURE_OPTIONS, ROWS_OPTION, 2)
+    monkeypatch.setitem(demo.FEATURE_OPTIONS, SEED_OPTION, 0)
+    demo.RESULT_CACHE.clear()
+    try:
+        error = json.loads(demo._call_tool("run_features", {"feature_names": ["dept_name", "salary"]}))
+    finally:
+        demo.RESULT_CACHE.clear()
+    assert "separate run_features calls" in error["error"]
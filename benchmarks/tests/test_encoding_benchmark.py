@@ -0,0 +1,19 @@
+"""Smoke test for the encoding microbenchmark."""
+
+import json
+from typing import Any
+
+from benchmarks.encoding_benchmark import benchmark, main
+from ptc_mloda_demo.tools.encoding.result_encoding import RESULT_FORMATS
+
+
+def test_benchmark_reports_every_format() -> None:
+    records = benchmark(50, repeat=1)
+    assert [r["format"] for r in records] == list(RESULT_FORMATS)
+    assert all(r["payload_bytes"] > 0 and r["encode_seconds"] >= 0 for r in records)
+
+
+def test_main_prints_json_lines(capsys: Any) -> None:
+    assert main(["--rows", "20", "--formats", "csv", "columnar_json", "--repeat", "1"]) == 0
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert [json.loads(line)["format"] for line in lines] == ["csv", "columnar_json"]
@@ -0,0 +1,18 @@
+"""Smoke test for the compute framework benchmark."""
+
+import json
+
+import pytest
+
+from benchmarks.framework_benchmark import main
+
+
+def test_reports_each_installed_framework(capsys: pytest.CaptureFixture[str]) -> None:
+    argv = ["--frameworks", "PandasDataFrame", "PyArrowTable", "--rows", "2000", "--repeat", "1"]
+    assert main(argv) == 0
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [r["framework"] for r in records] == ["PandasDataFrame", "PyArrowTable"]
+    for record in records:
+        assert record["rows"] == 2000
+        assert 0 < record["fetch_seconds"] and 0 < record["query_seconds"]
+        assert record["peak_rss_bytes"] >= 0
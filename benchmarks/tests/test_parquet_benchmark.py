@@ -0,0 +1,22 @@
+"""Smoke test for the partitioned Parquet read benchmark."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+from benchmarks.parquet_benchmark import benchmark, main, strategies
+
+
+def test_benchmark_reports_every_strategy(tmp_path: Path) -> None:
+    records = benchmark(tmp_path, 600, files=2, workers=2, repeat=1)
+    assert [r["strategy"] for r in records] == list(strategies(tmp_path, 2))
+    by_strategy = {r["strategy"]: r for r in records}
+    assert by_strategy["baseline"]["speedup"] == 1.0
+    assert all(by_strategy[s]["rows"] == 600 for s in ("baseline", "threads", "processes", "projection", "row_groups"))
+    assert 0 < by_strategy["pruned"]["rows"] < 600
+
+
+def test_main_prints_json_lines(tmp_path: Path, capsys: Any) -> None:
+    assert main(["--rows", "120", "--files", "1", "--workers", "2", "--repeat", "1", "--dir", str(tmp_path)]) == 0
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert [json.loads(line)["benchmark"] for line in lines] == ["parquet"] * 6
@@ -0,0 +1,55 @@
+"""Smoke tests for the request scheduler benchmark and the rate-limited stub API."""
+
+import asyncio
+import json
+from typing import Any
+
+import anthropic
+import pytest
+
+from benchmarks.scheduler_benchmark import main, run_once
+from benchmarks.stub_api import StubAnthropic, StubRateLimits, final_turn
+
+# 20 requests per 0.2s window: 100 requests per second once the burst is used up.
+LIMITS: dict[str, Any] = {
+    "requests_per_window": 20,
+    "window_seconds": 0.2,
+    "latency_seconds": 0.01,
+    "prompt_chars": 200,
+}
+
+
+def test_stub_answers_429_with_rate_limit_headers() -> None:
+    client = StubAnthropic([final_turn("a"), final_turn("b")], rate_limits=StubRateLimits(requests_per_minute=1))
+
+    async def converse() -> tuple[Any, Any]:
+        raw = await client.messages.with_raw_response.create(messages=[])
+        with pytest.raises(anthropic.RateLimitError) as rejected:
+            await client.messages.create(messages=[])
+        return raw, rejected.value
+
+    raw, error = asyncio.run(converse())
+    assert raw.headers["anthropic-ratelimit-requests-limit"] == "1"
+    assert raw.headers["anthropic-ratelimit-requests-remaining"] == "0"
+    assert error.status_code == 429
+    assert 55 < float(error.response.headers["retry-after"]) <= 60
+    assert [r.throttled for r in client.requests] == [False, True]
+
+
+def test_scheduler_completes_every_session() -> None:
+    record = run_once("scheduler", sessions=30, turns=2, **LIMITS)
+    assert record["sessions_failed"] == 0
+    assert record["requests"] - record["throttled"] == 60
+    assert record["concurrency_limit"] >= 1
+
+
+def test_sdk_retries_fail_sessions_under_the_same_load() -> None:
+    record = run_once("sdk_retries", sessions=30, turns=2, **LIMITS)
+    assert record["throttled"] > 0
+    assert record["sessions_failed"] > 0
+
+
+def test_main_prints_json_lines(capsys: Any) -> None:
+    assert main(["--sessions", "4", "--turns", "1", "--window", "0.1", "--latency", "0"]) == 0
+    lines = capsys.readouterr().out.strip().splitlines()
+    assert [json.loads(line)["strategy"] for line in lines] == ["sdk_retries", "scheduler"]
@@ -0,0 +1,64 @@
+"""Tests for the startup benchmark."""
+
+import json
+
+import pytest
+
+from benchmarks.startup_benchmark import DEFAULT_BUDGET_MS, direct_imports, main, parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |   _io
+import time:       200 |        300 | site
+import time:        50 |         50 |     pandas._libs
+import time:       400 |        450 |   pandas
+import time:        30 |         30 |   json
+import time:        20 |        500 | demo
+some unrelated stderr line
+"""
+
+
+def test_parse_importtime_reads_depth_and_cumulative_seconds() -> None:
+    assert parse_importtime(IMPORTTIME) == [
+        ("_io", 1, 0.0001),
+        ("site", 0, 0.0003),
+        ("pandas._libs", 2, 0.00005),
+        ("pandas", 1, 0.00045),
+        ("json", 1, 0.00003),
+        ("demo", 0, 0.0005),
+    ]
+
+
+def test_direct_imports_stop_at_the_previous_top_level_module() -> None:
+    entries = parse_importtime(IMPORTTIME)
+    assert direct_imports(entries, "demo") == [("pandas", 0.00045), ("json", 0.00003)]
+    assert direct_imports(entries, "missing") == []
+
+
+def test_bash_starts_without_the_api_sdk(capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(["--approaches", "bash", "--repeat", "1", "--budget-ms", "60000"]) == 0
+    (record,) = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert record["approach"] == "bash"
+    assert record["imports_anthropic"] is False
+    assert record["deferred_loaded"] == []
+    assert record["within_budget"] is True
+    assert 0 < record["import_seconds"] < record["startup_seconds"]
+    assert "pandas" in record["slowest_imports"]
+
+
+def test_exceeding_the_budget_fails(capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(["--approaches", "bash", "--repeat", "1", "--budget-ms", "1"]) == 1
+    assert json.loads(capsys.readouterr().out)["within_budget"] is False
+
+
+def test_startup_within_the_default_budget(capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(["--repeat", "3"]) == 0
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [r["approach"] for r in records] == ["loop", "bash", "ptc"]
+    assert all(r["budget_seconds"] == DEFAULT_BUDGET_MS / 1000 and r["within_budget"] for r in records)
+    assert all("anthropic" not in r["deferred_loaded"] for r in records)
+
+
+def test_budget_check_can_be_disabled(capsys: pytest.CaptureFixture[str]) -> None:
+    assert main(["--approaches", "bash", "--repeat", "1", "--budget-ms", "0"]) == 0
+    assert "within_budget" not in json.loads(capsys.readouterr().out)
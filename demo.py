@@ -19,22 +19,94 @@ Usage:
     python demo.py loop                     # run only loop approach
     python demo.py bash                     # run only bash approach
     python demo.py ptc                      # run only ptc approach (needs ANTHROPIC_API_KEY)
+    python demo.py --async                  # run all 3 concurrently on one event loop
+    python demo.py ptc --sessions 20 --concurrency 5   # 20 ptc sessions, at most 5 in flight
+    python demo.py ptc --rows 1000000        # serve 1M generated employees instead of the 10-row sample
+    python demo.py ptc --parquet-dir data/employees   # serve department=<name>/*.parquet partitions
+    python demo.py --usage-jsonl usage.jsonl --usage-prom usage.prom   # export token/latency/payload usage
+    python demo.py loop --trace trace.json   # nested spans from LLM turn to calculate_feature (Chrome trace)
+    python demo.py --serve /tmp/mloda-tools.sock                 # keep mloda warm behind a local tool server
+    python demo.py bash --tool-server /tmp/mloda-tools.sock      # tool calls go to that server
 """
 
+import argparse
+import asyncio
+import dataclasses
+import functools
 import json
-import subprocess
-import sys
-from typing import Any, Optional
+from typing import TYPE_CHECKING, Any, Iterator, Optional
 
-import anthropic
 import pandas as pd
-from mloda.core.api.plugin_docs import get_feature_group_docs
+import pyarrow as pa
 from mloda.provider import BaseInputData, DataCreator, FeatureGroup, FeatureSet
-from mloda.user import Feature, PluginLoader
+from mloda.user import Feature, GlobalFilter, PluginLoader
 from mloda.user import mloda as mlodaAPI
 
-import ptc_mloda_demo.feature_groups.sample_data.sample_data_features  # noqa: F401
-from ptc_mloda_demo.extenders.observability.observability_extender import ObservabilityExtender
+from ptc_mloda_demo.agents.claude_cli.claude_pool import ClaudeCliPool, EventCallback, assistant_text
+from ptc_mloda_demo.agents.containers.container_pool import ContainerPool
+from ptc_mloda_demo.agents.context.loop_context import ContextPolicy, LoopContext
+from ptc_mloda_demo.agents.dispatch.tool_dispatcher import ToolDispatcher, tool_use_blocks
+from ptc_mloda_demo.agents.scheduler.request_scheduler import INTERACTIVE, PRIORITIES, RequestScheduler
+from ptc_mloda_demo.agents.usage.usage_tracker import SessionUsage, UsageTracker
+from ptc_mloda_demo.extenders.observability.observability_extender import ObservabilityExtender, ObservabilityMetrics
+from ptc_mloda_demo.extenders.tracing.tracing_extender import TRACER, TracingExtender
+from ptc_mloda_demo.feature_groups.employee_stats.employee_stats_features import (
+    DEPARTMENT_FEATURES,
+    DERIVED_FRAMEWORKS,
+    RANK_FEATURES,
+    DepartmentStatsFeatures,
+    EmployeeRankFeatures,
+)
+from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import (
+    PARQUET_DIR_OPTION,
+    ROWS_OPTION,
+    SEED_OPTION,
+    EmployeeDataFeatures,
+    iter_employee_chunks,
+)
+from ptc_mloda_demo.tools.catalog.feature_catalog import FeatureCatalog
+from ptc_mloda_demo.tools.encoding.result_encoding import (
+    DEFAULT_FORMAT,
+    RESULT_FORMATS,
+    SANDBOX_DECODERS,
+    TEXT_FORMATS,
+    UnsupportedFormatError,
+    result_format_property,
+)
+from ptc_mloda_demo.tools.frameworks.compute_frameworks import (
+    COMPUTE_FRAMEWORKS,
+    DEFAULT_FRAMEWORK,
+    UnsupportedFrameworkError,
+    available_frameworks,
+    check_framework,
+    compute_framework_property,
+    framework_options,
+    to_query_frame,
+)
+from ptc_mloda_demo.tools.paging.result_pager import (
+    FETCH_PAGE_DESCRIPTION,
+    FETCH_PAGE_INPUT_SCHEMA,
+    PAGE_ROWS_PROPERTY,
+    PagingError,
+    ResultPager,
+    iter_frame_chunks,
+    limit_chunks,
+    page_size,
+)
+from ptc_mloda_demo.tools.query.result_query import QUERY_SCHEMA_PROPERTIES, Frame, QueryError, ResultQuery
+from ptc_mloda_demo.tools.result_cache.result_cache import ResultCache
+from ptc_mloda_demo.tools.shaping.result_shaper import (
+    FETCH_SLICE_DESCRIPTION,
+    FETCH_SLICE_INPUT_SCHEMA,
+    ResultShaper,
+    ShapingError,
+)
+
+if TYPE_CHECKING:
+    import anthropic
+
+    from ptc_mloda_demo.extenders.feature_store.feature_store_extender import FeatureStore
+    from ptc_mloda_demo.tools.server.tool_server import ToolClient
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -56,125 +128,449 @@ EMPLOYEE_FEATURES = [
     "performance_score",
 ]
 
+# Compute framework of run_features calls that do not pass compute_framework; set by --compute-framework.
+COMPUTE_FRAMEWORK = DEFAULT_FRAMEWORK
+
+
+# Feature groups that read raw data; frameworks needing a connection (DuckDB) get it under their names.
+def _data_feature_groups() -> list[str]:
+    """Names of the employee data feature groups; the Parquet source is imported (and so registered with mloda)
+    on first use, since only run_features needs it."""
+    from ptc_mloda_demo.feature_groups.parquet_source.employee_parquet_features import EmployeeParquetFeatures
+
+    return [EmployeeDataFeatures.get_class_name(), EmployeeParquetFeatures.get_class_name()]
+
+
+# Feature groups mloda derives from the employee data; the prompts point the model at them.
+DERIVED_FEATURE_GROUPS = [EmployeeRankFeatures.get_class_name(), DepartmentStatsFeatures.get_class_name()]
+
+# Feature options passed to every run_features call; --rows / --seed switch to generated employee data,
+# --parquet-dir to a partitioned Parquet directory.
+FEATURE_OPTIONS: dict[str, Any] = {}
+
+# Shared across sessions in this process; call RESULT_CACHE.invalidate() when the underlying data changes.
+RESULT_CACHE = ResultCache()
+
+# Results of run_features' mloda runs persisted on disk across processes; set by --feature-store DIR.
+FEATURE_STORE: Optional["FeatureStore"] = None
+
+# Indexed view of the loaded feature groups; refreshed incrementally when plugins change.
+FEATURE_CATALOG = FeatureCatalog()
+
+# Open cursors of paged run_features results, served page by page through fetch_page.
+RESULT_PAGER = ResultPager()
+
+# run_features results over this many tokens come back as a digest with a handle for fetch_slice.
+RESULT_BUDGET_TOKENS = 20_000
+
+# Digests and fetch_slice handles of results over the budget; --result-budget-tokens / --result-budget-bytes.
+RESULT_SHAPER = ResultShaper(max_tokens=RESULT_BUDGET_TOKENS)
+
+# Tokens, API latency, tool time and tool_result bytes of every session in this process.
+USAGE = UsageTracker()
+
+# Per-feature-group latency percentiles and result sizes from every mloda run in this process.
+FEATURE_METRICS = ObservabilityMetrics()
+
+# Code-execution containers left warm by finished PTC sessions, handed to the next one.
+CONTAINER_POOL = ContainerPool()
+
+# claude -p processes of the bash approach: bounded worker count, per-process timeout, streamed output.
+CLAUDE_CLI = ClaudeCliPool()
+
+# Client of a running tool server (python demo.py --serve ADDRESS); set by --tool-server ADDRESS.
+# Loop / PTC tool calls and bash scripts then use that server's warm mloda instead of this process.
+TOOL_CLIENT: Optional["ToolClient"] = None
+
 
 # ---------------------------------------------------------------------------
 # Shared helpers
 # ---------------------------------------------------------------------------
 
 
-def _claude_p(prompt: str, allowed_tools: str = "") -> str:
-    """Run a single claude -p call and return the text result."""
-    cmd = ["claude", "-p", "--output-format", "json"]
-    if allowed_tools:
-        cmd.extend(["--allowedTools", allowed_tools])
-    result = subprocess.run(cmd, input=prompt, capture_output=True, text=True)
+def _no_client() -> None:
+    return None
+
+
+def _api_client() -> "anthropic.AsyncAnthropic":
+    """A new Messages API client; the SDK is imported here since it dominates import time and bash never needs it.
+
+    SCHEDULER retries throttled and failed requests, so the SDK does not retry on its own.
+    """
+    import anthropic
+
+    return anthropic.AsyncAnthropic(max_retries=0)
+
+
+async def _claude_p(
+    prompt: str,
+    allowed_tools: str = "",
+    usage: Optional[SessionUsage] = None,
+    on_event: Optional[EventCallback] = None,
+) -> str:
+    """Run a single claude -p call on CLAUDE_CLI and return the text result."""
+    result = await CLAUDE_CLI.run(prompt, allowed_tools, on_event)
+    if result.timed_out:
+        return f"[claude -p timed out after {CLAUDE_CLI.timeout_seconds}s]: {result.text}"
     if result.returncode != 0:
         return f"[claude -p failed (exit {result.returncode})]: {result.stderr}"
-    return json.loads(result.stdout).get("result", result.stdout)
+    if result.is_error:
+        return f"[claude -p returned an error]: {result.text or result.stderr}"
+    if usage is not None:
+        usage.record_request(result.usage, result.duration_seconds)
+    return result.text
+
+
+def _final_text(response: Any) -> str:
+    return "\n".join(block.text for block in response.content if getattr(block, "type", None) == "text")
 
 
 # ---------------------------------------------------------------------------
 # LoopApproach: Anthropic API + tool-calling loop
 # ---------------------------------------------------------------------------
 
+DISCOVER_FEATURES_DESCRIPTION = (
+    "Discover available mloda feature groups and their supported feature names. "
+    "Returns documentation for all loaded feature groups, optionally filtered."
+)
+
+DISCOVER_FEATURES_INPUT_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "name": {
+            "type": "string",
+            "description": "Optional filter by feature group name (partial match).",
+        },
+        "feature": {
+            "type": "string",
+            "description": "Optional filter: only feature groups that provide this exact feature name.",
+        },
+        "search": {
+            "type": "string",
+            "description": "Optional filter: words that must all appear in the feature group description.",
+        },
+    },
+    "required": [],
+}
+
+RUN_FEATURES_DESCRIPTION = (
+    "Run mloda to fetch data for the given feature names. Optional filter, group_by/aggregations, "
+    "order_by and limit are applied server-side, so only the matching rows are returned. "
+    "Returns a CSV string of the resulting DataFrame unless another format is requested. "
+    "Pass page_rows for large results to get them page by page via fetch_page. A text result over the "
+    "size budget comes back as a JSON digest (schema, statistics, sample) with a handle for fetch_slice."
+)
+
+RUN_FEATURES_INPUT_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "feature_names": {
+            "type": "array",
+            "items": {"type": "string"},
+            "description": "List of feature names to fetch via mloda.",
+        },
+        **QUERY_SCHEMA_PROPERTIES,
+        "format": result_format_property(TEXT_FORMATS),
+        "page_rows": PAGE_ROWS_PROPERTY,
+        "compute_framework": compute_framework_property(available_frameworks()),
+    },
+    "required": ["feature_names"],
+}
+
 LOOP_TOOLS = [
     {
         "name": "discover_features",
-        "description": (
-            "Discover available mloda feature groups and their supported feature names. "
-            "Returns documentation for all loaded feature groups."
-        ),
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "name": {
-                    "type": "string",
-                    "description": "Optional filter by feature group name (partial match).",
-                },
-            },
-            "required": [],
-        },
+        "description": DISCOVER_FEATURES_DESCRIPTION,
+        "input_schema": DISCOVER_FEATURES_INPUT_SCHEMA,
     },
     {
         "name": "run_features",
-        "description": (
-            "Run mloda to fetch data for the given feature names. Returns a CSV string of the resulting DataFrame."
-        ),
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "feature_names": {
-                    "type": "array",
-                    "items": {"type": "string"},
-                    "description": "List of feature names to fetch via mloda.",
-                },
-            },
-            "required": ["feature_names"],
-        },
+        "description": RUN_FEATURES_DESCRIPTION,
+        "input_schema": RUN_FEATURES_INPUT_SCHEMA,
+    },
+    {
+        "name": "fetch_page",
+        "description": FETCH_PAGE_DESCRIPTION,
+        "input_schema": FETCH_PAGE_INPUT_SCHEMA,
+    },
+    {
+        "name": "fetch_slice",
+        "description": FETCH_SLICE_DESCRIPTION,
+        "input_schema": FETCH_SLICE_INPUT_SCHEMA,
     },
 ]
 
+# Tells the model that precomputed rankings and per-department statistics exist.
+DERIVED_FEATURES_HINT = (
+    "Besides the raw employee columns, " + " and ".join(DERIVED_FEATURE_GROUPS) + " provide precomputed "
+    "rankings (salary_rank, salary_top_k, ...) and per-department statistics (dept_name, dept_mean_salary, ...); "
+    "request per-department features on their own, without per-employee ones. They run in the "
+    + " and ".join(f.get_class_name() for f in DERIVED_FRAMEWORKS)
+    + " compute frameworks.\n"
+)
+
 LOOP_PROMPT = (
     "You are a data analyst with access to mloda, a plugin-based data framework.\n\n"
     "First, use discover_features to see what data is available.\n"
-    "Then, use run_features to fetch the employee dataset.\n"
-    "Finally, analyze the data and answer these questions:\n" + "\n".join(QUESTIONS)
+    "Then, use run_features to fetch the employee data. Use its filter, group_by/aggregations, "
+    "order_by and limit arguments so only the rows you need come back.\n"
+    + DERIVED_FEATURES_HINT
+    + "Finally, analyze the data and answer these questions:\n"
+    + "\n".join(QUESTIONS)
 )
 
 
+# Prompt-cache breakpoints and tool-result compaction for the loop's growing message history.
+LOOP_CONTEXT_POLICY = ContextPolicy()
+
+
+def _mloda_extenders() -> set[Any]:
+    """Function extenders for every mloda run; tracing hooks are only added while tracing is enabled,
+    the feature store only when one is configured."""
+    extenders: set[Any] = {ObservabilityExtender(FEATURE_METRICS, log_calls=False)}
+    if TRACER.enabled:
+        extenders.add(TracingExtender(TRACER))
+    if FEATURE_STORE is not None:
+        from ptc_mloda_demo.extenders.feature_store.feature_store_extender import FeatureStoreExtender
+
+        extenders.add(FeatureStoreExtender(FEATURE_STORE))
+    return extenders
+
+
+def _partition_filters(query: ResultQuery) -> tuple[tuple[str, str, tuple[str, ...]], ...]:
+    """The query's department ``==`` / ``in`` filters as mloda (column, filter type, values), so that
+    --parquet-dir reads open only the matching partitions. Only pushed down when every fetched feature
+    is a raw employee column: ranks and department stats are computed over all employees, and a
+    mloda filter would compute them over the filtered ones instead."""
+    if PARQUET_DIR_OPTION not in FEATURE_OPTIONS or not set(query.fetch_names) <= set(EMPLOYEE_FEATURES):
+        return ()
+    from ptc_mloda_demo.feature_groups.parquet_source.employee_parquet_features import PARTITION_COLUMN
+
+    pushed: list[tuple[str, str, tuple[str, ...]]] = []
+    for f in query.filters:
+        if f.column != PARTITION_COLUMN:
+            continue
+        if f.op == "==" and isinstance(f.value, str):
+            pushed.append((f.column, "equal", (f.value,)))
+        elif f.op == "in" and all(isinstance(v, str) for v in f.value):
+            pushed.append((f.column, "categorical_inclusion", tuple(f.value)))
+    return tuple(pushed)
+
+
+def _global_filter(filters: tuple[tuple[str, str, tuple[str, ...]], ...]) -> Optional[GlobalFilter]:
+    if not filters:
+        return None
+    global_filter = GlobalFilter()
+    for column, filter_type, values in filters:
+        parameter = {"value": values[0]} if filter_type == "equal" else {"values": list(values)}
+        global_filter.add_filter(column, filter_type, parameter)
+    return global_filter
+
+
+def _source_chunks(query: ResultQuery) -> Optional[Iterator[pd.DataFrame]]:
+    """The rows of a paged filter / limit query over raw employee columns, read chunk by chunk from the
+    --rows generator or the --parquet-dir row groups, so paging never materializes the whole result.
+    None when the query needs every row at once (aggregations, order_by, derived features) or reads
+    the hardcoded sample."""
+    if query.aggregates or query.order_by or not set(query.fetch_names) <= set(EMPLOYEE_FEATURES):
+        return None
+    columns = set(query.fetch_names)
+    source: Iterator[Frame]
+    if PARQUET_DIR_OPTION in FEATURE_OPTIONS:
+        from ptc_mloda_demo.feature_groups.parquet_source.employee_parquet_features import iter_employee_row_groups
+
+        departments: Optional[set[str]] = None
+        for _, _, values in _partition_filters(query):
+            departments = set(values) if departments is None else departments & set(values)
+        source = iter_employee_row_groups(FEATURE_OPTIONS[PARQUET_DIR_OPTION], columns, departments)
+    elif ROWS_OPTION in FEATURE_OPTIONS:
+        seed = int(FEATURE_OPTIONS.get(SEED_OPTION) or 0)
+        source = iter_employee_chunks(int(FEATURE_OPTIONS[ROWS_OPTION]), seed, columns)
+    else:
+        return None
+    per_chunk = dataclasses.replace(query, limit=None)
+    return limit_chunks((per_chunk.apply(chunk) for chunk in source), query.limit)
+
+
+def _run_features(
+    feature_names: list[str],
+    compute_framework: Optional[str] = None,
+    filters: tuple[tuple[str, str, tuple[str, ...]], ...] = (),
+) -> Frame:
+    """Fetch the given features through mloda (cache misses only), computed in ``compute_framework``
+    and handed to the query layer with columns in the requested order: as a pandas DataFrame for
+    pandas, as an Arrow table for the Arrow-based frameworks, so their queries run in Arrow.
+    ``filters`` (see _partition_filters) are applied by mloda while fetching."""
+    per_department = [name for name in feature_names if name in DEPARTMENT_FEATURES]
+    if per_department and len(per_department) < len(feature_names):
+        raise QueryError(
+            f"Per-department features {per_department} cannot be combined with per-employee features "
+            f"{[name for name in feature_names if name not in DEPARTMENT_FEATURES]}; "
+            "request them in separate run_features calls"
+        )
+    framework = compute_framework or COMPUTE_FRAMEWORK
+    derived = [name for name in feature_names if name in RANK_FEATURES or name in DEPARTMENT_FEATURES]
+    supported = [f.get_class_name() for f in DERIVED_FRAMEWORKS]
+    if derived and framework not in supported:
+        raise UnsupportedFrameworkError(
+            f"Features {derived} are not available in compute framework {framework!r}; "
+            f"pass compute_framework as one of {supported}"
+        )
+    with framework_options(framework, _data_feature_groups()) as connections:
+        options = {**FEATURE_OPTIONS, **connections}
+        features = [Feature.not_typed(f, options=dict(options)) for f in feature_names]
+        with TRACER.span("mloda.run_all", features=len(features), framework=framework):
+            results = mlodaAPI.run_all(
+                features,
+                compute_frameworks=[framework],
+                function_extender=_mloda_extenders(),
+                global_filter=_global_filter(filters),
+                column_ordering="request_order",
+            )
+        frames = [to_query_frame(r, framework) for r in results]
+    if len(frames) == 1:
+        return frames[0]
+    # Derived per-employee features (EmployeeRankFeatures) come back as their own result, row-aligned
+    # with the EmployeeDataFeatures one.
+    if isinstance(frames[0], pa.Table):
+        columns = {name: table.column(name) for table in frames for name in table.column_names}
+        return pa.table({name: columns[name] for name in feature_names})
+    return pd.concat(frames, axis=1)[feature_names]
+
+
 def _handle_tool_call(name: str, inputs: dict) -> str:  # type: ignore[type-arg]
     """Dispatch a tool call (shared by LoopApproach and PtcApproach)."""
+    with TRACER.span(f"tool.{name}"):
+        if TOOL_CLIENT is not None:
+            return TOOL_CLIENT.call(name, inputs)
+        return _call_tool(name, inputs)
+
+
+def _call_tool(name: str, inputs: dict) -> str:  # type: ignore[type-arg]
     if name == "discover_features":
-        docs = get_feature_group_docs(name=inputs.get("name"))
-        return json.dumps(
-            [{"name": d.name, "features": list(d.supported_feature_names), "description": d.description} for d in docs]
+        return FEATURE_CATALOG.lookup(
+            name=inputs.get("name"), feature=inputs.get("feature"), search=inputs.get("search")
         )
     if name == "run_features":
-        feature_names = inputs["feature_names"]
-        features = [Feature.not_typed(f) for f in feature_names]
-        results = mlodaAPI.run_all(
-            features, compute_frameworks=["PandasDataFrame"], function_extender={ObservabilityExtender()}
-        )
-        return results[0].to_csv(index=False)
+        try:
+            query = ResultQuery.from_inputs(inputs)
+            framework = check_framework(inputs.get("compute_framework") or COMPUTE_FRAMEWORK)
+            fmt = inputs.get("format", DEFAULT_FORMAT)
+            page_rows = inputs.get("page_rows")
+            streamed = None if page_rows is None else _source_chunks(query)
+            if streamed is not None:
+                return RESULT_PAGER.open(streamed, None, fmt, page_size(page_rows, "page_rows"))
+            filters = _partition_filters(query)
+            frame = RESULT_CACHE.get_or_compute(
+                query.fetch_names,
+                framework,
+                functools.partial(_run_features, compute_framework=framework, filters=filters),
+                filters,
+            )
+            result = query.apply(frame)
+            if page_rows is None:
+                return RESULT_SHAPER.shape(result, fmt)
+            rows = page_size(page_rows, "page_rows")
+            return RESULT_PAGER.open(iter_frame_chunks(result, rows), len(result), fmt, rows)
+        except (QueryError, UnsupportedFormatError, UnsupportedFrameworkError, PagingError) as e:
+            return json.dumps({"error": str(e)})
+    if name == "fetch_page":
+        try:
+            return RESULT_PAGER.fetch_page(inputs.get("cursor"), inputs.get("n"))
+        except PagingError as e:
+            return json.dumps({"error": str(e)})
+    if name == "fetch_slice":
+        try:
+            return RESULT_SHAPER.fetch_slice(
+                inputs.get("handle"),
+                offset=inputs.get("offset", 0),
+                limit=inputs.get("limit"),
+                columns=inputs.get("columns"),
+                fmt=inputs.get("format", DEFAULT_FORMAT),
+            )
+        except ShapingError as e:
+            return json.dumps({"error": str(e)})
     return json.dumps({"error": f"Unknown tool: {name}"})
 
 
-class LoopApproach(FeatureGroup):
-    """Anthropic API + tool-calling loop. Claude calls discover_features / run_features tools."""
+# Independent tool_use blocks of one turn run concurrently; results keep block order.
+TOOL_DISPATCHER = ToolDispatcher(_handle_tool_call)
 
-    @classmethod
-    def input_data(cls) -> Optional[BaseInputData]:
-        return DataCreator({cls.get_class_name()})
+# Stream responses and start each tool call as soon as its tool_use block is complete (--stream-tools),
+# so mloda runs while the rest of the response is still being generated.
+STREAM_TOOL_CALLS = False
 
-    @classmethod
-    def calculate_feature(cls, data: Any, features: FeatureSet) -> Any:
-        client = anthropic.Anthropic()
-        messages: list = [{"role": "user", "content": LOOP_PROMPT}]  # type: ignore[type-arg]
+# Paces the Messages API requests of all loop and ptc sessions: rate limits, concurrency, retries.
+SCHEDULER = RequestScheduler()
 
-        while True:
-            response = client.messages.create(
-                model=MODEL,
-                max_tokens=4096,
-                tools=LOOP_TOOLS,
-                messages=messages,
+# Priority of this process's requests in SCHEDULER (--priority): interactive go before batch.
+REQUEST_PRIORITY = INTERACTIVE
+
+
+async def _model_turn(client: Any, usage: SessionUsage, **kwargs: Any) -> tuple[Any, list[dict[str, Any]]]:
+    """One model request, paced by SCHEDULER, and the tool_results of the tool calls it asks for."""
+    estimated_tokens = SCHEDULER.estimate(kwargs)
+    if not STREAM_TOOL_CALLS:
+        with TRACER.span("llm.messages.create", turn=usage.turn + 1):
+            response = await SCHEDULER.submit(
+                lambda: usage.measure(SCHEDULER.create(client, **kwargs)), estimated_tokens, REQUEST_PRIORITY
             )
+        if response.stop_reason == "end_turn":
+            return response, []
+        blocks = tool_use_blocks(response.content)
+        with TRACER.span("tools.dispatch", calls=len(blocks)):
+            return response, await asyncio.to_thread(TOOL_DISPATCHER.dispatch, blocks, usage.record_tool_call)
 
-            messages.append({"role": "assistant", "content": response.content})
+    async def stream() -> tuple[Any, Any]:
+        # A fresh batch per attempt, so a retried request never runs the same tool call twice.
+        from ptc_mloda_demo.agents.streaming.tool_stream import stream_message
+
+        batch = TOOL_DISPATCHER.batch(usage.record_tool_call)
+        try:
+            message = await usage.measure(stream_message(client, batch.submit, SCHEDULER.observe, **kwargs))
+        except BaseException:
+            batch.cancel()
+            raise
+        return message, batch
+
+    with TRACER.span("llm.messages.stream", turn=usage.turn + 1):
+        response, batch = await SCHEDULER.submit(stream, estimated_tokens, REQUEST_PRIORITY)
+    if not len(batch):
+        return response, []
+    with TRACER.span("tools.collect", calls=len(batch)):
+        return response, await asyncio.to_thread(batch.results)
+
+
+async def loop_session(client: "anthropic.AsyncAnthropic") -> str:
+    """One tool-calling loop session; returns Claude's final answer."""
+    context = LoopContext(LOOP_PROMPT, LOOP_TOOLS, LOOP_CONTEXT_POLICY)
+    usage = USAGE.session("loop")
+
+    with TRACER.span("session.loop", session=usage.session):
+        while True:
+            response, tool_results = await _model_turn(client, usage, model=MODEL, max_tokens=4096, **context.request())
+
+            context.append_assistant(response.content)
 
             if response.stop_reason == "end_turn":
                 break
 
-            tool_results = []
-            for block in response.content:
-                if getattr(block, "type", None) == "tool_use":
-                    result = _handle_tool_call(block.name, block.input)
-                    tool_results.append({"type": "tool_result", "tool_use_id": block.id, "content": result})
-
             if tool_results:
-                messages.append({"role": "user", "content": tool_results})
+                context.append_tool_results(tool_results)
+
+    return _final_text(response)
+
+
+class LoopApproach(FeatureGroup):
+    """Anthropic API + tool-calling loop. Claude calls discover_features / run_features tools."""
 
-        texts = [block.text for block in response.content if getattr(block, "type", None) == "text"]
-        return pd.DataFrame({cls.get_class_name(): ["\n".join(texts)]})
+    @classmethod
+    def input_data(cls) -> Optional[BaseInputData]:
+        return DataCreator({cls.get_class_name()})
+
+    @classmethod
+    def calculate_feature(cls, data: Any, features: FeatureSet) -> Any:
+        return pd.DataFrame({cls.get_class_name(): [asyncio.run(loop_session(_api_client()))]})
 
 
 # ---------------------------------------------------------------------------
@@ -196,6 +592,49 @@ BASH_PROMPT = (
     "3. Analyze the output and answer:\n" + "\n".join(QUESTIONS)
 )
 
+# With a tool server, each Bash call is a stdlib-only client process instead of a fresh mloda interpreter.
+BASH_TOOL_SERVER_PROMPT = (
+    "You are a data analyst. You have access to a Python project with a running mloda tool server.\n"
+    "The project virtualenv is at /home/tom/project/demo/ptc-mloda-demo/.venv/\n\n"
+    "Use Bash to activate the virtualenv and query the server, which already has mloda loaded:\n"
+    "   python -m ptc_mloda_demo.tools.server.tool_server {address} discover_features\n"
+    "   python -m ptc_mloda_demo.tools.server.tool_server {address} run_features "
+    '\'{{"feature_names": ' + json.dumps(EMPLOYEE_FEATURES) + "}}'\n"
+    'run_features also takes filter ([{{"column", "op", "value"}}]), group_by with aggregations '
+    '([{{"column", "func"}}]), order_by ([{{"column", "descending"}}]) and limit, so only the rows '
+    "you need come back.\n\n"
+    "Analyze the output and answer:\n" + "\n".join(QUESTIONS)
+)
+
+
+def _bash_prompt() -> str:
+    if TOOL_CLIENT is None:
+        return BASH_PROMPT
+    from ptc_mloda_demo.tools.server.tool_server import format_address
+
+    return BASH_TOOL_SERVER_PROMPT.format(address=format_address(TOOL_CLIENT.address))
+
+
+# Print the assistant text of bash sessions as it streams in (--stream), not only the final answer.
+STREAM_BASH = False
+
+
+def _print_partial(session: int) -> EventCallback:
+    def on_event(event: dict[str, Any]) -> None:
+        text = assistant_text(event) if event.get("type") == "assistant" else ""
+        if text:
+            print(f"[bash #{session}] {text}", flush=True)
+
+    return on_event
+
+
+async def bash_session(client: Any = None) -> str:
+    """One claude -p session with the Bash tool; the API client is unused."""
+    usage = USAGE.session("bash")
+    on_event = _print_partial(usage.session) if STREAM_BASH else None
+    with TRACER.span("session.bash", session=usage.session):
+        return await _claude_p(_bash_prompt(), allowed_tools="Bash", usage=usage, on_event=on_event)
+
 
 class BashApproach(FeatureGroup):
     """1 x claude -p call with Bash tool. Claude imports mloda and runs it in Python."""
@@ -206,65 +645,130 @@ class BashApproach(FeatureGroup):
 
     @classmethod
     def calculate_feature(cls, data: Any, features: FeatureSet) -> Any:
-        return pd.DataFrame({cls.get_class_name(): [_claude_p(BASH_PROMPT, allowed_tools="Bash")]})
+        return pd.DataFrame({cls.get_class_name(): [asyncio.run(bash_session())]})
 
 
 # ---------------------------------------------------------------------------
 # PtcApproach: Programmatic Tool Calling (code_execution + tools)
 # ---------------------------------------------------------------------------
 
+# The sandbox can decode binary payloads, so PTC callers may also request arrow_ipc / parquet.
+PTC_RUN_FEATURES_INPUT_SCHEMA: dict[str, Any] = {
+    **RUN_FEATURES_INPUT_SCHEMA,
+    "properties": {**RUN_FEATURES_INPUT_SCHEMA["properties"], "format": result_format_property(RESULT_FORMATS)},
+}
+
 PTC_TOOLS: list[dict[str, Any]] = [
     {"type": "code_execution_20260120", "name": "code_execution"},
     {
         "name": "discover_features",
-        "description": (
-            "Discover available mloda feature groups and their supported feature names. "
-            "Returns documentation for all loaded feature groups."
-        ),
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "name": {
-                    "type": "string",
-                    "description": "Optional filter by feature group name (partial match).",
-                },
-            },
-            "required": [],
-        },
+        "description": DISCOVER_FEATURES_DESCRIPTION,
+        "input_schema": DISCOVER_FEATURES_INPUT_SCHEMA,
         "allowed_callers": ["code_execution_20260120"],
     },
     {
         "name": "run_features",
-        "description": (
-            "Run mloda to fetch data for the given feature names. Returns a CSV string of the resulting DataFrame."
-        ),
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "feature_names": {
-                    "type": "array",
-                    "items": {"type": "string"},
-                    "description": "List of feature names to fetch via mloda.",
-                },
-            },
-            "required": ["feature_names"],
-        },
+        "description": RUN_FEATURES_DESCRIPTION,
+        "input_schema": PTC_RUN_FEATURES_INPUT_SCHEMA,
+        "allowed_callers": ["code_execution_20260120"],
+    },
+    {
+        "name": "fetch_page",
+        "description": FETCH_PAGE_DESCRIPTION,
+        "input_schema": FETCH_PAGE_INPUT_SCHEMA,
+        "allowed_callers": ["code_execution_20260120"],
+    },
+    {
+        "name": "fetch_slice",
+        "description": FETCH_SLICE_DESCRIPTION,
+        "input_schema": FETCH_SLICE_INPUT_SCHEMA,
         "allowed_callers": ["code_execution_20260120"],
     },
 ]
 
 PTC_PROMPT = (
     "You are a data analyst with access to mloda, a plugin-based data framework.\n\n"
-    "You have two async functions available in your code sandbox:\n"
+    "You have these async functions available in your code sandbox:\n"
     "  - discover_features(name=None): discover available feature groups and their features\n"
-    "  - run_features(feature_names=[...]): fetch data for the given feature names, returns CSV\n\n"
+    "  - run_features(feature_names=[...], filter=None, group_by=None, aggregations=None, order_by=None,\n"
+    "    limit=None, format='csv', page_rows=None, compute_framework=None): fetch data for the given feature\n"
+    "    names, optionally filtered / aggregated / sorted / limited server-side. Returns CSV by default; for\n"
+    "    large results pass\n"
+    "    format='parquet' and decode with " + SANDBOX_DECODERS["parquet"] + "\n"
+    "  - fetch_page(cursor, n=None): with page_rows set, run_features returns JSON with num_rows, schema, the\n"
+    "    first page and a cursor; call fetch_page(cursor) in a loop until the returned cursor is None\n"
+    "  - fetch_slice(handle, offset=0, limit=None, columns=None): a CSV or columnar_json result over the size\n"
+    "    budget comes back as JSON with digest=True and a handle; fetch_slice returns exact rows of it (use\n"
+    "    format='parquet' to get large results in full)\n\n"
     "Write Python code that:\n"
     "1. Calls discover_features() to see what data is available\n"
     "2. Calls run_features() with the relevant feature names to fetch the employee dataset\n"
-    "3. Parses the CSV and analyzes the data to answer these questions:\n" + "\n".join(QUESTIONS)
+    "3. Parses the result and analyzes the data to answer these questions:\n"
+    + "\n".join(QUESTIONS)
+    + "\n\n"
+    + DERIVED_FEATURES_HINT
 )
 
 
+async def ptc_session(client: "anthropic.AsyncAnthropic") -> str:
+    """One Programmatic Tool Calling session; returns Claude's final answer.
+
+    Starts in a warm container from CONTAINER_POOL when one is idle and returns its
+    container to the pool afterwards. A pooled container the API rejects on the first
+    request (expired or reclaimed) is discarded and the session starts cold.
+    """
+    import anthropic
+
+    container_id = CONTAINER_POOL.acquire()
+    pooled = container_id is not None
+    expires_at: Any = None
+    messages: list = [{"role": "user", "content": PTC_PROMPT}]  # type: ignore[type-arg]
+    usage = USAGE.session("ptc")
+
+    try:
+        with TRACER.span("session.ptc", session=usage.session, warm=pooled):
+            while True:
+                kwargs: dict[str, Any] = {
+                    "model": MODEL,
+                    "max_tokens": 16384,
+                    "tools": PTC_TOOLS,
+                    "messages": messages,
+                }
+                if container_id:
+                    kwargs["container"] = container_id
+                try:
+                    response, tool_results = await _model_turn(client, usage, **kwargs)
+                except (anthropic.BadRequestError, anthropic.NotFoundError):
+                    if not pooled or container_id is None:
+                        raise
+                    CONTAINER_POOL.discard(container_id)
+                    container_id, pooled = None, False
+                    continue
+                pooled = False
+
+                container_obj = getattr(response, "container", None)
+                if container_obj:
+                    container_id = container_obj.id
+                    expires_at = getattr(container_obj, "expires_at", None)
+
+                messages.append({"role": "assistant", "content": response.content})
+
+                if response.stop_reason == "end_turn":
+                    break
+
+                if tool_results:
+                    messages.append({"role": "user", "content": tool_results})
+    except BaseException:
+        # A failed or cancelled session may leave code running in its container; do not reuse it.
+        if container_id:
+            CONTAINER_POOL.discard(container_id)
+        raise
+
+    if container_id:
+        CONTAINER_POOL.release(container_id, expires_at)
+    return _final_text(response)
+
+
 class PtcApproach(FeatureGroup):
     """Programmatic Tool Calling. Claude writes code that calls tools from inside the sandbox."""
 
@@ -274,41 +778,7 @@ class PtcApproach(FeatureGroup):
 
     @classmethod
     def calculate_feature(cls, data: Any, features: FeatureSet) -> Any:
-        client = anthropic.Anthropic()
-        container_id: Optional[str] = None
-        messages: list = [{"role": "user", "content": PTC_PROMPT}]  # type: ignore[type-arg]
-
-        while True:
-            kwargs: dict[str, Any] = {
-                "model": MODEL,
-                "max_tokens": 16384,
-                "tools": PTC_TOOLS,
-                "messages": messages,
-            }
-            if container_id:
-                kwargs["container"] = container_id
-            response = client.messages.create(**kwargs)
-
-            container_obj = getattr(response, "container", None)
-            if container_obj:
-                container_id = container_obj.id
-
-            messages.append({"role": "assistant", "content": response.content})
-
-            if response.stop_reason == "end_turn":
-                break
-
-            tool_results = []
-            for block in response.content:
-                if getattr(block, "type", None) == "tool_use":
-                    result = _handle_tool_call(block.name, block.input)
-                    tool_results.append({"type": "tool_result", "tool_use_id": block.id, "content": result})
-
-            if tool_results:
-                messages.append({"role": "user", "content": tool_results})
-
-        texts = [block.text for block in response.content if getattr(block, "type", None) == "text"]
-        return pd.DataFrame({cls.get_class_name(): ["\n".join(texts)]})
+        return pd.DataFrame({cls.get_class_name(): [asyncio.run(ptc_session(_api_client()))]})
 
 
 # ---------------------------------------------------------------------------
@@ -317,21 +787,245 @@ class PtcApproach(FeatureGroup):
 
 APPROACH_MAP = {"loop": "LoopApproach", "bash": "BashApproach", "ptc": "PtcApproach"}
 
-if __name__ == "__main__":
-    PluginLoader.all()
+SESSIONS = {"loop": loop_session, "bash": bash_session, "ptc": ptc_session}
 
-    if len(sys.argv) > 1:
-        names = [APPROACH_MAP[sys.argv[1]]]
-    else:
-        names = list(APPROACH_MAP.values())
 
+def _print_section(title: str, body: str) -> None:
+    print(f"\n{'=' * 60}")
+    print(f"  {title}")
+    print(f"{'=' * 60}")
+    print(body)
+
+
+def _run_with_mloda(approaches: list[str]) -> None:
+    names = [APPROACH_MAP[a] for a in approaches]
     results = mlodaAPI.run_all(
-        names, compute_frameworks=["PandasDataFrame"], function_extender={ObservabilityExtender()}
+        names,
+        compute_frameworks=[DEFAULT_FRAMEWORK],
+        function_extender={ObservabilityExtender(FEATURE_METRICS, log_calls=False)},
     )
-
     for r in results:
         for col in [c for c in r.columns if c in APPROACH_MAP.values()]:
-            print(f"\n{'=' * 60}")
-            print(f"  {col}")
-            print(f"{'=' * 60}")
-            print(r[col].iloc[0])
+            _print_section(col, r[col].iloc[0])
+
+
+# Approaches whose sessions talk to the Messages API and expose discover_features over every loaded feature group.
+API_APPROACHES = ("loop", "ptc")
+
+
+def _load_plugins(approaches: list[str], through_mloda: bool = True) -> None:
+    """Load only the mloda plugins the selected approaches need.
+
+    loop and ptc need every plugin, since discover_features documents all loaded feature groups.
+    Run through mloda, bash only needs the pandas compute framework for its own feature group;
+    run directly (--async), it needs none, because claude -p loads mloda in its own process.
+    """
+    if any(a in API_APPROACHES for a in approaches):
+        PluginLoader.all()
+        _data_feature_groups()
+        FEATURE_CATALOG.refresh()
+    elif through_mloda:
+        PluginLoader().load_matching("compute_framework", "pandas/*.py")
+
+
+def _serve_tools(address: str) -> None:
+    """Serve discover_features / run_features / fetch_page / fetch_slice on ``address`` until interrupted.
+
+    Plugins stay loaded and the catalog, result cache, paging cursors and slice handles stay warm across
+    every client's calls.
+    """
+    from ptc_mloda_demo.tools.server.tool_server import ToolServer, format_address, parse_address
+
+    async def serve() -> None:
+        server = ToolServer(_call_tool, parse_address(address))
+        await server.start()
+        print(f"[tool server] listening on {format_address(server.address)}", flush=True)
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+def _run_async(approaches: list[str], sessions: int, concurrency: int) -> None:
+    from ptc_mloda_demo.agents.runner.async_runner import AsyncSessionRunner
+
+    needs_api = any(a in API_APPROACHES for a in approaches)
+    runner = AsyncSessionRunner(
+        SESSIONS, max_concurrency=concurrency, client_factory=_api_client if needs_api else _no_client
+    )
+    for result in asyncio.run(runner.run(approaches, sessions_per_approach=sessions)):
+        title = f"{APPROACH_MAP[result.approach]} #{result.session} ({result.elapsed_seconds:.1f}s)"
+        _print_section(title, result.output if result.error is None else f"[failed] {result.error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Three ways to connect an LLM to your data, all powered by mloda.")
+    parser.add_argument("approach", nargs="?", choices=list(APPROACH_MAP), help="run only this approach")
+    parser.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="run approaches concurrently on one event loop instead of through mloda.run_all",
+    )
+    parser.add_argument("--sessions", type=int, default=1, help="independent sessions per approach (implies --async)")
+    parser.add_argument("--concurrency", type=int, default=8, help="max sessions in flight with --async")
+    parser.add_argument("--rows", type=int, help="serve N generated employees instead of the 10-row sample")
+    parser.add_argument("--seed", type=int, default=0, help="seed for --rows")
+    parser.add_argument(
+        "--parquet-dir", metavar="DIR", help="serve employees from DIR's department=<name>/*.parquet partitions"
+    )
+    parser.add_argument("--usage-jsonl", metavar="PATH", help="write token/latency/payload usage as JSON lines")
+    parser.add_argument("--usage-prom", metavar="PATH", help="write usage totals in Prometheus text format")
+    parser.add_argument("--feature-metrics", metavar="PATH", help="write per-feature-group mloda metrics as JSON lines")
+    parser.add_argument("--trace", metavar="PATH", help="record tracing spans and write them as a Chrome trace")
+    parser.add_argument(
+        "--context-budget",
+        type=int,
+        default=LOOP_CONTEXT_POLICY.budget_tokens,
+        help="loop: compact older tool results once the history exceeds this many tokens (0 disables)",
+    )
+    parser.add_argument("--no-prompt-cache", action="store_true", help="loop: send no cache_control breakpoints")
+    parser.add_argument(
+        "--container-pool",
+        type=int,
+        default=CONTAINER_POOL.max_size,
+        help="ptc: idle code-execution containers kept warm for later sessions (0 disables)",
+    )
+    parser.add_argument(
+        "--claude-workers", type=int, default=CLAUDE_CLI.max_workers, help="bash: max claude -p processes at a time"
+    )
+    parser.add_argument(
+        "--claude-timeout", type=float, default=CLAUDE_CLI.timeout_seconds, help="bash: seconds per claude -p process"
+    )
+    parser.add_argument("--stream", action="store_true", help="bash: print assistant text as claude -p streams it")
+    parser.add_argument(
+        "--stream-tools", action="store_true", help="loop/ptc: start tool calls while the response is still streaming"
+    )
+    parser.add_argument(
+        "--feature-store",
+        metavar="DIR",
+        help="persist run_features results in DIR and reuse them in later processes instead of recomputing",
+    )
+    parser.add_argument("--feature-store-mb", type=int, default=1024, help="size limit of --feature-store")
+    parser.add_argument(
+        "--feature-store-format",
+        choices=["arrow", "parquet"],
+        default="arrow",
+        help="arrow: memory-mapped on read; parquet: smaller files, decoded on read",
+    )
+    parser.add_argument(
+        "--compute-framework",
+        choices=COMPUTE_FRAMEWORKS,
+        default=COMPUTE_FRAMEWORK,
+        help="mloda compute framework for run_features calls that do not choose one",
+    )
+    parser.add_argument(
+        "--serve",
+        metavar="ADDRESS",
+        help="run a tool server on a Unix socket path or host:port instead of the approaches",
+    )
+    parser.add_argument(
+        "--tool-server",
+        metavar="ADDRESS",
+        help="send tool calls (loop, ptc, bash scripts) to the tool server at ADDRESS",
+    )
+    parser.add_argument(
+        "--result-budget-tokens",
+        type=int,
+        default=RESULT_BUDGET_TOKENS,
+        help="digest run_features text results over this many tokens (0 disables)",
+    )
+    parser.add_argument("--result-budget-bytes", type=int, help="digest run_features text results over this many bytes")
+    parser.add_argument(
+        "--requests-per-minute", type=int, help="loop/ptc: API request limit until response headers report it"
+    )
+    parser.add_argument(
+        "--input-tokens-per-minute", type=int, help="loop/ptc: API input token limit until response headers report it"
+    )
+    parser.add_argument(
+        "--max-requests-in-flight", type=int, default=32, help="loop/ptc: ceiling of the adaptive concurrency limit"
+    )
+    parser.add_argument(
+        "--priority", choices=PRIORITIES, default=INTERACTIVE, help="loop/ptc: scheduling priority of API requests"
+    )
+    args = parser.parse_args()
+    if args.compute_framework not in available_frameworks():
+        parser.error(f"--compute-framework {args.compute_framework} is not installed")
+
+    if args.rows is not None and args.parquet_dir:
+        parser.error("--rows and --parquet-dir are mutually exclusive")
+    if args.rows is not None:
+        FEATURE_OPTIONS.update({ROWS_OPTION: args.rows, SEED_OPTION: args.seed})
+    if args.parquet_dir:
+        FEATURE_OPTIONS[PARQUET_DIR_OPTION] = args.parquet_dir
+
+    if args.trace:
+        TRACER.enabled = True
+    COMPUTE_FRAMEWORK = args.compute_framework
+    if args.feature_store:
+        from ptc_mloda_demo.extenders.feature_store.feature_store_extender import FeatureStore
+
+        FEATURE_STORE = FeatureStore(
+            args.feature_store, max_bytes=args.feature_store_mb * 1024 * 1024, format=args.feature_store_format
+        )
+    if args.tool_server:
+        from ptc_mloda_demo.tools.server.tool_server import ToolClient, parse_address
+
+        TOOL_CLIENT = ToolClient(parse_address(args.tool_server))
+    CONTAINER_POOL.max_size = args.container_pool
+    CLAUDE_CLI.max_workers = args.claude_workers
+    CLAUDE_CLI.timeout_seconds = args.claude_timeout
+    STREAM_BASH = args.stream
+    STREAM_TOOL_CALLS = args.stream_tools
+    SCHEDULER = RequestScheduler(
+        requests_per_minute=args.requests_per_minute,
+        input_tokens_per_minute=args.input_tokens_per_minute,
+        max_concurrency=args.max_requests_in_flight,
+        initial_concurrency=min(8, args.max_requests_in_flight),
+    )
+    REQUEST_PRIORITY = args.priority
+    RESULT_SHAPER = ResultShaper(max_bytes=args.result_budget_bytes, max_tokens=args.result_budget_tokens or None)
+    LOOP_CONTEXT_POLICY = ContextPolicy(
+        cache_prefix=not args.no_prompt_cache,
+        cache_turns=not args.no_prompt_cache,
+        budget_tokens=args.context_budget or None,
+    )
+
+    approaches = [args.approach] if args.approach else list(APPROACH_MAP)
+    use_async = args.use_async or args.sessions > 1
+    _load_plugins(list(API_APPROACHES) if args.serve else approaches, through_mloda=not use_async)
+
+    if args.serve:
+        _serve_tools(args.serve)
+    elif use_async:
+        _run_async(approaches, args.sessions, args.concurrency)
+    else:
+        _run_with_mloda(approaches)
+
+    for summary in USAGE.summaries(per_session=False):
+        print(
+            f"\n[usage] {summary.approach}: {summary.requests} requests, "
+            f"{summary.input_tokens} in / {summary.output_tokens} out tokens "
+            f"({summary.cache_read_input_tokens} cache read), {summary.api_seconds:.1f}s API, "
+            f"{summary.tool_calls} tool calls, {summary.payload_bytes} tool result bytes"
+        )
+    if SCHEDULER.stats.requests:
+        stats = SCHEDULER.stats
+        print(
+            f"[scheduler] {stats.requests} requests, {stats.throttled} throttled, {stats.retries} retries, "
+            f"{stats.waited_seconds:.1f}s queued, concurrency limit {stats.concurrency_limit:.1f}"
+        )
+    if args.usage_jsonl:
+        with open(args.usage_jsonl, "w") as f:
+            USAGE.write_jsonl(f)
+    if args.usage_prom:
+        with open(args.usage_prom, "w") as f:
+            USAGE.write_prometheus(f)
+    if args.feature_metrics:
+        with open(args.feature_metrics, "w") as f:
+            FEATURE_METRICS.write_jsonl(f)
+    if args.trace:
+        with open(args.trace, "w") as f:
+            TRACER.write_chrome_trace(f)
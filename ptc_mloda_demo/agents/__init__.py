@@ -0,0 +1 @@
+"""Helpers for the agent loops in demo.py."""
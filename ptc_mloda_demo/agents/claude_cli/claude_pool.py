@@ -0,0 +1,261 @@
+"""Concurrent ``claude -p`` invocations that stream their output, with timeouts and a worker limit."""
+
+import asyncio
+import json
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# stream-json lines carry whole tool results, far beyond asyncio's 64 KiB default line limit.
+STREAM_LIMIT_BYTES = 16 * 1024 * 1024
+
+# Only the tail of stderr is kept for the error message.
+STDERR_TAIL_BYTES = 64 * 1024
+
+# Called with every parsed stream-json event as soon as its line arrives.
+EventCallback = Callable[[dict[str, Any]], None]
+
+
+@dataclass
+class ClaudeCliResult:
+    """Outcome of one ``claude -p`` process.
+
+    ``text`` is the final result, or the assistant text streamed so far when the process
+    timed out or exited without a result event.
+    """
+
+    text: str
+    returncode: Optional[int]
+    usage: Optional[dict[str, Any]] = None
+    is_error: bool = False
+    timed_out: bool = False
+    stderr: str = ""
+    events: int = 0
+    queued_seconds: float = 0.0
+    duration_seconds: float = 0.0
+    first_event_seconds: Optional[float] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out and not self.is_error
+
+
+def build_command(executable: str = "claude", allowed_tools: str = "", output_format: str = "stream-json") -> list[str]:
+    cmd = [executable, "-p", "--output-format", output_format]
+    if output_format == "stream-json":
+        # The CLI only emits stream-json in print mode together with --verbose.
+        cmd.append("--verbose")
+    if allowed_tools:
+        cmd.extend(["--allowedTools", allowed_tools])
+    return cmd
+
+
+def assistant_text(event: dict[str, Any]) -> str:
+    """Text blocks of a stream-json ``assistant`` event."""
+    message = event.get("message")
+    content = message.get("content") if isinstance(message, dict) else None
+    if not isinstance(content, list):
+        return ""
+    return "".join(
+        block.get("text", "") for block in content if isinstance(block, dict) and block.get("type") == "text"
+    )
+
+
+class _StreamCollector:
+    def __init__(self, started: float, on_event: Optional[EventCallback]) -> None:
+        self.started = started
+        self.on_event = on_event
+        self.events = 0
+        self.first_event_seconds: Optional[float] = None
+        self.texts: list[str] = []
+        self.other_lines: list[str] = []
+        self.final: Optional[dict[str, Any]] = None
+
+    def feed(self, line: bytes) -> None:
+        text = line.decode("utf-8", errors="replace").strip()
+        if not text:
+            return
+        try:
+            event = json.loads(text)
+        except ValueError:
+            event = None
+        if not isinstance(event, dict):
+            self.other_lines.append(text)
+            return
+        self.events += 1
+        if self.first_event_seconds is None:
+            self.first_event_seconds = time.perf_counter() - self.started
+        kind = event.get("type", "result")
+        if kind == "assistant":
+            self.texts.append(assistant_text(event))
+        elif kind == "result" and "result" in event:
+            # Also matches the single object printed by --output-format json.
+            self.final = event
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def result(self, returncode: Optional[int], **fields: Any) -> ClaudeCliResult:
+        if self.final is not None:
+            text = str(self.final.get("result", ""))
+        else:
+            text = "\n".join(t for t in self.texts if t) or "\n".join(self.other_lines)
+        return ClaudeCliResult(
+            text=text,
+            returncode=returncode,
+            usage=self.final.get("usage") if self.final is not None else None,
+            is_error=bool(self.final.get("is_error", False)) if self.final is not None else False,
+            events=self.events,
+            first_event_seconds=self.first_event_seconds,
+            **fields,
+        )
+
+
+async def _read_tail(stream: Optional[asyncio.StreamReader], limit: int = STDERR_TAIL_BYTES) -> str:
+    """Drain ``stream`` so the child never blocks on a full pipe, keeping the last ``limit`` bytes."""
+    if stream is None:
+        return ""
+    tail = b""
+    while chunk := await stream.read(65536):
+        tail = (tail + chunk)[-limit:]
+    return tail.decode("utf-8", errors="replace")
+
+
+class ClaudeCliPool:
+    """Runs ``claude -p`` processes, at most ``max_workers`` at a time.
+
+    Each process gets the prompt on stdin and writes ``stream-json`` events, which are
+    parsed line by line and handed to ``on_event`` as they arrive. A process running past
+    ``timeout_seconds`` (not counting time queued for a worker) is terminated, then killed
+    after ``kill_grace_seconds``; its result has ``timed_out`` set and keeps the text
+    streamed so far. Cancelling the awaiting task kills the process too.
+
+    ``run_many`` fans a batch out over the workers and yields results as they finish; it
+    starts a new process only when a worker is free and the consumer asks for more, so a
+    slow consumer holds back the batch instead of piling up finished output.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        timeout_seconds: Optional[float] = 600.0,
+        executable: str = "claude",
+        output_format: str = "stream-json",
+        kill_grace_seconds: float = 5.0,
+    ) -> None:
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self.executable = executable
+        self.output_format = output_format
+        self.kill_grace_seconds = kill_grace_seconds
+        # One semaphore per event loop: the demo calls asyncio.run() once per mloda feature group.
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @asynccontextmanager
+    async def _worker(self) -> AsyncIterator[None]:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_workers)
+        async with semaphore:
+            yield
+
+    async def run(
+        self, prompt: str, allowed_tools: str = "", on_event: Optional[EventCallback] = None
+    ) -> ClaudeCliResult:
+        """Run one ``claude -p`` invocation once a worker is free."""
+        queued = time.perf_counter()
+        async with self._worker():
+            started = time.perf_counter()
+            proc = await asyncio.create_subprocess_exec(
+                *build_command(self.executable, allowed_tools, self.output_format),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=STREAM_LIMIT_BYTES,
+            )
+            collector = _StreamCollector(started, on_event)
+            timings = {"queued_seconds": started - queued}
+            try:
+                stderr = await asyncio.wait_for(self._communicate(proc, prompt, collector), self.timeout_seconds)
+            except asyncio.TimeoutError:
+                logger.warning("claude -p (pid %s) timed out after %.1fs", proc.pid, self.timeout_seconds)
+                await self._kill(proc)
+                timings["duration_seconds"] = time.perf_counter() - started
+                return collector.result(proc.returncode, timed_out=True, **timings)
+            except BaseException:
+                await self._kill(proc)
+                raise
+            timings["duration_seconds"] = time.perf_counter() - started
+            return collector.result(proc.returncode, stderr=stderr, **timings)
+
+    async def run_many(
+        self,
+        prompts: Iterable[str],
+        allowed_tools: str = "",
+        on_event: Optional[Callable[[int, dict[str, Any]], None]] = None,
+    ) -> AsyncIterator[tuple[int, ClaudeCliResult]]:
+        """Yield ``(prompt index, result)`` pairs in completion order.
+
+        Leaving the loop early cancels, and so kills, the processes still running.
+        """
+        pending: dict["asyncio.Task[ClaudeCliResult]", int] = {}
+        queue = enumerate(prompts)
+        try:
+            while True:
+                for index, prompt in queue:
+                    callback = None if on_event is None else _bind_index(on_event, index)
+                    pending[asyncio.ensure_future(self.run(prompt, allowed_tools, callback))] = index
+                    if len(pending) >= self.max_workers:
+                        break
+                if not pending:
+                    return
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield pending.pop(task), task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    @staticmethod
+    async def _communicate(proc: asyncio.subprocess.Process, prompt: str, collector: _StreamCollector) -> str:
+        stderr = asyncio.ensure_future(_read_tail(proc.stderr))
+        try:
+            if proc.stdin is not None:
+                try:
+                    proc.stdin.write(prompt.encode())
+                    await proc.stdin.drain()
+                    proc.stdin.close()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # exited before reading its prompt; the exit code tells why
+            if proc.stdout is not None:
+                async for line in proc.stdout:
+                    collector.feed(line)
+            await proc.wait()
+            return await stderr
+        finally:
+            stderr.cancel()
+
+    async def _kill(self, proc: asyncio.subprocess.Process) -> None:
+        if proc.returncode is not None:
+            return
+        try:
+            proc.terminate()
+        except ProcessLookupError:
+            pass  # exited in the meantime
+        try:
+            await asyncio.wait_for(proc.wait(), self.kill_grace_seconds)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+
+
+def _bind_index(on_event: Callable[[int, dict[str, Any]], None], index: int) -> EventCallback:
+    return lambda event: on_event(index, event)
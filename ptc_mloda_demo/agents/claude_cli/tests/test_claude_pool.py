@@ -0,0 +1,229 @@
+"""Tests for ClaudeCliPool against a scripted stand-in for the claude CLI."""
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from ptc_mloda_demo.agents.claude_cli.claude_pool import ClaudeCliPool, build_command
+
+# Reads the prompt from stdin and acts on it: "sleep:S", "fail", "hang", "plain" (single json
+# object), "error" (an is_error result, exit code 0), "big" (one event larger than asyncio's
+# default line limit). Otherwise streams an init event, an assistant message and a result event.
+FAKE_CLI = """
+import json, os, sys, time
+prompt = sys.stdin.read()
+pid_dir = os.environ.get("FAKE_PID_DIR")
+if pid_dir:
+    open(os.path.join(pid_dir, str(os.getpid())), "w").close()
+def emit(event):
+    sys.stdout.write(json.dumps(event) + "\\n")
+    sys.stdout.flush()
+if prompt == "fail":
+    sys.stderr.write("boom\\n")
+    sys.exit(3)
+if prompt == "plain":
+    emit({"result": "plain answer"})
+    sys.exit(0)
+if prompt == "error":
+    emit({"type": "result", "result": "Credit balance is too low", "is_error": True, "usage": {"input_tokens": 1}})
+    sys.exit(0)
+emit({"type": "system", "subtype": "init"})
+emit({"type": "assistant", "message": {"content": [{"type": "text", "text": "partial " + prompt}]}})
+if prompt == "hang":
+    time.sleep(60)
+if prompt.startswith("sleep:"):
+    time.sleep(float(prompt.split(":")[1]))
+text = "x" * 200_000 if prompt == "big" else "answer " + prompt
+emit({"type": "result", "result": text, "is_error": False, "usage": {"input_tokens": 7, "output_tokens": 3}})
+if pid_dir:
+    os.remove(os.path.join(pid_dir, str(os.getpid())))
+"""
+
+
+@pytest.fixture
+def fake_cli(tmp_path: Path) -> str:
+    path = tmp_path / "claude"
+    path.write_text(f"#!{sys.executable}\n{FAKE_CLI}")
+    path.chmod(0o755)
+    return str(path)
+
+
+def _run(pool: ClaudeCliPool, prompt: str, events: Any = None) -> Any:
+    return asyncio.run(pool.run(prompt, on_event=None if events is None else events.append))
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Single invocation
+# ---------------------------------------------------------------------------
+
+
+class TestRun:
+    """One process: streamed events, the final result and failures."""
+
+    def test_command_asks_for_stream_json(self) -> None:
+        assert build_command("claude", "Bash") == [
+            "claude",
+            "-p",
+            "--output-format",
+            "stream-json",
+            "--verbose",
+            "--allowedTools",
+            "Bash",
+        ]
+        assert build_command(output_format="json") == ["claude", "-p", "--output-format", "json"]
+
+    def test_streams_events_and_returns_result(self, fake_cli: str) -> None:
+        events: list[dict[str, Any]] = []
+        result = _run(ClaudeCliPool(executable=fake_cli), "hi", events)
+        assert result.ok
+        assert result.text == "answer hi"
+        assert result.usage == {"input_tokens": 7, "output_tokens": 3}
+        assert [e["type"] for e in events] == ["system", "assistant", "result"]
+        assert result.events == 3
+        assert result.first_event_seconds is not None
+        assert result.first_event_seconds <= result.duration_seconds
+
+    def test_single_json_object_output(self, fake_cli: str) -> None:
+        result = _run(ClaudeCliPool(executable=fake_cli), "plain")
+        assert (result.ok, result.text) == (True, "plain answer")
+
+    def test_nonzero_exit_keeps_stderr(self, fake_cli: str) -> None:
+        result = _run(ClaudeCliPool(executable=fake_cli), "fail")
+        assert not result.ok
+        assert result.returncode == 3
+        assert "boom" in result.stderr
+
+    def test_error_result_with_zero_exit(self, fake_cli: str) -> None:
+        result = _run(ClaudeCliPool(executable=fake_cli), "error")
+        assert (result.returncode, result.is_error, result.ok) == (0, True, False)
+
+    def test_lines_beyond_default_stream_limit(self, fake_cli: str) -> None:
+        result = _run(ClaudeCliPool(executable=fake_cli), "big")
+        assert len(result.text) == 200_000
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Timeouts and cancellation
+# ---------------------------------------------------------------------------
+
+
+class TestTermination:
+    """Stuck or abandoned processes are killed, not leaked."""
+
+    def test_timeout_kills_and_keeps_partial_text(self, fake_cli: str) -> None:
+        pool = ClaudeCliPool(executable=fake_cli, timeout_seconds=1.0, kill_grace_seconds=1.0)
+        start = time.perf_counter()
+        result = _run(pool, "hang")
+        assert time.perf_counter() - start < 10
+        assert result.timed_out and not result.ok
+        assert result.text == "partial hang"
+        assert result.returncode is not None
+
+    def test_cancellation_kills_the_process(
+        self, fake_cli: str, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        pid_dir = tmp_path / "pids"
+        pid_dir.mkdir()
+        monkeypatch.setenv("FAKE_PID_DIR", str(pid_dir))
+        pool = ClaudeCliPool(executable=fake_cli, kill_grace_seconds=1.0)
+
+        async def cancel_after_first_event() -> None:
+            started = asyncio.Event()
+            task = asyncio.ensure_future(pool.run("hang", on_event=lambda event: started.set()))
+            await asyncio.wait_for(started.wait(), 10)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_after_first_event())
+        (pid_file,) = list(pid_dir.iterdir())
+        with pytest.raises(ProcessLookupError):
+            os.kill(int(pid_file.name), 0)
+
+
+# ---------------------------------------------------------------------------
+# Level 3: Batches
+# ---------------------------------------------------------------------------
+
+
+class TestRunMany:
+    """Batches fan out over a bounded number of workers."""
+
+    def test_yields_every_result_in_completion_order(self, fake_cli: str) -> None:
+        pool = ClaudeCliPool(executable=fake_cli, max_workers=3)
+
+        async def collect() -> list[tuple[int, str]]:
+            return [(i, r.text) async for i, r in pool.run_many(["sleep:0.6", "sleep:0", "sleep:0.3"])]
+
+        results = asyncio.run(collect())
+        assert [i for i, _ in results] == [1, 2, 0]
+        assert dict(results)[0] == "answer sleep:0.6"
+
+    def test_worker_limit_bounds_concurrency(self, fake_cli: str, tmp_path: Path) -> None:
+        pool = ClaudeCliPool(executable=fake_cli, max_workers=2)
+        running = 0
+        peak = 0
+
+        def on_event(index: int, event: dict[str, Any]) -> None:
+            nonlocal running, peak
+            if event["type"] == "system":
+                running += 1
+                peak = max(peak, running)
+            elif event["type"] == "result":
+                running -= 1
+
+        async def collect() -> list[int]:
+            return [i async for i, _ in pool.run_many(["sleep:0.2"] * 5, on_event=on_event)]
+
+        assert sorted(asyncio.run(collect())) == list(range(5))
+        assert peak == 2
+
+    def test_leaving_early_kills_the_rest(self, fake_cli: str) -> None:
+        pool = ClaudeCliPool(executable=fake_cli, max_workers=2, kill_grace_seconds=1.0)
+
+        async def first() -> int:
+            batch = pool.run_many(["sleep:0", "hang", "hang"])
+            async for index, _ in batch:
+                await batch.aclose()  # type: ignore[attr-defined]
+                return index
+            raise AssertionError("no result")
+
+        start = time.perf_counter()
+        assert asyncio.run(first()) == 0
+        assert time.perf_counter() - start < 10
+
+    def test_events_carry_the_prompt_index(self, fake_cli: str) -> None:
+        pool = ClaudeCliPool(executable=fake_cli)
+        seen: list[tuple[int, str]] = []
+
+        async def drain() -> None:
+            async for _ in pool.run_many(["a", "b"], on_event=lambda i, e: seen.append((i, e["type"]))):
+                pass
+
+        asyncio.run(drain())
+        assert sorted(i for i, kind in seen if kind == "result") == [0, 1]
+
+
+# ---------------------------------------------------------------------------
+# Level 3: demo's claude -p calls
+# ---------------------------------------------------------------------------
+
+
+def test_demo_reports_error_results(fake_cli: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    import demo
+    from ptc_mloda_demo.agents.usage.usage_tracker import UsageTracker
+
+    monkeypatch.setattr(demo, "CLAUDE_CLI", ClaudeCliPool(executable=fake_cli))
+    tracker = UsageTracker()
+    usage = tracker.session("bash")
+    assert (
+        asyncio.run(demo._claude_p("error", usage=usage)) == "[claude -p returned an error]: Credit balance is too low"
+    )
+    assert tracker.events() == []
+    assert asyncio.run(demo._claude_p("hi", usage=usage)) == "answer hi"
+    assert len(tracker.events()) == 1
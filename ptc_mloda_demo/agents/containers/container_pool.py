@@ -0,0 +1,120 @@
+"""Warm code-execution containers kept alive across PTC sessions."""
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+
+@dataclass
+class PooledContainer:
+    id: str
+    expires_at: float
+    last_used: float
+    sessions: int = 1
+
+
+@dataclass
+class ContainerPoolStats:
+    hits: int = 0
+    misses: int = 0
+    released: int = 0
+    expired: int = 0
+    evicted: int = 0
+    discarded: int = 0
+
+
+def expiry_timestamp(value: Any) -> Optional[float]:
+    """A container's ``expires_at`` (datetime, ISO string or epoch seconds) as epoch seconds."""
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
+
+
+class ContainerPool:
+    """Hands the warmest idle container to the next PTC session.
+
+    ``acquire`` checks a container out (the most recently used live one), so two concurrent
+    sessions never share a sandbox; ``release`` puts it back once the session has finished,
+    with the ``expires_at`` of the last response. Containers are dropped ``expiry_margin_seconds``
+    before they expire, or ``idle_ttl_seconds`` after their last use when the API gave no
+    expiry, and at most ``max_size`` are kept idle (least recently used evicted first).
+    Sessions whose pooled container was rejected should ``discard`` it and start cold.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 4,
+        idle_ttl_seconds: float = 270.0,
+        expiry_margin_seconds: float = 30.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_size = max_size
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.expiry_margin_seconds = expiry_margin_seconds
+        self.stats = ContainerPoolStats()
+        self._clock = clock
+        self._idle: dict[str, PooledContainer] = {}
+        self._sessions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._idle)
+
+    def acquire(self) -> Optional[str]:
+        """Check out the most recently used live container, or None for a cold start."""
+        with self._lock:
+            self._expire()
+            if not self._idle:
+                self.stats.misses += 1
+                return None
+            container = max(self._idle.values(), key=lambda c: c.last_used)
+            del self._idle[container.id]
+            self._sessions[container.id] = container.sessions
+            self.stats.hits += 1
+            return container.id
+
+    def release(self, container_id: str, expires_at: Any = None) -> None:
+        """Return a container after a session; ``expires_at`` is the API's expiry, if it sent one."""
+        now = self._clock()
+        expiry = expiry_timestamp(expires_at)
+        deadline = now + self.idle_ttl_seconds if expiry is None else expiry - self.expiry_margin_seconds
+        with self._lock:
+            sessions = self._sessions.pop(container_id, 0) + 1
+            self.stats.released += 1
+            if deadline <= now or self.max_size < 1:
+                self.stats.expired += 1
+                return
+            self._idle[container_id] = PooledContainer(container_id, deadline, now, sessions)
+            self._expire()
+            while len(self._idle) > self.max_size:
+                oldest = min(self._idle.values(), key=lambda c: c.last_used)
+                del self._idle[oldest.id]
+                self.stats.evicted += 1
+
+    def discard(self, container_id: str) -> None:
+        """Forget a container that failed or was rejected by the API."""
+        with self._lock:
+            self._sessions.pop(container_id, None)
+            self._idle.pop(container_id, None)
+            self.stats.discarded += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+            self._sessions.clear()
+            self.stats = ContainerPoolStats()
+
+    def _expire(self) -> None:
+        now = self._clock()
+        for container_id in [c for c, container in self._idle.items() if container.expires_at <= now]:
+            del self._idle[container_id]
+            self.stats.expired += 1
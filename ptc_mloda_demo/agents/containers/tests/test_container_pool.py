@@ -0,0 +1,123 @@
+"""Tests for ContainerPool."""
+
+from datetime import datetime, timezone
+
+from ptc_mloda_demo.agents.containers.container_pool import ContainerPool, expiry_timestamp
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Checkout and return
+# ---------------------------------------------------------------------------
+
+
+class TestAcquireRelease:
+    """Finished sessions leave their container warm for the next one."""
+
+    def test_empty_pool_is_a_cold_start(self) -> None:
+        pool = ContainerPool()
+        assert pool.acquire() is None
+        assert (pool.stats.hits, pool.stats.misses) == (0, 1)
+
+    def test_released_container_is_handed_out_once(self) -> None:
+        pool = ContainerPool()
+        pool.release("c1")
+        assert pool.acquire() == "c1"
+        assert pool.acquire() is None
+        assert (pool.stats.hits, pool.stats.misses) == (1, 1)
+
+    def test_most_recently_used_container_goes_first(self) -> None:
+        clock = FakeClock()
+        pool = ContainerPool(clock=clock)
+        pool.release("old")
+        clock.now += 10
+        pool.release("new")
+        assert [pool.acquire(), pool.acquire()] == ["new", "old"]
+
+    def test_discard_forgets_a_checked_out_container(self) -> None:
+        pool = ContainerPool()
+        pool.release("c1")
+        container_id = pool.acquire()
+        assert container_id == "c1"
+        pool.discard(container_id)
+        assert len(pool) == 0
+        assert pool.stats.discarded == 1
+
+    def test_sessions_are_counted_per_container(self) -> None:
+        pool = ContainerPool()
+        pool.release("c1")
+        pool.release(pool.acquire() or "")
+        assert pool._idle["c1"].sessions == 2
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Expiry and capacity
+# ---------------------------------------------------------------------------
+
+
+class TestEviction:
+    """Stale containers are never handed out and the pool stays bounded."""
+
+    def test_idle_ttl_applies_without_api_expiry(self) -> None:
+        clock = FakeClock()
+        pool = ContainerPool(idle_ttl_seconds=60, clock=clock)
+        pool.release("c1")
+        clock.now += 61
+        assert pool.acquire() is None
+        assert pool.stats.expired == 1
+
+    def test_api_expiry_minus_margin_wins(self) -> None:
+        clock = FakeClock()
+        pool = ContainerPool(idle_ttl_seconds=60, expiry_margin_seconds=30, clock=clock)
+        pool.release("c1", expires_at=clock.now + 3600)
+        clock.now += 3000
+        assert pool.acquire() == "c1"
+        pool.release("c1", expires_at=clock.now + 40)
+        clock.now += 11
+        assert pool.acquire() is None
+
+    def test_already_expired_container_is_not_pooled(self) -> None:
+        clock = FakeClock()
+        pool = ContainerPool(expiry_margin_seconds=30, clock=clock)
+        pool.release("c1", expires_at=clock.now + 10)
+        assert len(pool) == 0
+        assert pool.stats.expired == 1
+
+    def test_least_recently_used_is_evicted_over_capacity(self) -> None:
+        clock = FakeClock()
+        pool = ContainerPool(max_size=2, clock=clock)
+        for container_id in ["a", "b", "c"]:
+            pool.release(container_id)
+            clock.now += 1
+        assert len(pool) == 2
+        assert pool.stats.evicted == 1
+        assert {pool.acquire(), pool.acquire()} == {"b", "c"}
+
+    def test_zero_size_disables_pooling(self) -> None:
+        pool = ContainerPool(max_size=0)
+        pool.release("c1")
+        assert pool.acquire() is None
+
+
+# ---------------------------------------------------------------------------
+# Level 3: Expiry parsing
+# ---------------------------------------------------------------------------
+
+
+class TestExpiryTimestamp:
+    """The API's expires_at arrives as a datetime from the SDK, or as a string in raw JSON."""
+
+    def test_formats(self) -> None:
+        moment = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        assert expiry_timestamp(moment) == moment.timestamp()
+        assert expiry_timestamp("2025-01-01T00:00:00Z") == moment.timestamp()
+        assert expiry_timestamp(12.5) == 12.5
+        assert expiry_timestamp("soon") is None
+        assert expiry_timestamp(None) is None
@@ -0,0 +1,170 @@
+"""Message history for the tool-calling loop: prompt-cache breakpoints and tool-result compaction."""
+
+import csv
+import hashlib
+import io
+import json
+from dataclasses import dataclass
+from typing import Any, Optional
+
+CACHE_CONTROL: dict[str, str] = {"type": "ephemeral"}
+
+
+@dataclass(frozen=True)
+class ContextPolicy:
+    """How LoopContext shapes each request.
+
+    ``cache_prefix`` marks the tools and the initial prompt as a cached prefix; ``cache_turns``
+    also marks the newest message, so each request reads the previous turns from the cache.
+    Once the estimated history exceeds ``budget_tokens``, tool results of at least
+    ``min_result_bytes`` outside the last ``keep_recent_turns`` turns are replaced by digests.
+    """
+
+    cache_prefix: bool = True
+    cache_turns: bool = True
+    budget_tokens: Optional[int] = 50_000
+    keep_recent_turns: int = 1
+    min_result_bytes: int = 1024
+    chars_per_token: float = 4.0
+
+
+@dataclass
+class ContextStats:
+    requests: int = 0
+    compactions: int = 0
+    results_compacted: int = 0
+    bytes_removed: int = 0
+    estimated_tokens: int = 0
+
+
+def digest_tool_result(content: str) -> str:
+    """Compact stand-in for a bulky tool result: schema, row count, size and content hash."""
+    digest: dict[str, Any] = {
+        "compacted": True,
+        "bytes": len(content.encode("utf-8")),
+        "sha256": hashlib.sha256(content.encode("utf-8")).hexdigest()[:16],
+    }
+    try:
+        parsed = json.loads(content)
+    except ValueError:
+        parsed = None
+    if isinstance(parsed, dict) and "num_rows" in parsed:
+        # columnar_json result, or the first page of a paged result.
+        digest["rows"] = parsed["num_rows"]
+        if isinstance(parsed.get("columns"), dict):
+            digest["columns"] = list(parsed["columns"])
+        elif isinstance(parsed.get("schema"), list):
+            digest["columns"] = [column["name"] for column in parsed["schema"]]
+    elif parsed is None:
+        lines = content.splitlines()
+        if lines:
+            digest["columns"] = next(csv.reader(io.StringIO(lines[0])))
+            digest["rows"] = len(lines) - 1
+    digest["note"] = "Older result removed from the conversation; call the tool again if you need the rows."
+    return json.dumps(digest)
+
+
+def _estimate_chars(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_estimate_chars(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_estimate_chars(v) for v in value)
+    # SDK content blocks: text, or the JSON input of a tool_use.
+    text = getattr(value, "text", None)
+    if isinstance(text, str):
+        return len(text)
+    inputs = getattr(value, "input", None)
+    return len(json.dumps(inputs, default=str)) if inputs is not None else 0
+
+
+class LoopContext:
+    """Holds the conversation of one loop session and builds each request's tools and messages.
+
+    The stored history is only changed by compaction. Cache breakpoints are applied to copies
+    per request, so at most three are ever sent: tools, initial prompt and newest message.
+    Compacting rewrites earlier turns and so invalidates the cached prefix after the prompt
+    once; compaction frees enough to stay below budget for a while rather than every turn.
+    """
+
+    def __init__(self, prompt: str, tools: list[dict[str, Any]], policy: Optional[ContextPolicy] = None) -> None:
+        self.policy = policy if policy is not None else ContextPolicy()
+        self.tools = tools
+        self.messages: list[dict[str, Any]] = [{"role": "user", "content": [{"type": "text", "text": prompt}]}]
+        self.stats = ContextStats()
+
+    def append_assistant(self, content: Any) -> None:
+        self.messages.append({"role": "assistant", "content": content})
+
+    def append_tool_results(self, results: list[dict[str, Any]]) -> None:
+        self.messages.append({"role": "user", "content": results})
+
+    def estimated_tokens(self) -> int:
+        return int(_estimate_chars(self.messages) / self.policy.chars_per_token)
+
+    def request(self) -> dict[str, Any]:
+        """``tools`` and ``messages`` keyword arguments for the next messages.create call."""
+        self.stats.requests += 1
+        budget = self.policy.budget_tokens
+        if budget is not None and self.estimated_tokens() > budget:
+            self.compact(budget)
+        self.stats.estimated_tokens = self.estimated_tokens()
+
+        tools = self.tools
+        messages = list(self.messages)
+        if self.policy.cache_prefix and tools:
+            tools = [*tools[:-1], {**tools[-1], "cache_control": CACHE_CONTROL}]
+            messages[0] = self._with_breakpoint(messages[0])
+        if self.policy.cache_turns and len(messages) > 1:
+            messages[-1] = self._with_breakpoint(messages[-1])
+        return {"tools": tools, "messages": messages}
+
+    def compact(self, budget_tokens: int) -> int:
+        """Replace older bulky tool results, oldest first, until the estimate fits the budget.
+
+        Returns the number of tool results replaced.
+        """
+        target_chars = budget_tokens * self.policy.chars_per_token
+        total = _estimate_chars(self.messages)
+        # Turn boundaries are the user messages after the prompt; the newest ones are kept as is.
+        tool_turns = [i for i, m in enumerate(self.messages[1:], 1) if m["role"] == "user"]
+        protected = set(tool_turns[-self.policy.keep_recent_turns :]) if self.policy.keep_recent_turns else set()
+        replaced = 0
+        for index in tool_turns:
+            if total <= target_chars:
+                break
+            if index in protected or not isinstance(self.messages[index]["content"], list):
+                continue
+            blocks = self.messages[index]["content"]
+            for position, block in enumerate(blocks):
+                content = block.get("content") if isinstance(block, dict) else None
+                if not isinstance(content, str) or len(content.encode("utf-8")) < self.policy.min_result_bytes:
+                    continue
+                if content.startswith('{"compacted": true'):
+                    continue
+                digest = digest_tool_result(content)
+                blocks[position] = {**block, "content": digest}
+                total -= len(content) - len(digest)
+                self.stats.bytes_removed += len(content.encode("utf-8")) - len(digest.encode("utf-8"))
+                replaced += 1
+        if replaced:
+            self.stats.compactions += 1
+            self.stats.results_compacted += replaced
+        return replaced
+
+    @staticmethod
+    def _with_breakpoint(message: dict[str, Any]) -> dict[str, Any]:
+        content = message["content"]
+        if isinstance(content, str):
+            content = [{"type": "text", "text": content}]
+        if not isinstance(content, list) or not content:
+            return message
+        last = content[-1]
+        if not isinstance(last, dict):
+            # SDK content block of an assistant turn: cache the dict form of it.
+            dump = getattr(last, "model_dump", None)
+            if dump is None:
+                return message
+            last = dump(exclude_none=True)
+        return {**message, "content": [*content[:-1], {**last, "cache_control": CACHE_CONTROL}]}
@@ -0,0 +1,155 @@
+"""Tests for LoopContext prompt-cache breakpoints and tool-result compaction."""
+
+import json
+from typing import Any
+
+from ptc_mloda_demo.agents.context.loop_context import ContextPolicy, LoopContext, digest_tool_result
+
+TOOLS = [{"name": "discover_features"}, {"name": "run_features"}]
+
+
+def _csv(rows: int) -> str:
+    return "name,salary\n" + "".join(f"employee_{i},{1000 + i}\n" for i in range(rows))
+
+
+def _result(tool_use_id: str, content: str) -> dict[str, Any]:
+    return {"type": "tool_result", "tool_use_id": tool_use_id, "content": content}
+
+
+def _turn(context: LoopContext, tool_use_id: str, content: str) -> None:
+    context.append_assistant([{"type": "tool_use", "id": tool_use_id, "name": "run_features", "input": {}}])
+    context.append_tool_results([_result(tool_use_id, content)])
+
+
+def _breakpoints(request: dict[str, Any]) -> int:
+    return json.dumps(request).count('"cache_control"')
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Cache breakpoints
+# ---------------------------------------------------------------------------
+
+
+class TestCacheBreakpoints:
+    """Tools, initial prompt and newest message carry cache_control; the history does not."""
+
+    def test_first_request_marks_tools_and_prompt(self) -> None:
+        request = LoopContext("question", TOOLS).request()
+        assert request["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in request["tools"][0]
+        assert request["messages"][0]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+        assert _breakpoints(request) == 2
+
+    def test_newest_message_is_marked_and_older_ones_are_not(self) -> None:
+        context = LoopContext("question", TOOLS)
+        for i in range(3):
+            _turn(context, f"t{i}", "[]")
+            request = context.request()
+            assert _breakpoints(request) == 3
+            assert request["messages"][-1]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+
+    def test_request_does_not_mutate_history(self) -> None:
+        context = LoopContext("question", TOOLS)
+        _turn(context, "t0", "[]")
+        context.request()
+        assert "cache_control" not in json.dumps(context.messages)
+        assert "cache_control" not in json.dumps(TOOLS)
+
+    def test_policy_can_disable_breakpoints(self) -> None:
+        context = LoopContext("question", TOOLS, ContextPolicy(cache_prefix=False, cache_turns=False))
+        _turn(context, "t0", "[]")
+        assert _breakpoints(context.request()) == 0
+
+    def test_sdk_blocks_are_dumped_before_marking(self) -> None:
+        class Block:
+            type = "text"
+            text = "answer"
+
+            def model_dump(self, exclude_none: bool = False) -> dict[str, Any]:
+                return {"type": self.type, "text": self.text}
+
+        context = LoopContext("question", TOOLS)
+        context.append_assistant([Block()])
+        last = context.request()["messages"][-1]["content"][-1]
+        assert last == {"type": "text", "text": "answer", "cache_control": {"type": "ephemeral"}}
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Compaction
+# ---------------------------------------------------------------------------
+
+
+class TestCompaction:
+    """Over budget, older bulky tool results are replaced by digests, oldest first."""
+
+    def test_under_budget_history_is_untouched(self) -> None:
+        context = LoopContext("question", TOOLS, ContextPolicy(budget_tokens=100_000))
+        _turn(context, "t0", _csv(200))
+        _turn(context, "t1", _csv(200))
+        context.request()
+        assert context.stats.compactions == 0
+        assert context.messages[2]["content"][0]["content"] == _csv(200)
+
+    def test_over_budget_compacts_older_results_and_keeps_recent_turn(self) -> None:
+        context = LoopContext("question", TOOLS, ContextPolicy(budget_tokens=2_000))
+        for i in range(3):
+            _turn(context, f"t{i}", _csv(400))
+        before = context.estimated_tokens()
+        context.request()
+
+        digest = json.loads(context.messages[2]["content"][0]["content"])
+        assert digest["compacted"] is True
+        assert (digest["rows"], digest["columns"]) == (400, ["name", "salary"])
+        assert context.messages[2]["content"][0]["tool_use_id"] == "t0"
+        assert context.messages[-1]["content"][0]["content"] == _csv(400)
+        assert context.stats.compactions == 1
+        assert context.stats.bytes_removed > 0
+        assert context.stats.estimated_tokens < before
+
+    def test_compaction_stops_once_within_budget(self) -> None:
+        context = LoopContext("question", TOOLS)
+        for i in range(3):
+            _turn(context, f"t{i}", _csv(400))
+        budget = context.estimated_tokens() - 100
+        assert context.compact(budget) == 1
+        assert context.messages[4]["content"][0]["content"] == _csv(400)
+
+    def test_small_and_compacted_results_are_skipped(self) -> None:
+        context = LoopContext("question", TOOLS, ContextPolicy(budget_tokens=0, keep_recent_turns=0))
+        _turn(context, "t0", "[]")
+        _turn(context, "t1", _csv(400))
+        assert context.compact(0) == 1
+        assert context.compact(0) == 0
+        assert context.messages[2]["content"][0]["content"] == "[]"
+
+    def test_no_budget_disables_compaction(self) -> None:
+        context = LoopContext("question", TOOLS, ContextPolicy(budget_tokens=None))
+        for i in range(3):
+            _turn(context, f"t{i}", _csv(400))
+        context.request()
+        assert context.stats.compactions == 0
+
+
+# ---------------------------------------------------------------------------
+# Level 3: Digests
+# ---------------------------------------------------------------------------
+
+
+class TestDigest:
+    """Digests keep the shape of the result so the model can decide whether to re-run it."""
+
+    def test_columnar_json(self) -> None:
+        content = json.dumps({"num_rows": 2, "columns": {"name": ["a", "b"], "salary": [1, 2]}})
+        digest = json.loads(digest_tool_result(content))
+        assert (digest["rows"], digest["columns"]) == (2, ["name", "salary"])
+        assert digest["bytes"] == len(content)
+
+    def test_paged_result(self) -> None:
+        content = json.dumps({"num_rows": 10, "schema": [{"name": "name", "type": "string"}], "cursor": "c"})
+        digest = json.loads(digest_tool_result(content))
+        assert (digest["rows"], digest["columns"]) == (10, ["name"])
+
+    def test_same_content_same_hash(self) -> None:
+        first, second = json.loads(digest_tool_result(_csv(3))), json.loads(digest_tool_result(_csv(3)))
+        assert first["sha256"] == second["sha256"]
+        assert first["sha256"] != json.loads(digest_tool_result(_csv(4)))["sha256"]
@@ -0,0 +1,109 @@
+"""Tests for ToolDispatcher."""
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any
+
+from ptc_mloda_demo.agents.dispatch.tool_dispatcher import ToolDispatcher, tool_use_blocks
+
+
+def _block(block_id: str, name: str = "run_features", **inputs: Any) -> SimpleNamespace:
+    return SimpleNamespace(type="tool_use", id=block_id, name=name, input=inputs)
+
+
+def test_tool_use_blocks_filters_content() -> None:
+    content = [SimpleNamespace(type="text", text="hi"), _block("a"), SimpleNamespace(type="server_tool_use")]
+    assert [b.id for b in tool_use_blocks(content)] == ["a"]
+
+
+def test_results_keep_block_order() -> None:
+    def handler(name: str, inputs: dict[str, Any]) -> str:
+        time.sleep(inputs["delay"])
+        return str(inputs["delay"])
+
+    dispatcher = ToolDispatcher(handler, max_workers=4)
+    results = dispatcher.dispatch([_block("a", delay=0.05), _block("b", delay=0.0), _block("c", delay=0.02)])
+    assert [r["tool_use_id"] for r in results] == ["a", "b", "c"]
+    assert [r["content"] for r in results] == ["0.05", "0.0", "0.02"]
+    dispatcher.shutdown()
+
+
+def test_calls_run_concurrently() -> None:
+    barrier = threading.Barrier(3, timeout=2)
+
+    def handler(name: str, inputs: dict[str, Any]) -> str:
+        barrier.wait()
+        return "ok"
+
+    dispatcher = ToolDispatcher(handler, max_workers=3)
+    results = dispatcher.dispatch([_block("a"), _block("b"), _block("c")])
+    assert all(r["content"] == "ok" for r in results)
+    dispatcher.shutdown()
+
+
+def test_failure_is_isolated() -> None:
+    def handler(name: str, inputs: dict[str, Any]) -> str:
+        if inputs.get("fail"):
+            raise RuntimeError("boom")
+        return "ok"
+
+    dispatcher = ToolDispatcher(handler)
+    failed, ok = dispatcher.dispatch([_block("a", fail=True), _block("b")])
+    assert failed["is_error"] is True
+    assert "boom" in json.loads(failed["content"])["error"]
+    assert ok == {"type": "tool_result", "tool_use_id": "b", "content": "ok"}
+    dispatcher.shutdown()
+
+
+def test_timeout_does_not_stall_turn() -> None:
+    release = threading.Event()
+
+    def handler(name: str, inputs: dict[str, Any]) -> str:
+        if inputs.get("hang"):
+            release.wait(5)
+        return "ok"
+
+    dispatcher = ToolDispatcher(handler, timeout_seconds=0.1)
+    start = time.monotonic()
+    hung, ok = dispatcher.dispatch([_block("a", hang=True), _block("b")])
+    assert time.monotonic() - start < 1
+    assert hung["is_error"] is True
+    assert "timed out" in json.loads(hung["content"])["error"]
+    assert ok["content"] == "ok"
+    release.set()
+    dispatcher.shutdown()
+
+
+def test_observer_sees_each_result_with_run_time() -> None:
+    def handler(name: str, inputs: dict[str, Any]) -> str:
+        time.sleep(inputs["delay"])
+        return "ok"
+
+    seen: list[tuple[str, str, float]] = []
+    dispatcher = ToolDispatcher(handler)
+    dispatcher.dispatch(
+        [_block("a", delay=0.05), _block("b", delay=0.0)],
+        observer=lambda block, result, elapsed: seen.append((block.id, result["tool_use_id"], elapsed)),
+    )
+    assert [(b, r) for b, r, _ in seen] == [("a", "a"), ("b", "b")]
+    assert seen[0][2] >= 0.05 > seen[1][2]
+    dispatcher.shutdown()
+
+
+def test_batch_starts_each_call_on_submit() -> None:
+    started = threading.Event()
+
+    def handler(name: str, inputs: dict[str, Any]) -> str:
+        started.set()
+        return name
+
+    dispatcher = ToolDispatcher(handler)
+    batch = dispatcher.batch()
+    batch.submit(_block("a", name="first"))
+    assert started.wait(5)
+    batch.submit(_block("b", name="second"))
+    assert len(batch) == 2
+    assert [r["content"] for r in batch.results()] == ["first", "second"]
+    dispatcher.shutdown()
@@ -0,0 +1,134 @@
+"""Concurrent dispatch of the tool_use blocks in one assistant turn."""
+
+import contextvars
+import json
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+ToolHandler = Callable[[str, dict[str, Any]], str]
+
+# Called once per tool_use block with the block, its tool_result and the handler's run time in seconds.
+ToolObserver = Callable[[Any, dict[str, Any], float], None]
+
+
+def tool_use_blocks(content: Iterable[Any]) -> list[Any]:
+    """The tool_use blocks of a response's content, in order."""
+    return [block for block in content if getattr(block, "type", None) == "tool_use"]
+
+
+def error_result(tool_use_id: str, message: str) -> dict[str, Any]:
+    return {
+        "type": "tool_result",
+        "tool_use_id": tool_use_id,
+        "content": json.dumps({"error": message}),
+        "is_error": True,
+    }
+
+
+class ToolDispatcher:
+    """Runs independent tool calls on a bounded thread pool.
+
+    Results come back in the order of the tool_use blocks. A call that raises or
+    runs past ``timeout_seconds`` (measured from dispatch, so time spent queued
+    behind a full pool counts) yields an ``is_error`` tool_result instead of
+    failing or stalling the whole turn. Python threads cannot be killed, so a
+    timed-out call keeps its worker until it returns; its result is discarded.
+    """
+
+    def __init__(self, handler: ToolHandler, max_workers: int = 8, timeout_seconds: Optional[float] = 120.0) -> None:
+        self.handler = handler
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="tool-dispatch")
+        return self._executor
+
+    def dispatch(self, blocks: Iterable[Any], observer: Optional[ToolObserver] = None) -> list[dict[str, Any]]:
+        """Run every tool_use block and return their tool_result dicts in block order.
+
+        ``observer``, if given, is called for each block once its result is collected.
+        """
+        batch = self.batch(observer)
+        for block in blocks:
+            batch.submit(block)
+        return batch.results()
+
+    def batch(self, observer: Optional[ToolObserver] = None) -> "ToolBatch":
+        """An empty batch, for submitting tool_use blocks one at a time as they become available."""
+        return ToolBatch(self, observer)
+
+    def _timed(self, name: str, inputs: dict[str, Any]) -> tuple[str, float]:
+        start = time.perf_counter()
+        return self.handler(name, inputs), time.perf_counter() - start
+
+    def _collect(
+        self, block: Any, future: "Future[tuple[str, float]]", deadline: Optional[float], submitted: float
+    ) -> tuple[dict[str, Any], float]:
+        """The block's tool_result and handler run time (time since dispatch for failed calls)."""
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            content, elapsed = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            future.cancel()
+            logger.warning("tool %s (%s) timed out after %.1fs", block.name, block.id, self.timeout_seconds)
+            result = error_result(block.id, f"Tool {block.name} timed out after {self.timeout_seconds}s")
+            return result, time.perf_counter() - submitted
+        except Exception as e:
+            logger.warning("tool %s (%s) failed: %r", block.name, block.id, e)
+            result = error_result(block.id, f"Tool {block.name} failed: {type(e).__name__}: {e}")
+            return result, time.perf_counter() - submitted
+        return {"type": "tool_result", "tool_use_id": block.id, "content": content}, elapsed
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class ToolBatch:
+    """Tool calls of one turn, started one by one as their tool_use blocks arrive.
+
+    ``submit`` starts a call right away; ``results`` waits for all of them and returns the
+    tool_results in submission order. Each call's timeout is measured from its own submission.
+    """
+
+    def __init__(self, dispatcher: ToolDispatcher, observer: Optional[ToolObserver] = None) -> None:
+        self.dispatcher = dispatcher
+        self.observer = observer
+        self._calls: list[tuple[Any, "Future[tuple[str, float]]", Optional[float], float]] = []
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def submit(self, block: Any) -> None:
+        submitted = time.perf_counter()
+        timeout = self.dispatcher.timeout_seconds
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # Each call runs in a copy of the caller's context, so contextvars (e.g. tracing spans) carry over.
+        future = self.dispatcher._pool().submit(
+            contextvars.copy_context().run, self.dispatcher._timed, block.name, block.input
+        )
+        self._calls.append((block, future, deadline, submitted))
+
+    def results(self) -> list[dict[str, Any]]:
+        results = []
+        for block, future, deadline, submitted in self._calls:
+            result, elapsed = self.dispatcher._collect(block, future, deadline, submitted)
+            if self.observer is not None:
+                self.observer(block, result, elapsed)
+            results.append(result)
+        return results
+
+    def cancel(self) -> None:
+        """Cancel calls that have not started; running ones finish and their results are dropped."""
+        for _, future, _, _ in self._calls:
+            future.cancel()
+        self._calls.clear()
@@ -0,0 +1,80 @@
+"""Run many approach sessions concurrently on one event loop."""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Mapping, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# A session coroutine receives the shared API client and returns the final answer text.
+SessionFn = Callable[[Any], Awaitable[str]]
+
+
+@dataclass(frozen=True)
+class SessionResult:
+    approach: str
+    session: int
+    output: Optional[str]
+    error: Optional[str]
+    elapsed_seconds: float
+
+
+def _default_client() -> Any:
+    # Imported on first use; the SDK takes most of a cold start's import time.
+    import anthropic
+
+    return anthropic.AsyncAnthropic()
+
+
+class AsyncSessionRunner:
+    """Executes approaches, and N independent sessions per approach, concurrently.
+
+    All sessions share one API client, and so one HTTP connection pool. At most
+    ``max_concurrency`` sessions are in flight at a time. A failing session is
+    reported in its SessionResult and does not cancel the others.
+    """
+
+    def __init__(
+        self,
+        sessions: Mapping[str, SessionFn],
+        max_concurrency: int = 8,
+        client_factory: Optional[Callable[[], Any]] = None,
+    ) -> None:
+        self.sessions = sessions
+        self.max_concurrency = max_concurrency
+        self.client_factory = client_factory if client_factory is not None else _default_client
+
+    async def run(self, approaches: Sequence[str], sessions_per_approach: int = 1) -> list[SessionResult]:
+        """Run every (approach, session) pair; results are ordered by approach, then session index."""
+        unknown = [a for a in approaches if a not in self.sessions]
+        if unknown:
+            raise ValueError(f"Unknown approach(es) {unknown}; expected one of {list(self.sessions)}")
+
+        client = self.client_factory()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            return list(
+                await asyncio.gather(
+                    *(
+                        self._run_session(client, semaphore, approach, index)
+                        for approach in approaches
+                        for index in range(sessions_per_approach)
+                    )
+                )
+            )
+        finally:
+            close = getattr(client, "close", None)
+            if close is not None:
+                await close()
+
+    async def _run_session(self, client: Any, semaphore: asyncio.Semaphore, approach: str, index: int) -> SessionResult:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                output = await self.sessions[approach](client)
+            except Exception as e:
+                logger.warning("session %s #%d failed: %r", approach, index, e)
+                return SessionResult(approach, index, None, f"{type(e).__name__}: {e}", time.perf_counter() - start)
+            return SessionResult(approach, index, output, None, time.perf_counter() - start)
@@ -0,0 +1,75 @@
+"""Tests for AsyncSessionRunner."""
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from ptc_mloda_demo.agents.runner.async_runner import AsyncSessionRunner
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.closed = False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def test_runs_sessions_concurrently_with_limit() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def session(client: Any) -> str:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return "done"
+
+    runner = AsyncSessionRunner({"loop": session, "ptc": session}, max_concurrency=3, client_factory=FakeClient)
+    results = asyncio.run(runner.run(["loop", "ptc"], sessions_per_approach=4))
+    assert [(r.approach, r.session) for r in results] == [("loop", i) for i in range(4)] + [
+        ("ptc", i) for i in range(4)
+    ]
+    assert all(r.output == "done" and r.error is None for r in results)
+    assert peak == 3
+
+
+def test_sessions_share_one_client_which_is_closed() -> None:
+    seen: list[Any] = []
+    clients: list[FakeClient] = []
+
+    def factory() -> FakeClient:
+        clients.append(FakeClient())
+        return clients[-1]
+
+    async def session(client: Any) -> str:
+        seen.append(client)
+        return "ok"
+
+    asyncio.run(AsyncSessionRunner({"loop": session}, client_factory=factory).run(["loop"], sessions_per_approach=3))
+    assert len(clients) == 1
+    assert all(c is clients[0] for c in seen)
+    assert clients[0].closed
+
+
+def test_failing_session_is_isolated() -> None:
+    async def bad(client: Any) -> str:
+        raise RuntimeError("boom")
+
+    async def good(client: Any) -> str:
+        return "ok"
+
+    runner = AsyncSessionRunner({"bad": bad, "good": good}, client_factory=FakeClient)
+    bad_result, good_result = asyncio.run(runner.run(["bad", "good"]))
+    assert bad_result.output is None
+    assert bad_result.error == "RuntimeError: boom"
+    assert good_result.output == "ok"
+
+
+def test_unknown_approach_raises() -> None:
+    runner = AsyncSessionRunner({}, client_factory=FakeClient)
+    with pytest.raises(ValueError):
+        asyncio.run(runner.run(["nope"]))
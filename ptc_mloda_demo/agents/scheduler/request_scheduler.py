@@ -0,0 +1,361 @@
+"""Shared pacing of Messages API requests: rate limits, adaptive concurrency, retries and priorities."""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Mapping, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Request priorities, most urgent first: a queued interactive request is always sent before a batch one.
+INTERACTIVE = "interactive"
+BATCH = "batch"
+PRIORITIES = (INTERACTIVE, BATCH)
+
+# Statuses worth retrying: timeout, conflict, rate limit, server errors and 529 overloaded.
+RETRY_STATUSES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+# Statuses saying we send too much; they also halve the concurrency limit.
+THROTTLE_STATUSES = frozenset({429, 529})
+
+RATE_LIMIT_PREFIX = "anthropic-ratelimit-"
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """One ``anthropic-ratelimit-<name>-*`` header group; ``reset_seconds`` is relative to when it was read."""
+
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    reset_seconds: Optional[float] = None
+
+
+def _lower(headers: Mapping[str, str]) -> dict[str, str]:
+    return {str(k).lower(): str(v) for k, v in headers.items()}
+
+
+def _int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _seconds_until(value: Optional[str], now: float) -> Optional[float]:
+    """Seconds from ``now`` (epoch) to an RFC 3339 timestamp."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() - now)
+    except ValueError:
+        return None
+
+
+def parse_rate_limits(headers: Mapping[str, str], now: Optional[float] = None) -> dict[str, RateLimit]:
+    """The rate-limit header groups of a response, by name ("requests", "input-tokens", "output-tokens", "tokens")."""
+    now = time.time() if now is None else now
+    values = _lower(headers)
+    names = {
+        key[len(RATE_LIMIT_PREFIX) :].rsplit("-", 1)[0]
+        for key in values
+        if key.startswith(RATE_LIMIT_PREFIX) and key.endswith(("-limit", "-remaining", "-reset"))
+    }
+    return {
+        name: RateLimit(
+            limit=_int(values.get(f"{RATE_LIMIT_PREFIX}{name}-limit")),
+            remaining=_int(values.get(f"{RATE_LIMIT_PREFIX}{name}-remaining")),
+            reset_seconds=_seconds_until(values.get(f"{RATE_LIMIT_PREFIX}{name}-reset"), now),
+        )
+        for name in names
+    }
+
+
+def retry_after(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """Seconds to wait from ``retry-after-ms`` or ``retry-after`` (seconds); None when absent or unparsable."""
+    if not headers:
+        return None
+    values = _lower(headers)
+    for key, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        try:
+            return max(0.0, float(values[key]) * scale)
+        except (KeyError, ValueError):
+            continue
+    return None
+
+
+def _block_text(value: Any) -> Any:
+    # SDK content blocks: text, or the JSON input of a tool_use.
+    text = getattr(value, "text", None)
+    return text if isinstance(text, str) else getattr(value, "input", "")
+
+
+def estimate_input_tokens(request: Mapping[str, Any], chars_per_token: float = 4.0) -> int:
+    """Rough input tokens of a messages.create request: its system prompt, tools and messages."""
+    payload = {key: request.get(key) for key in ("system", "tools", "messages")}
+    return int(len(json.dumps(payload, default=_block_text)) / chars_per_token)
+
+
+class TokenBucket:
+    """``capacity`` tokens, refilled continuously at ``capacity`` per ``period_seconds``.
+
+    Unlimited while ``capacity`` is None. Requests larger than the capacity only wait
+    for a full bucket, so they can never block forever.
+    """
+
+    def __init__(
+        self,
+        capacity: Optional[float] = None,
+        period_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity = capacity
+        self.period_seconds = period_seconds
+        self._clock = clock
+        self._level = capacity or 0.0
+        self._updated = clock()
+
+    @property
+    def level(self) -> float:
+        self._refill()
+        return self._level
+
+    def _refill(self) -> None:
+        now = self._clock()
+        if self.capacity is not None:
+            self._level = min(self.capacity, self._level + (now - self._updated) * self.capacity / self.period_seconds)
+        self._updated = now
+
+    def wait_seconds(self, amount: float) -> float:
+        """Time until ``amount`` tokens are available."""
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.capacity) - self._level
+        return max(0.0, missing * self.period_seconds / self.capacity)
+
+    def take(self, amount: float) -> None:
+        if self.capacity is not None:
+            self._refill()
+            self._level -= min(amount, self.capacity)
+
+    def update(self, capacity: Optional[int], remaining: Optional[int]) -> None:
+        """Adopt the limit and the remaining tokens the API reported; its count wins over our estimate."""
+        self._refill()
+        if capacity is not None:
+            if self.capacity is None:
+                self._level = float(capacity)
+            self.capacity = float(capacity)
+        if remaining is not None and self.capacity is not None:
+            self._level = min(self.capacity, float(remaining))
+
+
+@dataclass
+class SchedulerStats:
+    requests: int = 0
+    retries: int = 0
+    throttled: int = 0
+    failed: int = 0
+    # Time requests spent queued for a rate limit, a concurrency slot or a retry pause.
+    waited_seconds: float = 0.0
+    max_queued: int = 0
+    concurrency_limit: float = 0.0
+
+
+class RequestScheduler:
+    """Paces the Messages API requests of every session sharing it.
+
+    A request waits for a concurrency slot, one request from the requests-per-minute
+    bucket and its estimated input tokens from the input-tokens-per-minute bucket. Both
+    buckets start at ``requests_per_minute`` / ``input_tokens_per_minute`` (unlimited when
+    None) and follow the ``anthropic-ratelimit-*`` headers of every response. An exhausted
+    limit, or a 429 with ``retry-after``, holds back every queued request until it resets,
+    so sessions do not all retry into the same wall.
+
+    The concurrency limit adapts AIMD-style: it grows by one per success until the first
+    throttle (slow start), then by one per limit's worth of successes, and halves on 429 or
+    529 at most once per round of requests sent. Retryable errors are retried up to
+    ``max_retries`` times after a full-jitter exponential backoff, keeping their place in
+    the queue. Interactive requests always go before batch ones. ``window_seconds`` is the
+    period the per-minute limits refill over; only tests and benchmarks shorten it.
+
+    Drive it from one event loop at a time; the demo's sequential ``asyncio.run`` calls share it.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        input_tokens_per_minute: Optional[int] = None,
+        max_concurrency: int = 32,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_retries: int = 6,
+        backoff_seconds: float = 0.5,
+        max_backoff_seconds: float = 30.0,
+        chars_per_token: float = 4.0,
+        window_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.requests = TokenBucket(requests_per_minute, window_seconds, clock)
+        self.input_tokens = TokenBucket(input_tokens_per_minute, window_seconds, clock)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.chars_per_token = chars_per_token
+        self.stats = SchedulerStats(
+            concurrency_limit=float(min(max(initial_concurrency, min_concurrency), max_concurrency))
+        )
+        self._clock = clock
+        self._rng = rng if rng is not None else random.Random()  # nosec B311
+        self._queue: list[tuple[int, int, float, asyncio.Future[int]]] = []
+        self._tickets = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight = 0
+        self._sent = 0
+        self._last_cut = -1
+        self._slow_start = True
+        self._paused_until = 0.0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def submit(
+        self, send: Callable[[], Awaitable[T]], estimated_tokens: float = 0, priority: str = INTERACTIVE
+    ) -> T:
+        """Await ``send()`` once the limits allow, retrying it on retryable errors; returns its result.
+
+        ``send`` is called again for each retry, so it must create a new request each time.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {list(PRIORITIES)}")
+        rank, ticket = PRIORITIES.index(priority), next(self._tickets)
+        attempt = 0
+        while True:
+            queued = self._clock()
+            sent = await self._acquire(rank, ticket, estimated_tokens)
+            self.stats.waited_seconds += self._clock() - queued
+            self.stats.requests += 1
+            try:
+                result = await send()
+            except Exception as e:
+                status = getattr(e, "status_code", None)
+                headers = getattr(getattr(e, "response", None), "headers", None)
+                if headers:
+                    self.observe(headers)
+                if status in THROTTLE_STATUSES:
+                    self._throttled(sent, retry_after(headers))
+                if status not in RETRY_STATUSES or attempt >= self.max_retries:
+                    self.stats.failed += 1
+                    raise
+                delay = self.backoff(attempt)
+                logger.info("request failed with %s; retry %d in %.2fs", status, attempt + 1, delay)
+            else:
+                self._succeeded()
+                return result
+            finally:
+                self._release()
+            self.stats.retries += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+            self.stats.waited_seconds += delay
+
+    async def create(self, client: Any, **kwargs: Any) -> Any:
+        """``client.messages.create(**kwargs)``, reading the rate-limit headers of the response when the client exposes them."""
+        raw = getattr(client.messages, "with_raw_response", None)
+        if raw is None:
+            return await client.messages.create(**kwargs)
+        response = await raw.create(**kwargs)
+        self.observe(response.headers)
+        return await response.parse()
+
+    def estimate(self, request: Mapping[str, Any]) -> int:
+        return estimate_input_tokens(request, self.chars_per_token)
+
+    def observe(self, headers: Mapping[str, str]) -> None:
+        """Follow the ``anthropic-ratelimit-*`` headers of a response (or of an error response)."""
+        limits = parse_rate_limits(headers)
+        for name, bucket in (("requests", self.requests), ("input-tokens", self.input_tokens)):
+            if name in limits:
+                bucket.update(limits[name].limit, limits[name].remaining)
+        for limit in limits.values():
+            # Output and combined token limits have no bucket: an exhausted one pauses sending until it resets.
+            if limit.remaining == 0 and limit.reset_seconds:
+                self._pause(limit.reset_seconds)
+        self._dispatch()
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff: uniform in [0, backoff_seconds * 2**attempt], capped."""
+        return self._rng.uniform(0.0, min(self.max_backoff_seconds, self.backoff_seconds * 2**attempt))
+
+    async def _acquire(self, rank: int, ticket: int, tokens: float) -> int:
+        """Wait for this request's turn; returns its send number."""
+        future: asyncio.Future[int] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (rank, ticket, tokens, future))
+        self.stats.max_queued = max(self.stats.max_queued, len(self._queue))
+        self._dispatch()
+        try:
+            return await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release()  # granted, then cancelled before sending
+            raise
+
+    def _dispatch(self) -> None:
+        """Grant queued requests in priority order while a slot and the rate limits allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue:
+            _, _, tokens, future = self._queue[0]
+            if future.done():  # cancelled while queued
+                heapq.heappop(self._queue)
+                continue
+            if self._in_flight >= int(self.stats.concurrency_limit):
+                return
+            wait = max(
+                self._paused_until - self._clock(),
+                self.requests.wait_seconds(1),
+                self.input_tokens.wait_seconds(tokens),
+            )
+            if wait > 0:
+                self._timer = future.get_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._queue)
+            self.requests.take(1)
+            self.input_tokens.take(tokens)
+            self._in_flight += 1
+            self._sent += 1
+            future.set_result(self._sent)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+    def _succeeded(self) -> None:
+        limit = self.stats.concurrency_limit
+        limit += 1.0 if self._slow_start else 1.0 / limit
+        self.stats.concurrency_limit = min(float(self.max_concurrency), limit)
+
+    def _throttled(self, sent: int, wait: Optional[float]) -> None:
+        self.stats.throttled += 1
+        if wait:
+            self._pause(wait)
+        # Requests sent before the last cut hit the same overload; count each congestion event once.
+        if sent > self._last_cut:
+            self._slow_start = False
+            self._last_cut = self._sent
+            self.stats.concurrency_limit = max(float(self.min_concurrency), self.stats.concurrency_limit / 2)
+            logger.info("throttled; concurrency limit now %.1f", self.stats.concurrency_limit)
@@ -0,0 +1,312 @@
+"""Tests for RequestScheduler and its rate-limit parsing."""
+
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Optional
+
+import pytest
+
+from ptc_mloda_demo.agents.scheduler.request_scheduler import (
+    BATCH,
+    INTERACTIVE,
+    RateLimit,
+    RequestScheduler,
+    TokenBucket,
+    estimate_input_tokens,
+    parse_rate_limits,
+    retry_after,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StatusError(Exception):
+    """Duck-types anthropic.APIStatusError: a status code and the HTTP response headers."""
+
+    def __init__(self, status: int, headers: Optional[dict[str, str]] = None) -> None:
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def _answers(*outcomes: Any) -> Callable[[], Awaitable[Any]]:
+    """A send function returning (or raising) the next outcome on each call."""
+    remaining = list(outcomes)
+
+    async def send() -> Any:
+        outcome = remaining.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return send
+
+
+def _scheduler(**kwargs: Any) -> RequestScheduler:
+    return RequestScheduler(backoff_seconds=0.01, rng=random.Random(0), **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Headers, estimates and the token bucket
+# ---------------------------------------------------------------------------
+
+
+class TestHeaders:
+    """anthropic-ratelimit-* and retry-after headers are read whatever their case."""
+
+    def test_parse_rate_limits(self) -> None:
+        now = time.time()
+        reset = datetime.fromtimestamp(now, timezone.utc) + timedelta(seconds=30)
+        limits = parse_rate_limits(
+            {
+                "Anthropic-RateLimit-Requests-Limit": "50",
+                "anthropic-ratelimit-requests-remaining": "49",
+                "anthropic-ratelimit-requests-reset": reset.isoformat().replace("+00:00", "Z"),
+                "anthropic-ratelimit-input-tokens-limit": "30000",
+                "anthropic-ratelimit-input-tokens-remaining": "not a number",
+                "request-id": "req_1",
+            },
+            now=now,
+        )
+        assert set(limits) == {"requests", "input-tokens"}
+        assert limits["requests"].limit == 50 and limits["requests"].remaining == 49
+        assert limits["requests"].reset_seconds == pytest.approx(30, abs=0.01)
+        assert limits["input-tokens"] == RateLimit(limit=30000)
+
+    def test_retry_after(self) -> None:
+        assert retry_after({"Retry-After": "2"}) == 2.0
+        assert retry_after({"retry-after-ms": "150", "retry-after": "1"}) == pytest.approx(0.15)
+        assert retry_after({"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"}) is None
+        assert retry_after(None) is None
+
+    def test_estimate_input_tokens(self) -> None:
+        request = {"tools": [{"name": "x" * 400}], "messages": [{"role": "user", "content": "y" * 400}], "model": "m"}
+        assert 200 <= estimate_input_tokens(request) <= 250
+        assert estimate_input_tokens(request, chars_per_token=2.0) >= 2 * estimate_input_tokens(request)
+
+
+class TestTokenBucket:
+    """Capacity per window, refilled continuously."""
+
+    def test_waits_for_refill(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(60, period_seconds=60.0, clock=clock)
+        bucket.take(60)
+        assert bucket.wait_seconds(1) == pytest.approx(1.0)
+        clock.now += 30
+        assert bucket.level == pytest.approx(30)
+        assert bucket.wait_seconds(100) == pytest.approx(30.0)  # larger than capacity: waits for a full bucket
+
+    def test_unlimited_until_the_api_reports_a_limit(self) -> None:
+        bucket = TokenBucket(clock=FakeClock())
+        bucket.take(10**9)
+        assert bucket.wait_seconds(10**9) == 0.0
+        bucket.update(capacity=100, remaining=0)
+        assert bucket.wait_seconds(50) == pytest.approx(30.0)
+        bucket.update(capacity=None, remaining=80)
+        assert bucket.level == 80
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Scheduling
+# ---------------------------------------------------------------------------
+
+
+class TestRetries:
+    """Retryable errors are retried with backoff; others are raised at once."""
+
+    def test_429_is_retried(self) -> None:
+        scheduler = _scheduler()
+        result = asyncio.run(scheduler.submit(_answers(StatusError(429), StatusError(529), "ok")))
+        assert result == "ok"
+        stats = scheduler.stats
+        assert (stats.requests, stats.retries, stats.throttled, stats.failed) == (3, 2, 2, 0)
+        assert scheduler.in_flight == 0
+
+    def test_client_errors_are_not_retried(self) -> None:
+        scheduler = _scheduler()
+        with pytest.raises(StatusError):
+            asyncio.run(scheduler.submit(_answers(StatusError(400), "ok")))
+        with pytest.raises(ValueError):
+            asyncio.run(scheduler.submit(_answers(ValueError("bad"))))
+        assert (scheduler.stats.requests, scheduler.stats.retries, scheduler.stats.failed) == (2, 0, 2)
+
+    def test_gives_up_after_max_retries(self) -> None:
+        scheduler = _scheduler(max_retries=2)
+        with pytest.raises(StatusError):
+            asyncio.run(scheduler.submit(_answers(*[StatusError(503)] * 3)))
+        assert (scheduler.stats.requests, scheduler.stats.retries, scheduler.stats.failed) == (3, 2, 1)
+
+    def test_backoff_is_jittered_and_capped(self) -> None:
+        scheduler = RequestScheduler(backoff_seconds=1.0, max_backoff_seconds=5.0, rng=random.Random(1))
+        delays = [scheduler.backoff(attempt) for attempt in range(8) for _ in range(20)]
+        assert all(0.0 <= d <= 5.0 for d in delays)
+        assert len(set(delays)) == len(delays)
+        assert max(scheduler.backoff(0) for _ in range(50)) <= 1.0
+
+    def test_retry_after_holds_back_every_request(self) -> None:
+        scheduler = _scheduler()
+
+        async def run() -> float:
+            throttled = asyncio.ensure_future(scheduler.submit(_answers(StatusError(429, {"retry-after": "0.3"}), "a")))
+            await asyncio.sleep(0.05)
+            start = time.perf_counter()
+            await scheduler.submit(_answers("b"))  # sent after the 429: waits out its retry-after too
+            elapsed = time.perf_counter() - start
+            await throttled
+            return elapsed
+
+        assert asyncio.run(run()) >= 0.2
+
+
+class TestConcurrency:
+    """The concurrency limit grows on success and halves once per congestion event."""
+
+    def test_slow_start_then_additive_increase(self) -> None:
+        scheduler = _scheduler(initial_concurrency=2, max_concurrency=5)
+        for _ in range(4):
+            asyncio.run(scheduler.submit(_answers("ok")))
+        assert scheduler.stats.concurrency_limit == 5  # +1 per success, capped
+        asyncio.run(scheduler.submit(_answers(StatusError(429), "ok")))
+        assert scheduler.stats.concurrency_limit == pytest.approx(2.5 + 1 / 2.5)
+        asyncio.run(scheduler.submit(_answers("ok")))
+        assert scheduler.stats.concurrency_limit < 3.5  # no more slow start
+
+    def test_concurrent_429s_cut_the_limit_once(self) -> None:
+        scheduler = _scheduler(initial_concurrency=8)
+        in_flight: list[int] = []
+
+        def send(first: list[bool]) -> Callable[[], Awaitable[str]]:
+            async def call() -> str:
+                in_flight.append(scheduler.in_flight)
+                await asyncio.sleep(0.02)
+                if first:
+                    first.pop()
+                    raise StatusError(429)
+                return "ok"
+
+            return call
+
+        async def run() -> list[str]:
+            return await asyncio.gather(*(scheduler.submit(send([True])) for _ in range(8)))
+
+        assert asyncio.run(run()) == ["ok"] * 8
+        assert scheduler.stats.throttled == 8
+        assert scheduler.stats.concurrency_limit == pytest.approx(4 + 8 * 0.25, abs=0.5)  # one halving, then +1/limit
+        assert max(in_flight) <= 8
+
+    def test_never_exceeds_the_limit(self) -> None:
+        scheduler = _scheduler(initial_concurrency=3, max_concurrency=3)
+        peak = 0
+
+        async def call() -> None:
+            nonlocal peak
+            peak = max(peak, scheduler.in_flight)
+            await asyncio.sleep(0.01)
+
+        async def run() -> None:
+            await asyncio.gather(*(scheduler.submit(call) for _ in range(12)))
+
+        asyncio.run(run())
+        assert peak == 3
+        assert scheduler.stats.max_queued >= 9
+
+    def test_cancelled_requests_free_their_slot(self) -> None:
+        scheduler = _scheduler(initial_concurrency=1, max_concurrency=1)
+
+        async def run() -> str:
+            blocked = asyncio.ensure_future(scheduler.submit(lambda: asyncio.sleep(10)))
+            queued = asyncio.ensure_future(scheduler.submit(_answers("never")))
+            await asyncio.sleep(0.01)
+            queued.cancel()
+            blocked.cancel()
+            await asyncio.gather(blocked, queued, return_exceptions=True)
+            return await scheduler.submit(_answers("ok"))
+
+        assert asyncio.run(run()) == "ok"
+        assert scheduler.in_flight == 0
+
+
+class TestPriorities:
+    """Queued interactive requests go before batch ones; each class keeps its order."""
+
+    def test_interactive_first(self) -> None:
+        scheduler = _scheduler(initial_concurrency=1, max_concurrency=1)
+        order: list[str] = []
+
+        def send(name: str) -> Callable[[], Awaitable[None]]:
+            async def call() -> None:
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+            return call
+
+        async def run() -> None:
+            requests = [scheduler.submit(send("b1"), priority=BATCH), scheduler.submit(send("b2"), priority=BATCH)]
+            requests += [scheduler.submit(send("i1"), priority=INTERACTIVE), scheduler.submit(send("i2"))]
+            await asyncio.gather(*requests)
+
+        asyncio.run(run())
+        assert order == ["b1", "i1", "i2", "b2"]  # b1 was sent before the others were queued
+
+    def test_unknown_priority(self) -> None:
+        with pytest.raises(ValueError, match="Unknown priority"):
+            asyncio.run(_scheduler().submit(_answers("x"), priority="urgent"))
+
+
+class TestRateLimits:
+    """Configured and reported limits pace requests."""
+
+    def test_exhausted_requests_limit_waits_for_refill(self) -> None:
+        scheduler = _scheduler(window_seconds=1.0)
+        scheduler.observe({"anthropic-ratelimit-requests-limit": "10", "anthropic-ratelimit-requests-remaining": "0"})
+        start = time.perf_counter()
+        asyncio.run(scheduler.submit(_answers("ok")))
+        assert time.perf_counter() - start >= 0.09
+
+    def test_input_tokens_are_paced_by_the_estimate(self) -> None:
+        scheduler = _scheduler(input_tokens_per_minute=100, window_seconds=1.0)
+
+        async def run() -> float:
+            start = time.perf_counter()
+            await asyncio.gather(*(scheduler.submit(_answers("ok"), estimated_tokens=50) for _ in range(4)))
+            return time.perf_counter() - start
+
+        assert asyncio.run(run()) >= 0.9  # 2 fit the bucket, the next 2 wait 0.5s each
+
+    def test_exhausted_output_tokens_pause_until_reset(self) -> None:
+        scheduler = _scheduler()
+        reset = datetime.now(timezone.utc) + timedelta(seconds=0.3)
+        scheduler.observe(
+            {"anthropic-ratelimit-output-tokens-remaining": "0", "anthropic-ratelimit-output-tokens-reset": str(reset)}
+        )
+        start = time.perf_counter()
+        asyncio.run(scheduler.submit(_answers("ok")))
+        assert time.perf_counter() - start >= 0.2
+
+    def test_create_reads_response_headers(self) -> None:
+        message = SimpleNamespace(stop_reason="end_turn")
+
+        async def raw_create(**kwargs: Any) -> Any:
+            async def parse() -> Any:
+                return message
+
+            return SimpleNamespace(
+                headers={"anthropic-ratelimit-requests-limit": "50", "anthropic-ratelimit-requests-remaining": "7"},
+                parse=parse,
+            )
+
+        client = SimpleNamespace(messages=SimpleNamespace(with_raw_response=SimpleNamespace(create=raw_create)))
+        scheduler = _scheduler()
+        assert asyncio.run(scheduler.create(client, model="m")) is message
+        assert scheduler.requests.capacity == 50
+        assert scheduler.requests.level == pytest.approx(7, abs=0.1)
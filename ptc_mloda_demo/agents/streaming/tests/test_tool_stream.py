@@ -0,0 +1,159 @@
+"""Tests for starting tool calls from a streamed response."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Optional, final
+
+import pytest
+
+from ptc_mloda_demo.agents.streaming.tool_stream import StreamedToolUse, ToolUseAccumulator, stream_message
+
+
+def _start(index: int, block_type: str, **fields: Any) -> SimpleNamespace:
+    return SimpleNamespace(
+        type="content_block_start", index=index, content_block=SimpleNamespace(type=block_type, **fields)
+    )
+
+
+def _delta(index: int, delta_type: str, **fields: Any) -> SimpleNamespace:
+    return SimpleNamespace(type="content_block_delta", index=index, delta=SimpleNamespace(type=delta_type, **fields))
+
+
+def _stop(index: int) -> SimpleNamespace:
+    return SimpleNamespace(type="content_block_stop", index=index)
+
+
+def _tool_use_events(index: int, tool_id: str, name: str, inputs: dict[str, Any]) -> list[SimpleNamespace]:
+    raw = json.dumps(inputs)
+    return [
+        _start(index, "tool_use", id=tool_id, name=name, input={}),
+        *(_delta(index, "input_json_delta", partial_json=raw[i : i + 5]) for i in range(0, len(raw), 5)),
+        _stop(index),
+    ]
+
+
+@final
+class FakeStream:
+    """``messages.stream`` stand-in: yields events, pausing after each completed content block."""
+
+    def __init__(
+        self, events: list[Any], final: Any, pause_seconds: float = 0.0, error: Optional[Exception] = None
+    ) -> None:
+        self.events = events
+        self.final = final
+        self.pause_seconds = pause_seconds
+        self.error = error
+
+    async def __aenter__(self) -> "FakeStream":
+        if self.error is not None:
+            raise self.error
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        return None
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        for event in self.events:
+            yield event
+            if event.type == "content_block_stop":
+                await asyncio.sleep(self.pause_seconds)
+
+    async def get_final_message(self) -> Any:
+        return self.final
+
+
+class FakeClient:
+    def __init__(self, stream: FakeStream) -> None:
+        self.messages = self
+        self._stream = stream
+        self.kwargs: dict[str, Any] = {}
+
+    def stream(self, **kwargs: Any) -> FakeStream:
+        self.kwargs = kwargs
+        return self._stream
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Accumulating tool_use blocks
+# ---------------------------------------------------------------------------
+
+
+class TestToolUseAccumulator:
+    """A tool_use block is complete, with parsed input, at its content_block_stop."""
+
+    def test_returns_block_with_joined_input_at_stop(self) -> None:
+        accumulator = ToolUseAccumulator()
+        events = _tool_use_events(0, "toolu_1", "run_features", {"feature_names": ["salary"], "limit": 3})
+        completed = [accumulator.feed(event) for event in events]
+        assert completed[:-1] == [None] * (len(events) - 1)
+        assert completed[-1] == StreamedToolUse("toolu_1", "run_features", {"feature_names": ["salary"], "limit": 3}, 0)
+
+    def test_empty_input(self) -> None:
+        accumulator = ToolUseAccumulator()
+        accumulator.feed(_start(0, "tool_use", id="toolu_1", name="discover_features", input={}))
+        block = accumulator.feed(_stop(0))
+        assert block is not None and block.input == {}
+
+    def test_interleaved_text_and_server_tool_blocks_are_ignored(self) -> None:
+        accumulator = ToolUseAccumulator()
+        events = [
+            _start(0, "text", text=""),
+            _delta(0, "text_delta", text="Let me look."),
+            _stop(0),
+            _start(1, "server_tool_use", id="srvtoolu_1", name="code_execution", input={}),
+            _delta(1, "input_json_delta", partial_json='{"code": "x"}'),
+            _stop(1),
+            *_tool_use_events(2, "toolu_2", "run_features", {"feature_names": ["salary"]}),
+            SimpleNamespace(type="message_delta"),
+            SimpleNamespace(type="message_stop"),
+        ]
+        blocks = [block for block in map(accumulator.feed, events) if block is not None]
+        assert [(b.id, b.index) for b in blocks] == [("toolu_2", 2)]
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Streaming a message
+# ---------------------------------------------------------------------------
+
+
+class TestStreamMessage:
+    """Tool calls are handed over while the response is still streaming."""
+
+    def test_tool_use_is_handed_over_before_the_stream_ends(self) -> None:
+        events = [
+            *_tool_use_events(0, "toolu_1", "run_features", {"feature_names": ["salary"]}),
+            *_tool_use_events(1, "toolu_2", "discover_features", {}),
+            SimpleNamespace(type="message_stop"),
+        ]
+        final = SimpleNamespace(content=[], stop_reason="tool_use")
+        client = FakeClient(FakeStream(events, final, pause_seconds=0.05))
+        handed_over: list[tuple[str, float]] = []
+
+        async def run() -> tuple[Any, float]:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+
+            def on_tool_use(block: StreamedToolUse) -> None:
+                handed_over.append((block.id, loop.time() - start))
+
+            message = await stream_message(client, on_tool_use, model="m", max_tokens=10)
+            return message, loop.time() - start
+
+        message, total = asyncio.run(run())
+        assert message is final
+        assert client.kwargs == {"model": "m", "max_tokens": 10}
+        assert [tool_id for tool_id, _ in handed_over] == ["toolu_1", "toolu_2"]
+        assert handed_over[0][1] < total - 0.04
+
+    def test_errors_propagate(self) -> None:
+        client = FakeClient(FakeStream([], None, error=ConnectionError("dropped")))
+        with pytest.raises(ConnectionError):
+            asyncio.run(stream_message(client, lambda block: None))
+
+    def test_response_headers_are_handed_over(self) -> None:
+        stream = FakeStream([SimpleNamespace(type="message_stop")], SimpleNamespace(content=[]))
+        stream.response = SimpleNamespace(headers={"anthropic-ratelimit-requests-remaining": "9"})  # type: ignore[attr-defined]
+        headers: list[Any] = []
+        asyncio.run(stream_message(FakeClient(stream), lambda block: None, headers.append))
+        assert headers == [{"anthropic-ratelimit-requests-remaining": "9"}]
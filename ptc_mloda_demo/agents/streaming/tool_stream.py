@@ -0,0 +1,79 @@
+"""Start tool calls from a streamed Messages response as soon as each tool_use block is complete."""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StreamedToolUse:
+    """A tool_use block whose input JSON has fully arrived; duck-types the SDK's ToolUseBlock."""
+
+    id: str
+    name: str
+    input: dict[str, Any]
+    index: int
+    type: str = "tool_use"
+
+
+@dataclass
+class _PartialToolUse:
+    id: str
+    name: str
+    chunks: list[str] = field(default_factory=list)
+
+
+class ToolUseAccumulator:
+    """Feed it the events of a message stream; it returns each tool_use block at its content_block_stop.
+
+    Only the raw ``content_block_*`` events are read, so this works on the event iterator of
+    ``client.messages.stream(...)`` as well as on ``client.messages.create(..., stream=True)``.
+    Server tool calls (the PTC ``code_execution`` block) run on Anthropic's side and are ignored.
+    """
+
+    def __init__(self) -> None:
+        self._open: dict[int, _PartialToolUse] = {}
+
+    def feed(self, event: Any) -> Optional[StreamedToolUse]:
+        kind = getattr(event, "type", None)
+        if kind == "content_block_start":
+            block = event.content_block
+            if getattr(block, "type", None) == "tool_use":
+                self._open[event.index] = _PartialToolUse(block.id, block.name)
+        elif kind == "content_block_delta":
+            partial = self._open.get(event.index)
+            if partial is not None and getattr(event.delta, "type", None) == "input_json_delta":
+                partial.chunks.append(event.delta.partial_json)
+        elif kind == "content_block_stop":
+            partial = self._open.pop(event.index, None)
+            if partial is not None:
+                raw = "".join(partial.chunks)
+                return StreamedToolUse(partial.id, partial.name, json.loads(raw) if raw else {}, event.index)
+        return None
+
+
+async def stream_message(
+    client: Any,
+    on_tool_use: Callable[[StreamedToolUse], None],
+    on_headers: Optional[Callable[[Any], None]] = None,
+    **kwargs: Any,
+) -> Any:
+    """``client.messages.stream(**kwargs)``, calling ``on_tool_use`` for each tool_use block as it completes.
+
+    ``on_headers`` gets the HTTP response headers once the stream is open. Returns the final
+    message, the same object ``messages.create`` would have returned.
+    """
+    accumulator = ToolUseAccumulator()
+    async with client.messages.stream(**kwargs) as stream:
+        response = getattr(stream, "response", None)
+        if on_headers is not None and response is not None:
+            on_headers(response.headers)
+        async for event in stream:
+            block = accumulator.feed(event)
+            if block is not None:
+                logger.debug("tool_use %s (%s) complete at block %d", block.name, block.id, block.index)
+                on_tool_use(block)
+        return await stream.get_final_message()
@@ -0,0 +1,122 @@
+"""Tests for UsageTracker."""
+
+import asyncio
+import io
+import json
+from types import SimpleNamespace
+from typing import Any
+
+from ptc_mloda_demo.agents.dispatch.tool_dispatcher import ToolDispatcher
+from ptc_mloda_demo.agents.usage.usage_tracker import RequestEvent, ToolCallEvent, UsageTracker
+
+
+class FakeClient:
+    """Minimal async Messages client returning a fixed usage block."""
+
+    def __init__(self) -> None:
+        self.messages = self
+
+    async def create(self, **kwargs: Any) -> SimpleNamespace:
+        await asyncio.sleep(0.01)
+        usage = SimpleNamespace(
+            input_tokens=100, output_tokens=20, cache_creation_input_tokens=None, cache_read_input_tokens=80
+        )
+        return SimpleNamespace(content=[], usage=usage)
+
+
+def _block(block_id: str, name: str = "run_features") -> SimpleNamespace:
+    return SimpleNamespace(type="tool_use", id=block_id, name=name, input={})
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Recording
+# ---------------------------------------------------------------------------
+
+
+class TestUsageRecording:
+    """Requests and tool calls become events attributed to their session."""
+
+    def test_sessions_are_numbered_per_approach(self) -> None:
+        tracker = UsageTracker()
+        assert [tracker.session("loop").session for _ in range(2)] == [0, 1]
+        assert tracker.session("ptc").session == 0
+
+    def test_create_records_latency_and_tokens(self) -> None:
+        tracker = UsageTracker()
+        usage = tracker.session("loop")
+        asyncio.run(usage.create(FakeClient(), model="m"))
+        (event,) = tracker.events()
+        assert isinstance(event, RequestEvent)
+        assert (event.input_tokens, event.output_tokens, event.cache_read_input_tokens) == (100, 20, 80)
+        assert event.cache_creation_input_tokens == 0
+        assert event.latency_seconds >= 0.01
+
+    def test_usage_dict_from_claude_cli(self) -> None:
+        tracker = UsageTracker()
+        tracker.session("bash").record_request({"input_tokens": 5, "output_tokens": 7}, 1.5)
+        (event,) = tracker.events()
+        assert isinstance(event, RequestEvent)
+        assert (event.input_tokens, event.output_tokens, event.latency_seconds) == (5, 7, 1.5)
+
+    def test_dispatcher_observer_records_tool_calls(self) -> None:
+        tracker = UsageTracker()
+        usage = tracker.session("loop")
+
+        def handler(name: str, inputs: dict[str, Any]) -> str:
+            if name == "broken":
+                raise RuntimeError("boom")
+            return "x" * 10
+
+        dispatcher = ToolDispatcher(handler)
+        dispatcher.dispatch([_block("a"), _block("b", name="broken")], usage.record_tool_call)
+        dispatcher.shutdown()
+        ok, failed = tracker.events()
+        assert isinstance(ok, ToolCallEvent) and isinstance(failed, ToolCallEvent)
+        assert (ok.tool, ok.payload_bytes, ok.is_error) == ("run_features", 10, False)
+        assert failed.is_error is True
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Aggregation and export
+# ---------------------------------------------------------------------------
+
+
+def _populated() -> UsageTracker:
+    tracker = UsageTracker()
+    for approach, payload in [("loop", 300), ("loop", 100), ("ptc", 50)]:
+        usage = tracker.session(approach)
+        usage.record_request({"input_tokens": 10, "output_tokens": 1}, 0.5)
+        usage.record_tool_call(_block("a"), {"content": "x" * payload}, 0.25)
+    return tracker
+
+
+class TestUsageExport:
+    """Totals per session / approach, JSON lines and Prometheus text."""
+
+    def test_summaries(self) -> None:
+        tracker = _populated()
+        per_session = tracker.summaries()
+        assert [(s.approach, s.session, s.payload_bytes) for s in per_session] == [
+            ("loop", 0, 300),
+            ("loop", 1, 100),
+            ("ptc", 0, 50),
+        ]
+        loop, ptc = tracker.summaries(per_session=False)
+        assert (loop.requests, loop.input_tokens, loop.tool_calls, loop.payload_bytes) == (2, 20, 2, 400)
+        assert loop.api_seconds == 1.0 and ptc.payload_bytes == 50
+
+    def test_write_jsonl(self) -> None:
+        out = io.StringIO()
+        _populated().write_jsonl(out)
+        kinds = [json.loads(line)["kind"] for line in out.getvalue().splitlines()]
+        assert kinds.count("request") == 3 and kinds.count("tool_call") == 3
+        assert kinds.count("summary") == 3 + 2
+
+    def test_write_prometheus(self) -> None:
+        out = io.StringIO()
+        _populated().write_prometheus(out)
+        text = out.getvalue()
+        assert "# TYPE ptc_demo_requests_total counter" in text
+        assert 'ptc_demo_requests_total{approach="loop"} 2' in text
+        assert 'ptc_demo_tokens_total{approach="loop",type="input"} 20' in text
+        assert 'ptc_demo_tool_result_bytes_total{approach="ptc",tool="run_features"} 50' in text
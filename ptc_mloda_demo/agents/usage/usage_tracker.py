@@ -0,0 +1,230 @@
+"""Token, payload and latency accounting for the agent sessions."""
+
+import itertools
+import json
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Iterable, Optional, TextIO
+
+# Token counters read from a Messages API ``usage`` object (or a claude -p JSON ``usage`` dict).
+TOKEN_FIELDS = ("input_tokens", "output_tokens", "cache_creation_input_tokens", "cache_read_input_tokens")
+
+
+def _usage_value(usage: Any, key: str) -> int:
+    value = usage.get(key) if isinstance(usage, dict) else getattr(usage, key, None)
+    return int(value) if isinstance(value, (int, float)) else 0
+
+
+@dataclass(frozen=True)
+class RequestEvent:
+    """One model request: a Messages API call or a claude -p invocation."""
+
+    approach: str
+    session: int
+    turn: int
+    latency_seconds: float
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    kind: str = "request"
+
+
+@dataclass(frozen=True)
+class ToolCallEvent:
+    """One tool call; ``payload_bytes`` is the size of the tool_result content sent back."""
+
+    approach: str
+    session: int
+    turn: int
+    tool: str
+    duration_seconds: float
+    payload_bytes: int
+    is_error: bool
+    kind: str = "tool_call"
+
+
+@dataclass
+class UsageSummary:
+    """Totals over a set of events, per session or per approach."""
+
+    approach: str
+    session: Optional[int]
+    requests: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    api_seconds: float = 0.0
+    tool_calls: int = 0
+    tool_errors: int = 0
+    tool_seconds: float = 0.0
+    payload_bytes: int = 0
+    kind: str = "summary"
+
+    def add(self, event: "RequestEvent | ToolCallEvent") -> None:
+        if isinstance(event, RequestEvent):
+            self.requests += 1
+            self.api_seconds += event.latency_seconds
+            for key in TOKEN_FIELDS:
+                setattr(self, key, getattr(self, key) + getattr(event, key))
+        else:
+            self.tool_calls += 1
+            self.tool_errors += int(event.is_error)
+            self.tool_seconds += event.duration_seconds
+            self.payload_bytes += event.payload_bytes
+
+
+class SessionUsage:
+    """Records the requests and tool calls of one session into its UsageTracker."""
+
+    def __init__(self, tracker: "UsageTracker", approach: str, session: int) -> None:
+        self.tracker = tracker
+        self.approach = approach
+        self.session = session
+        self.turn = 0
+
+    async def create(self, client: Any, **kwargs: Any) -> Any:
+        """``client.messages.create(**kwargs)``, recording its latency and token usage."""
+        return await self.measure(client.messages.create(**kwargs))
+
+    async def measure(self, request: Awaitable[Any]) -> Any:
+        """Await a model request (e.g. a streamed message) and record its latency and token usage."""
+        start = time.perf_counter()
+        response = await request
+        self.record_request(getattr(response, "usage", None), time.perf_counter() - start)
+        return response
+
+    def record_request(self, usage: Any, latency_seconds: float) -> None:
+        self.turn += 1
+        self.tracker.record(
+            RequestEvent(
+                approach=self.approach,
+                session=self.session,
+                turn=self.turn,
+                latency_seconds=latency_seconds,
+                input_tokens=_usage_value(usage, "input_tokens"),
+                output_tokens=_usage_value(usage, "output_tokens"),
+                cache_creation_input_tokens=_usage_value(usage, "cache_creation_input_tokens"),
+                cache_read_input_tokens=_usage_value(usage, "cache_read_input_tokens"),
+            )
+        )
+
+    def record_tool_call(self, block: Any, result: dict[str, Any], elapsed_seconds: float) -> None:
+        """ToolDispatcher observer: one event per tool_result."""
+        content = result.get("content", "")
+        payload = content if isinstance(content, str) else json.dumps(content)
+        self.tracker.record(
+            ToolCallEvent(
+                approach=self.approach,
+                session=self.session,
+                turn=self.turn,
+                tool=str(block.name),
+                duration_seconds=elapsed_seconds,
+                payload_bytes=len(payload.encode("utf-8")),
+                is_error=bool(result.get("is_error", False)),
+            )
+        )
+
+
+class UsageTracker:
+    """Collects usage events from concurrent sessions and exports them.
+
+    ``session(approach)`` hands out a SessionUsage with the next session number for that
+    approach. ``summaries`` aggregates per session and per approach; ``write_jsonl`` and
+    ``write_prometheus`` export the events and totals.
+    """
+
+    def __init__(self) -> None:
+        self._events: list[RequestEvent | ToolCallEvent] = []
+        self._counters: dict[str, itertools.count[int]] = defaultdict(itertools.count)
+        self._lock = threading.Lock()
+
+    def session(self, approach: str) -> SessionUsage:
+        with self._lock:
+            return SessionUsage(self, approach, next(self._counters[approach]))
+
+    def record(self, event: "RequestEvent | ToolCallEvent") -> None:
+        with self._lock:
+            self._events.append(event)
+
+    def events(self) -> list["RequestEvent | ToolCallEvent"]:
+        with self._lock:
+            return list(self._events)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events.clear()
+            self._counters.clear()
+
+    def summaries(self, per_session: bool = True) -> list[UsageSummary]:
+        """Totals per (approach, session), or per approach with ``per_session=False``."""
+        totals: dict[tuple[str, Optional[int]], UsageSummary] = {}
+        for event in self.events():
+            key = (event.approach, event.session if per_session else None)
+            if key not in totals:
+                totals[key] = UsageSummary(*key)
+            totals[key].add(event)
+        return [totals[key] for key in sorted(totals, key=lambda k: (k[0], -1 if k[1] is None else k[1]))]
+
+    def write_jsonl(self, stream: TextIO, include_events: bool = True) -> None:
+        """One JSON object per line: every event (optional), then per-session and per-approach totals."""
+        records: Iterable[Any] = itertools.chain(
+            self.events() if include_events else [], self.summaries(), self.summaries(per_session=False)
+        )
+        stream.writelines(json.dumps(asdict(record)) + "\n" for record in records)
+
+    def write_prometheus(self, stream: TextIO, prefix: str = "ptc_demo") -> None:
+        """Per-approach totals in the Prometheus text exposition format."""
+        by_approach = self.summaries(per_session=False)
+        by_tool: dict[tuple[str, str], list[float]] = defaultdict(lambda: [0, 0.0, 0, 0])
+        for event in self.events():
+            if isinstance(event, ToolCallEvent):
+                totals = by_tool[(event.approach, event.tool)]
+                totals[0] += 1
+                totals[1] += event.duration_seconds
+                totals[2] += event.payload_bytes
+                totals[3] += int(event.is_error)
+
+        def metric(name: str, kind: str, help_text: str, samples: Iterable[tuple[str, float]]) -> None:
+            stream.write(f"# HELP {prefix}_{name} {help_text}\n# TYPE {prefix}_{name} {kind}\n")
+            stream.writelines(f"{prefix}_{name}{{{labels}}} {value}\n" for labels, value in samples)
+
+        metric(
+            "requests_total",
+            "counter",
+            "Model requests.",
+            ((f'approach="{s.approach}"', s.requests) for s in by_approach),
+        )
+        metric(
+            "tokens_total",
+            "counter",
+            "Tokens reported by the API, by type.",
+            (
+                (f'approach="{s.approach}",type="{key.removesuffix("_tokens")}"', getattr(s, key))
+                for s in by_approach
+                for key in TOKEN_FIELDS
+            ),
+        )
+        metric(
+            "api_latency_seconds_total",
+            "counter",
+            "Summed model request round-trip time.",
+            ((f'approach="{s.approach}"', s.api_seconds) for s in by_approach),
+        )
+        for index, (name, help_text) in enumerate(
+            [
+                ("tool_calls_total", "Tool calls."),
+                ("tool_seconds_total", "Summed tool execution time."),
+                ("tool_result_bytes_total", "Bytes of tool_result content sent back to the model or sandbox."),
+                ("tool_errors_total", "Tool calls that returned an error result."),
+            ]
+        ):
+            metric(
+                name,
+                "counter",
+                help_text,
+                ((f'approach="{a}",tool="{t}"', totals[index]) for (a, t), totals in sorted(by_tool.items())),
+            )
@@ -0,0 +1,307 @@
+"""On-disk feature store: calculate_feature results persisted as Arrow IPC or Parquet files across processes."""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Optional, Set, Union
+
+import pandas as pd
+import pyarrow as pa
+from mloda.steward import Extender, ExtenderHook
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+
+# Schema metadata key recording whether a stored table came from a pandas frame or an Arrow table.
+_KIND_KEY = b"ptc_mloda_demo.result_kind"
+
+_TMP_SUFFIX = ".tmp"
+
+Result = Union[pd.DataFrame, pa.Table]
+
+# The " at 0x..." of default reprs, which differs between runs of the same options.
+_ADDRESS = re.compile(r" at 0x[0-9a-fA-F]+")
+
+
+@dataclass
+class FeatureStoreStats:
+    """Counters for store effectiveness, exposed via FeatureStore.stats."""
+
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    errors: int = 0
+
+
+def _stable_repr(value: Any) -> str:
+    return _ADDRESS.sub("", repr(value))
+
+
+class FeatureStore:
+    """Directory of materialized feature results, shared by every process that points at it.
+
+    Each result lives in ``<root>/<feature group>/<key>.<ext>``. ``format="arrow"`` writes
+    uncompressed Arrow IPC files that are read back memory-mapped, so a hit maps the file
+    instead of decoding it; ``"parquet"`` writes smaller files that are decoded on read.
+
+    Writers are safe to run concurrently: every file is written under a unique temporary
+    name in the target directory and renamed into place, so readers only ever see complete
+    files and the last of two writers of the same key wins. Hits touch the file's mtime;
+    after each write the least recently used files are deleted until the store fits in
+    ``max_bytes``, along with temporary files older than ``stale_tmp_seconds`` left by
+    crashed writers. Files deleted while mapped stay readable until unmapped (POSIX).
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        max_bytes: int = 1024 * 1024 * 1024,
+        format: str = "arrow",
+        stale_tmp_seconds: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format {format!r}; expected one of {sorted(FORMATS)}")
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.format = format
+        self.stale_tmp_seconds = stale_tmp_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.stats = FeatureStoreStats()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Pickled into MULTIPROCESSING workers with the extender; locks are not picklable.
+        return {k: v for k, v in self.__dict__.items() if k != "_lock"}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Stable hex digest of JSON-serializable ``parts``; values JSON cannot encode are keyed by repr,
+        without memory addresses (so a per-run DuckDB connection in the options keys like any other)."""
+        payload = json.dumps(parts, sort_keys=True, default=_stable_repr, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    def path(self, feature_group: str, key: str) -> Path:
+        return self.root / feature_group / f"{key}{FORMATS[self.format]}"
+
+    def get(self, feature_group: str, key: str) -> Optional[Result]:
+        """The stored result, or None on a miss. Unreadable files are deleted and count as misses."""
+        path = self.path(feature_group, key)
+        try:
+            table = self._read(path)
+            os.utime(path)
+        except FileNotFoundError:
+            self._count("misses")
+            return None
+        except (OSError, pa.ArrowException) as e:
+            logger.warning("discarding unreadable feature store file %s: %r", path, e)
+            path.unlink(missing_ok=True)
+            self._count("errors", "misses")
+            return None
+        self._count("hits")
+        return self._to_result(table)
+
+    def put(self, feature_group: str, key: str, result: Result) -> None:
+        """Write ``result`` atomically, then evict until the store fits in max_bytes."""
+        if isinstance(result, pd.DataFrame):
+            table = pa.Table.from_pandas(result)
+            kind = b"pandas"
+        else:
+            table = result
+            kind = b"arrow"
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), _KIND_KEY: kind})
+
+        path = self.path(feature_group, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{key}.", suffix=_TMP_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                self._write(table, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._count("writes")
+        self.cleanup()
+
+    def cleanup(self) -> int:
+        """Delete least recently used files beyond max_bytes, and stale temporary files; returns bytes freed."""
+        now = self._clock()
+        files: list[tuple[float, int, Path]] = []
+        freed = 0
+        for path in self.root.glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # removed by another process
+            if path.name.endswith(_TMP_SUFFIX):
+                if now - stat.st_mtime > self.stale_tmp_seconds:
+                    path.unlink(missing_ok=True)
+                    freed += stat.st_size
+            elif path.suffix in FORMATS.values():
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        evicted = 0
+        for _, size, path in sorted(files, key=lambda f: f[0]):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            freed += size
+            evicted += 1
+        if evicted:
+            with self._lock:
+                self.stats.evictions += evicted
+        return freed
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.root.glob("*/*") if p.suffix in FORMATS.values())
+
+    def clear(self) -> None:
+        for path in self.root.glob("*/*"):
+            path.unlink(missing_ok=True)
+
+    def _write(self, table: pa.Table, sink: Any) -> None:
+        if self.format == "parquet":
+            import pyarrow.parquet as pq  # only parquet stores pay for its import
+
+            pq.write_table(table, sink)
+        else:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+    def _read(self, path: Path) -> pa.Table:
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.read_table(path, memory_map=True)
+        # The table's buffers point into the mapping: no copy, and pages load on first touch.
+        with pa.memory_map(str(path)) as source:
+            return pa.ipc.open_file(source).read_all()
+
+    @staticmethod
+    def _to_result(table: pa.Table) -> Result:
+        if (table.schema.metadata or {}).get(_KIND_KEY) == b"arrow":
+            return table
+        # split_blocks keeps each column its own block, so numeric columns without nulls stay zero-copy.
+        return table.to_pandas(split_blocks=True)
+
+    def _count(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+
+class FeatureStoreExtender(Extender):
+    """Wraps calculate_feature to serve results from a FeatureStore and persist new ones.
+
+    A result is keyed by feature group, the requested feature names, their options and
+    filters, a hash of the source file defining its calculate_feature, ``data_version``,
+    for feature groups with input data, a content hash of that input and, for feature groups
+    defining a ``source_fingerprint(features)`` classmethod, its result (e.g. sizes and mtimes
+    of the files it reads). Bump ``data_version`` when other data a feature group reads
+    changes outside of its options. Results that are
+    neither a pandas DataFrame nor an Arrow table, and inputs of any other type, pass
+    through uncached. ``feature_groups`` limits the store to those feature group names.
+    """
+
+    def __init__(self, store: FeatureStore, data_version: str = "", feature_groups: Optional[Set[str]] = None) -> None:
+        self.store = store
+        self.data_version = data_version
+        self.feature_groups = feature_groups
+        self._code_versions: dict[str, str] = {}
+
+    def wraps(self) -> Set[ExtenderHook]:
+        return {ExtenderHook.FEATURE_GROUP_CALCULATE_FEATURE}
+
+    def __call__(self, func: Any, *args: Any, **kwargs: Any) -> Any:
+        name = self.feature_group_name(func)
+        if self.feature_groups is not None and name not in self.feature_groups:
+            return func(*args, **kwargs)
+        key = self.key(func, args)
+        if key is None:
+            return func(*args, **kwargs)
+
+        cached = self.store.get(name, key)
+        if cached is not None:
+            return cached
+        result = func(*args, **kwargs)
+        if isinstance(result, (pd.DataFrame, pa.Table)):
+            self.store.put(name, key, result)
+        return result
+
+    def key(self, func: Any, args: tuple[Any, ...]) -> Optional[str]:
+        """Store key for this call, or None if its input data or source cannot be fingerprinted."""
+        data = args[0] if args else None
+        if data is None:
+            input_hash = None
+        elif isinstance(data, pd.DataFrame):
+            input_hash = hashlib.sha256(pd.util.hash_pandas_object(data).to_numpy().tobytes()).hexdigest()
+            input_hash += "|" + ",".join(map(str, data.columns))
+        else:
+            return None
+
+        features = self.feature_set(args)
+        names: list[str] = []
+        options: Any = None
+        filters: Any = None
+        if features is not None:
+            names = sorted(str(n) for n in features.get_all_names())
+            if features.options is not None:
+                options = [features.options.group, features.options.context]
+            filters = sorted(map(repr, features.filters or ()))
+        try:
+            source = self._source_fingerprint(func, features)
+        except OSError:
+            return None
+        return self.store.make_key(
+            self.feature_group_name(func),
+            names,
+            options,
+            filters,
+            self._code_version(func),
+            self.data_version,
+            input_hash,
+            source,
+        )
+
+    @staticmethod
+    def _source_fingerprint(func: Any, features: Any) -> Any:
+        """The owning feature group's ``source_fingerprint(features)``; None if it defines none."""
+        owner = getattr(func, "__self__", None) or getattr(inspect.unwrap(func), "__self__", None)
+        fingerprint = getattr(owner, "source_fingerprint", None)
+        if fingerprint is None or features is None:
+            return None
+        return fingerprint(features)
+
+    def _code_version(self, func: Any) -> str:
+        """Hash of the source file defining ``func``, so editing a feature group invalidates its results."""
+        module_name = getattr(func, "__module__", None) or ""
+        version = self._code_versions.get(module_name)
+        if version is None:
+            path = getattr(sys.modules.get(module_name), "__file__", None)
+            try:
+                version = hashlib.sha256(Path(path).read_bytes()).hexdigest() if path else module_name
+            except OSError:
+                version = module_name
+            self._code_versions[module_name] = version
+        return version
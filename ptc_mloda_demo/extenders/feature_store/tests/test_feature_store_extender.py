@@ -0,0 +1,232 @@
+"""Tests for FeatureStore and FeatureStoreExtender."""
+
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Union
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from mloda.provider import FeatureSet
+from mloda.steward import Extender, ExtenderHook
+from mloda.user import Feature, PluginLoader
+from mloda.user import mloda as mlodaAPI
+
+from ptc_mloda_demo.extenders.feature_store.feature_store_extender import FeatureStore, FeatureStoreExtender
+from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import ROWS_OPTION, generate_employees
+
+
+def _frame(rows: int = 1_000) -> pd.DataFrame:
+    return generate_employees(rows, seed=1)
+
+
+def _age(path: Path, seconds: float) -> None:
+    stat = path.stat()
+    os.utime(path, (stat.st_atime - seconds, stat.st_mtime - seconds))
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Store
+# ---------------------------------------------------------------------------
+
+
+class TestFeatureStore:
+    """Results round-trip through files that any process can read."""
+
+    @pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+    def test_round_trips_frames(self, tmp_path: Path, fmt: str) -> None:
+        store = FeatureStore(tmp_path, format=fmt)
+        frame = _frame()
+        assert store.get("G", "k") is None
+        store.put("G", "k", frame)
+        restored = store.get("G", "k")
+        assert isinstance(restored, pd.DataFrame)
+        pd.testing.assert_frame_equal(restored, frame)
+        assert store.path("G", "k").exists()
+        assert (store.stats.hits, store.stats.misses, store.stats.writes) == (1, 1, 1)
+
+    def test_arrow_tables_come_back_as_tables(self, tmp_path: Path) -> None:
+        store = FeatureStore(tmp_path)
+        table = pa.table({"a": [1, 2, 3]})
+        store.put("G", "k", table)
+        restored = store.get("G", "k")
+        assert isinstance(restored, pa.Table)
+        assert restored.column("a").to_pylist() == [1, 2, 3]
+
+    def test_arrow_hit_is_memory_mapped(self, tmp_path: Path) -> None:
+        store = FeatureStore(tmp_path)
+        store.put("G", "k", _frame())
+        restored = store.get("G", "k")
+        assert isinstance(restored, pd.DataFrame)
+        assert not restored["salary"].to_numpy().flags.owndata
+
+    def test_a_new_store_on_the_same_directory_sees_results(self, tmp_path: Path) -> None:
+        FeatureStore(tmp_path).put("G", "k", _frame())
+        assert FeatureStore(tmp_path).get("G", "k") is not None
+
+    def test_unreadable_file_is_discarded(self, tmp_path: Path) -> None:
+        store = FeatureStore(tmp_path)
+        path = store.path("G", "k")
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"not arrow")
+        assert store.get("G", "k") is None
+        assert not path.exists()
+        assert store.stats.errors == 1
+
+    def test_unknown_format(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError, match="Unknown format"):
+            FeatureStore(tmp_path, format="csv")
+
+    def test_is_picklable(self, tmp_path: Path) -> None:
+        store = pickle.loads(pickle.dumps(FeatureStore(tmp_path)))
+        store.put("G", "k", _frame(10))
+        assert store.get("G", "k") is not None
+
+    def test_make_key_is_stable(self) -> None:
+        assert FeatureStore.make_key("G", {"b": 1, "a": 2}) == FeatureStore.make_key("G", {"a": 2, "b": 1})
+        assert FeatureStore.make_key("G", 1) != FeatureStore.make_key("G", 2)
+        assert FeatureStore.make_key("G", {"conn": object()}) == FeatureStore.make_key("G", {"conn": object()})
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Cleanup and concurrent writers
+# ---------------------------------------------------------------------------
+
+
+class TestCleanup:
+    """The store stays within max_bytes and never exposes partial files."""
+
+    def test_evicts_least_recently_used_beyond_max_bytes(self, tmp_path: Path) -> None:
+        store = FeatureStore(tmp_path, max_bytes=10**9)
+        for index, key in enumerate(["a", "b", "c"]):
+            store.put("G", key, _frame())
+            _age(store.path("G", key), 100 - index)
+        store.get("G", "a")  # most recently used now
+        one_file = store.path("G", "a").stat().st_size
+        store.max_bytes = 2 * one_file
+        store.cleanup()
+        assert [k for k in "abc" if store.path("G", k).exists()] == ["a", "c"]
+        assert store.stats.evictions == 1
+
+    def test_put_keeps_store_within_budget(self, tmp_path: Path) -> None:
+        store = FeatureStore(tmp_path, max_bytes=1)
+        store.put("G", "a", _frame())
+        store.put("G", "b", _frame())
+        assert store.total_bytes == 0
+        assert store.stats.evictions == 2
+
+    def test_removes_stale_temporary_files_only(self, tmp_path: Path) -> None:
+        store = FeatureStore(tmp_path, stale_tmp_seconds=60)
+        (tmp_path / "G").mkdir()
+        stale, fresh = tmp_path / "G" / ".x.1.tmp", tmp_path / "G" / ".x.2.tmp"
+        stale.write_bytes(b"partial")
+        fresh.write_bytes(b"partial")
+        _age(stale, 120)
+        store.cleanup()
+        assert not stale.exists() and fresh.exists()
+
+    def test_concurrent_writers_of_one_key(self, tmp_path: Path) -> None:
+        frame = _frame(50_000)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(FeatureStore(tmp_path).put, "G", "k", frame) for _ in range(8)]
+        for future in futures:
+            future.result()
+        assert [p.name for p in (tmp_path / "G").iterdir()] == [FeatureStore(tmp_path).path("G", "k").name]
+        restored = FeatureStore(tmp_path).get("G", "k")
+        assert isinstance(restored, pd.DataFrame)
+        pd.testing.assert_frame_equal(restored, frame)
+
+
+# ---------------------------------------------------------------------------
+# Level 3: Extender and integration with mloda.run_all()
+# ---------------------------------------------------------------------------
+
+
+class TestFeatureStoreExtender:
+    """calculate_feature results are served from the store on later runs."""
+
+    def test_structure(self, tmp_path: Path) -> None:
+        assert issubclass(FeatureStoreExtender, Extender)
+        assert FeatureStoreExtender(FeatureStore(tmp_path)).wraps() == {ExtenderHook.FEATURE_GROUP_CALCULATE_FEATURE}
+
+    def test_unhashable_inputs_and_other_results_pass_through(self, tmp_path: Path) -> None:
+        store = FeatureStore(tmp_path)
+        ext = FeatureStoreExtender(store)
+        assert ext(lambda data, features: "x", object(), None) == "x"
+        assert ext(lambda data, features: 42, None, None) == 42
+        assert store.stats.writes == 0
+
+    def test_input_data_is_part_of_the_key(self, tmp_path: Path) -> None:
+        ext = FeatureStoreExtender(FeatureStore(tmp_path))
+        calls: list[int] = []
+
+        def doubled(data: pd.DataFrame, features: Any) -> pd.DataFrame:
+            calls.append(1)
+            return data * 2
+
+        first, second = pd.DataFrame({"a": [1]}), pd.DataFrame({"a": [2]})
+        assert ext(doubled, first, None)["a"].tolist() == [2]
+        assert ext(doubled, first.copy(), None)["a"].tolist() == [2]
+        assert ext(doubled, second, None)["a"].tolist() == [4]
+        assert len(calls) == 2
+
+    def test_feature_groups_limits_the_store(self, tmp_path: Path) -> None:
+        store = FeatureStore(tmp_path)
+        FeatureStoreExtender(store, feature_groups={"Other"})(lambda data, features: _frame(10), None, None)
+        assert store.stats.writes == 0
+
+    def test_source_fingerprint_is_part_of_the_key(self, tmp_path: Path) -> None:
+        ext = FeatureStoreExtender(FeatureStore(tmp_path))
+        features = FeatureSet()
+        features.add(Feature("a"))
+
+        class Source:
+            version = 1
+
+            @classmethod
+            def source_fingerprint(cls, features: FeatureSet) -> int:
+                if cls.version < 0:
+                    raise FileNotFoundError("gone")
+                return cls.version
+
+            @classmethod
+            def calculate_feature(cls, data: Any, features: FeatureSet) -> pd.DataFrame:
+                return pd.DataFrame({"a": [cls.version]})
+
+        assert ext(Source.calculate_feature, None, features)["a"].tolist() == [1]
+        Source.version = 2
+        assert ext(Source.calculate_feature, None, features)["a"].tolist() == [2]
+        Source.version = -1
+        assert ext.key(Source.calculate_feature, (None, features)) is None
+        assert ext.store.stats.writes == 2
+
+    def _run(self, store: FeatureStore, rows: int, data_version: str = "") -> pd.DataFrame:
+        PluginLoader.all()
+        features: list[Union[Feature, str]] = [
+            Feature.not_typed(name, options={ROWS_OPTION: rows}) for name in ("employee_id", "salary")
+        ]
+        results = mlodaAPI.run_all(
+            features,
+            compute_frameworks=["PandasDataFrame"],
+            function_extender={FeatureStoreExtender(store, data_version=data_version)},
+        )
+        return pd.concat(results, axis=1)
+
+    def test_later_runs_read_the_store(self, tmp_path: Path) -> None:
+        first = self._run(FeatureStore(tmp_path), 500)
+        restarted = FeatureStore(tmp_path)
+        second = self._run(restarted, 500)
+        pd.testing.assert_frame_equal(first, second)
+        assert restarted.stats.hits >= 1 and restarted.stats.misses == 0
+
+    def test_options_and_data_version_are_part_of_the_key(self, tmp_path: Path) -> None:
+        store = FeatureStore(tmp_path)
+        assert len(self._run(store, 500)) == 500
+        misses = store.stats.misses
+        assert len(self._run(store, 600)) == 600
+        assert store.stats.misses > misses
+        misses = store.stats.misses
+        self._run(store, 600, data_version="v2")
+        assert store.stats.misses > misses
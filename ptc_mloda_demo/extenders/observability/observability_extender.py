@@ -1,34 +1,235 @@
-"""Observability extender: logs execution time and result shape for each feature calculation."""
+"""Observability extender: per-feature-group latency, size and memory metrics for each feature calculation."""
 
+import bisect
+import json
 import logging
+import math
+import random
+import threading
 import time
-from typing import Any, Set
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Set, TextIO
 
 import pandas as pd
+import pyarrow as pa
 from mloda.steward import Extender, ExtenderHook
 
 logger = logging.getLogger(__name__)
 
+PERCENTILES = (50, 95, 99)
+
+# Geometric latency buckets from 1µs to ~2.7h, 10% apart: percentiles are accurate to one bucket.
+_BUCKET_BOUNDS = tuple(1e-6 * 1.1**i for i in range(int(math.log(1e4 / 1e-6, 1.1)) + 1))
+
+
+@dataclass
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; memory stays constant however many calls it records."""
+
+    counts: list[int] = field(default_factory=lambda: [0] * (len(_BUCKET_BOUNDS) + 1))
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(_BUCKET_BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (0 < q <= 100), capped at the max seen."""
+        if self.count == 0:
+            return 0.0
+        rank = math.ceil(q / 100 * self.count)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(_BUCKET_BOUNDS[index], self.max) if index < len(_BUCKET_BOUNDS) else self.max
+        return self.max
+
+
+@dataclass
+class FeatureGroupStats:
+    """Aggregates for one feature group. Only sampled calls contribute latency, size and memory."""
+
+    calls: int = 0
+    sampled: int = 0
+    errors: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    rows: int = 0
+    columns: int = 0
+    bytes: int = 0
+    peak_alloc_bytes: int = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "sampled": self.sampled,
+            "errors": self.errors,
+            **{f"p{q}_seconds": self.latency.percentile(q) for q in PERCENTILES},
+            "sum_seconds": self.latency.total,
+            "mean_seconds": self.latency.total / self.latency.count if self.latency.count else 0.0,
+            "max_seconds": self.latency.max,
+            "rows": self.rows,
+            "columns": self.columns,
+            "bytes": self.bytes,
+            "peak_alloc_bytes": self.peak_alloc_bytes,
+        }
+
+
+class ObservabilityMetrics:
+    """Thread-safe registry of FeatureGroupStats, shareable between extender instances and runs."""
+
+    def __init__(self) -> None:
+        self._stats: dict[str, FeatureGroupStats] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Extenders are pickled into MULTIPROCESSING workers; locks are not picklable.
+        return {"_stats": self._stats}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self._stats = state["_stats"]
+        self._lock = threading.Lock()
+
+    def count_call(self, name: str) -> None:
+        with self._lock:
+            self._stats.setdefault(name, FeatureGroupStats()).calls += 1
+
+    def record(
+        self,
+        name: str,
+        seconds: float,
+        error: bool = False,
+        shape: Optional[tuple[int, int]] = None,
+        nbytes: int = 0,
+        peak_alloc_bytes: int = 0,
+    ) -> None:
+        with self._lock:
+            stats = self._stats.setdefault(name, FeatureGroupStats())
+            stats.calls += 1
+            stats.sampled += 1
+            stats.errors += int(error)
+            stats.latency.record(seconds)
+            if shape is not None:
+                stats.rows += shape[0]
+                stats.columns += shape[1]
+            stats.bytes += nbytes
+            stats.peak_alloc_bytes = max(stats.peak_alloc_bytes, peak_alloc_bytes)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        """Point-in-time copy of every feature group's aggregates, keyed by feature group name."""
+        with self._lock:
+            return {name: self._stats[name].snapshot() for name in sorted(self._stats)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def write_jsonl(self, stream: TextIO) -> None:
+        stream.writelines(
+            json.dumps({"feature_group": name, **values}) + "\n" for name, values in self.snapshot().items()
+        )
+
+    def write_prometheus(self, stream: TextIO, prefix: str = "mloda_feature_group") -> None:
+        """Snapshot in the Prometheus text exposition format (latency as a summary with quantiles)."""
+        snapshot = self.snapshot()
+        stream.write(f"# HELP {prefix}_latency_seconds calculate_feature latency of sampled calls.\n")
+        stream.write(f"# TYPE {prefix}_latency_seconds summary\n")
+        for name, values in snapshot.items():
+            stream.writelines(
+                f'{prefix}_latency_seconds{{feature_group="{name}",quantile="{q / 100}"}} {values[f"p{q}_seconds"]}\n'
+                for q in PERCENTILES
+            )
+            stream.write(f'{prefix}_latency_seconds_sum{{feature_group="{name}"}} {values["sum_seconds"]}\n')
+            stream.write(f'{prefix}_latency_seconds_count{{feature_group="{name}"}} {values["sampled"]}\n')
+        for key, kind in [
+            ("calls", "counter"),
+            ("sampled", "counter"),
+            ("errors", "counter"),
+            ("rows", "counter"),
+            ("columns", "counter"),
+            ("bytes", "counter"),
+            ("peak_alloc_bytes", "gauge"),
+        ]:
+            metric = f"{prefix}_{key}" + ("_total" if kind == "counter" else "")
+            stream.write(f"# TYPE {metric} {kind}\n")
+            stream.writelines(
+                f'{metric}{{feature_group="{name}"}} {values[key]}\n' for name, values in snapshot.items()
+            )
+
 
 class ObservabilityExtender(Extender):
-    """Wraps calculate_feature to log execution time and result shape.
+    """Wraps calculate_feature to record per-feature-group metrics.
 
     Designed for PTC (Programmatic Tool Calling) where the orchestration loop
     is internal to Claude, so observability must be injected into mloda.run_all()
     via function_extender rather than the loop itself.
+
+    Every call is counted; a ``sample_rate`` fraction of calls is also timed into a
+    latency histogram and, for pandas DataFrame and Arrow table results, adds rows,
+    columns and (deep) memory bytes. With ``trace_memory`` sampled calls also capture their tracemalloc peak
+    (process-wide, so concurrent calculations inflate each other's peaks). Pass a
+    shared ``metrics`` to aggregate across runs, and ``log_calls=False`` to drop the
+    per-call log lines on hot paths.
     """
 
+    def __init__(
+        self,
+        metrics: Optional[ObservabilityMetrics] = None,
+        sample_rate: float = 1.0,
+        trace_memory: bool = False,
+        log_calls: bool = True,
+        rng: Callable[[], float] = random.random,
+    ) -> None:
+        self.metrics = metrics if metrics is not None else ObservabilityMetrics()
+        self.sample_rate = sample_rate
+        self.trace_memory = trace_memory
+        self.log_calls = log_calls
+        self._rng = rng
+
     def wraps(self) -> Set[ExtenderHook]:
         return {ExtenderHook.FEATURE_GROUP_CALCULATE_FEATURE}
 
     def __call__(self, func: Any, *args: Any, **kwargs: Any) -> Any:
+        name = self.feature_group_name(func)
+        if self.sample_rate < 1.0 and self._rng() >= self.sample_rate:
+            self.metrics.count_call(name)
+            return func(*args, **kwargs)
+
+        tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif self.trace_memory:
+            tracemalloc.reset_peak()
         start = time.perf_counter()
-        result = func(*args, **kwargs)
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.metrics.record(name, time.perf_counter() - start, error=True)
+            raise
+        finally:
+            peak = tracemalloc.get_traced_memory()[1] if self.trace_memory else 0
+            if tracing:
+                tracemalloc.stop()
         elapsed = time.perf_counter() - start
 
-        logger.info("calculate_feature elapsed=%.4fs", elapsed)
-
+        shape: Optional[tuple[int, int]] = None
+        nbytes = 0
         if isinstance(result, pd.DataFrame):
-            logger.info("result shape=(%d, %d)", result.shape[0], result.shape[1])
+            shape = (result.shape[0], result.shape[1])
+            nbytes = int(result.memory_usage(deep=True).sum())
+        elif isinstance(result, pa.Table):
+            shape = (result.num_rows, result.num_columns)
+            nbytes = int(result.nbytes)
+        self.metrics.record(name, elapsed, shape=shape, nbytes=nbytes, peak_alloc_bytes=peak)
+
+        if self.log_calls:
+            logger.info("calculate_feature %s elapsed=%.4fs", name, elapsed)
+            if shape is not None:
+                logger.info("result shape=(%d, %d)", shape[0], shape[1])
 
         return result
@@ -1,14 +1,22 @@
 """Tests for ObservabilityExtender (TDD: red then green)."""
 
+import io
+import json
 import logging
+import pickle
 from typing import Any, Union
 
 import pandas as pd
+import pyarrow as pa
 from mloda.steward import Extender, ExtenderHook
 from mloda.user import Feature, PluginLoader
 from mloda.user import mloda as mlodaAPI
 
-from ptc_mloda_demo.extenders.observability.observability_extender import ObservabilityExtender
+from ptc_mloda_demo.extenders.observability.observability_extender import (
+    LatencyHistogram,
+    ObservabilityExtender,
+    ObservabilityMetrics,
+)
 
 import ptc_mloda_demo.feature_groups.sample_data.sample_data_features  # noqa: F401
 
@@ -75,6 +83,99 @@ class TestObservabilityExtenderBehavior:
         assert len(shape_messages) == 0
 
 
+class TestObservabilityMetrics:
+    """Per-feature-group aggregation, sampling, memory capture and export."""
+
+    def test_histogram_percentiles(self) -> None:
+        hist = LatencyHistogram()
+        for ms in range(1, 101):
+            hist.record(ms / 1000)
+        assert hist.count == 100
+        assert 0.050 <= hist.percentile(50) <= 0.050 * 1.1
+        assert 0.095 <= hist.percentile(95) <= 0.095 * 1.1
+        assert hist.percentile(99) <= hist.percentile(100) == hist.max == 0.1
+
+    def test_records_per_feature_group(self) -> None:
+        class FakeGroup:
+            @classmethod
+            def calculate_feature(cls) -> pd.DataFrame:
+                return pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+
+        ext = ObservabilityExtender()
+        ext(FakeGroup.calculate_feature)
+        ext(FakeGroup.calculate_feature)
+        stats = ext.metrics.snapshot()["FakeGroup"]
+        assert (stats["calls"], stats["sampled"], stats["rows"], stats["columns"]) == (2, 2, 6, 4)
+        assert stats["bytes"] > 0
+        assert 0 < stats["p50_seconds"] <= stats["p99_seconds"] <= stats["max_seconds"]
+
+    def test_records_arrow_tables(self) -> None:
+        table = pa.table({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+
+        class ArrowGroup:
+            @classmethod
+            def calculate_feature(cls) -> pa.Table:
+                return table
+
+        ext = ObservabilityExtender()
+        ext(ArrowGroup.calculate_feature)
+        stats = ext.metrics.snapshot()["ArrowGroup"]
+        assert (stats["rows"], stats["columns"], stats["bytes"]) == (3, 2, table.nbytes)
+
+    def test_errors_are_counted_and_reraised(self) -> None:
+        def boom() -> None:
+            raise RuntimeError("boom")
+
+        ext = ObservabilityExtender()
+        try:
+            ext(boom)
+        except RuntimeError:
+            pass
+        (stats,) = ext.metrics.snapshot().values()
+        assert stats["errors"] == 1
+
+    def test_sampling_skips_measurement_but_counts_calls(self) -> None:
+        draws = iter([0.05, 0.5, 0.9, 0.01])
+        ext = ObservabilityExtender(sample_rate=0.1, rng=lambda: next(draws))
+        df = pd.DataFrame({"a": [1]})
+        for _ in range(4):
+            ext(lambda: df)
+        (stats,) = ext.metrics.snapshot().values()
+        assert (stats["calls"], stats["sampled"], stats["rows"]) == (4, 2, 2)
+
+    def test_trace_memory_captures_peak(self) -> None:
+        ext = ObservabilityExtender(trace_memory=True)
+        ext(lambda: bytearray(5_000_000))
+        (stats,) = ext.metrics.snapshot().values()
+        assert stats["peak_alloc_bytes"] >= 5_000_000
+
+    def test_log_calls_off(self, caplog: Any) -> None:
+        ext = ObservabilityExtender(log_calls=False)
+        with caplog.at_level(logging.INFO):
+            ext(lambda: pd.DataFrame({"a": [1]}))
+        assert caplog.records == []
+
+    def test_shared_metrics_export(self) -> None:
+        metrics = ObservabilityMetrics()
+        for _ in range(2):
+            ObservabilityExtender(metrics, log_calls=False)(lambda: pd.DataFrame({"a": [1, 2]}))
+        out = io.StringIO()
+        metrics.write_jsonl(out)
+        (line,) = out.getvalue().splitlines()
+        assert json.loads(line)["calls"] == 2
+        prom = io.StringIO()
+        metrics.write_prometheus(prom)
+        assert 'quantile="0.95"' in prom.getvalue()
+        assert "mloda_feature_group_rows_total" in prom.getvalue()
+
+    def test_metrics_are_picklable(self) -> None:
+        metrics = ObservabilityMetrics()
+        metrics.count_call("x")
+        clone = pickle.loads(pickle.dumps(metrics))
+        clone.count_call("x")
+        assert clone.snapshot()["x"]["calls"] == 2
+
+
 # ---------------------------------------------------------------------------
 # Level 3: Integration with mloda.run_all()
 # ---------------------------------------------------------------------------
@@ -97,3 +198,29 @@ class TestObservabilityExtenderIntegration:
         assert "salary" in results[0].columns
         elapsed_logs = [r for r in caplog.records if "elapsed" in r.message.lower()]
         assert len(elapsed_logs) >= 1
+
+    def test_run_all_aggregates_per_feature_group(self) -> None:
+        PluginLoader.all()
+        metrics = ObservabilityMetrics()
+        features: list[Union[Feature, str]] = [Feature.not_typed("employee_id"), Feature.not_typed("salary")]
+        for _ in range(3):
+            mlodaAPI.run_all(
+                features,
+                compute_frameworks=["PandasDataFrame"],
+                function_extender={ObservabilityExtender(metrics, log_calls=False)},
+            )
+        stats = metrics.snapshot()["EmployeeDataFeatures"]
+        assert stats["calls"] == 3
+        assert stats["rows"] == 30
+
+    def test_run_all_records_arrow_results(self) -> None:
+        PluginLoader.all()
+        metrics = ObservabilityMetrics()
+        mlodaAPI.run_all(
+            [Feature.not_typed("employee_id"), Feature.not_typed("salary")],
+            compute_frameworks=["PyArrowTable"],
+            function_extender={ObservabilityExtender(metrics, log_calls=False)},
+        )
+        stats = metrics.snapshot()["EmployeeDataFeatures"]
+        assert (stats["rows"], stats["columns"]) == (10, 2)
+        assert stats["bytes"] > 0
@@ -0,0 +1,154 @@
+"""Tests for Tracer and TracingExtender."""
+
+import asyncio
+import io
+import json
+import pickle
+from types import SimpleNamespace
+from typing import Any, Union
+
+import pytest
+from mloda.steward import Extender, ExtenderHook
+from mloda.user import Feature, PluginLoader
+from mloda.user import mloda as mlodaAPI
+
+from ptc_mloda_demo.agents.dispatch.tool_dispatcher import ToolDispatcher
+from ptc_mloda_demo.extenders.tracing.tracing_extender import Span, Tracer, TracingExtender, current_span
+
+import ptc_mloda_demo.feature_groups.sample_data.sample_data_features  # noqa: F401
+
+
+def _by_name(tracer: Tracer) -> dict[str, Span]:
+    return {span.name: span for span in tracer.spans()}
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Tracer
+# ---------------------------------------------------------------------------
+
+
+class TestTracer:
+    """Nesting, context propagation, bounds and export."""
+
+    def test_disabled_tracer_records_nothing(self) -> None:
+        tracer = Tracer()
+        with tracer.span("outer") as span:
+            assert span is None
+            assert current_span() is None
+        assert tracer.spans() == []
+
+    def test_spans_nest(self) -> None:
+        tracer = Tracer(enabled=True)
+        with tracer.span("outer", a=1) as outer, tracer.span("inner") as inner:
+            assert current_span() is inner
+        assert current_span() is None
+        spans = _by_name(tracer)
+        assert outer is not None and inner is not None
+        assert spans["inner"].parent_id == outer.span_id
+        assert spans["outer"].parent_id is None
+        assert spans["outer"].attrs == {"a": 1}
+        assert spans["outer"].duration_ns >= spans["inner"].duration_ns
+
+    def test_error_is_recorded(self) -> None:
+        tracer = Tracer(enabled=True)
+        with pytest.raises(KeyError), tracer.span("failing"):
+            raise KeyError("x")
+        assert tracer.spans()[0].attrs["error"] == "KeyError"
+
+    def test_parent_carries_across_tasks_and_dispatcher_threads(self) -> None:
+        tracer = Tracer(enabled=True)
+
+        def handler(name: str, inputs: dict[str, Any]) -> str:
+            with tracer.span(f"tool.{name}"):
+                return "ok"
+
+        dispatcher = ToolDispatcher(handler)
+        block = SimpleNamespace(type="tool_use", id="a", name="run_features", input={})
+
+        async def session() -> None:
+            with tracer.span("session"):
+                await asyncio.to_thread(dispatcher.dispatch, [block])
+
+        asyncio.run(session())
+        dispatcher.shutdown()
+        spans = _by_name(tracer)
+        assert spans["tool.run_features"].parent_id == spans["session"].span_id
+
+    def test_max_spans(self) -> None:
+        tracer = Tracer(enabled=True, max_spans=2)
+        for _ in range(3):
+            with tracer.span("x"):
+                pass
+        assert len(tracer.spans()) == 2
+        assert tracer.dropped == 1
+
+    def test_chrome_trace_export(self) -> None:
+        tracer = Tracer(enabled=True)
+        with tracer.span("session.loop"), tracer.span("tool.run_features"):
+            pass
+        out = io.StringIO()
+        tracer.write_chrome_trace(out)
+        events = json.loads(out.getvalue())["traceEvents"]
+        assert [e["name"] for e in events] == ["session.loop", "tool.run_features"]
+        assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+        assert events[1]["args"]["parent_id"] == events[0]["args"]["span_id"]
+        assert events[0]["cat"] == "session"
+
+    def test_json_export(self) -> None:
+        tracer = Tracer(enabled=True)
+        with tracer.span("x", rows=3):
+            pass
+        out = io.StringIO()
+        tracer.write_json(out)
+        (span,) = json.loads(out.getvalue())["spans"]
+        assert span["name"] == "x" and span["attrs"] == {"rows": 3}
+
+    def test_picklable(self) -> None:
+        tracer = Tracer(enabled=True)
+        with tracer.span("x"):
+            pass
+        clone = pickle.loads(pickle.dumps(TracingExtender(tracer)))
+        assert clone.tracer.enabled and clone.tracer.spans() == []
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Extender structure
+# ---------------------------------------------------------------------------
+
+
+class TestTracingExtenderStructure:
+    """Hooks every extender point by default; passthrough when disabled."""
+
+    def test_is_extender_wrapping_all_hooks(self) -> None:
+        ext = TracingExtender(Tracer())
+        assert isinstance(ext, Extender)
+        assert ext.wraps() == set(ExtenderHook)
+
+    def test_disabled_passthrough(self) -> None:
+        tracer = Tracer()
+        assert TracingExtender(tracer)(lambda x: x + 1, 1) == 2
+        assert tracer.spans() == []
+
+
+# ---------------------------------------------------------------------------
+# Level 3: Integration with mloda.run_all()
+# ---------------------------------------------------------------------------
+
+
+def test_run_all_spans_nest_below_caller() -> None:
+    PluginLoader.all()
+    tracer = Tracer(enabled=True)
+    features: list[Union[Feature, str]] = [Feature.not_typed("employee_id"), Feature.not_typed("salary")]
+    with tracer.span("tool.run_features"):
+        mlodaAPI.run_all(features, compute_frameworks=["PandasDataFrame"], function_extender={TracingExtender(tracer)})
+    spans = tracer.spans()
+    by_id = {s.span_id: s for s in spans}
+    (calculate,) = [s for s in spans if s.name == "mloda.feature_group_calculate_feature"]
+    assert calculate.attrs["feature_group"] == "EmployeeDataFeatures"
+    chain = []
+    parent_id = calculate.parent_id
+    while parent_id is not None:
+        chain.append(by_id[parent_id].name)
+        parent_id = by_id[parent_id].parent_id
+    assert chain == ["mloda.run", "tool.run_features"]
+    assert any(s.name == "mloda.plan" and s.attrs["status"] == "succeeded" for s in spans)
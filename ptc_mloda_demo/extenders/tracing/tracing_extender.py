@@ -0,0 +1,222 @@
+"""Nested tracing spans from agent turns down to mloda hooks, exportable as a Chrome trace."""
+
+import contextlib
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, ContextManager, Iterator, Optional, Set, TextIO
+
+from mloda.steward import Extender, ExtenderHook, HookContext, LifecycleOutcome, PlanContext, PlanStep, RunContext
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("ptc_mloda_demo_span", default=None)
+
+# Shared no-op context manager returned by a disabled tracer, so a disabled span costs one attribute check.
+_NOOP: ContextManager[None] = contextlib.nullcontext()
+
+
+@dataclass
+class Span:
+    name: str
+    span_id: int
+    parent_id: Optional[int]
+    thread_id: int
+    start_ns: int
+    end_ns: Optional[int] = None
+    attrs: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def duration_ns(self) -> int:
+        return 0 if self.end_ns is None else self.end_ns - self.start_ns
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span of the calling context, if any."""
+    return _current_span.get()
+
+
+class Tracer:
+    """Collects nested spans; parents follow contextvars, so they carry across await and copied contexts.
+
+    A disabled tracer records nothing and ``span`` returns a shared no-op context manager.
+    At most ``max_spans`` finished spans are kept; later ones are counted in ``dropped``.
+    """
+
+    def __init__(
+        self, enabled: bool = False, max_spans: int = 100_000, clock: Callable[[], int] = time.perf_counter_ns
+    ) -> None:
+        self.enabled = enabled
+        self.max_spans = max_spans
+        self.dropped = 0
+        self._clock = clock
+        self._ids = itertools.count(1)
+        self._spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Pickled into MULTIPROCESSING workers with the extender; worker spans stay in the worker.
+        state = {k: v for k, v in self.__dict__.items() if k != "_lock"}
+        state["_spans"] = []
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attrs: Any) -> ContextManager[Optional[Span]]:
+        """Context manager timing a child span of the current one."""
+        if not self.enabled:
+            return _NOOP
+        return self._span(name, attrs)
+
+    @contextlib.contextmanager
+    def _span(self, name: str, attrs: dict[str, Any]) -> Iterator[Optional[Span]]:
+        span = self.start(name, attrs)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            _current_span.reset(token)
+            self.finish(span)
+
+    def start(self, name: str, attrs: Optional[dict[str, Any]] = None, parent: Optional[Span] = None) -> Span:
+        """Open a span without making it current; ``parent`` defaults to the current span."""
+        parent = parent if parent is not None else _current_span.get()
+        return Span(
+            name=name,
+            span_id=next(self._ids),
+            parent_id=None if parent is None else parent.span_id,
+            thread_id=threading.get_ident(),
+            start_ns=self._clock(),
+            attrs=dict(attrs or {}),
+        )
+
+    def finish(self, span: Span) -> None:
+        span.end_ns = self._clock()
+        with self._lock:
+            if len(self._spans) < self.max_spans:
+                self._spans.append(span)
+            else:
+                self.dropped += 1
+
+    def spans(self) -> list[Span]:
+        """Finished spans, in the order they finished."""
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+            self.dropped = 0
+
+    def write_json(self, stream: TextIO) -> None:
+        """All finished spans with ids, parents and nanosecond timestamps."""
+        records = [
+            {
+                "name": s.name,
+                "span_id": s.span_id,
+                "parent_id": s.parent_id,
+                "thread_id": s.thread_id,
+                "start_ns": s.start_ns,
+                "duration_ns": s.duration_ns,
+                "attrs": s.attrs,
+            }
+            for s in self.spans()
+        ]
+        json.dump({"spans": records, "dropped": self.dropped}, stream, default=str)
+
+    def write_chrome_trace(self, stream: TextIO) -> None:
+        """Trace Event Format (complete events), loadable in chrome://tracing, Perfetto or speedscope."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": s.name,
+                "cat": s.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": s.start_ns / 1000,
+                "dur": s.duration_ns / 1000,
+                "pid": pid,
+                "tid": s.thread_id,
+                "args": {"span_id": s.span_id, "parent_id": s.parent_id, **s.attrs},
+            }
+            for s in sorted(self.spans(), key=lambda s: s.start_ns)
+        ]
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, stream, default=str)
+
+
+# Process-wide tracer, disabled unless PTC_MLODA_TRACE=1 or enabled explicitly (demo.py --trace).
+TRACER = Tracer(enabled=os.environ.get("PTC_MLODA_TRACE") == "1")
+
+
+class TracingExtender(Extender):
+    """Records mloda plan, run and hook spans into a Tracer.
+
+    Plan and run spans become the current span between their start and complete callbacks,
+    so every hook span of that run nests below them, and all of it below whatever span was
+    open around ``mloda.run_all``. Hook spans carry the feature group and feature names from
+    the ambient HookContext. Pass the extender only while tracing is enabled; a disabled
+    tracer makes every hook a direct call.
+    """
+
+    def __init__(self, tracer: Optional[Tracer] = None, hooks: Optional[Set[ExtenderHook]] = None) -> None:
+        self.tracer = tracer if tracer is not None else TRACER
+        self.hooks = set(ExtenderHook) if hooks is None else set(hooks)
+        self._open: dict[str, tuple[Span, contextvars.Token[Optional[Span]]]] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {**self.__dict__, "_open": {}}
+
+    def wraps(self) -> Set[ExtenderHook]:
+        return self.hooks
+
+    def __call__(self, func: Any, *args: Any, **kwargs: Any) -> Any:
+        if not self.tracer.enabled:
+            return func(*args, **kwargs)
+        context = HookContext.current()
+        name = "mloda.hook" if context is None else f"mloda.{context.hook.value}"
+        fg_class = None if context is None else context.feature_group_class
+        feature_group = fg_class.rsplit(".", 1)[-1] if fg_class else self.feature_group_name(func)
+        attrs: dict[str, Any] = {} if feature_group == "unknown" else {"feature_group": feature_group}
+        if context is not None:
+            attrs["features"] = list(context.feature_names)
+            if context.compute_framework_name:
+                attrs["compute_framework"] = context.compute_framework_name
+        with self.tracer.span(name, **attrs):
+            return func(*args, **kwargs)
+
+    def on_plan_start(self, plan: PlanContext) -> None:
+        self._open_span(f"plan:{plan.plan_id}", "mloda.plan", {"plan_id": plan.plan_id})
+
+    def on_plan_complete(self, plan: PlanContext, outcome: LifecycleOutcome) -> None:
+        self._close_span(f"plan:{plan.plan_id}", outcome)
+
+    def on_run_start(self, run: RunContext, plan: PlanContext, steps: tuple[PlanStep, ...]) -> None:
+        self._open_span(f"run:{run.run_id}", "mloda.run", {"run_id": run.run_id, "steps": len(steps)})
+
+    def on_run_complete(self, run: RunContext, outcome: LifecycleOutcome) -> None:
+        self._close_span(f"run:{run.run_id}", outcome)
+
+    def _open_span(self, key: str, name: str, attrs: dict[str, Any]) -> None:
+        if not self.tracer.enabled:
+            return
+        span = self.tracer.start(name, attrs)
+        self._open[key] = (span, _current_span.set(span))
+
+    def _close_span(self, key: str, outcome: LifecycleOutcome) -> None:
+        opened = self._open.pop(key, None)
+        if opened is None:
+            return
+        span, token = opened
+        span.attrs["status"] = outcome.status
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Completed from another context than it started in; leave that context untouched.
+            pass
+        self.tracer.finish(span)
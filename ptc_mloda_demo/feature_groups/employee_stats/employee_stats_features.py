@@ -0,0 +1,184 @@
+"""Aggregate and ranking features derived from EmployeeDataFeatures inside mloda.
+
+Answering "average salary per department" or "top 3 earners" from these features returns
+a handful of rows instead of the whole employee table. The kernels are numpy over the
+input columns, and each group returns the native type of its compute framework
+(pandas or Arrow).
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, ClassVar, Optional, Set
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from mloda.provider import ComputeFramework, FeatureGroup, FeatureSet
+from mloda.user import Feature, Options
+from mloda_plugins.compute_framework.base_implementations.pandas.dataframe import PandasDataFrame
+from mloda_plugins.compute_framework.base_implementations.pyarrow.table import PyArrowTable
+
+# Feature option: k of the top-k membership flags (default 3).
+TOP_K_OPTION = "top_k"
+DEFAULT_TOP_K = 3
+
+# Ranked column -> prefix of its derived row features.
+RANKED_COLUMNS = {"salary": "salary", "performance_score": "performance"}
+
+# <prefix>_rank: 1 for the highest value, ties share the best rank. <prefix>_percentile: percent of
+# employees with a value at or below this one. <prefix>_top_k: rank <= k.
+RANK_FEATURES: dict[str, tuple[str, str]] = {
+    f"{prefix}_{kind}": (column, kind)
+    for column, prefix in RANKED_COLUMNS.items()
+    for kind in ("rank", "percentile", "top_k")
+}
+
+# One row per department, in the department column's order. dept_name is the department itself.
+DEPARTMENT_FEATURES: dict[str, tuple[Optional[str], str]] = {
+    "dept_name": (None, "name"),
+    "dept_employee_count": (None, "count"),
+    **{
+        f"dept_{func}_{column}": (column, func)
+        for column in ("salary", "performance_score", "years_experience")
+        for func in ("mean", "median")
+    },
+}
+
+# Compute frameworks the derived feature groups run in; the others fail mloda's feature resolution.
+DERIVED_FRAMEWORKS: tuple[type[ComputeFramework], ...] = (PandasDataFrame, PyArrowTable)
+
+
+def _column(data: Any, name: str) -> np.ndarray:
+    if isinstance(data, pa.Table):
+        return np.asarray(data.column(name).to_numpy())
+    return np.asarray(data[name].to_numpy())
+
+
+def rank_descending(values: np.ndarray) -> np.ndarray:
+    """1 + the number of strictly greater values, so ties share the best rank (pandas method="min")."""
+    ordered = np.sort(values)
+    return (len(values) - np.searchsorted(ordered, values, side="right") + 1).astype(np.int64)
+
+
+def percentile(values: np.ndarray) -> np.ndarray:
+    """Percent of values at or below each value (pandas rank(method="max", pct=True) * 100)."""
+    if not len(values):
+        return np.empty(0, dtype=np.float64)
+    ordered = np.sort(values)
+    return np.searchsorted(ordered, values, side="right") * (100.0 / len(values))
+
+
+def group_stats(codes: np.ndarray, values: np.ndarray, groups: int) -> dict[str, np.ndarray]:
+    """count, mean and median of ``values`` per group code in ``range(groups)``, in one sort."""
+    count = np.bincount(codes, minlength=groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.bincount(codes, weights=values, minlength=groups) / count
+    ordered = values[np.lexsort((values, codes))].astype(np.float64)
+    starts = np.concatenate(([0], np.cumsum(count)[:-1]))
+    median = np.full(groups, np.nan)
+    present = count > 0
+    lower = starts[present] + (count[present] - 1) // 2
+    upper = starts[present] + count[present] // 2
+    median[present] = (ordered[lower] + ordered[upper]) / 2
+    return {"count": count.astype(np.int64), "mean": mean, "median": median}
+
+
+def _department_codes(data: Any) -> tuple[np.ndarray, list[str]]:
+    """Integer codes of the department column (category order, else by name); only the key column leaves Arrow."""
+    column = data.column("department").to_pandas() if isinstance(data, pa.Table) else data["department"]
+    codes, labels = pd.factorize(column, sort=True)
+    return np.asarray(codes), [str(label) for label in labels]
+
+
+class _EmployeeDerivedFeatures(FeatureGroup, ABC):
+    """Shared plumbing: inputs come from EmployeeDataFeatures with the requesting feature's options."""
+
+    FEATURES: ClassVar[dict[str, Any]] = {}
+
+    @classmethod
+    def feature_names_supported(cls) -> Set[str]:
+        return set(cls.FEATURES)
+
+    @classmethod
+    def compute_framework_rule(cls) -> Optional[set[type[ComputeFramework]]]:
+        return set(DERIVED_FRAMEWORKS)
+
+    def input_features(self, options: Options, feature_name: Any) -> Optional[Set[Feature]]:
+        return {Feature(column, options=options) for column in self._inputs(str(feature_name))}
+
+    @classmethod
+    @abstractmethod
+    def _inputs(cls, feature_name: str) -> list[str]:
+        """EmployeeDataFeatures columns ``feature_name`` is computed from."""
+
+    @staticmethod
+    def _option(features: FeatureSet, key: str) -> Any:
+        if features.options is None:
+            return None
+        return features.get_options_key(key)
+
+
+class EmployeeRankFeatures(_EmployeeDerivedFeatures):
+    """Per-employee salary and performance_score rank (1 = highest), percentile (percent of employees at or
+    below) and top-k membership flag (rank <= k, k from the top_k option, default 3; ties can make it more
+    than k rows). One row per employee, aligned with the EmployeeDataFeatures columns."""
+
+    FEATURES = RANK_FEATURES
+
+    @classmethod
+    def _inputs(cls, feature_name: str) -> list[str]:
+        return [RANK_FEATURES[feature_name][0]]
+
+    @classmethod
+    def calculate_feature(cls, data: Any, features: FeatureSet) -> Any:
+        k = int(cls._option(features, TOP_K_OPTION) or DEFAULT_TOP_K)
+        ranks: dict[str, np.ndarray] = {}
+        derived: dict[str, np.ndarray] = {}
+        for name in features.get_all_names():
+            column, kind = RANK_FEATURES[str(name)]
+            values = _column(data, column)
+            if kind == "percentile":
+                derived[str(name)] = percentile(values)
+                continue
+            if column not in ranks:
+                ranks[column] = rank_descending(values)
+            derived[str(name)] = ranks[column] if kind == "rank" else ranks[column] <= k
+
+        if isinstance(data, pa.Table):
+            for name, values in derived.items():
+                data = data.append_column(name, pa.array(values))
+            return data
+        return data.assign(**derived)
+
+
+class DepartmentStatsFeatures(_EmployeeDerivedFeatures):
+    """Per-department employee count and mean / median salary, performance_score and years_experience.
+    One row per department; request these features without per-employee ones."""
+
+    FEATURES = DEPARTMENT_FEATURES
+
+    @classmethod
+    def _inputs(cls, feature_name: str) -> list[str]:
+        column = DEPARTMENT_FEATURES[feature_name][0]
+        return ["department"] if column is None else ["department", column]
+
+    @classmethod
+    def calculate_feature(cls, data: Any, features: FeatureSet) -> Any:
+        codes, labels = _department_codes(data)
+        present = codes >= 0
+        codes = codes[present]
+        stats: dict[str, dict[str, np.ndarray]] = {}
+        columns: dict[str, Any] = {}
+        for name in features.get_all_names():
+            column, func = DEPARTMENT_FEATURES[str(name)]
+            if func == "name":
+                columns[str(name)] = labels
+            elif column is None:  # dept_employee_count
+                columns[str(name)] = np.bincount(codes, minlength=len(labels)).astype(np.int64)
+            else:
+                if column not in stats:
+                    stats[column] = group_stats(codes, _column(data, column)[present], len(labels))
+                columns[str(name)] = stats[column][func]
+
+        if isinstance(data, pa.Table):
+            return pa.table(columns)
+        return pd.DataFrame(columns)
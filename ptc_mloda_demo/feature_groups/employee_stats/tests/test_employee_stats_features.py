@@ -0,0 +1,128 @@
+"""Tests for EmployeeRankFeatures and DepartmentStatsFeatures — 3-level testing per guide 10-testing-guide.md."""
+
+from typing import Any, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from mloda.provider import FeatureGroup
+from mloda.user import Feature, PluginLoader, mloda
+
+from ptc_mloda_demo.feature_groups.employee_stats.employee_stats_features import (
+    DEPARTMENT_FEATURES,
+    RANK_FEATURES,
+    TOP_K_OPTION,
+    DepartmentStatsFeatures,
+    EmployeeRankFeatures,
+    group_stats,
+    percentile,
+    rank_descending,
+)
+from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import (
+    ROWS_OPTION,
+    SEED_OPTION,
+    generate_employees,
+)
+from ptc_mloda_demo.tools.frameworks.compute_frameworks import to_pandas
+
+FRAMEWORKS = ["PandasDataFrame", "PyArrowTable"]
+
+
+def _run(names: list[str], framework: str, **options: Any) -> list[pd.DataFrame]:
+    PluginLoader.all()
+    options = {ROWS_OPTION: 2_000, SEED_OPTION: 5, **options}
+    features: list[Union[Feature, str]] = [Feature.not_typed(n, options=options) for n in names]
+    return [to_pandas(r) for r in mloda.run_all(features, compute_frameworks=[framework])]
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Unit tests — class structure, kernels
+# ---------------------------------------------------------------------------
+
+
+def test_extend_feature_group() -> None:
+    assert issubclass(EmployeeRankFeatures, FeatureGroup)
+    assert issubclass(DepartmentStatsFeatures, FeatureGroup)
+
+
+def test_feature_names_supported() -> None:
+    assert EmployeeRankFeatures.feature_names_supported() == set(RANK_FEATURES)
+    assert {"salary_rank", "performance_percentile", "salary_top_k"} <= set(RANK_FEATURES)
+    assert DepartmentStatsFeatures.feature_names_supported() == set(DEPARTMENT_FEATURES)
+    assert {"dept_name", "dept_employee_count", "dept_mean_salary"} <= set(DEPARTMENT_FEATURES)
+
+
+def test_rank_and_percentile_match_pandas() -> None:
+    values = np.random.default_rng(0).integers(0, 50, 1_000)
+    series = pd.Series(values)
+    assert rank_descending(values).tolist() == series.rank(method="min", ascending=False).astype(int).tolist()
+    np.testing.assert_allclose(percentile(values), series.rank(method="max", pct=True) * 100)
+    assert rank_descending(np.array([5, 9, 9, 1])).tolist() == [3, 1, 1, 4]
+    assert percentile(np.array([])).tolist() == []
+
+
+def test_group_stats_match_groupby() -> None:
+    rng = np.random.default_rng(1)
+    codes, values = rng.integers(0, 4, 1_001), rng.normal(size=1_001)
+    stats = group_stats(codes, values, 5)  # group 4 has no rows
+    grouped = pd.Series(values).groupby(codes)
+    assert stats["count"].tolist() == [*grouped.size().tolist(), 0]
+    np.testing.assert_allclose(stats["mean"][:4], grouped.mean())
+    np.testing.assert_allclose(stats["median"][:4], grouped.median())
+    assert np.isnan(stats["mean"][4]) and np.isnan(stats["median"][4])
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Framework test — calculate_feature over both input types
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("as_arrow", [False, True])
+def test_calculate_features_return_the_input_type(as_arrow: bool) -> None:
+    frame = generate_employees(500, seed=2)
+    data: Any = pa.Table.from_pandas(frame, preserve_index=False) if as_arrow else frame
+
+    class Features:
+        options = None
+
+        def __init__(self, *names: str) -> None:
+            self.names = names
+
+        def get_all_names(self) -> tuple[str, ...]:
+            return self.names
+
+    ranked = EmployeeRankFeatures.calculate_feature(data, Features("salary_rank", "salary_top_k"))  # type: ignore[arg-type]
+    stats = DepartmentStatsFeatures.calculate_feature(data, Features("dept_name", "dept_median_salary"))  # type: ignore[arg-type]
+    assert isinstance(ranked, pa.Table) == as_arrow and isinstance(stats, pa.Table) == as_arrow
+
+    ranked, stats = to_pandas(ranked), to_pandas(stats)
+    assert ranked["salary_top_k"].sum() >= 3
+    assert ranked.loc[ranked["salary_rank"] == 1, "salary"].iloc[0] == frame["salary"].max()
+    expected = frame.groupby("department", observed=True)["salary"].median()
+    assert dict(zip(stats["dept_name"], stats["dept_median_salary"])) == expected.to_dict()
+
+
+# ---------------------------------------------------------------------------
+# Level 3: Integration test — mloda.run_all end-to-end
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("framework", FRAMEWORKS)
+def test_run_all_department_stats(framework: str) -> None:
+    (stats,) = _run(["dept_name", "dept_employee_count", "dept_mean_salary"], framework)
+    expected = generate_employees(2_000, seed=5).groupby("department", observed=True)["salary"].agg(["size", "mean"])
+    assert len(stats) == len(expected)
+    stats = stats.set_index("dept_name")
+    assert stats["dept_employee_count"].to_dict() == expected["size"].to_dict()
+    np.testing.assert_allclose(stats.loc[expected.index, "dept_mean_salary"], expected["mean"])
+
+
+@pytest.mark.parametrize("framework", FRAMEWORKS)
+def test_run_all_ranks_align_with_employee_rows(framework: str) -> None:
+    results = _run(["employee_id", "salary", "salary_rank", "salary_top_k"], framework, **{TOP_K_OPTION: 5})
+    frame = pd.concat(results, axis=1)
+    assert len(frame) == 2_000
+    top = frame[frame["salary_top_k"]].sort_values("salary_rank")
+    expected = generate_employees(2_000, seed=5).nlargest(5, "salary", keep="all")
+    assert top["employee_id"].tolist() == expected["employee_id"].tolist()
@@ -0,0 +1,267 @@
+"""File-backed employee source: a directory of Parquet files partitioned Hive-style by department.
+
+The layout is ``<root>/department=<name>/<file>.parquet``, as written by
+``write_employee_partitions`` (or any tool writing Hive partitions). Files are read in
+parallel on a thread or process pool, only for the requested columns and only for the
+departments a filter leaves; ``iter_employee_row_groups`` streams row groups instead of
+loading every file at once.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Set, Union
+from urllib.parse import unquote
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from mloda.provider import BaseInputData, DataCreator, FeatureGroup, FeatureSet
+from mloda.user import Options
+
+from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import (
+    ARROW_FRAMEWORKS,
+    EMPLOYEE_COLUMNS,
+    EMPLOYEE_FEATURES,
+    PARQUET_DIR_OPTION,
+)
+
+PARTITION_COLUMN = "department"
+
+# Feature options: pool size and kind ("thread" or "process") for partition reads.
+WORKERS_OPTION = "employee_parquet_workers"
+POOL_OPTION = "employee_parquet_pool"
+
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+POOLS = ("thread", "process")
+
+
+@dataclass(frozen=True)
+class ParquetPart:
+    """One Parquet file and the department of the partition it lives in."""
+
+    department: str
+    path: Path
+
+
+def discover_parts(root: Union[str, Path]) -> list[ParquetPart]:
+    """Every Parquet file under ``root``'s ``department=<name>`` directories, sorted by department and file name.
+
+    Only directory names are read, so discovery never opens a file.
+    """
+    prefix = f"{PARTITION_COLUMN}="
+    parts: list[ParquetPart] = []
+    for directory in sorted(Path(root).iterdir()):
+        if directory.is_dir() and directory.name.startswith(prefix):
+            department = unquote(directory.name[len(prefix) :])
+            parts.extend(ParquetPart(department, path) for path in sorted(directory.glob("*.parquet")))
+    return parts
+
+
+def prune(parts: Iterable[ParquetPart], departments: Optional[Iterable[str]]) -> list[ParquetPart]:
+    """The parts in ``departments``; all of them when it is None."""
+    if departments is None:
+        return list(parts)
+    wanted = set(departments)
+    return [p for p in parts if p.department in wanted]
+
+
+def fingerprint_parts(parts: Iterable[ParquetPart]) -> list[tuple[str, int, int]]:
+    """Path, size and mtime (ns) of every part, so rewritten files are told apart without reading them."""
+    fingerprint = []
+    for part in parts:
+        stat = part.path.stat()
+        fingerprint.append((str(part.path), stat.st_size, stat.st_mtime_ns))
+    return fingerprint
+
+
+def write_employee_partitions(
+    table: pa.Table,
+    root: Union[str, Path],
+    max_rows_per_file: int = 0,
+    row_group_rows: int = 1 << 16,
+) -> list[ParquetPart]:
+    """Write ``table`` (with a department column) as Hive partitions under ``root``; returns the parts written.
+
+    ``max_rows_per_file`` splits large partitions into several files (0 = one file per partition).
+    """
+    if max_rows_per_file:
+        row_group_rows = min(row_group_rows, max_rows_per_file)
+    ds.write_dataset(
+        table,
+        root,
+        format="parquet",
+        partitioning=[PARTITION_COLUMN],
+        partitioning_flavor="hive",
+        max_rows_per_file=max_rows_per_file,
+        max_rows_per_group=row_group_rows,
+        min_rows_per_group=row_group_rows,
+        existing_data_behavior="delete_matching",
+    )
+    return discover_parts(root)
+
+
+def _file_columns(columns: Optional[list[str]]) -> Optional[list[str]]:
+    return None if columns is None else [c for c in columns if c != PARTITION_COLUMN]
+
+
+def _with_department(
+    table: pa.Table, part: ParquetPart, dictionary: pa.Array, columns: Optional[list[str]]
+) -> pa.Table:
+    """Add the partition's department as a dictionary column, and order columns as requested."""
+    if columns is None or PARTITION_COLUMN in columns:
+        indices = np.full(table.num_rows, dictionary.index(part.department).as_py(), dtype=np.int32)
+        table = table.append_column(PARTITION_COLUMN, pa.DictionaryArray.from_arrays(indices, dictionary))
+    order = columns if columns is not None else [c for c in EMPLOYEE_COLUMNS if c in table.column_names]
+    return table.select(order)
+
+
+def _read_part(part: ParquetPart, columns: Optional[list[str]], dictionary: pa.Array) -> pa.Table:
+    # One thread per file from our pool; Arrow's own threads would only compete with it.
+    with pq.ParquetFile(part.path) as f:
+        table = f.read(columns=_file_columns(columns), use_threads=False)
+    return _with_department(table, part, dictionary, columns)
+
+
+def _read_row_group(part: ParquetPart, index: int, columns: Optional[list[str]], dictionary: pa.Array) -> pa.Table:
+    with pq.ParquetFile(part.path) as f:
+        table = f.read_row_group(index, columns=_file_columns(columns), use_threads=False)
+    return _with_department(table, part, dictionary, columns)
+
+
+def _executor(pool: str, max_workers: int) -> Executor:
+    if pool not in POOLS:
+        raise ValueError(f"Unknown pool {pool!r}; expected one of {list(POOLS)}")
+    if pool == "process":
+        return ProcessPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="parquet-read")
+
+
+def _dictionary(parts: list[ParquetPart]) -> pa.Array:
+    """Every department under the root, so tables read with different pruning share one dictionary."""
+    return pa.array(sorted({p.department for p in parts}), type=pa.string())
+
+
+def read_employees(
+    root: Union[str, Path],
+    columns: Optional[Iterable[str]] = None,
+    departments: Optional[Iterable[str]] = None,
+    max_workers: int = DEFAULT_WORKERS,
+    pool: str = "thread",
+) -> pa.Table:
+    """Read the employee partitions under ``root`` into one Arrow table.
+
+    Only ``columns`` are decoded (department comes from the directory name, dictionary-encoded),
+    only the partitions in ``departments`` are opened, and files are read concurrently on
+    ``max_workers`` threads or processes. Rows come in part order: by department, then file.
+    """
+    parts = discover_parts(root)
+    if not parts:
+        raise FileNotFoundError(f"No {PARTITION_COLUMN}=<name> Parquet partitions under {root}")
+    dictionary = _dictionary(parts)
+    selected = prune(parts, departments)
+    wanted = None if columns is None else [c for c in EMPLOYEE_COLUMNS if c in set(columns)]
+    if not selected:
+        return _with_department(pq.read_schema(parts[0].path).empty_table(), parts[0], dictionary, wanted)
+    if len(selected) == 1 or max_workers <= 1:
+        tables = [_read_part(p, wanted, dictionary) for p in selected]
+    else:
+        with _executor(pool, min(max_workers, len(selected))) as executor:
+            tables = list(executor.map(_read_part, selected, [wanted] * len(selected), [dictionary] * len(selected)))
+    return pa.concat_tables(tables)
+
+
+def iter_employee_row_groups(
+    root: Union[str, Path],
+    columns: Optional[Iterable[str]] = None,
+    departments: Optional[Iterable[str]] = None,
+    max_workers: int = 4,
+    pool: str = "thread",
+) -> Iterator[pa.Table]:
+    """Yield the rows of ``read_employees`` one Parquet row group at a time, in the same order.
+
+    At most ``max_workers`` row groups are read ahead, so memory stays bounded by a few row
+    groups however large the partitions are.
+    """
+    parts = discover_parts(root)
+    dictionary = _dictionary(parts)
+    wanted = None if columns is None else [c for c in EMPLOYEE_COLUMNS if c in set(columns)]
+    tasks = [(p, i) for p in prune(parts, departments) for i in range(pq.read_metadata(p.path).num_row_groups)]
+    with _executor(pool, max(1, max_workers)) as executor:
+        ahead: deque[Future[pa.Table]] = deque()
+        for part, index in tasks:
+            ahead.append(executor.submit(_read_row_group, part, index, wanted, dictionary))
+            if len(ahead) >= max_workers:
+                yield ahead.popleft().result()
+        while ahead:
+            yield ahead.popleft().result()
+
+
+def filtered_departments(features: Optional[FeatureSet]) -> Optional[set[str]]:
+    """Departments a mloda equal / categorical_inclusion filter on department allows; None if unfiltered."""
+    allowed: Optional[set[str]] = None
+    for f in (features.filters if features is not None else None) or ():
+        if f.name != PARTITION_COLUMN:
+            continue
+        if f.filter_type == "equal" and f.parameter.value is not None:
+            values = {str(f.parameter.value)}
+        elif f.filter_type == "categorical_inclusion" and f.parameter.values is not None:
+            values = {str(v) for v in f.parameter.values}
+        else:
+            continue
+        allowed = values if allowed is None else allowed & values
+    return allowed
+
+
+class EmployeeParquetFeatures(FeatureGroup):
+    """EmployeeDataFeatures read from a partitioned Parquet directory, for features carrying the
+    employee_parquet_dir option (which EmployeeDataFeatures declines).
+
+    Reads only the requested columns, skips departments an equal / categorical_inclusion
+    filter on department excludes (mloda still applies the filters to the rows read), and
+    reads files in parallel (employee_parquet_workers, employee_parquet_pool options).
+    Returns an Arrow table to the Arrow-based frameworks and a pandas DataFrame otherwise."""
+
+    @classmethod
+    def input_data(cls) -> Optional[BaseInputData]:
+        return DataCreator(EMPLOYEE_FEATURES)
+
+    @classmethod
+    def feature_names_supported(cls) -> Set[str]:
+        return EMPLOYEE_FEATURES
+
+    @classmethod
+    def match_feature_group_criteria(
+        cls, feature_name: Any, options: Options, data_access_collection: Any = None
+    ) -> bool:
+        if options.get(PARQUET_DIR_OPTION) is None:
+            return False
+        return super().match_feature_group_criteria(feature_name, options, data_access_collection)
+
+    @classmethod
+    def source_fingerprint(cls, features: FeatureSet) -> list[tuple[str, int, int]]:
+        """Fingerprint of the files ``calculate_feature`` reads, for FeatureStoreExtender's key."""
+        parts = discover_parts(str(features.get_options_key(PARQUET_DIR_OPTION)))
+        return fingerprint_parts(prune(parts, filtered_departments(features)))
+
+    @classmethod
+    def calculate_feature(cls, data: Any, features: FeatureSet) -> Any:
+        table = read_employees(
+            str(features.get_options_key(PARQUET_DIR_OPTION)),
+            columns={str(n) for n in features.get_all_names()},
+            departments=filtered_departments(features),
+            max_workers=int(features.get_options_key(WORKERS_OPTION) or DEFAULT_WORKERS),
+            pool=str(features.get_options_key(POOL_OPTION) or "thread"),
+        )
+        framework = next(iter(features.features)).get_compute_framework().__name__
+        if framework not in ARROW_FRAMEWORKS:
+            return table.to_pandas(split_blocks=True)
+        if framework in ("PolarsDataFrame", "PolarsLazyDataFrame"):
+            import polars as pl  # optional; only reached when mloda chose a Polars framework
+
+            frame = pl.from_arrow(table)
+            return frame.lazy() if framework == "PolarsLazyDataFrame" else frame
+        return table
@@ -0,0 +1,242 @@
+"""Tests for EmployeeParquetFeatures and the partitioned Parquet readers — 3-level testing per guide 10-testing-guide.md."""
+
+import io
+import json
+import shutil
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+from mloda.provider import FeatureGroup
+from mloda.user import Feature, GlobalFilter, PluginLoader, mloda
+
+from ptc_mloda_demo.extenders.feature_store.feature_store_extender import FeatureStore, FeatureStoreExtender
+import ptc_mloda_demo.feature_groups.employee_stats.employee_stats_features  # noqa: F401
+from ptc_mloda_demo.feature_groups.parquet_source import employee_parquet_features as parquet_source
+from ptc_mloda_demo.feature_groups.parquet_source.employee_parquet_features import (
+    EmployeeParquetFeatures,
+    ParquetPart,
+    discover_parts,
+    fingerprint_parts,
+    iter_employee_row_groups,
+    prune,
+    read_employees,
+    write_employee_partitions,
+)
+from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import (
+    PARQUET_DIR_OPTION,
+    EmployeeDataFeatures,
+    generate_employee_table,
+    generate_employees,
+)
+from ptc_mloda_demo.tools.frameworks.compute_frameworks import to_pandas
+
+ROWS = 3_000
+
+
+@pytest.fixture
+def root(tmp_path: Path) -> Path:
+    write_employee_partitions(
+        generate_employee_table(ROWS, seed=9), tmp_path, max_rows_per_file=200, row_group_rows=100
+    )
+    return tmp_path
+
+
+def _by_id(table: Union[pa.Table, pd.DataFrame]) -> pd.DataFrame:
+    frame = table.to_pandas() if isinstance(table, pa.Table) else table
+    frame = frame.sort_values("employee_id").reset_index(drop=True)
+    if "department" in frame:
+        frame["department"] = frame["department"].astype(str)
+    return frame
+
+
+def _expected(columns: Optional[set[str]] = None) -> pd.DataFrame:
+    return _by_id(generate_employees(ROWS, seed=9, columns=columns))
+
+
+@pytest.fixture
+def reads(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Departments of the files read by thread-pool reads."""
+    departments: list[str] = []
+    read_part = parquet_source._read_part
+
+    def counting(part: ParquetPart, *args: Any) -> pa.Table:
+        departments.append(part.department)
+        return read_part(part, *args)
+
+    monkeypatch.setattr(parquet_source, "_read_part", counting)
+    return departments
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Unit tests — class structure, partition discovery
+# ---------------------------------------------------------------------------
+
+
+def test_extends_feature_group() -> None:
+    assert issubclass(EmployeeParquetFeatures, FeatureGroup)
+    assert EmployeeParquetFeatures.feature_names_supported() == EmployeeDataFeatures.feature_names_supported()
+
+
+def test_discover_and_prune(root: Path) -> None:
+    parts = discover_parts(root)
+    departments = sorted({p.department for p in parts})
+    assert departments == ["Engineering", "Finance", "HR", "Marketing", "Operations", "Sales"]
+    assert len(parts) > len(departments)  # large partitions are split into several files
+    assert {p.department for p in prune(parts, ["HR", "Sales"])} == {"HR", "Sales"}
+    assert prune(parts, None) == parts
+
+
+def test_fingerprint_follows_rewrites(tmp_path: Path) -> None:
+    write_employee_partitions(generate_employee_table(2, seed=1), tmp_path)
+    before = fingerprint_parts(discover_parts(tmp_path))
+    assert fingerprint_parts(discover_parts(tmp_path)) == before
+    write_employee_partitions(generate_employee_table(3, seed=2), tmp_path)
+    assert fingerprint_parts(discover_parts(tmp_path)) != before
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Readers
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize(("pool", "max_workers"), [("thread", 1), ("thread", 8), ("process", 2)])
+def test_read_employees_returns_every_row(root: Path, pool: str, max_workers: int) -> None:
+    table = read_employees(root, max_workers=max_workers, pool=pool)
+    assert table.column_names == ["employee_id", "department", "salary", "years_experience", "performance_score"]
+    assert pa.types.is_dictionary(table.schema.field("department").type)
+    pd.testing.assert_frame_equal(_by_id(table), _expected(), check_dtype=False)
+
+
+def test_read_employees_projects_columns(root: Path) -> None:
+    table = read_employees(root, columns={"salary", "employee_id"})
+    assert table.column_names == ["employee_id", "salary"]
+    pd.testing.assert_frame_equal(_by_id(table), _expected({"salary", "employee_id"}), check_dtype=False)
+
+
+def test_read_employees_opens_only_selected_departments(root: Path, reads: list[str]) -> None:
+    table = read_employees(root, departments=["HR"])
+    assert set(reads) == {"HR"}
+    assert set(table.column("department").to_pylist()) == {"HR"}
+    assert table.num_rows == (generate_employees(ROWS, seed=9)["department"] == "HR").sum()
+
+
+def test_read_employees_without_matching_partitions(root: Path, tmp_path_factory: pytest.TempPathFactory) -> None:
+    empty = read_employees(root, columns={"salary", "department"}, departments=["Legal"])
+    assert empty.num_rows == 0 and empty.column_names == ["department", "salary"]
+    with pytest.raises(FileNotFoundError):
+        read_employees(tmp_path_factory.mktemp("empty"))
+    with pytest.raises(ValueError, match="Unknown pool"):
+        read_employees(root, pool="gpu")
+
+
+def test_row_groups_stream_the_same_rows(root: Path) -> None:
+    chunks = list(iter_employee_row_groups(root, columns={"employee_id", "department"}, max_workers=3))
+    assert len(chunks) > len(discover_parts(root))
+    assert max(c.num_rows for c in chunks) <= 100
+    assert pa.concat_tables(chunks).equals(read_employees(root, columns={"employee_id", "department"}))
+
+
+# ---------------------------------------------------------------------------
+# Level 3: Integration test — mloda.run_all end-to-end
+# ---------------------------------------------------------------------------
+
+
+def _run(
+    root: Path,
+    names: list[str],
+    framework: str,
+    global_filter: Optional[GlobalFilter] = None,
+    extenders: Optional[set[Any]] = None,
+) -> list[Any]:
+    PluginLoader.all()
+    features: list[Union[Feature, str]] = [Feature.not_typed(n, options={PARQUET_DIR_OPTION: str(root)}) for n in names]
+    return mloda.run_all(
+        features,
+        compute_frameworks=[framework],
+        global_filter=global_filter,
+        function_extender=extenders,
+        column_ordering="request_order",
+    )
+
+
+@pytest.mark.parametrize(("framework", "native"), [("PandasDataFrame", pd.DataFrame), ("PyArrowTable", pa.Table)])
+def test_run_all_reads_the_parquet_source(root: Path, framework: str, native: type) -> None:
+    (result,) = _run(root, ["employee_id", "salary"], framework)
+    assert isinstance(result, native)
+    pd.testing.assert_frame_equal(_by_id(to_pandas(result)), _expected({"employee_id", "salary"}), check_dtype=False)
+
+
+def test_run_all_department_filter_prunes_partitions(root: Path, reads: list[str]) -> None:
+    global_filter = GlobalFilter()
+    global_filter.add_filter("department", "categorical_inclusion", {"values": ["HR", "Sales"]})
+    (result,) = _run(root, ["employee_id", "department", "salary"], "PandasDataFrame", global_filter)
+    assert set(reads) == {"HR", "Sales"}
+    expected = _expected()
+    expected = expected[expected["department"].isin(["HR", "Sales"])].reset_index(drop=True)
+    pd.testing.assert_frame_equal(_by_id(result), expected[list(result.columns)], check_dtype=False)
+
+
+def test_derived_features_read_the_parquet_source(root: Path) -> None:
+    (stats,) = _run(root, ["dept_name", "dept_employee_count"], "PyArrowTable")
+    counts = dict(zip(stats.column("dept_name").to_pylist(), stats.column("dept_employee_count").to_pylist()))
+    assert counts == generate_employees(ROWS, seed=9)["department"].value_counts().to_dict()
+
+
+def test_feature_store_sees_rewritten_partitions(tmp_path: Path) -> None:
+    root, store = tmp_path / "employees", FeatureStore(tmp_path / "store")
+    extenders: set[Any] = {FeatureStoreExtender(store)}
+    write_employee_partitions(generate_employee_table(2, seed=1), root)
+    assert len(_run(root, ["employee_id"], "PandasDataFrame", extenders=extenders)[0]) == 2
+    assert len(_run(root, ["employee_id"], "PandasDataFrame", extenders=extenders)[0]) == 2
+    assert store.stats.hits == 1
+    shutil.rmtree(root)
+    write_employee_partitions(generate_employee_table(3, seed=2), root)
+    assert len(_run(root, ["employee_id"], "PandasDataFrame", extenders=extenders)[0]) == 3
+    assert store.stats.hits == 1
+
+
+@pytest.mark.parametrize("framework", ["PandasDataFrame", "PyArrowTable"])
+def test_demo_department_filter_prunes_partitions(
+    root: Path, reads: list[str], monkeypatch: pytest.MonkeyPatch, framework: str
+) -> None:
+    import demo
+
+    PluginLoader.all()
+    monkeypatch.setitem(demo.FEATURE_OPTIONS, PARQUET_DIR_OPTION, str(root))
+    count: dict[str, Any] = {
+        "feature_names": ["department"],
+        "aggregations": [{"column": "department", "func": "count", "alias": "n"}],
+        "compute_framework": framework,
+    }
+    hr_filter = [{"column": "department", "op": "in", "value": ["HR"]}]
+    demo.RESULT_CACHE.clear()
+    try:
+        hr = demo._call_tool("run_features", {**count, "filter": hr_filter})
+        assert set(reads) == {"HR"}
+        everyone = demo._call_tool("run_features", count)
+    finally:
+        demo.RESULT_CACHE.clear()
+    departments = _expected()["department"]
+    assert hr.split() == ["n", str((departments == "HR").sum())]
+    assert everyone.split() == ["n", str(len(departments))]
+
+
+def test_demo_streams_pages_from_row_groups(root: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import demo
+
+    monkeypatch.setitem(demo.FEATURE_OPTIONS, PARQUET_DIR_OPTION, str(root))
+    inputs: dict[str, Any] = {
+        "feature_names": ["employee_id"],
+        "filter": [{"column": "department", "op": "==", "value": "HR"}],
+        "page_rows": 150,
+    }
+    pages = [json.loads(demo._call_tool("run_features", inputs))]
+    while pages[-1]["cursor"] is not None:
+        pages.append(json.loads(demo._call_tool("fetch_page", {"cursor": pages[-1]["cursor"]})))
+    ids = pd.concat([pd.read_csv(io.StringIO(page["page"])) for page in pages])["employee_id"]
+    expected = _expected()
+    assert sorted(ids) == expected[expected["department"] == "HR"]["employee_id"].tolist()
+    assert pages[0]["num_rows"] is None
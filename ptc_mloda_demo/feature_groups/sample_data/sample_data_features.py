@@ -1,15 +1,157 @@
-"""Hardcoded employee dataset for PTC demo."""
+"""Employee dataset for PTC demo: a hardcoded sample, or a seeded generator for realistic volumes."""
 
-from typing import Any, Optional, Set
+from typing import Any, Iterator, Optional, Set
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
 from mloda.provider import BaseInputData, DataCreator, FeatureGroup, FeatureSet
+from mloda.user import Options
 
 EMPLOYEE_FEATURES: Set[str] = {"employee_id", "department", "salary", "years_experience", "performance_score"}
 
+# Column order of every frame this module returns.
+EMPLOYEE_COLUMNS = ("employee_id", "department", "salary", "years_experience", "performance_score")
+
+# Compute frameworks EmployeeDataFeatures serves from an Arrow table (converted zero-copy for Polars).
+ARROW_FRAMEWORKS = ("PyArrowTable", "DuckDBFramework", "PolarsDataFrame", "PolarsLazyDataFrame")
+
+# Feature options switching EmployeeDataFeatures to generated data.
+ROWS_OPTION = "employee_rows"
+SEED_OPTION = "employee_seed"
+
+# Feature option switching to EmployeeParquetFeatures (feature_groups/parquet_source): a partitioned Parquet directory.
+PARQUET_DIR_OPTION = "employee_parquet_dir"
+
+DEPARTMENTS = ("Engineering", "Sales", "HR", "Finance", "Marketing", "Operations")
+_BASE_SALARY = np.array([90_000, 62_000, 52_000, 74_000, 60_000, 56_000], dtype=np.int32)
+
+# Rows are generated in fixed blocks with one random stream per (seed, block, column), so the
+# values of a row never depend on the chunk size or on which other columns were requested.
+BLOCK_ROWS = 1 << 16
+_STREAM_IDS = {"department": 1, "years_experience": 2, "salary": 3, "performance_score": 4}
+
+
+def _sample_employees() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "employee_id": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+            "department": [
+                "Engineering",
+                "Engineering",
+                "Engineering",
+                "Sales",
+                "Sales",
+                "Sales",
+                "HR",
+                "HR",
+                "HR",
+                "Engineering",
+            ],
+            "salary": [95000, 88000, 102000, 72000, 68000, 75000, 61000, 58000, 64000, 110000],
+            "years_experience": [5, 3, 8, 4, 2, 6, 7, 3, 5, 10],
+            "performance_score": [87, 72, 95, 81, 65, 78, 90, 55, 83, 98],
+        }
+    )
+
+
+def _ordered(columns: Optional[Set[str]]) -> list[str]:
+    return [c for c in EMPLOYEE_COLUMNS if columns is None or c in columns]
+
+
+def _rng(seed: int, block: int, column: str) -> np.random.Generator:
+    return np.random.default_rng([seed, block, _STREAM_IDS[column]])
+
+
+def _generate_block(seed: int, block: int, n: int, columns: list[str]) -> dict[str, np.ndarray]:
+    """Raw column arrays for the first ``n`` rows of one block; only derives what ``columns`` needs."""
+    out: dict[str, np.ndarray] = {}
+    codes = years = None
+    if "department" in columns or "salary" in columns:
+        codes = _rng(seed, block, "department").integers(0, len(DEPARTMENTS), BLOCK_ROWS, dtype=np.int8)[:n]
+        if "department" in columns:
+            out["department"] = codes
+    if "years_experience" in columns or "salary" in columns:
+        years = _rng(seed, block, "years_experience").integers(0, 41, BLOCK_ROWS, dtype=np.int16)[:n]
+        if "years_experience" in columns:
+            out["years_experience"] = years
+    if "salary" in columns and codes is not None and years is not None:
+        noise = _rng(seed, block, "salary").normal(0.0, 8_000.0, BLOCK_ROWS)[:n]
+        salary = _BASE_SALARY[codes] + years.astype(np.int32) * 1_500 + np.round(noise, -2).astype(np.int32)
+        out["salary"] = np.maximum(salary, 30_000).astype(np.int32)
+    if "performance_score" in columns:
+        score = _rng(seed, block, "performance_score").normal(75.0, 10.0, BLOCK_ROWS)[:n]
+        out["performance_score"] = np.clip(np.round(score), 0, 100).astype(np.int16)
+    return out
+
+
+def _generate_columns(start: int, stop: int, seed: int, columns: list[str]) -> dict[str, np.ndarray]:
+    """Raw arrays of rows ``start`` to ``stop``, in ``columns`` order; department as int8 codes into DEPARTMENTS."""
+    parts: dict[str, list[np.ndarray]] = {c: [] for c in columns if c != "employee_id"}
+    blocks = range(start // BLOCK_ROWS, (stop - 1) // BLOCK_ROWS + 1) if stop > start else range(0)
+    for block in blocks:
+        block_start = block * BLOCK_ROWS
+        lo, hi = max(start, block_start) - block_start, min(stop, block_start + BLOCK_ROWS) - block_start
+        for name, values in _generate_block(seed, block, hi, list(parts)).items():
+            parts[name].append(values[lo:hi])
+
+    data: dict[str, np.ndarray] = {}
+    for name in columns:
+        if name == "employee_id":
+            data[name] = np.arange(start + 1, stop + 1, dtype=np.int32)
+        else:
+            data[name] = np.concatenate(parts[name]) if parts[name] else np.empty(0, dtype=np.int8)
+    return data
+
+
+def _generate_rows(start: int, stop: int, seed: int, columns: list[str]) -> pd.DataFrame:
+    data: dict[str, Any] = _generate_columns(start, stop, seed, columns)
+    if "department" in data:
+        data["department"] = pd.Categorical.from_codes(data["department"], categories=DEPARTMENTS)
+    return pd.DataFrame(data, index=pd.RangeIndex(start, stop), columns=columns)
+
+
+def generate_employees(rows: int, seed: int = 0, columns: Optional[Set[str]] = None) -> pd.DataFrame:
+    """Generate ``rows`` employees deterministically from ``seed``, materializing only ``columns``.
+
+    Uses compact dtypes: int32 ids and salaries, int16 experience and scores, categorical department.
+    """
+    return _generate_rows(0, rows, seed, _ordered(columns))
+
+
+def generate_employee_table(rows: int, seed: int = 0, columns: Optional[Set[str]] = None) -> pa.Table:
+    """``generate_employees`` as an Arrow table, built from the generated arrays without going through pandas.
+
+    department is dictionary-encoded over DEPARTMENTS, which Polars and DuckDB read without a copy.
+    """
+    data = _generate_columns(0, rows, seed, _ordered(columns))
+    arrays = {
+        name: pa.DictionaryArray.from_arrays(values, DEPARTMENTS) if name == "department" else pa.array(values)
+        for name, values in data.items()
+    }
+    return pa.table(arrays)
+
+
+def iter_employee_chunks(
+    rows: int, seed: int = 0, columns: Optional[Set[str]] = None, chunk_rows: int = BLOCK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """Yield the rows of ``generate_employees(rows, seed, columns)`` in chunks of ``chunk_rows``.
+
+    Each chunk keeps its global row positions as index.
+    """
+    ordered = _ordered(columns)
+    for start in range(0, rows, chunk_rows):
+        yield _generate_rows(start, min(start + chunk_rows, rows), seed, ordered)
+
 
 class EmployeeDataFeatures(FeatureGroup):
-    """Hardcoded employee dataset for PTC demo. 10 employees across 3 departments."""
+    """Employee dataset for PTC demo. 10 hardcoded employees across 3 departments by default;
+    with the employee_rows option (and optional employee_seed), that many generated employees.
+
+    Produces the native data type of the compute framework mloda chose: a pandas DataFrame,
+    an Arrow table (PyArrowTable, and DuckDBFramework, which reads Arrow without a copy), or a
+    Polars DataFrame / LazyFrame. Any other framework gets a pandas DataFrame to convert.
+    Features with the employee_parquet_dir option are left to EmployeeParquetFeatures."""
 
     @classmethod
     def input_data(cls) -> Optional[BaseInputData]:
@@ -19,25 +161,45 @@ class EmployeeDataFeatures(FeatureGroup):
     def feature_names_supported(cls) -> Set[str]:
         return EMPLOYEE_FEATURES
 
+    @classmethod
+    def match_feature_group_criteria(
+        cls, feature_name: Any, options: Options, data_access_collection: Any = None
+    ) -> bool:
+        if options.get(PARQUET_DIR_OPTION) is not None:
+            return False
+        return super().match_feature_group_criteria(feature_name, options, data_access_collection)
+
     @classmethod
     def calculate_feature(cls, data: Any, features: FeatureSet) -> Any:
-        return pd.DataFrame(
-            {
-                "employee_id": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
-                "department": [
-                    "Engineering",
-                    "Engineering",
-                    "Engineering",
-                    "Sales",
-                    "Sales",
-                    "Sales",
-                    "HR",
-                    "HR",
-                    "HR",
-                    "Engineering",
-                ],
-                "salary": [95000, 88000, 102000, 72000, 68000, 75000, 61000, 58000, 64000, 110000],
-                "years_experience": [5, 3, 8, 4, 2, 6, 7, 3, 5, 10],
-                "performance_score": [87, 72, 95, 81, 65, 78, 90, 55, 83, 98],
-            }
-        )
+        columns = set(features.get_all_names()) if features is not None else None
+        framework = cls._framework(features)
+        rows = cls._option(features, ROWS_OPTION)
+        if framework not in ARROW_FRAMEWORKS:
+            if rows is None:
+                return _sample_employees()[_ordered(columns)]
+            return generate_employees(int(rows), seed=int(cls._option(features, SEED_OPTION) or 0), columns=columns)
+
+        if rows is None:
+            table = pa.Table.from_pandas(_sample_employees()[_ordered(columns)], preserve_index=False)
+        else:
+            seed = int(cls._option(features, SEED_OPTION) or 0)
+            table = generate_employee_table(int(rows), seed=seed, columns=columns)
+        if framework in ("PolarsDataFrame", "PolarsLazyDataFrame"):
+            import polars as pl  # optional; only reached when mloda chose a Polars framework
+
+            frame = pl.from_arrow(table)
+            return frame.lazy() if framework == "PolarsLazyDataFrame" else frame
+        return table
+
+    @staticmethod
+    def _framework(features: Optional[FeatureSet]) -> Optional[str]:
+        """Class name of the compute framework mloda chose for this feature set."""
+        if features is None or not features.features:
+            return None
+        return str(next(iter(features.features)).get_compute_framework().__name__)
+
+    @staticmethod
+    def _option(features: Optional[FeatureSet], key: str) -> Any:
+        if features is None or features.options is None:
+            return None
+        return features.get_options_key(key)
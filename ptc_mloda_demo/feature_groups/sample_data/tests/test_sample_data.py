@@ -3,11 +3,22 @@
 from typing import Union, cast
 
 import pandas as pd
+import pyarrow as pa
+import pytest
 from mloda.core.abstract_plugins.components.options import Options
 from mloda.provider import BaseInputData, DataCreator, FeatureGroup, FeatureSet
 from mloda.user import Feature, PluginLoader, mloda
 
-from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import EMPLOYEE_FEATURES, EmployeeDataFeatures
+from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import (
+    EMPLOYEE_FEATURES,
+    ROWS_OPTION,
+    SEED_OPTION,
+    EmployeeDataFeatures,
+    generate_employee_table,
+    generate_employees,
+    iter_employee_chunks,
+)
+from ptc_mloda_demo.tools.frameworks.compute_frameworks import to_pandas
 
 
 # ---------------------------------------------------------------------------
@@ -49,6 +60,42 @@ def test_calculate_feature_returns_dataframe() -> None:
     assert len(result) == 10
 
 
+def test_generator_is_deterministic() -> None:
+    pd.testing.assert_frame_equal(generate_employees(1000, seed=7), generate_employees(1000, seed=7))
+    assert not generate_employees(1000, seed=7).equals(generate_employees(1000, seed=8))
+
+
+def test_generator_uses_compact_dtypes() -> None:
+    df = generate_employees(100)
+    assert list(df.columns) == ["employee_id", "department", "salary", "years_experience", "performance_score"]
+    assert df["employee_id"].tolist() == list(range(1, 101))
+    assert isinstance(df["department"].dtype, pd.CategoricalDtype)
+    assert df["salary"].dtype == "int32"
+    assert df["years_experience"].dtype == "int16"
+    assert df["performance_score"].between(0, 100).all()
+
+
+def test_generator_projection_keeps_values() -> None:
+    full = generate_employees(70_000, seed=3)
+    projected = generate_employees(70_000, seed=3, columns={"salary", "performance_score"})
+    assert list(projected.columns) == ["salary", "performance_score"]
+    pd.testing.assert_frame_equal(projected, full[["salary", "performance_score"]])
+
+
+def test_chunks_match_single_frame() -> None:
+    full = generate_employees(70_000, seed=1)
+    chunks = list(iter_employee_chunks(70_000, seed=1, chunk_rows=30_000))
+    assert [len(c) for c in chunks] == [30_000, 30_000, 10_000]
+    pd.testing.assert_frame_equal(pd.concat(chunks), full)
+
+
+def test_arrow_table_matches_frame() -> None:
+    table = generate_employee_table(70_000, seed=2)
+    assert table.schema.field("department").type == pa.dictionary(pa.int8(), pa.string())
+    pd.testing.assert_frame_equal(table.to_pandas(), generate_employees(70_000, seed=2).reset_index(drop=True))
+    assert generate_employee_table(10, columns={"salary"}).column_names == ["salary"]
+
+
 # ---------------------------------------------------------------------------
 # Level 3: Integration test — mloda.run_all end-to-end
 # ---------------------------------------------------------------------------
@@ -62,3 +109,30 @@ def test_run_all_integration() -> None:
     df = results[0]
     assert len(df) == 10
     assert {"employee_id", "department", "salary"}.issubset(set(df.columns))
+
+
+def test_run_all_generated_rows_with_projection() -> None:
+    PluginLoader.all()
+    options = {ROWS_OPTION: 500, SEED_OPTION: 4}
+    features: list[Union[Feature, str]] = [Feature.not_typed(f, options=options) for f in ["salary", "department"]]
+    results = mloda.run_all(features, compute_frameworks=["PandasDataFrame"])
+    df = results[0]
+    assert len(df) == 500
+    assert set(df.columns) == {"salary", "department"}
+    expected = generate_employees(500, seed=4)
+    assert df["salary"].tolist() == expected["salary"].tolist()
+
+
+@pytest.mark.parametrize(
+    ("framework", "package"),
+    [("PyArrowTable", "pyarrow"), ("PolarsDataFrame", "polars"), ("PolarsLazyDataFrame", "polars")],
+)
+def test_run_all_produces_framework_native_data(framework: str, package: str) -> None:
+    pytest.importorskip(package)
+    PluginLoader.all()
+    features: list[Union[Feature, str]] = [
+        Feature.not_typed(f, options={ROWS_OPTION: 300, SEED_OPTION: 4}) for f in ["salary", "department"]
+    ]
+    (result,) = mloda.run_all(features, compute_frameworks=[framework])
+    assert type(result).__module__.split(".")[0] == package
+    assert to_pandas(result)["salary"].tolist() == generate_employees(300, seed=4)["salary"].tolist()
@@ -0,0 +1 @@
+"""Tool-side helpers for the discover_features / run_features tools."""
@@ -0,0 +1,170 @@
+"""Precomputed, indexed catalog of loaded feature groups for the discover_features tool."""
+
+import json
+import re
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from mloda.provider import FeatureGroup, get_all_subclasses
+
+_TOKEN = re.compile(r"[a-z0-9_]+")
+
+
+def _tokens(text: str) -> set[str]:
+    return set(_TOKEN.findall(text.lower()))
+
+
+def _trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    name: str
+    features: tuple[str, ...]
+    description: str
+    fragment: str
+
+
+def describe(fg_class: type[FeatureGroup]) -> CatalogEntry:
+    """Catalog entry for one feature group class, with its pre-serialized JSON fragment."""
+    name = fg_class.get_class_name()
+    try:
+        description = str(fg_class.description())
+    except Exception:
+        description = (fg_class.__doc__ or "").strip() or name
+    try:
+        features = tuple(sorted(fg_class.feature_names_supported()))
+    except Exception:
+        features = ()
+    fragment = json.dumps({"name": name, "features": list(features), "description": description})
+    return CatalogEntry(name=name, features=features, description=description, fragment=fragment)
+
+
+class FeatureCatalog:
+    """In-memory index over feature group names, supported feature names and description tokens.
+
+    Built from the loaded FeatureGroup subclasses (call ``refresh`` after ``PluginLoader.all()``).
+    ``refresh`` is incremental: it diffs the current subclasses against the indexed ones and only
+    describes added classes. Lookups check for plugin changes at most every ``staleness_seconds``
+    and memoize their serialized answer until the catalog changes.
+    """
+
+    def __init__(
+        self,
+        staleness_seconds: Optional[float] = 30.0,
+        memo_size: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.staleness_seconds = staleness_seconds
+        self.memo_size = memo_size
+        self._clock = clock
+        self._lock = threading.RLock()
+        # Weak references, so the catalog never keeps an unloaded plugin class alive.
+        self._classes: weakref.WeakKeyDictionary[type[FeatureGroup], str] = weakref.WeakKeyDictionary()
+        self._owners: dict[str, weakref.ref[type[FeatureGroup]]] = {}
+        self._entries: dict[str, CatalogEntry] = {}
+        self._by_feature: dict[str, set[str]] = {}
+        self._by_token: dict[str, set[str]] = {}
+        self._by_trigram: dict[str, set[str]] = {}
+        self._memo: dict[tuple[Optional[str], Optional[str], Optional[str]], str] = {}
+        self._checked_at: Optional[float] = None
+        self.generation = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def refresh(self) -> bool:
+        """Index added feature groups and drop removed ones. Returns True if the catalog changed."""
+        with self._lock:
+            self._checked_at = self._clock()
+            current = {cls for cls in get_all_subclasses(FeatureGroup) if cls.__module__ != "__main__"}
+            added = [cls for cls in current if cls not in self._classes]
+            removed = [name for name, owner in self._owners.items() if owner() not in current]
+            if not removed and not added:
+                return False
+            for name in removed:
+                self._unindex(name)
+                del self._owners[name]
+                # Fall back to another live class of the same name, if any.
+                added.extend(c for c, n in self._classes.items() if n == name and c in current and c not in added)
+            for cls in added:
+                entry = describe(cls)
+                self._classes[cls] = entry.name
+                # A redefined class replaces the indexed one with the same name.
+                self._unindex(entry.name)
+                self._owners[entry.name] = weakref.ref(cls)
+                self._index(entry)
+            self._memo.clear()
+            self.generation += 1
+            return True
+
+    def lookup(self, name: Optional[str] = None, feature: Optional[str] = None, search: Optional[str] = None) -> str:
+        """JSON list of matching feature groups, sorted by name.
+
+        ``name`` is a case-insensitive partial match on the group name, ``feature`` an exact
+        supported feature name, and ``search`` requires every word to appear in the description.
+        """
+        with self._lock:
+            if self._checked_at is None or (
+                self.staleness_seconds is not None and self._clock() - self._checked_at >= self.staleness_seconds
+            ):
+                self.refresh()
+            key = (name, feature, search)
+            cached = self._memo.get(key)
+            if cached is not None:
+                return cached
+            names = self._match(name, feature, search)
+            result = "[" + ", ".join(self._entries[n].fragment for n in sorted(names)) + "]"
+            if len(self._memo) >= self.memo_size:
+                self._memo.clear()
+            self._memo[key] = result
+            return result
+
+    def _match(self, name: Optional[str], feature: Optional[str], search: Optional[str]) -> Iterable[str]:
+        candidates: Optional[set[str]] = None
+        if feature is not None:
+            candidates = set(self._by_feature.get(feature, ()))
+        if search is not None:
+            for token in _tokens(search):
+                candidates = self._intersect(candidates, self._by_token.get(token, set()))
+        if name is not None:
+            needle = name.lower()
+            grams = _trigrams(needle)
+            for gram in grams:
+                candidates = self._intersect(candidates, self._by_trigram.get(gram, set()))
+            pool = self._entries.keys() if candidates is None else candidates
+            candidates = {n for n in pool if needle in n.lower()}
+        return self._entries.keys() if candidates is None else candidates
+
+    @staticmethod
+    def _intersect(candidates: Optional[set[str]], postings: set[str]) -> set[str]:
+        return set(postings) if candidates is None else candidates & postings
+
+    def _index(self, entry: CatalogEntry) -> None:
+        self._entries[entry.name] = entry
+        for feature in entry.features:
+            self._by_feature.setdefault(feature, set()).add(entry.name)
+        for token in _tokens(entry.description):
+            self._by_token.setdefault(token, set()).add(entry.name)
+        for gram in _trigrams(entry.name.lower()):
+            self._by_trigram.setdefault(gram, set()).add(entry.name)
+
+    def _unindex(self, name: str) -> None:
+        entry = self._entries.pop(name, None)
+        if entry is None:
+            return
+        for index, keys in (
+            (self._by_feature, entry.features),
+            (self._by_token, _tokens(entry.description)),
+            (self._by_trigram, _trigrams(entry.name.lower())),
+        ):
+            for key in keys:
+                postings = index.get(key)
+                if postings is not None:
+                    postings.discard(name)
+                    if not postings:
+                        del index[key]
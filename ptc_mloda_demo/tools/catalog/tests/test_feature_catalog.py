@@ -0,0 +1,115 @@
+"""Tests for FeatureCatalog."""
+
+import gc
+import json
+from typing import Any
+
+from mloda.core.api.plugin_docs import get_feature_group_docs
+from mloda.provider import FeatureGroup
+from mloda.user import PluginLoader
+
+from ptc_mloda_demo.tools.catalog.feature_catalog import FeatureCatalog
+
+import ptc_mloda_demo.feature_groups.sample_data.sample_data_features  # noqa: F401
+
+
+def _names(payload: str) -> list[str]:
+    return [entry["name"] for entry in json.loads(payload)]
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Lookups
+# ---------------------------------------------------------------------------
+
+
+class TestFeatureCatalogLookup:
+    """Name, feature and description lookups over the loaded plugins."""
+
+    def test_matches_mloda_name_filter(self) -> None:
+        PluginLoader.all()
+        catalog = FeatureCatalog()
+        for needle in [None, "employee", "EMP", "a", "zz_no_such_group"]:
+            expected = [d.name for d in get_feature_group_docs(name=needle)]
+            assert _names(catalog.lookup(name=needle)) == expected
+
+    def test_entry_shape(self) -> None:
+        catalog = FeatureCatalog()
+        (entry,) = json.loads(catalog.lookup(name="EmployeeDataFeatures"))
+        assert entry["features"] == ["department", "employee_id", "performance_score", "salary", "years_experience"]
+        assert "employee" in entry["description"].lower()
+
+    def test_lookup_by_feature(self) -> None:
+        catalog = FeatureCatalog()
+        # EmployeeParquetFeatures serves the same columns once feature_groups/parquet_source is imported.
+        names = _names(catalog.lookup(feature="salary"))
+        assert "EmployeeDataFeatures" in names
+        assert set(names) <= {"EmployeeDataFeatures", "EmployeeParquetFeatures"}
+        assert _names(catalog.lookup(feature="no_such_feature")) == []
+
+    def test_lookup_by_description_tokens(self) -> None:
+        catalog = FeatureCatalog()
+        assert "EmployeeDataFeatures" in _names(catalog.lookup(search="Employee DATASET"))
+        assert _names(catalog.lookup(search="employee xyzzy")) == []
+
+    def test_lookups_are_memoized(self) -> None:
+        catalog = FeatureCatalog()
+        assert catalog.lookup(name="employee") is catalog.lookup(name="employee")
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Incremental refresh
+# ---------------------------------------------------------------------------
+
+
+class TestFeatureCatalogRefresh:
+    """New and removed feature groups are picked up without a full rebuild."""
+
+    def test_refresh_is_noop_when_unchanged(self) -> None:
+        catalog = FeatureCatalog()
+        catalog.refresh()
+        generation = catalog.generation
+        assert catalog.refresh() is False
+        assert catalog.generation == generation
+
+    def test_added_and_removed_groups(self) -> None:
+        catalog = FeatureCatalog(staleness_seconds=None)
+        catalog.refresh()
+        before = len(catalog)
+
+        def make_group() -> Any:
+            class CatalogProbeFeatures(FeatureGroup):
+                """Probe group for catalog refresh tests."""
+
+                @classmethod
+                def feature_names_supported(cls) -> set[str]:
+                    return {"catalog_probe_value"}
+
+            return CatalogProbeFeatures
+
+        probe = make_group()
+        assert catalog.lookup(feature="catalog_probe_value") == "[]"
+        assert catalog.refresh() is True
+        assert len(catalog) == before + 1
+        assert _names(catalog.lookup(feature="catalog_probe_value")) == ["CatalogProbeFeatures"]
+
+        del probe
+        gc.collect()
+        assert catalog.refresh() is True
+        assert len(catalog) == before
+        assert catalog.lookup(feature="catalog_probe_value") == "[]"
+
+    def test_lookup_refreshes_when_stale(self) -> None:
+        now = [0.0]
+        catalog = FeatureCatalog(staleness_seconds=10, clock=lambda: now[0])
+        catalog.lookup()
+        generation = catalog.generation
+
+        class StaleProbeFeatures(FeatureGroup):
+            """Probe group for staleness tests."""
+
+        catalog.lookup()
+        assert catalog.generation == generation
+        now[0] = 10
+        assert "StaleProbeFeatures" in _names(catalog.lookup())
+        del StaleProbeFeatures
+        gc.collect()
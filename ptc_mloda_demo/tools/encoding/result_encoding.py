@@ -0,0 +1,112 @@
+"""Wire formats for run_features results.
+
+``csv`` stays the default. ``columnar_json`` is a compact column-oriented JSON document
+with dictionary-encoded string columns, readable by a model or any JSON parser.
+``arrow_ipc`` and ``parquet`` are base64-encoded binary payloads meant for the PTC
+sandbox, which can decode them with pandas (see ``decode_result``).
+"""
+
+import base64
+import io
+import json
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+TEXT_FORMATS = ("csv", "columnar_json")
+BINARY_FORMATS = ("arrow_ipc", "parquet")
+RESULT_FORMATS = TEXT_FORMATS + BINARY_FORMATS
+DEFAULT_FORMAT = "csv"
+
+# How sandbox code turns each payload back into a DataFrame; quoted in the PTC prompt.
+SANDBOX_DECODERS = {
+    "csv": "pd.read_csv(io.StringIO(payload))",
+    "columnar_json": "see the 'columns' object: {name: {'values': [...]}} or {'dictionary': [...], 'codes': [...]}",
+    "arrow_ipc": "pd.read_feather(io.BytesIO(base64.b64decode(payload)))  # Arrow IPC file (Feather v2)",
+    "parquet": "pd.read_parquet(io.BytesIO(base64.b64decode(payload)))",
+}
+
+
+class UnsupportedFormatError(ValueError):
+    """Raised when a run_features caller asks for an unknown result format."""
+
+
+def result_format_property(formats: tuple[str, ...] = RESULT_FORMATS) -> dict[str, Any]:
+    """JSON schema property for the run_features ``format`` argument."""
+    return {
+        "type": "string",
+        "enum": list(formats),
+        "description": (
+            f"Result encoding, default {DEFAULT_FORMAT}. columnar_json is compact JSON with dictionary-encoded "
+            "strings; arrow_ipc and parquet are base64 binary payloads decodable with pandas."
+        ),
+    }
+
+
+def encode_result(frame: pd.DataFrame, fmt: str = DEFAULT_FORMAT) -> str:
+    """Serialize ``frame`` in the requested format."""
+    if fmt == "csv":
+        return str(frame.to_csv(index=False))
+    if fmt == "columnar_json":
+        return _encode_columnar_json(frame)
+    if fmt == "arrow_ipc":
+        return base64.b64encode(_arrow_ipc_bytes(frame)).decode("ascii")
+    if fmt == "parquet":
+        buffer = io.BytesIO()
+        frame.to_parquet(buffer, index=False)
+        return base64.b64encode(buffer.getvalue()).decode("ascii")
+    raise UnsupportedFormatError(f"Unsupported result format {fmt!r}; expected one of {list(RESULT_FORMATS)}")
+
+
+def decode_result(payload: str, fmt: str = DEFAULT_FORMAT) -> pd.DataFrame:
+    """Inverse of ``encode_result``; mirrors what sandbox code does with a payload."""
+    if fmt == "csv":
+        return pd.read_csv(io.StringIO(payload))
+    if fmt == "columnar_json":
+        return _decode_columnar_json(payload)
+    if fmt == "arrow_ipc":
+        return pd.read_feather(io.BytesIO(base64.b64decode(payload)))
+    if fmt == "parquet":
+        return pd.read_parquet(io.BytesIO(base64.b64decode(payload)))
+    raise UnsupportedFormatError(f"Unsupported result format {fmt!r}; expected one of {list(RESULT_FORMATS)}")
+
+
+def _encode_columnar_json(frame: pd.DataFrame) -> str:
+    columns: dict[str, dict[str, Any]] = {}
+    for name in frame.columns:
+        series = frame[name]
+        dtype = str(series.dtype)
+        if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            values = series.to_numpy(dtype=object, na_value=None) if series.hasnans else series.to_numpy()
+            columns[str(name)] = {"dtype": dtype, "values": values.tolist()}
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=True)
+            dictionary = [str(u) for u in uniques] if not pd.api.types.is_string_dtype(uniques) else uniques.tolist()
+            columns[str(name)] = {"dtype": dtype, "dictionary": dictionary, "codes": codes.tolist()}
+    return json.dumps({"num_rows": len(frame), "columns": columns}, separators=(",", ":"))
+
+
+def _decode_columnar_json(payload: str) -> pd.DataFrame:
+    document = json.loads(payload)
+    data: dict[str, Any] = {}
+    for name, column in document["columns"].items():
+        if "dictionary" in column:
+            codes = np.asarray(column["codes"], dtype=np.int64)
+            categorical = pd.Categorical.from_codes(codes, categories=column["dictionary"])
+            series = pd.Series(categorical)
+            data[name] = series if column["dtype"] == "category" else series.astype(object).astype(column["dtype"])
+        else:
+            data[name] = pd.Series(column["values"], dtype=column["dtype"])
+    return pd.DataFrame(data, index=pd.RangeIndex(document["num_rows"]))
+
+
+def _arrow_ipc_bytes(frame: pd.DataFrame) -> bytes:
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return bytes(sink.getvalue())
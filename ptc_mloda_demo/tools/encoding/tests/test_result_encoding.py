@@ -0,0 +1,75 @@
+"""Tests for run_features result encodings."""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import EmployeeDataFeatures
+from ptc_mloda_demo.tools.encoding.result_encoding import (
+    RESULT_FORMATS,
+    UnsupportedFormatError,
+    decode_result,
+    encode_result,
+    result_format_property,
+)
+
+
+def _employees() -> pd.DataFrame:
+    frame: pd.DataFrame = EmployeeDataFeatures.calculate_feature(None, None)  # type: ignore[arg-type]
+    return frame
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Format selection
+# ---------------------------------------------------------------------------
+
+
+def test_csv_is_unchanged_default() -> None:
+    frame = _employees()
+    assert encode_result(frame) == frame.to_csv(index=False)
+
+
+def test_unknown_format_raises() -> None:
+    with pytest.raises(UnsupportedFormatError):
+        encode_result(_employees(), "xml")
+
+
+def test_schema_property_lists_formats() -> None:
+    assert result_format_property(("csv",))["enum"] == ["csv"]
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Round trips
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("fmt", RESULT_FORMATS)
+def test_round_trip(fmt: str) -> None:
+    frame = _employees()
+    decoded = decode_result(encode_result(frame, fmt), fmt)
+    pd.testing.assert_frame_equal(decoded, frame, check_dtype=False)
+
+
+@pytest.mark.parametrize("fmt", ["columnar_json", "arrow_ipc", "parquet"])
+def test_round_trip_with_missing_values(fmt: str) -> None:
+    frame = pd.DataFrame(
+        {
+            "f": [1.5, np.nan, 2.0],
+            "s": ["a", None, "a"],
+            "n": pd.array([1, None, 3], dtype="Int64"),
+            "c": pd.Categorical(["x", "y", "x"]),
+        }
+    )
+    decoded = decode_result(encode_result(frame, fmt), fmt)
+    pd.testing.assert_frame_equal(decoded, frame)
+
+
+def test_columnar_json_dictionary_encodes_strings() -> None:
+    document = json.loads(encode_result(_employees(), "columnar_json"))
+    department = document["columns"]["department"]
+    assert department["dictionary"] == ["Engineering", "Sales", "HR"]
+    assert department["codes"][:4] == [0, 0, 0, 1]
+    assert document["columns"]["salary"]["values"][0] == 95000
+    assert document["num_rows"] == 10
@@ -0,0 +1,104 @@
+"""Compute frameworks run_features can run mloda in, and conversion of their results for the tool layer."""
+
+import contextlib
+import importlib.util
+from typing import Any, Iterable, Iterator, Union
+
+import pandas as pd
+import pyarrow as pa
+
+DEFAULT_FRAMEWORK = "PandasDataFrame"
+
+# mloda compute framework name -> the package it needs.
+FRAMEWORK_PACKAGES = {
+    "PandasDataFrame": "pandas",
+    "PyArrowTable": "pyarrow",
+    "PolarsDataFrame": "polars",
+    "PolarsLazyDataFrame": "polars",
+    "DuckDBFramework": "duckdb",
+}
+
+COMPUTE_FRAMEWORKS = tuple(FRAMEWORK_PACKAGES)
+
+# Frameworks whose results the query layer gets as pandas frames; the others' as Arrow tables.
+PANDAS_FRAMEWORKS = ("PandasDataFrame",)
+
+
+class UnsupportedFrameworkError(ValueError):
+    """Raised when a run_features caller asks for an unknown or uninstalled compute framework."""
+
+
+def available_frameworks() -> tuple[str, ...]:
+    """The compute frameworks whose package is installed; checked without importing it."""
+    return tuple(name for name, package in FRAMEWORK_PACKAGES.items() if importlib.util.find_spec(package) is not None)
+
+
+def check_framework(name: str) -> str:
+    if name not in available_frameworks():
+        raise UnsupportedFrameworkError(
+            f"Unsupported compute framework {name!r}; expected one of {list(available_frameworks())}"
+        )
+    return name
+
+
+def compute_framework_property(frameworks: tuple[str, ...]) -> dict[str, Any]:
+    """JSON schema property for the run_features ``compute_framework`` argument."""
+    return {
+        "type": "string",
+        "enum": list(frameworks),
+        "description": (
+            f"mloda compute framework to produce the features in, default {DEFAULT_FRAMEWORK}. "
+            "The query and the result format are the same for every framework."
+        ),
+    }
+
+
+@contextlib.contextmanager
+def framework_options(framework: str, feature_groups: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """Feature options ``framework`` needs for one mloda run: DuckDB converts data into relations on
+    a connection that mloda looks up under the name of the feature group producing it. The
+    connection is closed on exit, so results must be converted (``to_query_frame``) inside."""
+    if framework != "DuckDBFramework":
+        yield {}
+        return
+    import duckdb
+
+    connection = duckdb.connect()
+    try:
+        yield {name: connection for name in feature_groups}
+    finally:
+        connection.close()
+
+
+def to_arrow(result: Any) -> pa.Table:
+    """The result of a mloda run as an Arrow table; zero-copy for Arrow and Polars results."""
+    if isinstance(result, pa.Table):
+        return result
+    if isinstance(result, pd.DataFrame):
+        return pa.Table.from_pandas(result, preserve_index=False)
+    module = type(result).__module__
+    if module.startswith("polars"):
+        return (result.collect() if hasattr(result, "collect") else result).to_arrow()
+    if hasattr(result, "to_arrow_table"):  # mloda's DuckdbRelation
+        table: pa.Table = result.to_arrow_table()
+        return table
+    raise TypeError(f"Cannot convert {type(result).__name__} to an Arrow table")
+
+
+def to_query_frame(result: Any, framework: str) -> Union[pd.DataFrame, pa.Table]:
+    """The result in the form the query layer runs on for ``framework``: pandas for pandas, Arrow otherwise."""
+    return to_pandas(result) if framework in PANDAS_FRAMEWORKS else to_arrow(result)
+
+
+def to_pandas(result: Any) -> pd.DataFrame:
+    """The result of a mloda run as a pandas DataFrame, converting through Arrow where possible."""
+    if isinstance(result, pd.DataFrame):
+        return result
+    if isinstance(result, pa.Table):
+        return result.to_pandas(split_blocks=True)
+    module = type(result).__module__
+    if module.startswith("polars"):
+        return (result.collect() if hasattr(result, "collect") else result).to_pandas()
+    if hasattr(result, "to_arrow_table"):  # mloda's DuckdbRelation
+        return result.to_arrow_table().to_pandas(split_blocks=True)
+    raise TypeError(f"Cannot convert {type(result).__name__} to a pandas DataFrame")
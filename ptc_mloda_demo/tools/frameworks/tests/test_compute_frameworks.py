@@ -0,0 +1,73 @@
+"""Tests for compute framework selection and result conversion."""
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from ptc_mloda_demo.tools.frameworks.compute_frameworks import (
+    COMPUTE_FRAMEWORKS,
+    DEFAULT_FRAMEWORK,
+    UnsupportedFrameworkError,
+    available_frameworks,
+    check_framework,
+    compute_framework_property,
+    framework_options,
+    to_arrow,
+    to_pandas,
+    to_query_frame,
+)
+
+
+def test_installed_frameworks_are_available() -> None:
+    assert {"PandasDataFrame", "PyArrowTable"} <= set(available_frameworks())
+    assert set(available_frameworks()) <= set(COMPUTE_FRAMEWORKS)
+    assert check_framework(DEFAULT_FRAMEWORK) == DEFAULT_FRAMEWORK
+
+
+def test_unknown_framework_is_rejected() -> None:
+    with pytest.raises(UnsupportedFrameworkError, match="SparkFramework"):
+        check_framework("SparkFramework")
+
+
+def test_schema_property_lists_frameworks() -> None:
+    assert compute_framework_property(("PandasDataFrame",))["enum"] == ["PandasDataFrame"]
+
+
+def test_only_duckdb_needs_options() -> None:
+    with framework_options("PyArrowTable", ["EmployeeDataFeatures"]) as options:
+        assert options == {}
+
+
+def test_duckdb_connection_per_feature_group_is_closed() -> None:
+    duckdb = pytest.importorskip("duckdb")
+    with framework_options("DuckDBFramework", ["A", "B"]) as options:
+        assert set(options) == {"A", "B"}
+        assert isinstance(options["A"], duckdb.DuckDBPyConnection) and options["A"] is options["B"]
+        options["A"].execute("select 1")
+    with pytest.raises(duckdb.ConnectionException):
+        options["A"].execute("select 1")
+
+
+def test_to_pandas() -> None:
+    frame = pd.DataFrame({"a": [1, 2]})
+    assert to_pandas(frame) is frame
+    pd.testing.assert_frame_equal(to_pandas(pa.table({"a": [1, 2]})), frame)
+    with pytest.raises(TypeError):
+        to_pandas([1, 2])
+
+
+def test_to_arrow_and_query_frame() -> None:
+    table = pa.table({"a": [1, 2]})
+    assert to_arrow(table) is table
+    assert to_arrow(pd.DataFrame({"a": [1, 2]})).equals(table)
+    with pytest.raises(TypeError):
+        to_arrow([1, 2])
+    assert to_query_frame(table, "PyArrowTable") is table
+    assert isinstance(to_query_frame(table, "PandasDataFrame"), pd.DataFrame)
+
+
+def test_polars_to_pandas() -> None:
+    pl = pytest.importorskip("polars")
+    expected = pd.DataFrame({"a": [1, 2]})
+    pd.testing.assert_frame_equal(to_pandas(pl.DataFrame({"a": [1, 2]})), expected)
+    pd.testing.assert_frame_equal(to_pandas(pl.DataFrame({"a": [1, 2]}).lazy()), expected)
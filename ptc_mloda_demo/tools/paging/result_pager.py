@@ -0,0 +1,227 @@
+"""Cursor-based paging for large run_features results, with bounded server-side state."""
+
+import itertools
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+import pandas as pd
+
+from ptc_mloda_demo.tools.encoding.result_encoding import encode_result
+
+DEFAULT_PAGE_ROWS = 1000
+
+PAGE_ROWS_PROPERTY: dict[str, Any] = {
+    "type": "integer",
+    "minimum": 1,
+    "description": (
+        "Optional: return the result in pages of this many rows. The response holds the schema, "
+        "total num_rows (null if the rows are streamed and not counted yet), the first page and a cursor "
+        "for fetch_page (null once all rows are sent)."
+    ),
+}
+
+FETCH_PAGE_DESCRIPTION = (
+    "Fetch the next page of a paged run_features result. Pass the cursor from the previous response; "
+    "n is the maximum number of rows to return. Cursors expire after a few minutes of inactivity."
+)
+
+FETCH_PAGE_INPUT_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "cursor": {"type": "string", "description": "Cursor returned by run_features or fetch_page."},
+        "n": {"type": "integer", "minimum": 1, "description": "Maximum rows in this page."},
+    },
+    "required": ["cursor"],
+}
+
+
+class PagingError(ValueError):
+    """Unknown or expired cursor, or an invalid page size."""
+
+
+def page_size(value: Any, argument: str) -> int:
+    """A page_rows / n tool argument as a positive row count; PagingError if it is not one."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise PagingError(f"{argument} must be a positive integer, got {value!r}")
+    try:
+        rows = int(value)
+    except ValueError:
+        raise PagingError(f"{argument} must be a positive integer, got {value!r}") from None
+    if rows < 1:
+        raise PagingError(f"{argument} must be positive, got {rows}")
+    return rows
+
+
+def limit_chunks(chunks: Iterable[pd.DataFrame], limit: Optional[int]) -> Iterator[pd.DataFrame]:
+    """The first ``limit`` rows of ``chunks`` (all of them for None), pulling no chunk past the limit."""
+    remaining = limit
+    for chunk in chunks:
+        if remaining is None:
+            yield chunk
+            continue
+        chunk = chunk.iloc[:remaining]
+        yield chunk
+        remaining -= len(chunk)
+        if remaining == 0:
+            return
+
+
+def iter_frame_chunks(frame: pd.DataFrame, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Yield consecutive row slices of ``frame`` without copying it; one empty slice if it has no rows,
+    so the pager still sees its columns."""
+    if frame.empty:
+        yield frame.iloc[0:0]
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start : start + chunk_rows]
+
+
+@dataclass
+class _Cursor:
+    chunks: Iterator[pd.DataFrame]
+    pending: Optional[pd.DataFrame]
+    fmt: str
+    page_rows: int
+    offset: int
+    num_rows: Optional[int]
+    expires_at: float
+
+
+def _schema(frame: pd.DataFrame) -> list[dict[str, str]]:
+    return [{"name": str(name), "dtype": str(dtype)} for name, dtype in frame.dtypes.items()]
+
+
+class ResultPager:
+    """Serves a result as encoded pages pulled on demand from a chunk generator.
+
+    ``open`` encodes only the first page and keeps the generator (plus at most one partially
+    consumed chunk) under a cursor ID; ``fetch_page`` encodes the next page, so no call encodes
+    more than one page. Whatever the generator references stays alive until its cursor is
+    exhausted, closed or expired: all of the frame for ``iter_frame_chunks``, a few chunks for
+    streaming sources. Cursors expire ``ttl_seconds`` after their last use, and at most
+    ``max_cursors`` are kept (oldest dropped first). A result without rows is one empty page
+    and no cursor. With ``num_rows=None`` (a streamed result not counted up front) num_rows is
+    null unless the first page is the whole result, and the cursor ends with the generator.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300.0,
+        max_cursors: int = 64,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_cursors = max_cursors
+        self._clock = clock
+        self._cursors: dict[str, _Cursor] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._cursors)
+
+    def open(
+        self, chunks: Iterable[pd.DataFrame], num_rows: Optional[int], fmt: str, page_rows: int = DEFAULT_PAGE_ROWS
+    ) -> str:
+        """Start paging ``chunks`` (``num_rows`` rows in total, None if unknown) and return the first page as JSON."""
+        page_rows = page_size(page_rows, "page_rows")
+        iterator = iter(chunks)
+        first = next(iterator, None)
+        if first is None:
+            first = pd.DataFrame()
+        state = _Cursor(
+            chunks=iterator,
+            pending=first,
+            fmt=fmt,
+            page_rows=page_rows,
+            offset=0,
+            num_rows=num_rows,
+            expires_at=0.0,
+        )
+        page = self._take(state, page_rows)
+        cursor_id = None if self._done(state) else uuid.uuid4().hex
+        # Encode before registering the cursor, so a bad format leaves no state behind.
+        response = {"num_rows": state.num_rows, "schema": _schema(first), "format": fmt}
+        response.update(self._page(cursor_id, state, page))
+        if cursor_id is not None:
+            with self._lock:
+                self._expire()
+                while len(self._cursors) >= self.max_cursors:
+                    del self._cursors[next(iter(self._cursors))]
+                state.expires_at = self._clock() + self.ttl_seconds
+                self._cursors[cursor_id] = state
+        return json.dumps(response)
+
+    def fetch_page(self, cursor_id: str, n: Any = None) -> str:
+        """Next page of at most ``n`` rows (default: the page size given to ``open``) as JSON.
+
+        ``cursor_id`` and ``n`` are checked as tool arguments: PagingError unless a string and a
+        positive integer."""
+        if not isinstance(cursor_id, str):
+            raise PagingError(f"fetch_page needs the cursor string of a paged result, got {cursor_id!r}")
+        if n is not None:
+            n = page_size(n, "n")
+        # The cursor is checked out while its page is produced, so concurrent fetches cannot share it.
+        with self._lock:
+            self._expire()
+            state = self._cursors.pop(cursor_id, None)
+        if state is None:
+            raise PagingError(f"Unknown or expired cursor: {cursor_id}")
+        page = self._take(state, state.page_rows if n is None else n)
+        done = self._done(state)
+        response = self._page(None if done else cursor_id, state, page)
+        if not done:
+            with self._lock:
+                state.expires_at = self._clock() + self.ttl_seconds
+                self._cursors[cursor_id] = state
+        return json.dumps(response)
+
+    def close(self, cursor_id: str) -> bool:
+        """Drop a cursor before it is exhausted. Returns False if it was unknown."""
+        with self._lock:
+            return self._cursors.pop(cursor_id, None) is not None
+
+    def _expire(self) -> None:
+        now = self._clock()
+        for cursor_id in [c for c, state in self._cursors.items() if state.expires_at <= now]:
+            del self._cursors[cursor_id]
+
+    @staticmethod
+    def _done(state: _Cursor) -> bool:
+        return state.num_rows is not None and state.offset >= state.num_rows
+
+    @staticmethod
+    def _take(state: _Cursor, rows: int) -> pd.DataFrame:
+        parts: list[pd.DataFrame] = []
+        needed = rows
+        for chunk in itertools.chain([state.pending] if state.pending is not None else [], state.chunks):
+            if len(chunk) > needed:
+                parts.append(chunk.iloc[:needed])
+                state.pending = chunk.iloc[needed:]
+                needed = 0
+                break
+            parts.append(chunk)
+            needed -= len(chunk)
+            if needed == 0:
+                state.pending = None
+                break
+        else:
+            state.pending = None
+            state.chunks = iter(())  # release the exhausted source
+            state.num_rows = state.offset + rows - needed
+        page = pd.concat(parts) if len(parts) > 1 else parts[0] if parts else pd.DataFrame()
+        state.offset += len(page)
+        return page
+
+    @staticmethod
+    def _page(cursor_id: Optional[str], state: _Cursor, page: pd.DataFrame) -> dict[str, Any]:
+        return {
+            "cursor": cursor_id,
+            "offset": state.offset - len(page),
+            "rows": len(page),
+            "page": encode_result(page, state.fmt),
+        }
@@ -0,0 +1,268 @@
+"""Tests for ResultPager."""
+
+import io
+import json
+from typing import Any, Iterator, Union
+
+import pandas as pd
+import pytest
+from mloda.user import Feature, PluginLoader
+from mloda.user import mloda as mlodaAPI
+
+import demo
+from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import (
+    BLOCK_ROWS,
+    ROWS_OPTION,
+    SEED_OPTION,
+    generate_employees,
+    iter_employee_chunks,
+)
+from ptc_mloda_demo.tools.encoding.result_encoding import UnsupportedFormatError, decode_result
+from ptc_mloda_demo.tools.paging.result_pager import (
+    PagingError,
+    ResultPager,
+    iter_frame_chunks,
+    limit_chunks,
+    page_size,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _csv(response: dict[str, Any]) -> pd.DataFrame:
+    return pd.read_csv(io.StringIO(response["page"]))
+
+
+def _drain(pager: ResultPager, first: str) -> list[dict[str, Any]]:
+    pages = [json.loads(first)]
+    while pages[-1]["cursor"] is not None:
+        pages.append(json.loads(pager.fetch_page(pages[-1]["cursor"])))
+    return pages
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Paging
+# ---------------------------------------------------------------------------
+
+
+class TestResultPagerPages:
+    """First page with schema and cursor; later pages via fetch_page."""
+
+    def test_first_page_carries_schema_and_count(self) -> None:
+        frame = generate_employees(25)
+        first = json.loads(ResultPager().open(iter_frame_chunks(frame, 10), len(frame), "csv", 10))
+        assert first["num_rows"] == 25
+        assert [c["name"] for c in first["schema"]] == list(frame.columns)
+        assert first["offset"] == 0 and first["rows"] == 10
+        assert first["cursor"] is not None
+
+    def test_pages_reassemble_the_result(self) -> None:
+        frame = generate_employees(25)
+        pager = ResultPager()
+        pages = _drain(pager, pager.open(iter_frame_chunks(frame, 10), len(frame), "csv", 10))
+        assert [p["rows"] for p in pages] == [10, 10, 5]
+        assert [p["offset"] for p in pages] == [0, 10, 20]
+        combined = pd.concat([_csv(p) for p in pages], ignore_index=True)
+        assert combined["employee_id"].tolist() == frame["employee_id"].tolist()
+        assert len(pager) == 0
+
+    def test_page_size_independent_of_chunk_size(self) -> None:
+        pager = ResultPager()
+        chunks = iter_employee_chunks(100, columns={"employee_id"}, chunk_rows=7)
+        first = json.loads(pager.open(chunks, 100, "csv", 30))
+        second = json.loads(pager.fetch_page(first["cursor"], n=45))
+        assert (first["rows"], second["rows"]) == (30, 45)
+        assert _csv(second)["employee_id"].tolist() == list(range(31, 76))
+
+    def test_small_result_has_no_cursor(self) -> None:
+        pager = ResultPager()
+        first = json.loads(pager.open(iter_frame_chunks(generate_employees(5), 10), 5, "csv", 10))
+        assert first["cursor"] is None
+        assert len(pager) == 0
+
+    def test_empty_result_is_one_empty_page(self) -> None:
+        pager = ResultPager()
+        frame = generate_employees(5).iloc[0:0]
+        first = json.loads(pager.open(iter_frame_chunks(frame, 10), 0, "csv", 10))
+        assert (first["num_rows"], first["rows"], first["cursor"]) == (0, 0, None)
+        assert [c["name"] for c in first["schema"]] == list(frame.columns)
+        assert list(_csv(first).columns) == list(frame.columns)
+        assert json.loads(pager.open(iter([]), 0, "csv", 10))["rows"] == 0
+        assert len(pager) == 0
+
+    def test_binary_pages(self) -> None:
+        frame = generate_employees(20)
+        pager = ResultPager()
+        pages = _drain(pager, pager.open(iter_frame_chunks(frame, 8), len(frame), "parquet", 8))
+        decoded = pd.concat([decode_result(p["page"], "parquet") for p in pages], ignore_index=True)
+        assert decoded["salary"].tolist() == frame["salary"].tolist()
+
+    def test_uncounted_stream(self) -> None:
+        frame = generate_employees(25)
+        pager = ResultPager()
+        first = json.loads(pager.open(limit_chunks(iter_frame_chunks(frame, 10), 22), None, "csv", 10))
+        assert first["num_rows"] is None and first["cursor"] is not None
+        pages = _drain(pager, json.dumps(first))
+        assert [p["rows"] for p in pages] == [10, 10, 2]
+        small = json.loads(pager.open(iter_frame_chunks(frame, 30), None, "csv", 30))
+        assert (small["num_rows"], small["cursor"]) == (25, None)
+
+    def test_pages_are_pulled_lazily(self) -> None:
+        pulled = []
+
+        def chunks() -> Iterator[pd.DataFrame]:
+            for start in range(0, 100, 10):
+                pulled.append(start)
+                yield pd.DataFrame({"x": range(start, start + 10)})
+
+        pager = ResultPager()
+        first = json.loads(pager.open(chunks(), 100, "csv", 10))
+        assert pulled == [0]
+        pager.fetch_page(first["cursor"])
+        assert pulled == [0, 10]
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Cursor lifecycle
+# ---------------------------------------------------------------------------
+
+
+class TestResultPagerCursors:
+    """Unknown, expired and evicted cursors are rejected."""
+
+    def test_unknown_cursor(self) -> None:
+        with pytest.raises(PagingError):
+            ResultPager().fetch_page("nope")
+
+    def test_cursor_expires(self) -> None:
+        clock = FakeClock()
+        pager = ResultPager(ttl_seconds=10, clock=clock)
+        first = json.loads(pager.open(iter_frame_chunks(generate_employees(30), 10), 30, "csv", 10))
+        clock.now = 9
+        second = json.loads(pager.fetch_page(first["cursor"]))
+        clock.now = 20
+        with pytest.raises(PagingError):
+            pager.fetch_page(second["cursor"])
+
+    def test_oldest_cursor_dropped_when_full(self) -> None:
+        pager = ResultPager(max_cursors=2)
+        frame = generate_employees(30)
+        cursors = [json.loads(pager.open(iter_frame_chunks(frame, 10), 30, "csv", 10))["cursor"] for _ in range(3)]
+        assert len(pager) == 2
+        with pytest.raises(PagingError):
+            pager.fetch_page(cursors[0])
+        pager.fetch_page(cursors[2])
+
+    def test_close(self) -> None:
+        pager = ResultPager()
+        first = json.loads(pager.open(iter_frame_chunks(generate_employees(30), 10), 30, "csv", 10))
+        assert pager.close(first["cursor"]) is True
+        assert pager.close(first["cursor"]) is False
+
+    @pytest.mark.parametrize("value", ["x", "", 0, -3, 2.5, True, None, [5]])
+    def test_bad_page_sizes(self, value: Any) -> None:
+        with pytest.raises(PagingError, match="page_rows"):
+            page_size(value, "page_rows")
+        pager = ResultPager()
+        with pytest.raises(PagingError):
+            pager.open(iter_frame_chunks(generate_employees(30), 10), 30, "csv", value)
+        first = json.loads(pager.open(iter_frame_chunks(generate_employees(30), 10), 30, "csv", 10))
+        with pytest.raises(PagingError, match="n must"):
+            pager.fetch_page(first["cursor"], value if value is not None else "x")
+
+    def test_page_sizes_from_json(self) -> None:
+        assert (page_size(5, "n"), page_size("5", "n"), page_size(5.0, "n")) == (5, 5, 5)
+
+    @pytest.mark.parametrize("cursor", [None, 3, {"cursor": "x"}])
+    def test_missing_cursor(self, cursor: Any) -> None:
+        with pytest.raises(PagingError, match="cursor"):
+            ResultPager().fetch_page(cursor)
+
+    def test_bad_format_leaves_no_cursor(self) -> None:
+        pager = ResultPager()
+        with pytest.raises(UnsupportedFormatError):
+            pager.open(iter_frame_chunks(generate_employees(30), 10), 30, "xml", 10)
+        assert len(pager) == 0
+
+
+# ---------------------------------------------------------------------------
+# Level 3: Integration — paging a mloda result
+# ---------------------------------------------------------------------------
+
+
+def test_pages_mloda_result() -> None:
+    PluginLoader.all()
+    features: list[Union[Feature, str]] = ["employee_id", "salary"]
+    frame = mlodaAPI.run_all(features, compute_frameworks=["PandasDataFrame"])[0]
+    pager = ResultPager()
+    pages = _drain(pager, pager.open(iter_frame_chunks(frame, 4), len(frame), "columnar_json", 4))
+    assert [p["rows"] for p in pages] == [4, 4, 2]
+    decoded = pd.concat([decode_result(p["page"], "columnar_json") for p in pages], ignore_index=True)
+    assert sorted(decoded["employee_id"].tolist()) == list(range(1, 11))
+
+
+def test_demo_pages_an_empty_filtered_result() -> None:
+    PluginLoader.all()
+    demo.RESULT_CACHE.clear()
+    inputs: dict[str, Any] = {
+        "feature_names": ["employee_id", "salary"],
+        "filter": [{"column": "salary", "op": "<", "value": 0}],
+        "page_rows": 5,
+    }
+    try:
+        first = json.loads(demo._call_tool("run_features", inputs))
+    finally:
+        demo.RESULT_CACHE.clear()
+    assert (first["num_rows"], first["rows"], first["cursor"]) == (0, 0, None)
+    assert [c["name"] for c in first["schema"]] == ["employee_id", "salary"]
+
+
+@pytest.mark.parametrize(
+    ("name", "inputs"),
+    [
+        ("run_features", {"feature_names": ["employee_id"], "page_rows": "x"}),
+        ("fetch_page", {}),
+        ("fetch_page", {"cursor": "nope", "n": "many"}),
+    ],
+)
+def test_demo_reports_bad_paging_arguments(name: str, inputs: dict[str, Any]) -> None:
+    PluginLoader.all()
+    assert "error" in json.loads(demo._call_tool(name, inputs))
+
+
+def test_demo_streams_pages_from_generated_rows(monkeypatch: pytest.MonkeyPatch) -> None:
+    rows = 3 * BLOCK_ROWS
+    pulled: list[int] = []
+
+    def counting(*args: Any) -> Iterator[pd.DataFrame]:
+        for chunk in iter_employee_chunks(*args):
+            pulled.append(len(chunk))
+            yield chunk
+
+    monkeypatch.setattr(demo, "iter_employee_chunks", counting)
+    monkeypatch.setitem(demo.FEATURE_OPTIONS, ROWS_OPTION, rows)
+    monkeypatch.setitem(demo.FEATURE_OPTIONS, SEED_OPTION, 5)
+    inputs: dict[str, Any] = {
+        "feature_names": ["employee_id", "salary"],
+        "filter": [{"column": "performance_score", "op": ">", "value": 50}],
+        "limit": BLOCK_ROWS,
+        "page_rows": 1000,
+    }
+    demo.RESULT_CACHE.clear()
+    first = json.loads(demo._call_tool("run_features", inputs))
+    assert len(demo.RESULT_CACHE) == 0
+    assert first["num_rows"] is None and pulled == [BLOCK_ROWS]
+    pages = [first]
+    while pages[-1]["cursor"] is not None:
+        pages.append(json.loads(demo._call_tool("fetch_page", {"cursor": pages[-1]["cursor"]})))
+    assert len(pulled) < 3
+    expected = generate_employees(rows, seed=5)
+    expected = expected[expected["performance_score"] > 50][["employee_id", "salary"]].head(BLOCK_ROWS)
+    streamed = pd.concat([_csv(page) for page in pages], ignore_index=True)
+    pd.testing.assert_frame_equal(streamed, expected.reset_index(drop=True), check_dtype=False)
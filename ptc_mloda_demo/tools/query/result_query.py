@@ -0,0 +1,370 @@
+"""Server-side filter / aggregate / sort / limit for run_features results.
+
+The query is parsed from the run_features tool inputs and applied to the mloda result
+before it is serialized, so that only the rows the model asked for cross the tool
+boundary. pandas results are queried with vectorized pandas operations; Arrow tables
+(from the Arrow-based compute frameworks) with Arrow compute kernels, converting only
+the query's result to pandas.
+"""
+
+import dataclasses
+import operator
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+FILTER_OPS: dict[str, Callable[[pd.Series, Any], pd.Series]] = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "in": lambda series, value: series.isin(value),
+    "not_in": lambda series, value: ~series.isin(value),
+}
+
+AGGREGATION_FUNCS = ("count", "sum", "mean", "median", "min", "max", "std", "nunique")
+
+# Aggregations that only apply to numeric (or boolean) columns.
+NUMERIC_AGGREGATIONS = ("sum", "mean", "median", "std")
+
+ARROW_FILTER_OPS: dict[str, Callable[[pa.ChunkedArray, Any], Any]] = {
+    "==": pc.equal,
+    "!=": pc.not_equal,
+    ">": pc.greater,
+    ">=": pc.greater_equal,
+    "<": pc.less,
+    "<=": pc.less_equal,
+    "in": lambda column, value: pc.is_in(column, value_set=pa.array(value)),
+    "not_in": lambda column, value: pc.invert(pc.is_in(column, value_set=pa.array(value))),
+}
+
+# Arrow hash aggregations (name, options) matching the pandas ones; median is left to pandas,
+# since Arrow's is approximate.
+ARROW_AGGREGATIONS: dict[str, tuple[str, Any]] = {
+    "count": ("count", None),
+    "sum": ("sum", None),
+    "mean": ("mean", None),
+    "min": ("min", None),
+    "max": ("max", None),
+    "std": ("stddev", pc.VarianceOptions(ddof=1)),
+    "nunique": ("count_distinct", None),
+}
+
+Frame = Union[pd.DataFrame, pa.Table]
+
+# JSON schema properties merged into the run_features input_schema.
+QUERY_SCHEMA_PROPERTIES: dict[str, Any] = {
+    "filter": {
+        "type": "array",
+        "description": "Row filters, combined with AND. 'in' / 'not_in' take a list value.",
+        "items": {
+            "type": "object",
+            "properties": {
+                "column": {"type": "string"},
+                "op": {"type": "string", "enum": list(FILTER_OPS)},
+                "value": {},
+            },
+            "required": ["column", "op", "value"],
+        },
+    },
+    "group_by": {
+        "type": "array",
+        "items": {"type": "string"},
+        "description": "Columns to group by. Requires aggregations.",
+    },
+    "aggregations": {
+        "type": "array",
+        "description": (
+            "Aggregations per group (or over all rows without group_by). "
+            "Output columns are named <column>_<func> unless 'alias' is given."
+        ),
+        "items": {
+            "type": "object",
+            "properties": {
+                "column": {"type": "string"},
+                "func": {"type": "string", "enum": list(AGGREGATION_FUNCS)},
+                "alias": {"type": "string"},
+            },
+            "required": ["column", "func"],
+        },
+    },
+    "order_by": {
+        "type": "array",
+        "description": "Sort keys, applied after aggregation.",
+        "items": {
+            "type": "object",
+            "properties": {
+                "column": {"type": "string"},
+                "descending": {"type": "boolean"},
+            },
+            "required": ["column"],
+        },
+    },
+    "limit": {
+        "type": "integer",
+        "minimum": 0,
+        "description": "Maximum number of rows to return, applied last.",
+    },
+}
+
+
+class QueryError(ValueError):
+    """Raised for a malformed run_features query; reported back to the model as a tool error."""
+
+
+def _items(inputs: dict[str, Any], argument: str) -> list[dict[str, Any]]:
+    """The objects of a filter / aggregations / order_by argument, each with a string column."""
+    items = inputs.get(argument) or []
+    if not isinstance(items, list):
+        raise QueryError(f"{argument} must be a list of objects")
+    for item in items:
+        if not isinstance(item, dict) or not isinstance(item.get("column"), str):
+            raise QueryError(f"Each {argument} item must be an object with a string 'column', got {item!r}")
+    return items
+
+
+@dataclass(frozen=True)
+class RowFilter:
+    column: str
+    op: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class Aggregation:
+    column: str
+    func: str
+    alias: str
+
+
+@dataclass(frozen=True)
+class SortKey:
+    column: str
+    descending: bool = False
+
+
+@dataclass(frozen=True)
+class ResultQuery:
+    """A parsed run_features request: the features to return plus an optional query on them."""
+
+    feature_names: tuple[str, ...]
+    filters: tuple[RowFilter, ...] = ()
+    group_by: tuple[str, ...] = ()
+    aggregations: tuple[Aggregation, ...] = ()
+    order_by: tuple[SortKey, ...] = ()
+    limit: Optional[int] = None
+
+    @classmethod
+    def from_inputs(cls, inputs: dict[str, Any]) -> "ResultQuery":
+        """Parse and validate run_features tool inputs."""
+        feature_names = inputs.get("feature_names")
+        if not isinstance(feature_names, list) or not feature_names:
+            raise QueryError("feature_names must be a non-empty list of strings")
+
+        filters = []
+        for item in _items(inputs, "filter"):
+            op = item.get("op")
+            if op not in FILTER_OPS:
+                raise QueryError(f"Unsupported filter op {op!r}; expected one of {list(FILTER_OPS)}")
+            if op in ("in", "not_in") and not isinstance(item.get("value"), list):
+                raise QueryError(f"Filter op {op!r} needs a list value")
+            filters.append(RowFilter(column=item["column"], op=op, value=item.get("value")))
+
+        aggregations = []
+        for item in _items(inputs, "aggregations"):
+            func = item.get("func")
+            if func not in AGGREGATION_FUNCS:
+                raise QueryError(f"Unsupported aggregation {func!r}; expected one of {list(AGGREGATION_FUNCS)}")
+            column = item["column"]
+            aggregations.append(Aggregation(column=column, func=func, alias=item.get("alias") or f"{column}_{func}"))
+
+        group_by_input = inputs.get("group_by") or ()
+        group_by = (group_by_input,) if isinstance(group_by_input, str) else tuple(group_by_input)
+        if not all(isinstance(column, str) for column in group_by):
+            raise QueryError("group_by must be a column name or a list of column names")
+        if group_by and not aggregations:
+            raise QueryError("group_by requires at least one aggregation")
+
+        limit = inputs.get("limit")
+        if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 0):
+            raise QueryError("limit must be a non-negative integer")
+
+        return cls(
+            feature_names=tuple(dict.fromkeys(feature_names)),
+            filters=tuple(filters),
+            group_by=group_by,
+            aggregations=tuple(aggregations),
+            order_by=tuple(
+                SortKey(column=item["column"], descending=bool(item.get("descending", False)))
+                for item in _items(inputs, "order_by")
+            ),
+            limit=limit,
+        )
+
+    @property
+    def aggregates(self) -> bool:
+        return bool(self.aggregations)
+
+    @property
+    def fetch_names(self) -> list[str]:
+        """Feature names mloda must produce: the requested ones plus every column the query reads."""
+        names = list(self.feature_names)
+        names.extend(f.column for f in self.filters)
+        names.extend(self.group_by)
+        names.extend(a.column for a in self.aggregations)
+        if not self.aggregates:
+            names.extend(k.column for k in self.order_by)
+        return list(dict.fromkeys(names))
+
+    def apply(self, frame: Frame) -> pd.DataFrame:
+        """Filter, aggregate, sort and limit ``frame``, projecting to the requested output columns."""
+        if isinstance(frame, pa.Table):
+            return self._apply_arrow(frame)
+        self._check_columns(frame, [f.column for f in self.filters], "filter")
+        if self.filters:
+            frame = frame.loc[self._mask(frame)]
+
+        if self.aggregates:
+            frame = self._aggregate(frame)
+            columns = [*self.group_by, *(a.alias for a in self.aggregations)]
+        else:
+            columns = list(self.feature_names)
+
+        if self.order_by:
+            self._check_columns(frame, [k.column for k in self.order_by], "order_by")
+            frame = self._sort(frame)
+        elif self.limit is not None:
+            frame = frame.head(self.limit)
+
+        return frame[columns].reset_index(drop=True)
+
+    def _mask(self, frame: pd.DataFrame) -> pd.Series:
+        mask = pd.Series(True, index=frame.index)
+        for row_filter in self.filters:
+            try:
+                mask &= FILTER_OPS[row_filter.op](frame[row_filter.column], row_filter.value)
+            except TypeError as e:
+                raise QueryError(f"Cannot compare column {row_filter.column!r} with {row_filter.value!r}: {e}") from e
+        return mask
+
+    def _aggregate(self, frame: pd.DataFrame) -> pd.DataFrame:
+        self._check_columns(frame, [*self.group_by, *(a.column for a in self.aggregations)], "aggregations")
+        self._check_numeric(lambda column: pd.api.types.is_numeric_dtype(frame[column]))
+        try:
+            if not self.group_by:
+                return pd.DataFrame({a.alias: [frame[a.column].agg(a.func)] for a in self.aggregations})
+            named = {a.alias: (a.column, a.func) for a in self.aggregations}
+            grouped = frame.groupby(list(self.group_by), sort=True, dropna=False, observed=True)
+            return grouped.agg(**named).reset_index()
+        except TypeError as e:
+            raise QueryError(f"Cannot aggregate {self._describe_aggregations()}: {e}") from e
+
+    def _check_numeric(self, is_numeric: Callable[[str], bool]) -> None:
+        for a in self.aggregations:
+            if a.func in NUMERIC_AGGREGATIONS and not is_numeric(a.column):
+                raise QueryError(f"Aggregation {a.func!r} needs a numeric column, got {a.column!r}")
+
+    def _describe_aggregations(self) -> str:
+        return ", ".join(f"{a.func}({a.column})" for a in self.aggregations)
+
+    def _sort(self, frame: pd.DataFrame) -> pd.DataFrame:
+        columns = [k.column for k in self.order_by]
+        single = self.order_by[0] if len(self.order_by) == 1 else None
+        if self.limit is not None and single is not None and pd.api.types.is_numeric_dtype(frame[single.column]):
+            # Partial selection is O(n log k) instead of a full sort.
+            select = frame.nlargest if single.descending else frame.nsmallest
+            return select(self.limit, single.column)
+        frame = frame.sort_values(columns, ascending=[not k.descending for k in self.order_by], kind="stable")
+        return frame if self.limit is None else frame.head(self.limit)
+
+    def _apply_arrow(self, table: pa.Table) -> pd.DataFrame:
+        """``apply`` with Arrow compute kernels; only the (usually small) result is converted to pandas."""
+        self._check_columns(table, [f.column for f in self.filters], "filter")
+        if self.filters:
+            table = table.filter(self._arrow_mask(table))
+
+        if self.aggregates:
+            self._check_columns(table, [*self.group_by, *(a.column for a in self.aggregations)], "aggregations")
+            self._check_numeric(lambda column: _is_arrow_numeric(table.schema.field(column).type))
+            if any(a.func not in ARROW_AGGREGATIONS for a in self.aggregations):
+                # Exact median: hand pandas only the columns the aggregation reads, already filtered.
+                read = list(dict.fromkeys([*self.group_by, *(a.column for a in self.aggregations)]))
+                return dataclasses.replace(self, filters=()).apply(table.select(read).to_pandas(split_blocks=True))
+            table = self._arrow_aggregate(table)
+            columns = [*self.group_by, *(a.alias for a in self.aggregations)]
+        else:
+            columns = list(self.feature_names)
+
+        if self.order_by:
+            self._check_columns(table, [k.column for k in self.order_by], "order_by")
+            table = _arrow_sort(table, self.order_by, self.limit)
+        elif self.limit is not None:
+            table = table.slice(0, self.limit)
+
+        return table.select(columns).to_pandas(split_blocks=True)
+
+    def _arrow_mask(self, table: pa.Table) -> Any:
+        mask = None
+        for row_filter in self.filters:
+            try:
+                matches = ARROW_FILTER_OPS[row_filter.op](table.column(row_filter.column), row_filter.value)
+            except (pa.ArrowException, TypeError) as e:
+                raise QueryError(f"Cannot compare column {row_filter.column!r} with {row_filter.value!r}: {e}") from e
+            mask = matches if mask is None else pc.and_(mask, matches)
+        return mask
+
+    def _arrow_aggregate(self, table: pa.Table) -> pa.Table:
+        pairs = list(dict.fromkeys((a.column, a.func) for a in self.aggregations))
+        try:
+            aggregated = table.group_by(list(self.group_by)).aggregate(
+                [(column, *ARROW_AGGREGATIONS[func]) for column, func in pairs]
+            )
+        except pa.ArrowException as e:
+            raise QueryError(f"Cannot aggregate {self._describe_aggregations()}: {e}") from e
+        columns = {key: aggregated.column(key) for key in self.group_by}
+        for a in self.aggregations:
+            columns[a.alias] = aggregated.column(f"{a.column}_{ARROW_AGGREGATIONS[a.func][0]}")
+        result = pa.table(columns)
+        # pandas' groupby(sort=True) order.
+        return _arrow_sort(result, [SortKey(key) for key in self.group_by], None) if self.group_by else result
+
+    @staticmethod
+    def _check_columns(frame: Frame, columns: list[str], argument: str) -> None:
+        present = frame.column_names if isinstance(frame, pa.Table) else frame.columns
+        missing = [c for c in columns if c not in present]
+        if missing:
+            raise QueryError(f"Unknown column(s) in {argument}: {missing}")
+
+
+def _is_arrow_numeric(data_type: pa.DataType) -> bool:
+    return bool(
+        pa.types.is_integer(data_type)
+        or pa.types.is_floating(data_type)
+        or pa.types.is_decimal(data_type)
+        or pa.types.is_boolean(data_type)
+    )
+
+
+def _arrow_sort(table: pa.Table, keys: Any, limit: Optional[int]) -> pa.Table:
+    """Stable sort of ``table`` by ``keys`` (then its first ``limit`` rows), ordering pandas' way:
+    dictionary columns by dictionary position, like categoricals, and nulls last."""
+    table = table.unify_dictionaries()
+    sort_columns: dict[str, Any] = {}
+    for i, key in enumerate(keys):
+        column = table.column(key.column)
+        if pa.types.is_dictionary(column.type):
+            column = pa.chunked_array([chunk.indices for chunk in column.chunks], type=column.type.index_type)
+        sort_columns[f"key_{i}"] = column
+    order = [(name, "descending" if key.descending else "ascending") for name, key in zip(sort_columns, keys)]
+    if limit is None:
+        return table.take(pc.sort_indices(pa.table(sort_columns), sort_keys=order))
+    # Partial selection is O(n log k); the row position as last key keeps it stable.
+    sort_columns["row"] = pa.array(np.arange(table.num_rows))
+    indices = pc.select_k_unstable(pa.table(sort_columns), k=limit, sort_keys=[*order, ("row", "ascending")])
+    return table.take(indices)
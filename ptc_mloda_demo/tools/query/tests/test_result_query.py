@@ -0,0 +1,247 @@
+"""Tests for ResultQuery (server-side filter / aggregate / sort / limit)."""
+
+from typing import Any
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import (
+    EmployeeDataFeatures,
+    generate_employee_table,
+    generate_employees,
+)
+from ptc_mloda_demo.tools.query.result_query import QueryError, ResultQuery
+
+
+def _employees() -> pd.DataFrame:
+    frame: pd.DataFrame = EmployeeDataFeatures.calculate_feature(None, None)  # type: ignore[arg-type]
+    return frame
+
+
+def _run(inputs: dict[str, Any]) -> pd.DataFrame:
+    return ResultQuery.from_inputs(inputs).apply(_employees())
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Parsing and validation
+# ---------------------------------------------------------------------------
+
+
+class TestResultQueryParsing:
+    """Tool inputs are validated and the fetch set covers every referenced column."""
+
+    def test_plain_request_has_no_query(self) -> None:
+        query = ResultQuery.from_inputs({"feature_names": ["salary", "salary"]})
+        assert query.feature_names == ("salary",)
+        assert query.fetch_names == ["salary"]
+
+    def test_fetch_names_include_filter_and_sort_columns(self) -> None:
+        query = ResultQuery.from_inputs(
+            {
+                "feature_names": ["employee_id"],
+                "filter": [{"column": "performance_score", "op": ">", "value": 90}],
+                "order_by": [{"column": "salary"}],
+            }
+        )
+        assert query.fetch_names == ["employee_id", "performance_score", "salary"]
+
+    def test_single_group_by_column(self) -> None:
+        query = ResultQuery.from_inputs(
+            {
+                "feature_names": ["salary"],
+                "group_by": "department",
+                "aggregations": [{"column": "salary", "func": "mean"}],
+            }
+        )
+        assert query.group_by == ("department",)
+
+    @pytest.mark.parametrize(
+        "inputs",
+        [
+            {"feature_names": []},
+            {"feature_names": ["a"], "filter": [{"column": "a", "op": "~", "value": 1}]},
+            {"feature_names": ["a"], "filter": [{"column": "a", "op": "in", "value": 1}]},
+            {"feature_names": ["a"], "aggregations": [{"column": "a", "func": "mode"}]},
+            {"feature_names": ["a"], "group_by": ["a"]},
+            {"feature_names": ["a"], "limit": -1},
+            {"feature_names": ["a"], "limit": True},
+            {"feature_names": ["a"], "filter": [{"op": "==", "value": 1}]},
+            {"feature_names": ["a"], "filter": {"column": "a", "op": "==", "value": 1}},
+            {"feature_names": ["a"], "aggregations": [{"func": "mean"}]},
+            {"feature_names": ["a"], "order_by": ["a"]},
+            {"feature_names": ["a"], "group_by": [1], "aggregations": [{"column": "a", "func": "sum"}]},
+        ],
+    )
+    def test_invalid_inputs_raise(self, inputs: dict[str, Any]) -> None:
+        with pytest.raises(QueryError):
+            ResultQuery.from_inputs(inputs)
+
+
+# ---------------------------------------------------------------------------
+# Level 2: The QUESTIONS workload
+# ---------------------------------------------------------------------------
+
+
+class TestResultQueryApply:
+    """Each demo question comes back as a tiny frame."""
+
+    def test_top_three_highest_paid(self) -> None:
+        result = _run(
+            {
+                "feature_names": ["employee_id", "department", "salary"],
+                "order_by": [{"column": "salary", "descending": True}],
+                "limit": 3,
+            }
+        )
+        assert list(result.columns) == ["employee_id", "department", "salary"]
+        assert result["employee_id"].tolist() == [10, 3, 1]
+
+    def test_average_salary_per_department(self) -> None:
+        result = _run(
+            {
+                "feature_names": ["department", "salary"],
+                "group_by": ["department"],
+                "aggregations": [{"column": "salary", "func": "mean"}],
+            }
+        )
+        assert list(result.columns) == ["department", "salary_mean"]
+        means = dict(zip(result["department"], result["salary_mean"]))
+        assert means == {"Engineering": 98750.0, "HR": 61000.0, "Sales": 71666.66666666667}
+
+    def test_performance_filter(self) -> None:
+        result = _run(
+            {
+                "feature_names": ["employee_id", "department", "performance_score"],
+                "filter": [{"column": "performance_score", "op": ">", "value": 90}],
+            }
+        )
+        assert result["employee_id"].tolist() == [3, 10]
+
+    def test_filter_column_not_in_output(self) -> None:
+        result = _run(
+            {
+                "feature_names": ["employee_id"],
+                "filter": [{"column": "department", "op": "in", "value": ["HR"]}],
+            }
+        )
+        assert list(result.columns) == ["employee_id"]
+        assert result["employee_id"].tolist() == [7, 8, 9]
+
+    def test_aggregation_without_group_by(self) -> None:
+        result = _run(
+            {"feature_names": ["salary"], "aggregations": [{"column": "salary", "func": "max", "alias": "m"}]}
+        )
+        assert result.to_dict("records") == [{"m": 110000}]
+
+    def test_multi_key_sort(self) -> None:
+        result = _run(
+            {
+                "feature_names": ["employee_id"],
+                "order_by": [{"column": "department"}, {"column": "salary", "descending": True}],
+                "limit": 2,
+            }
+        )
+        assert result["employee_id"].tolist() == [10, 3]
+
+    def test_unknown_column_raises(self) -> None:
+        with pytest.raises(QueryError):
+            _run({"feature_names": ["salary"], "filter": [{"column": "nope", "op": "==", "value": 1}]})
+
+    def test_type_mismatch_raises(self) -> None:
+        with pytest.raises(QueryError):
+            _run({"feature_names": ["salary"], "filter": [{"column": "department", "op": ">", "value": 3}]})
+
+
+class TestResultQueryArrow:
+    """Arrow tables are queried in Arrow with the same results as pandas."""
+
+    @pytest.mark.parametrize(
+        "inputs",
+        [
+            {
+                "feature_names": ["employee_id", "salary"],
+                "order_by": [{"column": "salary", "descending": True}],
+                "limit": 5,
+            },
+            {
+                "feature_names": ["salary"],
+                "group_by": ["department"],
+                "aggregations": [
+                    {"column": "salary", "func": f} for f in ("count", "sum", "mean", "min", "max", "nunique")
+                ],
+            },
+            {
+                "feature_names": ["salary"],
+                "group_by": "department",
+                "aggregations": [{"column": "salary", "func": "median"}],
+                "filter": [{"column": "performance_score", "op": ">=", "value": 80}],
+            },
+            {
+                "feature_names": ["employee_id", "department"],
+                "filter": [{"column": "department", "op": "not_in", "value": ["HR", "Sales"]}],
+                "order_by": [{"column": "department"}, {"column": "years_experience", "descending": True}],
+                "limit": 50,
+            },
+            {"feature_names": ["employee_id", "department"], "limit": 7},
+        ],
+    )
+    def test_same_result_as_pandas(self, inputs: dict[str, Any]) -> None:
+        query = ResultQuery.from_inputs(inputs)
+        expected = query.apply(generate_employees(5_000, seed=4))
+        result = query.apply(generate_employee_table(5_000, seed=4))
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False, check_categorical=False)
+
+    def test_std_matches_pandas(self) -> None:
+        query = ResultQuery.from_inputs(
+            {"feature_names": ["salary"], "aggregations": [{"column": "salary", "func": "std"}]}
+        )
+        table = generate_employee_table(1_000, seed=4)
+        assert query.apply(table)["salary_std"][0] == pytest.approx(query.apply(table.to_pandas())["salary_std"][0])
+
+    def test_type_mismatch_raises(self) -> None:
+        query = ResultQuery.from_inputs(
+            {"feature_names": ["salary"], "filter": [{"column": "salary", "op": ">", "value": "high"}]}
+        )
+        with pytest.raises(QueryError, match="Cannot compare"):
+            query.apply(pa.table({"salary": [1, 2]}))
+
+
+class TestAggregationTypes:
+    """Aggregations that do not fit a column's type are QueryErrors in both pandas and Arrow."""
+
+    @pytest.mark.parametrize("arrow", [False, True])
+    @pytest.mark.parametrize("func", ["sum", "mean", "median", "std"])
+    @pytest.mark.parametrize("group_by", [[], ["department"]])
+    def test_numeric_aggregation_on_strings_is_rejected(self, arrow: bool, func: str, group_by: list[str]) -> None:
+        query = ResultQuery.from_inputs(
+            {
+                "feature_names": ["department"],
+                "group_by": group_by,
+                "aggregations": [{"column": "department", "func": func}],
+            }
+        )
+        frame = generate_employee_table(100, seed=4) if arrow else generate_employees(100, seed=4)
+        with pytest.raises(QueryError, match="needs a numeric column"):
+            query.apply(frame)
+
+    @pytest.mark.parametrize("arrow", [False, True])
+    def test_min_max_on_strings(self, arrow: bool) -> None:
+        query = ResultQuery.from_inputs(
+            {
+                "feature_names": ["department"],
+                "aggregations": [{"column": "name", "func": "min"}, {"column": "name", "func": "max"}],
+            }
+        )
+        names = {"name": ["b", "a", "c"]}
+        result = query.apply(pa.table(names) if arrow else pd.DataFrame(names))
+        assert result.to_dict("records") == [{"name_min": "a", "name_max": "c"}]
+
+    @pytest.mark.parametrize("arrow", [False, True])
+    def test_min_on_unordered_categories_is_a_query_error(self, arrow: bool) -> None:
+        query = ResultQuery.from_inputs(
+            {"feature_names": ["department"], "aggregations": [{"column": "department", "func": "min"}]}
+        )
+        frame = generate_employee_table(100, seed=4) if arrow else generate_employees(100, seed=4)
+        with pytest.raises(QueryError, match="Cannot aggregate min"):
+            query.apply(frame)
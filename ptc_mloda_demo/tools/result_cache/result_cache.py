@@ -0,0 +1,184 @@
+"""Bounded LRU cache for run_features results, keyed on the requested feature set, compute framework and filters."""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+
+# (feature names, compute framework, filters mloda applied while fetching)
+CacheKey = tuple[tuple[str, ...], str, tuple[Any, ...]]
+
+# A pandas frame, or an Arrow table for the Arrow-based compute frameworks.
+Frame = Union[pd.DataFrame, pa.Table]
+
+
+def _nbytes(frame: Frame) -> int:
+    if isinstance(frame, pa.Table):
+        return int(frame.nbytes)
+    return int(frame.memory_usage(deep=True).sum())
+
+
+def _project(frame: Frame, names: list[str]) -> Frame:
+    return frame.select(names) if isinstance(frame, pa.Table) else frame[names]
+
+
+@dataclass
+class _Entry:
+    frame: Frame
+    nbytes: int
+    created_at: float
+
+
+@dataclass
+class CacheStats:
+    """Counters for cache effectiveness, exposed via ResultCache.stats."""
+
+    hits: int = 0
+    subset_hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+class ResultCache:
+    """Memoizes mloda results so repeated run_features calls skip planning and execution.
+
+    Entries are keyed on the sorted, de-duplicated feature names plus the compute
+    framework and the (hashable) filters mloda applied while fetching, since a
+    filtered fetch holds fewer rows than an unfiltered one. A request whose features are a subset of a cached entry is answered
+    by projecting the cached frame. Frames are pandas DataFrames or Arrow tables.
+    Eviction is LRU, bounded by the deep memory size of the cached frames, and
+    entries older than ``ttl_seconds`` are dropped.
+
+    Returned frames share memory with the cache and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: Optional[float] = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, _Entry] = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    @staticmethod
+    def make_key(feature_names: Iterable[str], compute_framework: str, filters: tuple[Any, ...] = ()) -> CacheKey:
+        return tuple(sorted(set(feature_names))), compute_framework, filters
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, feature_names: Iterable[str], compute_framework: str, filters: tuple[Any, ...] = ()
+    ) -> Optional[Frame]:
+        """Return the cached frame for the requested features, or None on a miss.
+
+        Columns come back in request order (duplicates removed), whether the hit
+        was exact or served from a cached superset.
+        """
+        requested = list(dict.fromkeys(feature_names))
+        key = self.make_key(requested, compute_framework, filters)
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats.hits += 1
+                return _project(entry.frame, requested)
+
+            superset_key = self._smallest_superset(key)
+            if superset_key is not None:
+                self._entries.move_to_end(superset_key)
+                self.stats.subset_hits += 1
+                return _project(self._entries[superset_key].frame, requested)
+
+            self.stats.misses += 1
+            return None
+
+    def put(
+        self, feature_names: Iterable[str], compute_framework: str, frame: Frame, filters: tuple[Any, ...] = ()
+    ) -> None:
+        """Store a result. Frames larger than max_bytes are not cached."""
+        key = self.make_key(feature_names, compute_framework, filters)
+        nbytes = _nbytes(frame)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _Entry(frame=frame, nbytes=nbytes, created_at=self._clock())
+            self._total_bytes += nbytes
+            while self._total_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.stats.evictions += 1
+
+    def get_or_compute(
+        self,
+        feature_names: Iterable[str],
+        compute_framework: str,
+        compute: Callable[[list[str]], Frame],
+        filters: tuple[Any, ...] = (),
+    ) -> Frame:
+        """Return a cached result, or call ``compute`` with the de-duplicated names and cache its output."""
+        requested = list(dict.fromkeys(feature_names))
+        cached = self.get(requested, compute_framework, filters)
+        if cached is not None:
+            return cached
+        frame = compute(requested)
+        self.put(requested, compute_framework, frame, filters)
+        return frame
+
+    def invalidate(self, feature_names: Optional[Iterable[str]] = None, compute_framework: Optional[str] = None) -> int:
+        """Drop entries containing any of the given features and/or using the given framework.
+
+        With no arguments every entry is dropped. Returns the number of removed entries.
+        """
+        names = set(feature_names) if feature_names is not None else None
+        with self._lock:
+            doomed = [
+                key
+                for key in self._entries
+                if (compute_framework is None or key[1] == compute_framework)
+                and (names is None or not names.isdisjoint(key[0]))
+            ]
+            for key in doomed:
+                self._remove(key)
+            return len(doomed)
+
+    def clear(self) -> None:
+        self.invalidate()
+
+    def _smallest_superset(self, key: CacheKey) -> Optional[CacheKey]:
+        wanted = set(key[0])
+        candidates = [k for k in self._entries if k[1:] == key[1:] and wanted.issubset(k[0])]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda k: self._entries[k].nbytes)
+
+    def _expire(self) -> None:
+        if self.ttl_seconds is None:
+            return
+        deadline = self._clock() - self.ttl_seconds
+        expired = [key for key, entry in self._entries.items() if entry.created_at <= deadline]
+        for key in expired:
+            self._remove(key)
+            self.stats.expirations += 1
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._total_bytes -= entry.nbytes
@@ -0,0 +1,163 @@
+"""Tests for ResultCache."""
+
+import pandas as pd
+import pyarrow as pa
+from mloda.user import Feature, PluginLoader
+from mloda.user import mloda as mlodaAPI
+
+from ptc_mloda_demo.tools.result_cache.result_cache import ResultCache
+
+import ptc_mloda_demo.feature_groups.sample_data.sample_data_features  # noqa: F401
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _frame(columns: list[str], rows: int = 3) -> pd.DataFrame:
+    return pd.DataFrame({c: list(range(rows)) for c in columns})
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Keys and lookups
+# ---------------------------------------------------------------------------
+
+
+class TestResultCacheLookup:
+    """Keys are normalized; exact and superset hits are served from memory."""
+
+    def test_key_is_sorted_and_deduplicated(self) -> None:
+        assert ResultCache.make_key(["b", "a", "b"], "PandasDataFrame") == (("a", "b"), "PandasDataFrame", ())
+
+    def test_miss_then_hit(self) -> None:
+        cache = ResultCache()
+        assert cache.get(["a", "b"], "PandasDataFrame") is None
+        cache.put(["a", "b"], "PandasDataFrame", _frame(["a", "b"]))
+        hit = cache.get(["b", "a"], "PandasDataFrame")
+        assert hit is not None
+        assert list(hit.columns) == ["b", "a"]
+        assert cache.stats.misses == 1
+        assert cache.stats.hits == 1
+
+    def test_compute_framework_is_part_of_key(self) -> None:
+        cache = ResultCache()
+        cache.put(["a"], "PandasDataFrame", _frame(["a"]))
+        assert cache.get(["a"], "PolarsDataFrame") is None
+
+    def test_filters_are_part_of_key(self) -> None:
+        cache = ResultCache()
+        hr = (("department", "equal", ("HR",)),)
+        cache.put(["a", "b"], "PandasDataFrame", _frame(["a", "b"], rows=1), hr)
+        assert cache.get(["a", "b"], "PandasDataFrame") is None
+        assert cache.get(["a"], "PandasDataFrame") is None
+        hit = cache.get(["a"], "PandasDataFrame", hr)
+        assert hit is not None and len(hit) == 1
+
+    def test_subset_served_from_superset(self) -> None:
+        cache = ResultCache()
+        cache.put(["a", "b", "c"], "PandasDataFrame", _frame(["a", "b", "c"]))
+        hit = cache.get(["c", "a"], "PandasDataFrame")
+        assert hit is not None
+        assert list(hit.columns) == ["c", "a"]
+        assert cache.stats.subset_hits == 1
+
+    def test_arrow_tables_are_projected(self) -> None:
+        cache = ResultCache()
+        table = pa.table({"a": [1, 2], "b": [3, 4]})
+        cache.put(["a", "b"], "PyArrowTable", table)
+        hit = cache.get(["b"], "PyArrowTable")
+        assert isinstance(hit, pa.Table) and hit.column_names == ["b"]
+        assert cache.total_bytes == table.nbytes
+
+    def test_get_or_compute_calls_compute_once(self) -> None:
+        cache = ResultCache()
+        calls: list[list[str]] = []
+
+        def compute(names: list[str]) -> pd.DataFrame:
+            calls.append(names)
+            return _frame(names)
+
+        cache.get_or_compute(["a", "b", "a"], "PandasDataFrame", compute)
+        cache.get_or_compute(["b", "a"], "PandasDataFrame", compute)
+        cache.get_or_compute(["a"], "PandasDataFrame", compute)
+        assert calls == [["a", "b"]]
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Eviction, TTL and invalidation
+# ---------------------------------------------------------------------------
+
+
+class TestResultCacheEviction:
+    """Byte budget, TTL and explicit invalidation."""
+
+    def test_lru_eviction_by_bytes(self) -> None:
+        frame_bytes = int(_frame(["a"]).memory_usage(deep=True).sum())
+        cache = ResultCache(max_bytes=frame_bytes * 2)
+        cache.put(["a"], "PandasDataFrame", _frame(["a"]))
+        cache.put(["b"], "PandasDataFrame", _frame(["b"]))
+        cache.get(["a"], "PandasDataFrame")
+        cache.put(["c"], "PandasDataFrame", _frame(["c"]))
+        assert cache.get(["b"], "PandasDataFrame") is None
+        assert cache.get(["a"], "PandasDataFrame") is not None
+        assert cache.stats.evictions == 1
+        assert cache.total_bytes <= cache.max_bytes
+
+    def test_oversized_frame_not_cached(self) -> None:
+        cache = ResultCache(max_bytes=1)
+        cache.put(["a"], "PandasDataFrame", _frame(["a"]))
+        assert len(cache) == 0
+
+    def test_ttl_expiry(self) -> None:
+        clock = FakeClock()
+        cache = ResultCache(ttl_seconds=10, clock=clock)
+        cache.put(["a"], "PandasDataFrame", _frame(["a"]))
+        clock.now = 5
+        assert cache.get(["a"], "PandasDataFrame") is not None
+        clock.now = 10
+        assert cache.get(["a"], "PandasDataFrame") is None
+        assert cache.stats.expirations == 1
+        assert cache.total_bytes == 0
+
+    def test_invalidate_by_feature(self) -> None:
+        cache = ResultCache()
+        cache.put(["a", "b"], "PandasDataFrame", _frame(["a", "b"]))
+        cache.put(["c"], "PandasDataFrame", _frame(["c"]))
+        assert cache.invalidate(feature_names=["b"]) == 1
+        assert cache.get(["a"], "PandasDataFrame") is None
+        assert cache.get(["c"], "PandasDataFrame") is not None
+
+    def test_invalidate_all(self) -> None:
+        cache = ResultCache()
+        cache.put(["a"], "PandasDataFrame", _frame(["a"]))
+        cache.put(["b"], "PolarsDataFrame", _frame(["b"]))
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.total_bytes == 0
+
+
+# ---------------------------------------------------------------------------
+# Level 3: Integration with mloda.run_all()
+# ---------------------------------------------------------------------------
+
+
+def test_caches_mloda_result() -> None:
+    PluginLoader.all()
+    cache = ResultCache()
+    calls = 0
+
+    def compute(names: list[str]) -> pd.DataFrame:
+        nonlocal calls
+        calls += 1
+        results = mlodaAPI.run_all([Feature.not_typed(n) for n in names], compute_frameworks=["PandasDataFrame"])
+        frame: pd.DataFrame = results[0]
+        return frame
+
+    first = cache.get_or_compute(["employee_id", "salary"], "PandasDataFrame", compute)
+    second = cache.get_or_compute(["salary"], "PandasDataFrame", compute)
+    assert calls == 1
+    assert second["salary"].tolist() == first["salary"].tolist()
@@ -0,0 +1,192 @@
+"""Tests for ToolServer and ToolClient."""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+from mloda.user import PluginLoader
+
+import demo
+from ptc_mloda_demo.tools.server.tool_server import (
+    Address,
+    ToolClient,
+    ToolServer,
+    ToolServerError,
+    format_address,
+    main,
+    parse_address,
+)
+
+LOCALHOST: Address = ("127.0.0.1", 0)
+
+INPUTS = {"feature_names": ["employee_id", "salary"], "order_by": [{"column": "salary"}], "limit": 3}
+
+
+def _echo(name: str, inputs: dict[str, Any]) -> str:
+    if name == "fail":
+        raise RuntimeError("boom")
+    if name == "sleep":
+        time.sleep(inputs["seconds"])
+    return json.dumps({"name": name, "input": inputs})
+
+
+@contextmanager
+def _running(handler: Any = _echo, address: Address = LOCALHOST, **kwargs: Any) -> Iterator[ToolServer]:
+    """A ToolServer on its own event loop thread, like ``demo.py --serve`` in another process."""
+    loop = asyncio.new_event_loop()
+    server = ToolServer(handler, address, **kwargs)
+    loop.run_until_complete(server.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        asyncio.run_coroutine_threadsafe(server.close(), loop).result(timeout=5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Addresses
+# ---------------------------------------------------------------------------
+
+
+class TestAddress:
+    """host:port is TCP, anything else a Unix socket path."""
+
+    def test_parse(self) -> None:
+        assert parse_address("127.0.0.1:8765") == ("127.0.0.1", 8765)
+        assert parse_address("localhost:0") == ("localhost", 0)
+        assert parse_address("/tmp/tools.sock") == "/tmp/tools.sock"
+        assert parse_address("./a:1") == "./a:1"
+        assert parse_address("tools.sock") == "tools.sock"
+
+    def test_format_round_trips(self) -> None:
+        for address in ("127.0.0.1:8765", "/tmp/tools.sock"):
+            assert format_address(parse_address(address)) == address
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Server and client
+# ---------------------------------------------------------------------------
+
+
+class TestToolServer:
+    """Calls reach the handler and come back over kept-open connections."""
+
+    def test_round_trip_over_tcp_reuses_the_connection(self) -> None:
+        with _running() as server:
+            client = ToolClient(server.address)
+            assert json.loads(client.call("run_features", {"feature_names": ["salary"]})) == {
+                "name": "run_features",
+                "input": {"feature_names": ["salary"]},
+            }
+            client.call("discover_features", {})
+            client.close()
+        assert (server.stats.connections, server.stats.requests, server.stats.errors) == (1, 2, 0)
+
+    def test_round_trip_over_a_unix_socket(self, tmp_path: Path) -> None:
+        path = str(tmp_path / "t.sock")
+        with _running(address=path) as server:
+            assert json.loads(ToolClient(path).call("x", {}))["name"] == "x"
+        assert not Path(path).exists()
+        assert server.stats.requests == 1
+
+    def test_handler_errors_are_raised_by_the_client(self) -> None:
+        with _running() as server:
+            client = ToolClient(server.address)
+            with pytest.raises(ToolServerError, match="Tool fail failed: RuntimeError: boom"):
+                client.call("fail", {})
+            assert json.loads(client.call("x", {}))["name"] == "x"  # the connection stays usable
+        assert server.stats.errors == 1
+
+    def test_concurrent_clients_run_in_parallel(self) -> None:
+        with _running(max_concurrency=8) as server:
+            client = ToolClient(server.address)
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: client.call("sleep", {"seconds": 0.3}), range(8)))
+            elapsed = time.perf_counter() - start
+        assert len(results) == 8
+        assert elapsed < 1.5  # 8 x 0.3s sequentially would take 2.4s
+        assert server.stats.connections == 8
+
+    def test_pipelined_requests_answer_as_they_complete(self) -> None:
+        with _running() as server:
+            assert not isinstance(server.address, str)
+            with socket.create_connection(server.address) as conn, conn.makefile("rwb") as f:
+                f.write(b'{"id": 1, "name": "sleep", "input": {"seconds": 0.3}}\n')
+                f.write(b'{"id": 2, "name": "fast"}\n')
+                f.write(b"not json\n")
+                f.flush()
+                responses = [json.loads(f.readline()) for _ in range(3)]
+        assert responses[-1]["id"] == 1  # the slow call does not hold back the ones behind it
+        by_id = {r["id"]: r for r in responses}
+        assert json.loads(by_id[2]["content"])["name"] == "fast"
+        assert "Malformed request" in by_id[None]["error"]
+
+    def test_client_reconnects_after_a_server_restart(self) -> None:
+        with _running() as server:
+            address = server.address
+            client = ToolClient(address)
+            client.call("x", {})
+        with _running(address=address):
+            assert json.loads(client.call("y", {}))["name"] == "y"
+
+    def test_unreachable_server(self) -> None:
+        with _running() as server:
+            address = server.address
+        with pytest.raises(ToolServerError, match="unreachable"):
+            ToolClient(address).call("x", {})
+
+    def test_cli(self, capsys: pytest.CaptureFixture[str]) -> None:
+        with _running() as server:
+            address = format_address(server.address)
+            assert main([address, "run_features", '{"limit": 1}']) == 0
+            assert json.loads(capsys.readouterr().out) == {"name": "run_features", "input": {"limit": 1}}
+            assert main([address, "fail"]) == 1
+            assert "boom" in capsys.readouterr().err
+        assert main([]) == 2
+
+
+# ---------------------------------------------------------------------------
+# Level 3: Integration with demo's tools
+# ---------------------------------------------------------------------------
+
+
+class TestDemoToolServer:
+    """A served demo answers like the in-process tools, and demo dispatch can use it."""
+
+    def test_served_results_match_in_process_results(self) -> None:
+        PluginLoader.all()
+        demo.FEATURE_CATALOG.refresh()
+        with _running(demo._call_tool) as server:
+            client = ToolClient(server.address)
+            assert client.call("run_features", INPUTS) == demo._call_tool("run_features", INPUTS)
+            assert client.call("discover_features", {"name": "EmployeeDataFeatures"}) == demo._call_tool(
+                "discover_features", {"name": "EmployeeDataFeatures"}
+            )
+
+    def test_demo_dispatch_and_bash_prompt_use_the_server(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        calls: list[str] = []
+
+        def handler(name: str, inputs: dict[str, Any]) -> str:
+            calls.append(name)
+            return "served"
+
+        with _running(handler) as server:
+            monkeypatch.setattr(demo, "TOOL_CLIENT", ToolClient(server.address))
+            assert demo._handle_tool_call("run_features", INPUTS) == "served"
+            prompt = demo._bash_prompt()
+        assert calls == ["run_features"]
+        assert f"tool_server {format_address(server.address)} run_features" in prompt
+        monkeypatch.setattr(demo, "TOOL_CLIENT", None)
+        assert demo._bash_prompt() == demo.BASH_PROMPT
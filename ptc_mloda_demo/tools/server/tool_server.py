@@ -0,0 +1,263 @@
+"""Long-lived tool server: discover_features / run_features over a local socket, with mloda kept warm.
+
+One process loads the plugins once and keeps the feature catalog, result cache and paging
+cursors across calls; bash scripts, the loop and PTC dispatch reach it through ToolClient
+instead of importing mloda themselves. The protocol is one JSON object per line:
+``{"id": 1, "name": "run_features", "input": {...}}`` is answered by
+``{"id": 1, "content": "..."}``, or ``{"id": 1, "error": "..."}`` when the handler raises.
+
+Usage (the server side runs in demo.py, which owns the handler):
+    python demo.py --serve /tmp/mloda-tools.sock
+    python -m ptc_mloda_demo.tools.server.tool_server /tmp/mloda-tools.sock discover_features
+    python -m ptc_mloda_demo.tools.server.tool_server 127.0.0.1:8765 run_features '{"feature_names": ["salary"]}'
+
+The client side only needs the standard library, so a client process never imports mloda or pandas.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional, Union, cast
+
+from ptc_mloda_demo.agents.dispatch.tool_dispatcher import ToolHandler
+
+logger = logging.getLogger(__name__)
+
+# Longest request line the server reads; tool inputs are small, results only flow the other way.
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+Address = Union[str, tuple[str, int]]
+
+
+class ToolServerError(RuntimeError):
+    """Raised by ToolClient when the server's handler failed or the server could not be reached."""
+
+
+def parse_address(address: str) -> Address:
+    """``host:port`` for TCP (localhost only, by convention), anything else is a Unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and host and port.isdigit() and "/" not in address:
+        return host, int(port)
+    return address
+
+
+def format_address(address: Address) -> str:
+    return address if isinstance(address, str) else f"{address[0]}:{address[1]}"
+
+
+@dataclass
+class ToolServerStats:
+    """Counters for server load, exposed via ToolServer.stats."""
+
+    connections: int = 0
+    requests: int = 0
+    errors: int = 0
+
+
+class ToolServer:
+    """asyncio server running ``handler(name, inputs)`` for any number of concurrent clients.
+
+    Requests on one connection may be pipelined: each runs as soon as it is read and its
+    response is written when it completes, tagged with the request's id. The handler runs
+    in worker threads, at most ``max_concurrency`` at a time across all connections, so a
+    slow mloda run never blocks the event loop or other clients. ``address`` is a Unix
+    socket path or ``(host, port)``; port 0 picks a free port, reported by ``address``
+    once started.
+    """
+
+    def __init__(self, handler: ToolHandler, address: Address, max_concurrency: int = 8) -> None:
+        self.handler = handler
+        self.address = address
+        self.max_concurrency = max_concurrency
+        self.stats = ToolServerStats()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._connections: set[asyncio.Task[None]] = set()
+
+    async def start(self) -> None:
+        if isinstance(self.address, str):
+            self._server = await asyncio.start_unix_server(
+                self._serve_connection, self.address, limit=MAX_REQUEST_BYTES
+            )
+        else:
+            host, port = self.address
+            self._server = await asyncio.start_server(self._serve_connection, host, port, limit=MAX_REQUEST_BYTES)
+            self.address = self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        try:
+            await cast(asyncio.AbstractServer, self._server).serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self) -> None:
+        """Stop listening and drop open connections; calls still running in worker threads are abandoned."""
+        if self._server is not None:
+            self._server.close()
+            for task in self._connections:
+                task.cancel()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
+            if isinstance(self.address, str) and os.path.exists(self.address):
+                os.unlink(self.address)
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats.connections += 1
+        connection = asyncio.current_task()
+        if connection is not None:
+            self._connections.add(connection)
+        write_lock = asyncio.Lock()
+        pending: set[asyncio.Task[None]] = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._respond(line, writer, write_lock))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.wait(pending)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            logger.warning("closing tool server connection: %r", e)
+        finally:
+            for task in pending:
+                task.cancel()
+            writer.close()
+            self._connections.discard(cast("asyncio.Task[None]", connection))
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter, write_lock: asyncio.Lock) -> None:
+        self.stats.requests += 1
+        request_id: Any = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            name, inputs = str(request["name"]), dict(request.get("input") or {})
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            response: dict[str, Any] = {"id": request_id, "error": f"Malformed request: {e!r}"}
+        else:
+            async with self._semaphore:
+                try:
+                    response = {"id": request_id, "content": await asyncio.to_thread(self.handler, name, inputs)}
+                except Exception as e:
+                    logger.warning("tool %s failed: %r", name, e)
+                    response = {"id": request_id, "error": f"Tool {name} failed: {type(e).__name__}: {e}"}
+        if "error" in response:
+            self.stats.errors += 1
+        async with write_lock:
+            writer.write(json.dumps(response).encode("utf-8") + b"\n")
+            await writer.drain()
+
+
+class ToolClient:
+    """Blocking client for a ToolServer; ``call`` has the ToolHandler signature.
+
+    Thread-safe: each concurrent caller gets its own connection, and connections are kept
+    open for the next call. A call on a kept connection the server has since closed (for
+    example after a server restart) is retried once on a new connection; tool calls are
+    read-only, so the retry is safe.
+    """
+
+    def __init__(self, address: Address, timeout_seconds: Optional[float] = 120.0) -> None:
+        self.address = parse_address(address) if isinstance(address, str) else address
+        self.timeout_seconds = timeout_seconds
+        self._idle: list[socket.socket] = []
+        self._lock = threading.Lock()
+        self._next_id = 0
+
+    def call(self, name: str, inputs: dict[str, Any]) -> str:
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            kept = self._idle.pop() if self._idle else None
+        payload = json.dumps({"id": request_id, "name": name, "input": inputs}).encode("utf-8") + b"\n"
+        try:
+            conn, response = self._send(kept, payload)
+        except OSError as e:
+            raise ToolServerError(f"Tool server at {format_address(self.address)} unreachable: {e}") from e
+        if response is None:
+            conn.close()
+            raise ToolServerError(f"Tool server at {format_address(self.address)} closed the connection")
+        with self._lock:
+            self._idle.append(conn)
+
+        if "error" in response:
+            raise ToolServerError(str(response["error"]))
+        return str(response["content"])
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _connect(self) -> socket.socket:
+        if isinstance(self.address, str):
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            conn = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        conn.settimeout(self.timeout_seconds)
+        try:
+            conn.connect(self.address)
+        except OSError:
+            conn.close()
+            raise
+        return conn
+
+    def _send(self, kept: Optional[socket.socket], payload: bytes) -> tuple[socket.socket, Optional[dict[str, Any]]]:
+        """Exchange on the kept connection, or on a new one if there is none or the server closed it."""
+        if kept is not None:
+            try:
+                response = self._exchange(kept, payload)
+            except OSError:
+                kept.close()
+                raise
+            if response is not None:
+                return kept, response
+            kept.close()
+        conn = self._connect()
+        try:
+            return conn, self._exchange(conn, payload)
+        except OSError:
+            conn.close()
+            raise
+
+    @staticmethod
+    def _exchange(conn: socket.socket, payload: bytes) -> Optional[dict[str, Any]]:
+        """Send one request and read its response; None if the server closed the connection."""
+        try:
+            conn.sendall(payload)
+            with conn.makefile("rb") as f:
+                line = f.readline()
+        except (BrokenPipeError, ConnectionResetError):
+            return None
+        if not line:
+            return None
+        response: dict[str, Any] = json.loads(line)
+        return response
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """``ADDRESS TOOL [JSON_INPUT]``: print the tool's result, or the error on stderr (exit code 1)."""
+    args = sys.argv[1:] if argv is None else argv
+    if len(args) not in (2, 3):
+        sys.stderr.write("usage: python -m ptc_mloda_demo.tools.server.tool_server ADDRESS TOOL [JSON_INPUT]\n")
+        return 2
+    client = ToolClient(args[0])
+    try:
+        sys.stdout.write(client.call(args[1], json.loads(args[2]) if len(args) == 3 else {}) + "\n")
+    except (ToolServerError, ValueError) as e:
+        sys.stderr.write(f"{e}\n")
+        return 1
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
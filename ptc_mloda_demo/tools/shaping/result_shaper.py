@@ -0,0 +1,317 @@
+"""Context-budget-aware shaping of run_features results: digests and handles for exact slices."""
+
+import json
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from ptc_mloda_demo.tools.encoding.result_encoding import DEFAULT_FORMAT, TEXT_FORMATS, encode_result
+
+# Quantiles reported per numeric column, with the names they get in a digest.
+QUANTILES = {"min": 0.0, "p25": 0.25, "p50": 0.5, "p75": 0.75, "max": 1.0}
+
+# Rows encoded to estimate the size of a large result before deciding to encode all of it.
+PROBE_ROWS = 256
+
+FETCH_SLICE_DESCRIPTION = (
+    "Fetch exact rows of a run_features result that was too large for the context budget and came back "
+    "as a digest. Pass the digest's handle, the first row (offset), how many rows (limit) and optionally "
+    "the columns. Slices are cut to fit the budget; handles expire after some minutes of inactivity."
+)
+
+FETCH_SLICE_INPUT_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "handle": {"type": "string", "description": "Handle from a run_features digest."},
+        "offset": {"type": "integer", "minimum": 0, "description": "First row, default 0."},
+        "limit": {"type": "integer", "minimum": 1, "description": "Maximum rows, default as many as fit."},
+        "columns": {"type": "array", "items": {"type": "string"}, "description": "Optional subset of columns."},
+        "format": {"type": "string", "enum": list(TEXT_FORMATS), "description": f"Default {DEFAULT_FORMAT}."},
+    },
+    "required": ["handle"],
+}
+
+
+class ShapingError(ValueError):
+    """Unknown or expired handle, or an invalid slice."""
+
+
+def _slice_argument(value: Any, argument: str, minimum: int) -> int:
+    """A fetch_slice offset / limit tool argument as an integer >= ``minimum``; ShapingError otherwise."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ShapingError(f"Invalid slice {argument}: expected an integer >= {minimum}, got {value!r}")
+    try:
+        number = int(value)
+    except ValueError:
+        raise ShapingError(f"Invalid slice {argument}: expected an integer >= {minimum}, got {value!r}") from None
+    if number < minimum:
+        raise ShapingError(f"Invalid slice {argument}: expected an integer >= {minimum}, got {number}")
+    return number
+
+
+def _json_number(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    if isinstance(value, (np.integer, int)):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return None if np.isnan(value) else round(float(value), 6)
+    return str(value)
+
+
+def _is_numeric(series: pd.Series) -> bool:
+    return pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+
+
+def numeric_summary(frame: pd.DataFrame) -> dict[str, dict[str, Any]]:
+    """Quantiles, mean and null count of every numeric column, computed over all columns at once."""
+    columns = [c for c in frame.columns if _is_numeric(frame[c])]
+    if not columns:
+        return {}
+    numbers = frame[columns]
+    quantiles = numbers.quantile(list(QUANTILES.values()))
+    means = numbers.mean()
+    nulls = numbers.isna().sum()
+    return {
+        str(c): {
+            **{name: _json_number(quantiles[c].iloc[i]) for i, name in enumerate(QUANTILES)},
+            "mean": _json_number(means[c]),
+            "nulls": int(nulls[c]),
+        }
+        for c in columns
+    }
+
+
+def category_summary(frame: pd.DataFrame, top: int = 5) -> dict[str, dict[str, Any]]:
+    """Distinct count, null count and the ``top`` most frequent values of every non-numeric column."""
+    summary: dict[str, dict[str, Any]] = {}
+    for c in frame.columns:
+        if _is_numeric(frame[c]):
+            continue
+        counts = frame[c].value_counts(sort=True)
+        counts = counts[counts > 0]  # unused categories of a categorical column
+        summary[str(c)] = {
+            "distinct": len(counts),
+            "nulls": int(frame[c].isna().sum()),
+            "top": [[str(value), int(count)] for value, count in counts.head(top).items()],
+        }
+    return summary
+
+
+def stratified_sample(frame: pd.DataFrame, rows: int, by: Optional[str] = None, seed: int = 0) -> pd.DataFrame:
+    """About ``rows`` rows with each ``by`` group represented in proportion (at least one row per group).
+
+    Without ``by``, rows are drawn uniformly. Rows keep their original order.
+    """
+    n = len(frame)
+    if n <= rows:
+        return frame
+    rng = np.random.default_rng(seed)
+    if by is None:
+        return frame.iloc[np.sort(rng.choice(n, size=rows, replace=False))]
+    codes, _ = pd.factorize(frame[by], use_na_sentinel=False)
+    counts = np.bincount(codes)
+    quota = np.minimum(counts, np.maximum(1, np.round(rows * counts / n).astype(np.int64)))
+    # Shuffle within each group, then keep each group's first ``quota`` rows.
+    order = np.lexsort((rng.random(n), codes))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    grouped = codes[order]
+    rank = np.arange(n) - starts[grouped]
+    return frame.iloc[np.sort(order[rank < quota[grouped]])]
+
+
+def _strata_column(categories: dict[str, dict[str, Any]], rows: int) -> Optional[str]:
+    """The non-numeric column with the most groups that still fit in a sample of ``rows``."""
+    candidates = [(stats["distinct"], name) for name, stats in categories.items() if 1 < stats["distinct"] <= rows]
+    return max(candidates)[1] if candidates else None
+
+
+@dataclass
+class _Handle:
+    frame: pd.DataFrame
+    expires_at: float
+
+
+@dataclass
+class ShapingStats:
+    results: int = 0
+    digests: int = 0
+    slices: int = 0
+    # Encoded bytes the digests kept out of the context.
+    bytes_avoided: int = 0
+
+
+class ResultShaper:
+    """Keeps run_features results within a context budget of ``max_bytes`` and/or ``max_tokens``.
+
+    ``shape`` returns the encoded result when it fits. Otherwise it returns a JSON digest:
+    schema, row count, quantiles of numeric columns, top values of the others, a
+    stratified sample and a handle to the full result for ``fetch_slice``. Large results
+    are sized from a probe of ``PROBE_ROWS`` rows, so one far over budget is never
+    encoded in full. Binary formats, meant for the PTC sandbox rather than the context,
+    are never shaped. Handles expire ``ttl_seconds`` after their last use and at most
+    ``max_handles`` are kept (oldest dropped first). Budgets of None disable shaping.
+    """
+
+    def __init__(
+        self,
+        max_bytes: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        chars_per_token: float = 4.0,
+        sample_rows: int = 20,
+        top_categories: int = 5,
+        ttl_seconds: float = 600.0,
+        max_handles: int = 32,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.max_tokens = max_tokens
+        self.chars_per_token = chars_per_token
+        self.sample_rows = sample_rows
+        self.top_categories = top_categories
+        self.ttl_seconds = ttl_seconds
+        self.max_handles = max_handles
+        self.stats = ShapingStats()
+        self._clock = clock
+        self._handles: OrderedDict[str, _Handle] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    @property
+    def budget_bytes(self) -> Optional[int]:
+        """The tighter of the byte budget and the token budget in bytes; None when shaping is off."""
+        budgets = [self.max_bytes] if self.max_bytes else []
+        if self.max_tokens:
+            budgets.append(int(self.max_tokens * self.chars_per_token))
+        return min(budgets) if budgets else None
+
+    def shape(self, frame: pd.DataFrame, fmt: str = DEFAULT_FORMAT) -> str:
+        """``encode_result(frame, fmt)``, or a digest with a handle when that would exceed the budget."""
+        self.stats.results += 1
+        budget = self.budget_bytes
+        if budget is None or fmt not in TEXT_FORMATS:
+            return encode_result(frame, fmt)
+        estimate = self._estimate_bytes(frame, fmt)
+        if estimate <= budget * 1.25:
+            encoded = encode_result(frame, fmt)
+            if len(encoded.encode("utf-8")) <= budget:
+                return encoded
+            estimate = len(encoded.encode("utf-8"))
+        self.stats.digests += 1
+        self.stats.bytes_avoided += estimate
+        return json.dumps(self.digest(frame, fmt, estimate, budget))
+
+    def digest(self, frame: pd.DataFrame, fmt: str, result_bytes: int, budget: int) -> dict[str, Any]:
+        """Summary of ``frame`` instead of its rows, with a handle for exact slices."""
+        categories = category_summary(frame, self.top_categories)
+        by = _strata_column(categories, self.sample_rows)
+        sample = stratified_sample(frame, self.sample_rows, by)
+        return {
+            "digest": True,
+            "reason": (
+                f"The result has {len(frame)} rows, about {result_bytes} bytes "
+                f"(~{int(result_bytes / self.chars_per_token)} tokens), over the {budget}-byte budget."
+            ),
+            "num_rows": len(frame),
+            "schema": [{"name": str(name), "dtype": str(dtype)} for name, dtype in frame.dtypes.items()],
+            "numeric": numeric_summary(frame),
+            "categorical": categories,
+            "sample": {"rows": len(sample), "stratified_by": by, "format": fmt, "data": encode_result(sample, fmt)},
+            "handle": self._register(frame),
+            "hint": (
+                "Call fetch_slice with this handle (offset, limit, columns) for exact rows, or narrow run_features "
+                "with filter, group_by/aggregations or limit."
+            ),
+        }
+
+    def fetch_slice(
+        self,
+        handle: str,
+        offset: Any = 0,
+        limit: Any = None,
+        columns: Optional[list[str]] = None,
+        fmt: str = DEFAULT_FORMAT,
+    ) -> str:
+        """Rows ``offset`` to ``offset + limit`` of a digested result as JSON, cut to fit the budget.
+
+        The arguments are checked as tool arguments: ShapingError unless ``handle`` is a string,
+        ``offset`` / ``limit`` are integers (>= 0 / >= 1) and ``columns`` is a list of strings."""
+        if not isinstance(handle, str):
+            raise ShapingError(f"fetch_slice needs the handle string of a digest, got {handle!r}")
+        offset = _slice_argument(offset, "offset", 0)
+        limit = None if limit is None else _slice_argument(limit, "limit", 1)
+        if columns is not None and (not isinstance(columns, list) or not all(isinstance(c, str) for c in columns)):
+            raise ShapingError(f"Invalid slice columns: expected a list of column names, got {columns!r}")
+        if fmt not in TEXT_FORMATS:
+            raise ShapingError(f"Unsupported slice format {fmt!r}; expected one of {list(TEXT_FORMATS)}")
+        with self._lock:
+            self._expire()
+            entry = self._handles.get(handle)
+            if entry is None:
+                raise ShapingError(f"Unknown or expired handle: {handle}")
+            entry.expires_at = self._clock() + self.ttl_seconds
+            self._handles.move_to_end(handle)
+        frame = entry.frame
+        if columns:
+            missing = [c for c in columns if c not in frame.columns]
+            if missing:
+                raise ShapingError(f"Unknown columns {missing}; the result has {[str(c) for c in frame.columns]}")
+            frame = frame[columns]
+        part = frame.iloc[offset : len(frame) if limit is None else offset + limit]
+        encoded = encode_result(part, fmt)
+        budget = self.budget_bytes
+        size = len(encoded.encode("utf-8"))
+        if budget is not None and size > budget and len(part) > 1:
+            # Leave a tenth for the wrapper and for rows longer than average.
+            part = part.iloc[: max(1, int(len(part) * budget * 0.9 / size))]
+            encoded = encode_result(part, fmt)
+        self.stats.slices += 1
+        end = offset + len(part)
+        return json.dumps(
+            {
+                "handle": handle,
+                "offset": offset,
+                "rows": len(part),
+                "num_rows": len(frame),
+                "next_offset": end if end < len(frame) else None,
+                "format": fmt,
+                "data": encoded,
+            }
+        )
+
+    def close(self, handle: str) -> bool:
+        """Drop a handle. Returns False if it was unknown."""
+        with self._lock:
+            return self._handles.pop(handle, None) is not None
+
+    def _estimate_bytes(self, frame: pd.DataFrame, fmt: str) -> int:
+        """Encoded size of ``frame``: exact for small frames, scaled up from evenly spaced rows otherwise."""
+        if len(frame) <= 2 * PROBE_ROWS:
+            return len(encode_result(frame, fmt).encode("utf-8"))
+        probe = frame.iloc[np.linspace(0, len(frame) - 1, PROBE_ROWS).astype(np.int64)]
+        return int(len(encode_result(probe, fmt).encode("utf-8")) * len(frame) / PROBE_ROWS)
+
+    def _register(self, frame: pd.DataFrame) -> str:
+        handle = uuid.uuid4().hex
+        with self._lock:
+            self._expire()
+            while len(self._handles) >= self.max_handles:
+                self._handles.popitem(last=False)
+            self._handles[handle] = _Handle(frame, self._clock() + self.ttl_seconds)
+        return handle
+
+    def _expire(self) -> None:
+        now = self._clock()
+        for handle in [h for h, entry in self._handles.items() if entry.expires_at <= now]:
+            del self._handles[handle]
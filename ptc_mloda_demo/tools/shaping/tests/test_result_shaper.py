@@ -0,0 +1,245 @@
+"""Tests for ResultShaper."""
+
+import io
+import json
+from typing import Any
+
+import pandas as pd
+import pytest
+from mloda.user import PluginLoader
+
+import demo
+from ptc_mloda_demo.feature_groups.sample_data.sample_data_features import ROWS_OPTION, generate_employees
+from ptc_mloda_demo.tools.encoding.result_encoding import encode_result
+from ptc_mloda_demo.tools.shaping.result_shaper import (
+    ResultShaper,
+    ShapingError,
+    category_summary,
+    numeric_summary,
+    stratified_sample,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _frame(rows: int = 5_000) -> pd.DataFrame:
+    frame = generate_employees(rows, seed=3)
+    frame["department"] = frame["department"].astype(str)
+    return frame
+
+
+def _csv(data: str) -> pd.DataFrame:
+    return pd.read_csv(io.StringIO(data))
+
+
+# ---------------------------------------------------------------------------
+# Level 1: Summaries and sampling
+# ---------------------------------------------------------------------------
+
+
+class TestSummaries:
+    """Numeric quantiles and top categories match pandas."""
+
+    def test_numeric_summary(self) -> None:
+        frame = _frame()
+        summary = numeric_summary(frame)
+        assert set(summary) == {"employee_id", "salary", "years_experience", "performance_score"}
+        salary = summary["salary"]
+        assert salary["min"] == frame["salary"].min() and salary["max"] == frame["salary"].max()
+        assert salary["p50"] == pytest.approx(frame["salary"].median())
+        assert salary["mean"] == pytest.approx(frame["salary"].mean())
+        assert salary["nulls"] == 0
+
+    def test_category_summary(self) -> None:
+        frame = generate_employees(1_000, seed=3)  # categorical department with all six categories
+        departments = category_summary(frame, top=2)["department"]
+        counts = frame["department"].value_counts()
+        assert departments["distinct"] == 6
+        assert departments["top"] == [[str(v), int(c)] for v, c in counts.head(2).items()]
+        assert category_summary(frame[frame["department"] == "HR"])["department"]["distinct"] == 1
+
+    def test_stratified_sample_covers_every_group(self) -> None:
+        frame = _frame()
+        frame.loc[frame.index[:3], "department"] = "Legal"  # a tiny group
+        sample = stratified_sample(frame, 30, by="department")
+        assert set(sample["department"]) == set(frame["department"])
+        assert 25 <= len(sample) <= 40
+        assert sample.index.is_monotonic_increasing
+        shares = sample["department"].value_counts(normalize=True)
+        assert shares["Engineering"] == pytest.approx((frame["department"] == "Engineering").mean(), abs=0.1)
+
+    def test_uniform_sample_without_strata(self) -> None:
+        frame = _frame(100)
+        assert len(stratified_sample(frame, 10)) == 10
+        assert stratified_sample(frame, 500) is frame
+
+
+# ---------------------------------------------------------------------------
+# Level 2: Shaping and slices
+# ---------------------------------------------------------------------------
+
+
+class TestShape:
+    """Results within the budget pass through; larger ones become digests."""
+
+    def test_small_result_is_returned_as_is(self) -> None:
+        frame = _frame(10)
+        shaper = ResultShaper(max_tokens=10_000)
+        assert shaper.shape(frame, "csv") == encode_result(frame, "csv")
+        assert (shaper.stats.results, shaper.stats.digests, len(shaper)) == (1, 0, 0)
+
+    def test_large_result_becomes_a_digest(self) -> None:
+        frame = _frame()
+        shaper = ResultShaper(max_bytes=10_000, sample_rows=12)
+        digest = json.loads(shaper.shape(frame, "csv"))
+        assert digest["digest"] is True
+        assert digest["num_rows"] == 5_000
+        assert [c["name"] for c in digest["schema"]] == list(frame.columns)
+        assert digest["numeric"]["salary"]["max"] == frame["salary"].max()
+        assert digest["categorical"]["department"]["distinct"] == 6
+        assert digest["sample"]["stratified_by"] == "department"
+        assert len(_csv(digest["sample"]["data"])) == digest["sample"]["rows"]
+        assert len(json.dumps(digest)) < 10_000
+        assert shaper.stats.digests == 1
+        assert shaper.stats.bytes_avoided > 5 * 10_000
+
+    def test_token_budget_and_disabled_shaping(self) -> None:
+        frame = _frame(500)
+        size = len(encode_result(frame, "csv"))
+        assert json.loads(ResultShaper(max_tokens=size // 8).shape(frame, "csv"))["digest"] is True
+        assert ResultShaper(max_tokens=size).shape(frame, "csv") == encode_result(frame, "csv")
+        assert ResultShaper().shape(frame, "csv") == encode_result(frame, "csv")
+
+    def test_binary_formats_are_never_shaped(self) -> None:
+        frame = _frame()
+        assert ResultShaper(max_bytes=100).shape(frame, "parquet") == encode_result(frame, "parquet")
+
+    def test_result_near_the_budget_is_measured_exactly(self) -> None:
+        frame = _frame(2_000)
+        size = len(encode_result(frame, "columnar_json"))
+        assert ResultShaper(max_bytes=size).shape(frame, "columnar_json") == encode_result(frame, "columnar_json")
+        assert json.loads(ResultShaper(max_bytes=size - 1).shape(frame, "columnar_json"))["digest"] is True
+
+
+class TestFetchSlice:
+    """Handles give exact rows of a digested result, within the budget."""
+
+    def _handle(self, shaper: ResultShaper, frame: pd.DataFrame) -> str:
+        return str(json.loads(shaper.shape(frame, "csv"))["handle"])
+
+    def test_exact_slice(self) -> None:
+        frame = _frame()
+        shaper = ResultShaper(max_bytes=10_000)
+        handle = self._handle(shaper, frame)
+        piece = json.loads(shaper.fetch_slice(handle, offset=100, limit=5, columns=["employee_id", "salary"]))
+        assert (piece["offset"], piece["rows"], piece["next_offset"], piece["num_rows"]) == (100, 5, 105, 5_000)
+        expected = frame[["employee_id", "salary"]].iloc[100:105].reset_index(drop=True)
+        pd.testing.assert_frame_equal(_csv(piece["data"]), expected, check_dtype=False)
+
+    def test_slice_is_cut_to_the_budget(self) -> None:
+        frame = _frame()
+        shaper = ResultShaper(max_bytes=10_000)
+        piece = json.loads(shaper.fetch_slice(self._handle(shaper, frame), offset=4_000))
+        assert 0 < piece["rows"] < 1_000
+        assert len(json.dumps(piece)) <= 10_000 * 1.05
+        assert piece["next_offset"] == 4_000 + piece["rows"]
+        last = json.loads(shaper.fetch_slice(self._handle(shaper, frame), offset=4_990))
+        assert (last["rows"], last["next_offset"]) == (10, None)
+
+    def test_invalid_slices(self) -> None:
+        shaper = ResultShaper(max_bytes=1_000)
+        handle = self._handle(shaper, _frame(500))
+        with pytest.raises(ShapingError, match="Unknown columns"):
+            shaper.fetch_slice(handle, columns=["bonus"])
+        with pytest.raises(ShapingError, match="Invalid slice"):
+            shaper.fetch_slice(handle, offset=-1)
+        with pytest.raises(ShapingError, match="Unsupported slice format"):
+            shaper.fetch_slice(handle, fmt="parquet")
+        with pytest.raises(ShapingError, match="Unknown or expired"):
+            shaper.fetch_slice("nope")
+
+    @pytest.mark.parametrize(
+        "arguments",
+        [
+            {"offset": "x"},
+            {"offset": 1.5},
+            {"offset": True},
+            {"limit": "all"},
+            {"limit": 0},
+            {"limit": [3]},
+            {"columns": "salary"},
+            {"columns": [1]},
+        ],
+    )
+    def test_invalid_slice_arguments(self, arguments: dict[str, Any]) -> None:
+        shaper = ResultShaper(max_bytes=1_000)
+        handle = self._handle(shaper, _frame(500))
+        with pytest.raises(ShapingError, match="Invalid slice"):
+            shaper.fetch_slice(handle, **arguments)
+
+    @pytest.mark.parametrize("handle", [None, 7])
+    def test_missing_handle(self, handle: Any) -> None:
+        with pytest.raises(ShapingError, match="handle"):
+            ResultShaper().fetch_slice(handle)
+
+    def test_json_numbers_are_accepted(self) -> None:
+        shaper = ResultShaper(max_bytes=10_000)
+        piece = json.loads(shaper.fetch_slice(self._handle(shaper, _frame()), offset="10", limit=3.0))
+        assert (piece["offset"], piece["rows"]) == (10, 3)
+
+    def test_handles_expire_and_are_bounded(self) -> None:
+        clock = FakeClock()
+        shaper = ResultShaper(max_bytes=1_000, ttl_seconds=10, max_handles=2, clock=clock)
+        frame = _frame(500)
+        handles = [self._handle(shaper, frame) for _ in range(3)]
+        assert len(shaper) == 2
+        with pytest.raises(ShapingError):
+            shaper.fetch_slice(handles[0], limit=1)
+        clock.now = 9
+        shaper.fetch_slice(handles[2], limit=1)  # use extends the handle's lifetime
+        clock.now = 15
+        shaper.fetch_slice(handles[2], limit=1)
+        with pytest.raises(ShapingError):
+            shaper.fetch_slice(handles[1], limit=1)
+        assert shaper.close(handles[2]) is True
+        assert shaper.close(handles[2]) is False
+
+
+# ---------------------------------------------------------------------------
+# Level 3: Integration with demo's run_features and fetch_slice tools
+# ---------------------------------------------------------------------------
+
+
+class TestDemoShaping:
+    """run_features returns a digest over the budget, and fetch_slice serves its rows."""
+
+    def test_run_features_digest_and_fetch_slice(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        PluginLoader.all()
+        monkeypatch.setattr(demo, "RESULT_SHAPER", ResultShaper(max_tokens=2_000))
+        monkeypatch.setitem(demo.FEATURE_OPTIONS, ROWS_OPTION, 3_000)
+        demo.RESULT_CACHE.clear()
+        inputs: dict[str, Any] = {"feature_names": ["employee_id", "department", "salary"]}
+        try:
+            digest = json.loads(demo._call_tool("run_features", inputs))
+            assert digest["digest"] is True and digest["num_rows"] == 3_000
+            piece = json.loads(demo._call_tool("fetch_slice", {"handle": digest["handle"], "offset": 10, "limit": 3}))
+            exact = demo._call_tool("run_features", {**inputs, "order_by": [{"column": "employee_id"}], "limit": 13})
+            assert piece["data"].splitlines()[1:] == exact.splitlines()[11:]
+            small = demo._call_tool("run_features", {**inputs, "limit": 5})
+            assert len(_csv(small)) == 5
+            error = json.loads(demo._call_tool("fetch_slice", {"handle": "expired"}))
+            assert "Unknown or expired handle" in error["error"]
+            for bad in ({}, {"handle": digest["handle"], "offset": "x"}, {"handle": digest["handle"], "limit": "y"}):
+                assert "error" in json.loads(demo._call_tool("fetch_slice", bad))
+        finally:
+            demo.RESULT_CACHE.clear()
+
+    def test_fetch_slice_is_offered_to_loop_and_ptc(self) -> None:
+        assert "fetch_slice" in [t["name"] for t in demo.LOOP_TOOLS]
+        assert "fetch_slice" in [t["name"] for t in demo.PTC_TOOLS]